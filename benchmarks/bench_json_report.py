@@ -0,0 +1,138 @@
+"""
+Benchmark for the combined JSON report: peak RSS and time of writing a
+100k-row System Inventory (plus DevEnvAudit results) with the previous
+output_to_json_combined (one combined dict, every object converted with
+to_dict(), then json.dump(indent=4)) against
+report_generator.write_combined_json_report (StreamingJsonWriter), indented
+and compact.
+
+Every mode runs in its own process, so each peak RSS is measured from the
+same starting point: the process after building the input data.
+Peak RSS needs the `resource` module (Linux/macOS).
+
+Usage:
+    python benchmarks/bench_json_report.py [--rows 100000] [--components 1000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.report_generator import write_combined_json_report  # noqa: E402
+from devenvaudit_src.scan_logic import DetectedComponent, ScanIssue  # noqa: E402
+
+MODES = ("legacy", "streaming", "streaming-compact")
+
+
+def peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def synthetic_inventory(rows):
+    return [
+        {
+            "DisplayName": f"Application {i}",
+            "DisplayVersion": f"{i % 30}.{i % 7}.{i % 101}",
+            "Publisher": f"Publisher {i % 500}",
+            "InstallLocation": f"C:\\Program Files\\Vendor {i % 500}\\Application {i}",
+            "InstallLocationSize": f"{(i * 7919) % 100000 / 10:.1f} MB",
+            "PathStatus": "OK",
+            "Remarks": "",
+            "SourceHive": "HKEY_LOCAL_MACHINE",
+            "RegistryKeyPath": f"SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\{{{i:08X}-APP}}",
+            "Category": "Application" if i % 4 else "Component/Driver",
+        }
+        for i in range(rows)
+    ]
+
+
+def synthetic_devenv(components):
+    detected = [
+        DetectedComponent(
+            id=f"tool{i}-1.{i}-/opt/tool{i}/bin/tool{i}",
+            name=f"Tool {i}",
+            version=f"1.{i}",
+            path=f"/opt/tool{i}/bin",
+            executable_path=f"/opt/tool{i}/bin/tool{i}",
+            details={"packages": {"pip": {"count": 20, "packages": {f"pkg{j}": "1.0" for j in range(20)}}}},
+        )
+        for i in range(components)
+    ]
+    issues = [
+        ScanIssue(severity="Warning", description=f"Issue {i}", category="PATH") for i in range(components)
+    ]
+    return detected, issues
+
+
+def legacy_output(path, inventory, components, issues):
+    """The previous output_to_json_combined, minus its placeholder handling and logging."""
+    combined_data = {
+        "systemInventory": inventory,
+        "devEnvAudit": {
+            "detectedComponents": [comp.to_dict() for comp in components],
+            "identifiedIssues": [issue.to_dict() for issue in issues],
+        },
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(combined_data, f, ensure_ascii=False, indent=4)
+
+
+def run_mode(mode, rows, components, path):
+    inventory = synthetic_inventory(rows)
+    detected, issues = synthetic_devenv(components)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "legacy":
+        legacy_output(path, inventory, detected, issues)
+    else:
+        write_combined_json_report(
+            path, inventory, detected, None, issues, compact=mode == "streaming-compact"
+        )
+    seconds = time.perf_counter() - start
+    print(json.dumps({"baseline": baseline, "peak": peak_rss_mb(), "seconds": seconds}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--components", type=int, default=1000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)  # Child process
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.mode:
+        run_mode(args.mode, args.rows, args.components, args.output)
+        return
+
+    print(f"rows: {args.rows} inventory, {args.components} components, {args.components} issues")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        outputs = {}
+        for mode in MODES:
+            output = os.path.join(tmp_dir, f"{mode}.json")
+            result = json.loads(
+                subprocess.run(
+                    [sys.executable, __file__, "--mode", mode, "--output", output,
+                     "--rows", str(args.rows), "--components", str(args.components)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+            )
+            size_mb = os.path.getsize(output) / (1024 * 1024)
+            print(
+                f"{mode:<18} {result['seconds']:6.2f} s  file {size_mb:6.1f} MB  "
+                f"peak RSS {result['peak']:7.1f} MB (+{result['peak'] - result['baseline']:.1f} MB over the input data)"
+            )
+            outputs[mode] = output
+        with open(outputs["legacy"], "rb") as legacy, open(outputs["streaming"], "rb") as streaming:
+            print(f"streaming output identical to legacy: {legacy.read() == streaming.read()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark for SoftwareCategorizer: categorizes 100k synthetic component names
+built from the real 'software categorization database.json' and compares the
+indexed `categorize_many` against a straightforward per-entry scan (the
+categorizer's previous algorithm).
+
+Usage:
+    python benchmarks/bench_software_categorizer.py [--count 100000] [--naive-sample 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.scan_logic import (  # noqa: E402
+    SOFTWARE_CATEGORIZATION_DB_PATH,
+    SoftwareCategorizer,
+)
+
+
+def naive_categorize(db, component_name, exe_name=None):
+    """Reference implementation: scans every entry of every category per call."""
+    comp_name_lower = component_name.lower() if component_name else ""
+    if exe_name:
+        for category, entries in db.items():
+            for entry in entries:
+                db_executables = [e.lower() for e in entry.get("executables") or [] if e]
+                if exe_name in db_executables:
+                    return category, entry.get("name")
+    if comp_name_lower:
+        for category, entries in db.items():
+            for entry in entries:
+                db_entry_name_lower = (entry.get("name") or "").lower()
+                if db_entry_name_lower and db_entry_name_lower in comp_name_lower:
+                    return category, entry.get("name")
+                keywords = [kw.lower() for kw in entry.get("keywords") or []]
+                if any(kw in comp_name_lower for kw in keywords):
+                    return category, entry.get("name")
+    return None, None
+
+
+def synthetic_names(db, count, seed=1234):
+    rng = random.Random(seed)
+    vocabulary = []
+    for entries in db.values():
+        for entry in entries:
+            vocabulary.extend((entry.get("name") or "").split())
+    vocabulary.extend(["Update", "Runtime", "x64", "Helper", "Redistributable", "Toolkit"])
+    names = []
+    for _ in range(count):
+        words = rng.sample(vocabulary, rng.randint(1, 4))
+        names.append(f"{' '.join(words)} {rng.randint(1, 30)}.{rng.randint(0, 9)}")
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--naive-sample", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with open(SOFTWARE_CATEGORIZATION_DB_PATH, "r", encoding="utf-8") as f:
+        db = json.load(f)
+    names = synthetic_names(db, args.count)
+
+    start = time.perf_counter()
+    categorizer = SoftwareCategorizer(db)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = categorizer.categorize_many(names)
+    indexed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results_warm = categorizer.categorize_many(names)
+    warm_seconds = time.perf_counter() - start
+
+    sample = names[: args.naive_sample]
+    start = time.perf_counter()
+    naive_results = [naive_categorize(db, name) for name in sample]
+    naive_seconds = time.perf_counter() - start
+
+    assert results == results_warm
+    assert results[: len(sample)] == naive_results, "indexed and naive results differ"
+
+    matched = sum(1 for category, _ in results if category)
+    naive_per_name = naive_seconds / max(1, len(sample))
+    print(f"entries indexed:        {len(categorizer._entries)} ({build_seconds * 1000:.1f} ms)")
+    print(f"names categorized:      {len(names)} ({matched} matched)")
+    print(f"categorize_many (cold): {indexed_seconds:.3f} s ({indexed_seconds / len(names) * 1e6:.1f} us/name)")
+    print(f"categorize_many (warm): {warm_seconds:.3f} s")
+    print(
+        f"naive scan:             {naive_per_name * 1e6:.1f} us/name "
+        f"(~{naive_per_name * len(names):.1f} s extrapolated for {len(names)} names)"
+    )
+
+
+if __name__ == "__main__":
+    main()
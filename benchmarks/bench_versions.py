@@ -0,0 +1,103 @@
+"""
+Benchmark for versions.py: 100k update checks (installed vs latest version)
+over a realistic mix of Debian, RPM, PEP 440, semver and winget-style
+versions, compared against the previous check in package_manager_integrator
+(`packaging.version.parse` per call with the import inside the function,
+falling back to string comparison).
+
+Usage:
+    python benchmarks/bench_versions.py [--count 100000] [--distinct 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src import versions  # noqa: E402
+
+
+def legacy_is_newer(installed_version, latest_version):
+    """The previous _is_update_available, minus its logging."""
+    try:
+        from packaging.version import parse as parse_version
+
+        return parse_version(latest_version) > parse_version(installed_version)
+    except ImportError:
+        return latest_version > installed_version
+    except Exception:
+        return latest_version > installed_version
+
+
+def synthetic_versions(rng, scheme):
+    major, minor, patch = rng.randint(0, 30), rng.randint(0, 20), rng.randint(0, 40)
+    if scheme == "debian":
+        epoch = f"{rng.randint(1, 2)}:" if rng.random() < 0.2 else ""
+        tilde = "~rc1" if rng.random() < 0.1 else ""
+        return f"{epoch}{major}.{minor}.{patch}{tilde}-{rng.randint(0, 5)}+deb12u{rng.randint(1, 3)}"
+    if scheme == "rpm":
+        return f"{major}.{minor}.{patch}-{rng.randint(1, 9)}.fc{rng.randint(37, 40)}"
+    if scheme == "pep440":
+        suffix = rng.choice(["", "", "rc1", ".post1", ".dev3"])
+        return f"{major}.{minor}.{patch}{suffix}"
+    if scheme == "semver":
+        suffix = rng.choice(["", "", "-beta.2", "-rc.1+build.7"])
+        return f"{major}.{minor}.{patch}{suffix}"
+    return f"{major}.{minor}.{patch}.{rng.randint(0, 9999)}"  # winget
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=2000, help="distinct versions per scheme")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(1234)
+    pools = {
+        scheme: [synthetic_versions(rng, scheme) for _ in range(args.distinct)]
+        for scheme in ("debian", "rpm", "pep440", "semver", "generic")
+    }
+    checks = []
+    for _ in range(args.count):
+        scheme = rng.choice(list(pools))
+        checks.append((scheme, rng.choice(pools[scheme]), rng.choice(pools[scheme])))
+
+    start = time.perf_counter()
+    legacy = [legacy_is_newer(installed, latest) for _, installed, latest in checks]
+    legacy_seconds = time.perf_counter() - start
+
+    versions.clear_cache()
+    start = time.perf_counter()
+    cold = [versions.is_newer(latest, installed, scheme) for scheme, installed, latest in checks]
+    cold_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warm = [versions.is_newer(latest, installed, scheme) for scheme, installed, latest in checks]
+    warm_seconds = time.perf_counter() - start
+
+    by_scheme = {}
+    for scheme, installed, latest in checks:
+        by_scheme.setdefault(scheme, []).append((latest, installed))
+    start = time.perf_counter()
+    for scheme, pairs in by_scheme.items():
+        versions.compare_many(pairs, scheme)
+    bulk_seconds = time.perf_counter() - start
+
+    assert cold == warm
+    disagreements = sum(1 for a, b in zip(legacy, cold) if a != b)
+    cache = versions.version_key.cache_info()
+    n = len(checks)
+    print(f"update checks:            {n} ({sum(cold)} newer)")
+    print(f"legacy packaging/string:  {legacy_seconds:.3f} s ({legacy_seconds / n * 1e6:.1f} us/check)")
+    print(f"versions.is_newer (cold): {cold_seconds:.3f} s ({cold_seconds / n * 1e6:.1f} us/check)")
+    print(f"versions.is_newer (warm): {warm_seconds:.3f} s ({warm_seconds / n * 1e6:.1f} us/check)")
+    print(f"versions.compare_many:    {bulk_seconds:.3f} s ({bulk_seconds / n * 1e6:.1f} us/check)")
+    print(f"key cache:                {cache.currsize} keys, {cache.hits} hits, {cache.misses} misses")
+    print(f"legacy results differing: {disagreements} (string fallback, epochs, tildes, revisions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,29 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "scan_env_vars": True,
         "cross_reference_tools": True,  # e.g., check if JAVA_HOME points to a detected Java
         "perform_update_checks": True,  # Check for updates using package managers
+        "latest_version_cache_ttl_hours": 1,  # Older lookups are served, then refreshed in the background
+        "latest_version_cache_max_stale_days": 7,  # Older lookups are dropped
+        "latest_version_cache_max_entries": 5000,
+        "package_manager_call_timeout_seconds": 15,  # Per package-manager command
+        "package_manager_stage_timeout_seconds": 120,  # Deadline for all commands of one update check or listing
+        "max_version_probe_workers": 8,  # Concurrent '<tool> --version' processes
+        "version_probe_timeout_seconds": 5,  # Per-probe timeout
+        "version_probe_deadline_seconds": 60,  # Deadline for all probes of one scan
+        "static_version_probe_enabled": True,  # Read versions from PE/ELF files before running them
+        "version_probe_cache_enabled": True,  # Reuse versions of unchanged binaries
+        "version_probe_cache_max_entries": 2000,
+        "version_probe_cache_max_age_days": 30,
+        "incremental_scan_enabled": True,  # Re-probe only changed binaries; report changes since the last scan
+        "progress_event_interval_seconds": 0.1,  # Max rate of progress updates to the GUI/CLI
+        "discovery_enabled": True,  # Walk scan_paths for tools that are not on PATH
+        "discovery_time_budget_seconds": 10,
+        "discovery_max_workers": 4,
+        "discovery_max_depth": 8,
+        # "discovery_pruned_dir_names": [...]  # Optional; replaces discovery.DEFAULT_PRUNED_DIR_NAMES
+        "version_manager_discovery_enabled": True,  # pyenv, nvm, SDKMAN!, asdf, rustup, conda
+        "ecosystem_inventory_enabled": True,  # pip/npm/cargo/go/gem packages of detected interpreters
+        "ecosystem_collector_max_workers": 4,
+        "ecosystem_command_timeout_seconds": 30,  # npm ls / go version -m / gem list
         "preferred_package_managers_windows": ["winget", "choco", "scoop"],
         "preferred_package_managers_linux": [
             "apt",
@@ -62,6 +85,7 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "file": "devenvaudit.log",  # Log file name (will be placed in CONFIG_DIR_PATH)
     },
     "ignored_tools_identifiers": [],  # List of component IDs to ignore in reports
+    # "env_rules": [...]  # Optional; replaces env_rules.DEFAULT_ENV_RULES when present
     "user_preferences": {"theme": "default", "always_show_details": False},
 }
 
@@ -0,0 +1,263 @@
+"""
+Cross-reference phase of the DevEnvAudit scan.
+
+Joins the detected components with what the PATH and the environment say
+about them:
+
+* PATH shadowing - for every executable name of a detected tool, the ordered
+  chain of distinct executables PATH resolves it to; the first one wins and
+  the rest are shadowed;
+* home variables - whether JAVA_HOME (and GOROOT) point at a detected
+  installation, and whether that is the one PATH runs;
+* duplicate and conflicting installs - several copies of the same version of
+  a tool, or several versions outside of a version manager.
+
+Each side is indexed once (components by resolved executable path and by
+name, PATH through the scan's PathIndex, environment variables in a dict), so
+the phase is linear in the number of components, executable names and
+variables. Findings are returned as plain data and turned into ScanIssues by
+the scanner, like env_rules' findings.
+"""
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .fs_cache import FileSystemCache
+from .path_index import PathIndex
+
+logger = logging.getLogger(__name__)
+
+# Environment variable -> executable names expected in its bin/ directory
+HOME_VARIABLES: Dict[str, Sequence[str]] = {
+    "JAVA_HOME": ("java", "java.exe"),
+    "GOROOT": ("go", "go.exe"),
+}
+
+
+@dataclass
+class CrossReferenceFinding:
+    severity: str
+    category: str
+    description: str
+    component_id: Optional[str] = None
+    related_path: Optional[str] = None
+
+
+@dataclass
+class ShadowingEntry:
+    path: str  # As found on PATH
+    resolved_path: str
+    component_id: Optional[str] = None
+    version: Optional[str] = None
+
+    def describe(self) -> str:
+        if self.component_id is None:
+            return f"{self.path} (not a detected component)"
+        return f"{self.path} ({self.version or 'Unknown'})"
+
+
+@dataclass
+class ShadowingChain:
+    """Distinct executables PATH resolves `name` to, in PATH order; the first wins."""
+
+    name: str
+    entries: List[ShadowingEntry] = field(default_factory=list)
+
+    @property
+    def winner(self) -> ShadowingEntry:
+        return self.entries[0]
+
+    @property
+    def paths(self) -> List[str]:
+        return [entry.path for entry in self.entries]
+
+
+class CrossReferenceAnalyzer:
+    def __init__(
+        self,
+        components: Sequence[Any],
+        environment: Mapping[str, str],
+        path_index: PathIndex,
+        filesystem: Optional[FileSystemCache] = None,
+        tool_executables: Optional[Mapping[str, Iterable[str]]] = None,
+    ):
+        """
+        `components` are DetectedComponents; `tool_executables` maps a tool
+        name to its executable names from the tools DB, in addition to the
+        basename of each component's executable.
+        """
+        self.components = components
+        self.environment = environment
+        self.path_index = path_index
+        self.fs = filesystem if filesystem is not None else FileSystemCache()
+        self.tool_executables = tool_executables or {}
+        self.shadowing: Dict[str, ShadowingChain] = {}
+        self._by_resolved_path: Dict[str, Any] = {}
+        self._by_name: Dict[str, List[Any]] = {}
+
+    def _resolve(self, path: Optional[str]) -> Optional[str]:
+        if not path:
+            return None
+        return os.path.normcase(self.fs.realpath(path))
+
+    def _build_indexes(self):
+        for component in self.components:
+            resolved = self._resolve(component.executable_path)
+            if resolved is not None:
+                self._by_resolved_path.setdefault(resolved, component)
+            self._by_name.setdefault(component.name, []).append(component)
+
+    def run(self) -> List[CrossReferenceFinding]:
+        self._build_indexes()
+        findings: List[CrossReferenceFinding] = []
+        findings.extend(self._check_path_shadowing())
+        findings.extend(self._check_home_variables())
+        findings.extend(self._check_duplicates_and_conflicts())
+        return findings
+
+    # --- PATH shadowing ---
+
+    def _executable_names(self) -> List[str]:
+        names: Dict[str, None] = {}  # Ordered set
+        for component in self.components:
+            for exe_name in self.tool_executables.get(component.name, ()):
+                names[exe_name] = None
+            if component.executable_path:
+                names[os.path.basename(component.executable_path)] = None
+        return list(names)
+
+    def _chain_for(self, name: str) -> ShadowingChain:
+        chain = ShadowingChain(name)
+        seen = set()
+        for path in self.path_index.find_all(name):
+            resolved = self._resolve(path)
+            if resolved in seen:
+                continue  # Another link to an executable already in the chain
+            seen.add(resolved)
+            component = self._by_resolved_path.get(resolved)
+            chain.entries.append(
+                ShadowingEntry(
+                    path=path,
+                    resolved_path=resolved,
+                    component_id=component.id if component else None,
+                    version=component.version if component else None,
+                )
+            )
+        return chain
+
+    def _check_path_shadowing(self) -> List[CrossReferenceFinding]:
+        findings = []
+        for name in self._executable_names():
+            chain = self._chain_for(name)
+            if not chain.entries:
+                continue
+            self.shadowing[name] = chain
+            if len(chain.entries) < 2:
+                continue
+            winner = chain.winner
+            shadowed = chain.entries[1:]
+            versions = {e.version for e in chain.entries if e.component_id is not None}
+            component_id = winner.component_id or next(
+                (e.component_id for e in shadowed if e.component_id), None
+            )
+            order = "; ".join(
+                f"{position}. {entry.describe()}"
+                for position, entry in enumerate(chain.entries, start=1)
+            )
+            findings.append(
+                CrossReferenceFinding(
+                    severity="Warning" if len(versions) > 1 else "Info",
+                    category="Pathing",
+                    description=(
+                        f"'{name}' resolves to {winner.describe()} and shadows "
+                        f"{len(shadowed)} other executable(s) on PATH. PATH order: {order}"
+                    ),
+                    component_id=component_id,
+                    related_path=winner.path,
+                )
+            )
+        return findings
+
+    # --- Home variables ---
+
+    def _check_home_variables(self) -> List[CrossReferenceFinding]:
+        findings = []
+        for variable, exe_names in HOME_VARIABLES.items():
+            home = self.environment.get(variable)
+            if not home or not home.strip():
+                continue
+            home_executable = None
+            for exe_name in exe_names:
+                candidate = os.path.join(home.strip(), "bin", exe_name)
+                if self.fs.isfile(candidate):
+                    home_executable = candidate
+                    break
+            if home_executable is None:
+                continue  # Reported by the java_home_invalid environment rule
+            home_component = self._by_resolved_path.get(self._resolve(home_executable))
+            on_path = next(
+                (self.shadowing[n].winner for n in exe_names if n in self.shadowing), None
+            )
+            if home_component is None:
+                findings.append(
+                    CrossReferenceFinding(
+                        severity="Info",
+                        category="Configuration",
+                        description=f"{variable} points to {home}, which is not one of the detected installations.",
+                        component_id=on_path.component_id if on_path else None,
+                        related_path=home,
+                    )
+                )
+            elif on_path is not None and on_path.resolved_path != self._resolve(home_executable):
+                findings.append(
+                    CrossReferenceFinding(
+                        severity="Warning",
+                        category="Configuration",
+                        description=(
+                            f"{variable} points to {home} ({home_component.version or 'Unknown'}), "
+                            f"but PATH runs {on_path.describe()}."
+                        ),
+                        component_id=home_component.id,
+                        related_path=home,
+                    )
+                )
+        return findings
+
+    # --- Duplicates and conflicts ---
+
+    def _check_duplicates_and_conflicts(self) -> List[CrossReferenceFinding]:
+        findings = []
+        for name, components in self._by_name.items():
+            # Several versions from a version manager are intentional.
+            unmanaged = [c for c in components if not c.details.get("version_manager")]
+            by_version: Dict[Optional[str], List[Any]] = {}
+            for component in unmanaged:
+                by_version.setdefault(component.version, []).append(component)
+            for version, copies in by_version.items():
+                distinct = {self._resolve(c.executable_path) for c in copies}
+                if len(distinct) > 1:
+                    findings.append(
+                        CrossReferenceFinding(
+                            severity="Info",
+                            category="Version",
+                            description=(
+                                f"{name} {version or 'Unknown'} is installed {len(distinct)} times: "
+                                + ", ".join(sorted(c.executable_path for c in copies))
+                            ),
+                            component_id=copies[0].id,
+                            related_path=copies[0].executable_path,
+                        )
+                    )
+            known_versions = sorted(v for v in by_version if v and v != "Unknown")
+            if len(known_versions) > 1:
+                findings.append(
+                    CrossReferenceFinding(
+                        severity="Warning",
+                        category="Version",
+                        description=f"Conflicting {name} installations: versions {', '.join(known_versions)}.",
+                        component_id=by_version[known_versions[0]][0].id,
+                    )
+                )
+        return findings
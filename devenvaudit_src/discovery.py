@@ -0,0 +1,262 @@
+"""
+Filesystem discovery of tools that are not reachable through PATH.
+
+Portable JDKs, SDKs unpacked under ~/tools, IDEs extracted to a download folder
+and similar installs are only found by walking the configured `scan_paths`.
+The `DiscoveryWalker` does that breadth-first on a small thread pool, one
+directory per task, and reports every file whose name is an executable name of
+a tool in the OS's view of the tools DB.
+
+The walk is kept cheap and bounded:
+
+* `excluded_paths` are stored in a prefix trie over path components, so each
+  directory is checked against all exclusions in O(depth), and excluded
+  subtrees are never listed;
+* heavy directories that never contain tools of interest (node_modules, .git,
+  caches, ...) are pruned by name before they are queued;
+* symlinked directories are not followed, so link cycles can't trap the walk;
+* the queue of directories still to visit, the walk depth and the number of
+  matches are capped, and the whole walk stops at a time budget. A walk that
+  hit any of these limits is reported as `truncated`/`timed_out` rather than
+  failing.
+"""
+
+import logging
+import os
+import platform
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .tools_db import ToolsDBView
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRUNED_DIR_NAMES = (
+    "node_modules",
+    ".git",
+    ".hg",
+    ".svn",
+    "__pycache__",
+    ".cache",
+    "Caches",
+    ".Trash",
+    ".tox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".gradle",
+    ".m2",
+    "site-packages",
+    "$Recycle.Bin",
+)
+DEFAULT_DISCOVERY_WORKERS = 4
+DEFAULT_DISCOVERY_TIME_BUDGET = 10.0  # seconds
+DEFAULT_DISCOVERY_MAX_DEPTH = 8
+DEFAULT_DISCOVERY_MAX_PENDING_DIRS = 10000
+DEFAULT_DISCOVERY_MAX_MATCHES = 1000
+_POLL_INTERVAL = 0.2  # seconds between should_stop checks
+
+
+def _split_path(path: str) -> Tuple[str, ...]:
+    """Normalized components of an absolute path, used as trie keys."""
+    normalized = os.path.normcase(os.path.abspath(os.path.expanduser(path)))
+    drive, rest = os.path.splitdrive(normalized)
+    parts = [part for part in rest.replace("\\", "/").split("/") if part]
+    return (drive,) + tuple(parts) if drive else tuple(parts)
+
+
+class ExclusionTrie:
+    """Prefix trie of excluded directories; a path is excluded if any ancestor is."""
+
+    _END = "\0"  # Can't occur in a path component
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._root: Dict[str, dict] = {}
+        self._size = 0
+        for path in paths:
+            self.add(path)
+
+    def add(self, path: str):
+        node = self._root
+        for part in _split_path(path):
+            node = node.setdefault(part, {})
+        if self._END not in node:
+            node[self._END] = {}
+            self._size += 1
+
+    def excludes(self, path: str) -> bool:
+        node = self._root
+        if self._END in node:
+            return True
+        for part in _split_path(path):
+            node = node.get(part)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self._size
+
+
+@dataclass
+class DiscoveryResult:
+    """Executables found by a discovery walk, keyed by tool id."""
+
+    matches: Dict[str, List[str]] = field(default_factory=dict)
+    directories_scanned: int = 0
+    directories_pruned: int = 0
+    elapsed: float = 0.0
+    truncated: bool = False  # A depth, queue or match limit was hit
+    timed_out: bool = False
+
+    def paths_for(self, tool_id: str) -> List[str]:
+        return self.matches.get(tool_id, [])
+
+    @property
+    def match_count(self) -> int:
+        return sum(len(paths) for paths in self.matches.values())
+
+
+class DiscoveryWalker:
+    """Parallel, bounded walk of scan paths looking for tool executables."""
+
+    def __init__(
+        self,
+        view: ToolsDBView,
+        scan_paths: Iterable[str],
+        excluded_paths: Iterable[str] = (),
+        pruned_dir_names: Iterable[str] = DEFAULT_PRUNED_DIR_NAMES,
+        max_workers: int = DEFAULT_DISCOVERY_WORKERS,
+        time_budget_seconds: float = DEFAULT_DISCOVERY_TIME_BUDGET,
+        max_depth: int = DEFAULT_DISCOVERY_MAX_DEPTH,
+        max_pending_dirs: int = DEFAULT_DISCOVERY_MAX_PENDING_DIRS,
+        max_matches: int = DEFAULT_DISCOVERY_MAX_MATCHES,
+        system: Optional[str] = None,
+    ):
+        self.view = view
+        self.system = system or platform.system()
+        self.excluded = ExclusionTrie(excluded_paths)
+        self.case_insensitive = self.system == "Windows"
+        self.pruned_dir_names = {self._key(name) for name in pruned_dir_names}
+        self.max_workers = max(1, int(max_workers))
+        self.time_budget_seconds = float(time_budget_seconds)
+        self.max_depth = int(max_depth)
+        self.max_pending_dirs = max(1, int(max_pending_dirs))
+        self.max_matches = int(max_matches)
+        self.roots = self._normalize_roots(scan_paths)
+
+    def _key(self, name: str) -> str:
+        return name.lower() if self.case_insensitive else name
+
+    def _normalize_roots(self, scan_paths: Iterable[str]) -> List[str]:
+        """Expands ~ and drops roots that are excluded or nested in another root."""
+        candidates = sorted(
+            {os.path.abspath(os.path.expanduser(p)) for p in scan_paths if p},
+            key=lambda p: len(_split_path(p)),
+        )
+        roots: List[str] = []
+        covered = ExclusionTrie()
+        for root in candidates:
+            if self.excluded.excludes(root) or covered.excludes(root):
+                continue
+            covered.add(root)
+            roots.append(root)
+        return roots
+
+    def _scan_directory(
+        self, directory: str
+    ) -> Tuple[List[str], List[Tuple[str, str]], int]:
+        """Lists one directory. Returns (subdirectories, (tool id, path) matches, pruned)."""
+        subdirs: List[str] = []
+        matches: List[Tuple[str, str]] = []
+        pruned = 0
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self._key(entry.name) in self.pruned_dir_names:
+                                pruned += 1
+                            else:
+                                subdirs.append(entry.path)
+                            continue
+                        tools = self.view.tools_for_executable(entry.name)
+                        if not tools or not entry.is_file():
+                            continue
+                        if self.system != "Windows" and not os.access(entry.path, os.X_OK):
+                            continue
+                        for tool in tools:
+                            matches.append((tool.id, entry.path))
+                    except OSError:
+                        continue
+        except (OSError, ValueError) as e:
+            logger.debug(f"Discovery could not list {directory}: {e}")
+        return subdirs, matches, pruned
+
+    def walk(self, should_stop: Optional[Callable[[], bool]] = None) -> DiscoveryResult:
+        """Walks all roots. `should_stop()` returning True ends the walk early."""
+        result = DiscoveryResult()
+        start = time.monotonic()
+        deadline = start + self.time_budget_seconds
+        pending: Deque[Tuple[str, int]] = deque((root, 0) for root in self.roots)
+        seen_matches = set()
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="discovery"
+        )
+        running = {}
+        try:
+            while pending or running:
+                # Keep every worker busy; the queue itself is the bounded frontier.
+                while pending and len(running) < self.max_workers:
+                    directory, depth = pending.popleft()
+                    running[executor.submit(self._scan_directory, directory)] = depth
+                if should_stop is not None and should_stop():
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    result.timed_out = True
+                    break
+                done, _ = wait(
+                    list(running),
+                    timeout=min(remaining, _POLL_INTERVAL),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    depth = running.pop(future)
+                    subdirs, matches, pruned = future.result()
+                    result.directories_scanned += 1
+                    result.directories_pruned += pruned
+                    for tool_id, path in matches:
+                        if (tool_id, path) in seen_matches:
+                            continue
+                        if len(seen_matches) >= self.max_matches:
+                            result.truncated = True
+                            break
+                        seen_matches.add((tool_id, path))
+                        result.matches.setdefault(tool_id, []).append(path)
+                    if depth >= self.max_depth:
+                        result.truncated = result.truncated or bool(subdirs)
+                        continue
+                    for subdir in subdirs:
+                        if self.excluded.excludes(subdir):
+                            result.directories_pruned += 1
+                        elif len(pending) >= self.max_pending_dirs:
+                            result.truncated = True
+                        else:
+                            pending.append((subdir, depth + 1))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        result.elapsed = time.monotonic() - start
+        logger.info(
+            f"Discovery walked {result.directories_scanned} directories "
+            f"({result.directories_pruned} pruned) in {result.elapsed:.2f}s and found "
+            f"{result.match_count} executables"
+            + (" (time budget exhausted)" if result.timed_out else "")
+            + (" (limits reached)" if result.truncated else "")
+        )
+        return result
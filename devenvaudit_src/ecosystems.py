@@ -0,0 +1,420 @@
+"""
+Inventory of language-ecosystem packages (pip, npm, cargo, go, gem) for the
+interpreters and toolchains a scan detected.
+
+Each collector answers for a whole interpreter at once, either from metadata
+on disk or with one machine-readable bulk command:
+
+    pip    <site-packages>/*.dist-info (and *.egg-info) of every detected
+           Python, found from the interpreter's prefix; nothing is imported
+           and no interpreter is started
+    npm    `npm ls -g --json --depth=0` of every detected Node.js
+    cargo  $CARGO_HOME/.crates.toml or .crates2.json (user-wide)
+    go     `go version -m $GOBIN` (module of every installed binary, user-wide)
+    gem    `gem list --local` of every detected Ruby
+
+A dist-info directory is named "<name>-<version>.dist-info" (PEP 376/427), so
+METADATA is only read for the rare directories whose name carries no
+version. Per-interpreter collectors run once per distinct interpreter (pip:
+per prefix and major.minor version, as several Pythons can share a prefix)
+and their inventory is given to every component of that interpreter;
+user-wide ones run once, for the first detected component of their
+toolchain. All jobs run concurrently.
+"""
+
+import json
+import logging
+import os
+import platform
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .fs_cache import FileSystemCache
+
+logger = logging.getLogger(__name__)
+
+# (command parts, timeout) -> (stdout, stderr, return code), e.g. EnvironmentScanner._run_command
+CommandRunner = Callable[[List[str], Optional[float]], Tuple[str, str, int]]
+
+DEFAULT_COLLECTOR_WORKERS = 4
+DEFAULT_COMMAND_TIMEOUT = 30.0
+
+_PYTHON_DIR_RE = re.compile(r"^python(\d+)(?:\.(\d+))?$")
+_CRATE_KEY_RE = re.compile(r'"([A-Za-z0-9_-]+) ([0-9][^ "]*) \(')
+_GEM_LINE_RE = re.compile(r"^(\S+) \((.*)\)\s*$")
+
+
+@dataclass
+class EcosystemInventory:
+    """Packages one ecosystem reports for one detected component."""
+
+    ecosystem: str
+    component_id: str
+    source: str  # Directory, file or command the packages were read from
+    packages: Dict[str, Optional[str]] = field(default_factory=dict)  # name -> version
+
+    def to_details(self) -> Dict[str, object]:
+        return {
+            "source": self.source,
+            "count": len(self.packages),
+            "packages": dict(sorted(self.packages.items(), key=lambda kv: kv[0].lower())),
+        }
+
+
+class EcosystemCollector:
+    """Lists the packages of one ecosystem for a detected component."""
+
+    name = ""
+    tool_ids: Tuple[str, ...] = ()
+    user_wide = False  # True: one inventory per user, not per interpreter
+
+    def __init__(
+        self,
+        fs: FileSystemCache,
+        system: str,
+        environ: Mapping[str, str],
+        home: str,
+        run_command: Optional[CommandRunner] = None,
+        timeout: float = DEFAULT_COMMAND_TIMEOUT,
+    ):
+        self.fs = fs
+        self.system = system
+        self.environ = environ
+        self.home = home
+        self.run_command = run_command
+        self.timeout = timeout
+
+    def job_key(self, component) -> Hashable:
+        """Components with the same key share one inventory (e.g. two links to one Node.js)."""
+        if self.user_wide:
+            return self.name
+        return self.fs.realpath(self._prefix(component.executable_path))
+
+    def _prefix(self, exe_path: str) -> str:
+        exe_dir = os.path.dirname(exe_path)
+        if os.path.basename(exe_dir).lower() in ("bin", "scripts"):
+            return os.path.dirname(exe_dir)
+        return exe_dir
+
+    def _sibling_executable(self, exe_path: str, name: str) -> Optional[str]:
+        suffixes = (".cmd", ".exe", ".bat") if self.system == "Windows" else ("",)
+        for suffix in suffixes:
+            path = os.path.join(os.path.dirname(exe_path), name + suffix)
+            if self.fs.isfile(path):
+                return path
+        return None
+
+    def _run(self, command_parts: List[str]) -> Optional[str]:
+        if self.run_command is None:
+            return None
+        stdout, stderr, _ = self.run_command(command_parts, self.timeout)
+        if not stdout:
+            logger.debug(f"No output from '{' '.join(command_parts)}': {stderr.strip()}")
+            return None
+        return stdout
+
+    def collect(self, component) -> Optional[EcosystemInventory]:
+        raise NotImplementedError
+
+
+# --- pip: dist-info directories, no imports ---
+
+
+def _parse_metadata_headers(text: str) -> Tuple[Optional[str], Optional[str]]:
+    name = version = None
+    for line in text.splitlines():
+        if not line.strip():
+            break  # End of the RFC 822 header block; the description follows
+        if line.startswith("Name:"):
+            name = line[5:].strip()
+        elif line.startswith("Version:"):
+            version = line[8:].strip()
+    return name, version
+
+
+class PipCollector(EcosystemCollector):
+    name = "pip"
+    tool_ids = ("python",)
+
+    def job_key(self, component) -> Hashable:
+        """Prefix and major.minor: /usr/bin/python2.7 and python3.11 have different site-packages."""
+        match = re.match(r"^(\d+)\.(\d+)", component.version or "")
+        return (super().job_key(component), match.group(0) if match else None)
+
+    def _python_dirs(self, lib_dir: str, version: Optional[str]) -> List[str]:
+        wanted = None
+        if version:
+            match = re.match(r"^(\d+)\.(\d+)", version)
+            if match:
+                wanted = (match.group(1), match.group(2))
+        names = []
+        for name in self.fs.list_dirs(lib_dir) or []:
+            match = _PYTHON_DIR_RE.match(name)
+            if not match:
+                continue
+            # "python3" (Debian's dist-packages) is shared by every 3.x
+            if wanted is None or match.group(2) is None or (match.group(1), match.group(2)) == wanted:
+                names.append(os.path.join(lib_dir, name))
+        return names
+
+    def _user_site_dirs(self, prefix: str, version: Optional[str]) -> List[str]:
+        match = re.match(r"^(\d+)\.(\d+)", version or "")
+        if not match or self.fs.isfile(os.path.join(prefix, "pyvenv.cfg")):
+            return []  # Virtual environments don't see the user site
+        major, minor = match.groups()
+        if self.system == "Windows":
+            appdata = self.environ.get("APPDATA")
+            if not appdata:
+                return []
+            return [os.path.join(appdata, "Python", f"Python{major}{minor}", "site-packages")]
+        return [os.path.join(self.home, ".local", "lib", f"python{major}.{minor}", "site-packages")]
+
+    def site_packages_dirs(self, exe_path: str, version: Optional[str]) -> List[str]:
+        """site-packages directories of the interpreter at `exe_path`, derived from its prefix."""
+        prefix = self._prefix(exe_path)
+        candidates = self._user_site_dirs(prefix, version)  # First on sys.path
+        if self.system == "Windows":
+            candidates.append(os.path.join(prefix, "Lib", "site-packages"))
+        else:
+            for lib_dir in (
+                os.path.join(prefix, "lib"),
+                os.path.join(prefix, "lib64"),
+                os.path.join(prefix, "local", "lib"),  # Debian: pip installs into /usr/local
+            ):
+                for python_dir in self._python_dirs(lib_dir, version):
+                    candidates.append(os.path.join(python_dir, "site-packages"))
+                    candidates.append(os.path.join(python_dir, "dist-packages"))
+        seen = set()
+        dirs = []
+        for directory in candidates:
+            resolved = self.fs.realpath(directory)
+            if resolved not in seen and self.fs.isdir(directory):
+                seen.add(resolved)
+                dirs.append(directory)
+        return dirs
+
+    def _read_distributions(self, site_dir: str) -> Dict[str, Optional[str]]:
+        packages = {}
+        for entry in self.fs.list_dirs(site_dir) or []:
+            for suffix, metadata_name in ((".dist-info", "METADATA"), (".egg-info", "PKG-INFO")):
+                if not entry.endswith(suffix):
+                    continue
+                parts = entry[: -len(suffix)].split("-")
+                name, version = parts[0], (parts[1] if len(parts) > 1 else None)
+                if not version:
+                    metadata = self.fs.read_text(os.path.join(site_dir, entry, metadata_name))
+                    meta_name, version = _parse_metadata_headers(metadata or "")
+                    name = meta_name or name
+                packages[name] = version
+        return packages
+
+    def collect(self, component) -> Optional[EcosystemInventory]:
+        site_dirs = self.site_packages_dirs(component.executable_path, component.version)
+        if not site_dirs:
+            return None
+        packages: Dict[str, Optional[str]] = {}
+        for site_dir in reversed(site_dirs):  # Earlier directories win on sys.path
+            packages.update(self._read_distributions(site_dir))
+        return EcosystemInventory(self.name, component.id, os.pathsep.join(site_dirs), packages)
+
+
+# --- npm, go, gem: one bulk command per interpreter ---
+
+
+def parse_npm_ls_json(output: str) -> Dict[str, Optional[str]]:
+    try:
+        data = json.loads(output)
+    except ValueError:
+        return {}
+    dependencies = data.get("dependencies") if isinstance(data, dict) else None
+    return {
+        name: info.get("version") if isinstance(info, dict) else None
+        for name, info in (dependencies or {}).items()
+    }
+
+
+def parse_go_version_m(output: str) -> Dict[str, Optional[str]]:
+    """'<binary>: go1.21.0' blocks of `go version -m`: main module path -> version."""
+    packages = {}
+    for line in output.splitlines():
+        parts = line.strip().split("\t")
+        if len(parts) >= 3 and parts[0] == "mod":
+            packages[parts[1]] = parts[2]
+    return packages
+
+
+def parse_gem_list(output: str) -> Dict[str, Optional[str]]:
+    """'rake (13.1.0, 13.0.6)' / 'bundler (default: 2.4.10)' lines: newest version per gem."""
+    packages = {}
+    for line in output.splitlines():
+        match = _GEM_LINE_RE.match(line.strip())
+        if match:
+            versions = [v.replace("default:", "").strip() for v in match.group(2).split(",")]
+            packages[match.group(1)] = versions[0] if versions and versions[0] else None
+    return packages
+
+
+class NpmCollector(EcosystemCollector):
+    name = "npm"
+    tool_ids = ("nodejs", "node")
+
+    def collect(self, component) -> Optional[EcosystemInventory]:
+        npm = self._sibling_executable(component.executable_path, "npm")
+        if npm is None:
+            return None
+        # The node install's own global prefix, not whichever npm config is active
+        if self.system == "Windows":
+            prefix = os.path.dirname(component.executable_path)
+        else:
+            prefix = self._prefix(component.executable_path)
+        command = [npm, "ls", "-g", "--json", "--depth=0", "--prefix", prefix]
+        output = self._run(command)  # Exits 1 on peer-dependency problems; the JSON is still complete
+        if output is None:
+            return None
+        return EcosystemInventory(self.name, component.id, " ".join(command), parse_npm_ls_json(output))
+
+
+class GoCollector(EcosystemCollector):
+    name = "go"
+    tool_ids = ("go",)
+    user_wide = True
+
+    def bin_dir(self) -> str:
+        if self.environ.get("GOBIN"):
+            return self.environ["GOBIN"]
+        gopath = (self.environ.get("GOPATH") or "").split(os.pathsep)[0]
+        return os.path.join(gopath or os.path.join(self.home, "go"), "bin")
+
+    def collect(self, component) -> Optional[EcosystemInventory]:
+        bin_dir = self.bin_dir()
+        if not self.fs.list_files(bin_dir):
+            return None
+        command = [component.executable_path, "version", "-m", bin_dir]
+        output = self._run(command)
+        if output is None:
+            return None
+        return EcosystemInventory(self.name, component.id, " ".join(command), parse_go_version_m(output))
+
+
+class GemCollector(EcosystemCollector):
+    name = "gem"
+    tool_ids = ("ruby",)
+
+    def collect(self, component) -> Optional[EcosystemInventory]:
+        gem = self._sibling_executable(component.executable_path, "gem")
+        if gem is None:
+            return None
+        command = [gem, "list", "--local"]
+        output = self._run(command)
+        if output is None:
+            return None
+        return EcosystemInventory(self.name, component.id, " ".join(command), parse_gem_list(output))
+
+
+# --- cargo: the install registry cargo keeps next to its binaries ---
+
+
+class CargoCollector(EcosystemCollector):
+    name = "cargo"
+    tool_ids = ("rust", "cargo")
+    user_wide = True
+
+    def collect(self, component) -> Optional[EcosystemInventory]:
+        cargo_home = self.environ.get("CARGO_HOME") or os.path.join(self.home, ".cargo")
+        # Both files key installs as "name version (source)"; .crates.toml has
+        # one short line per crate, so it is read first.
+        for file_name in (".crates.toml", ".crates2.json"):
+            path = os.path.join(cargo_home, file_name)
+            text = self.fs.read_text(path)
+            if text:
+                packages = {name: version for name, version in _CRATE_KEY_RE.findall(text)}
+                return EcosystemInventory(self.name, component.id, path, packages)
+        return None
+
+
+ECOSYSTEM_COLLECTORS = (
+    PipCollector,
+    NpmCollector,
+    CargoCollector,
+    GoCollector,
+    GemCollector,
+)
+
+
+def collect_ecosystem_packages(
+    components: Sequence,
+    fs: Optional[FileSystemCache] = None,
+    system: Optional[str] = None,
+    environ: Optional[Mapping[str, str]] = None,
+    home: Optional[str] = None,
+    run_command: Optional[CommandRunner] = None,
+    max_workers: int = DEFAULT_COLLECTOR_WORKERS,
+    collectors: Iterable[type] = ECOSYSTEM_COLLECTORS,
+    timeout: float = DEFAULT_COMMAND_TIMEOUT,
+) -> List[EcosystemInventory]:
+    """
+    Runs every collector for the detected components it applies to, all jobs
+    concurrently. Components need id, name, version and executable_path
+    (DetectedComponent). A failing collector is logged and skipped.
+    """
+    fs = fs if fs is not None else FileSystemCache()
+    system = system or platform.system()
+    environ = os.environ if environ is None else environ
+    home = home or os.path.expanduser("~")
+
+    jobs = []
+    sharing: Dict[Tuple[str, Hashable], List] = {}  # job key -> components after the first
+    for collector_cls in collectors:
+        collector = collector_cls(fs, system, environ, home, run_command, timeout)
+        for component in components:
+            if component.executable_path and _tool_id(component) in collector.tool_ids:
+                key = (collector.name, collector.job_key(component))
+                if key not in sharing:
+                    sharing[key] = []
+                    jobs.append((collector, component, key))
+                elif not collector.user_wide:
+                    sharing[key].append(component)
+    if not jobs:
+        return []
+
+    def run(job):
+        collector, component, key = job
+        try:
+            inventory = collector.collect(component)
+            if inventory is None:
+                return []
+            return [inventory] + [replace(inventory, component_id=other.id) for other in sharing[key]]
+        except Exception as e:
+            logger.error(
+                f"{collector.name} inventory for {component.executable_path} failed: {e}",
+                exc_info=True,
+            )
+            return []
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(int(max_workers), len(jobs))), thread_name_prefix="ecosystem"
+    ) as executor:
+        inventories = [inventory for job_inventories in executor.map(run, jobs) for inventory in job_inventories]
+    for inventory in inventories:
+        logger.info(
+            f"{inventory.ecosystem}: {len(inventory.packages)} packages for {inventory.component_id}."
+        )
+    return inventories
+
+
+def _tool_id(component) -> str:
+    # Components don't carry their tools DB id; the display name maps back to it.
+    return _TOOL_IDS_BY_NAME.get((component.name or "").lower(), (component.name or "").lower())
+
+
+_TOOL_IDS_BY_NAME = {
+    "python": "python",
+    "node.js": "nodejs",
+    "node": "nodejs",
+    "go": "go",
+    "rust": "rust",
+    "cargo": "cargo",
+    "ruby": "ruby",
+}
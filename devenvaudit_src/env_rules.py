@@ -0,0 +1,350 @@
+"""
+Declarative rule engine for DevEnvAudit's environment variable checks.
+
+Each rule names the variables it applies to (`names` for exact names,
+`name_contains` for substrings, `name_regex` for regular expressions, all
+case-insensitive unless the rule sets `case_sensitive`; a rule without any of
+these applies to every variable) and one `check` with its parameters. All
+`name_contains` patterns of all rules are compiled into KeywordAutomatons (one
+per case mode) and exact names into one dict, so matching
+a variable name against every rule costs a single pass over the name (plus
+any regex patterns); the result is memoized per name. Rules come from the optional
+"env_rules" list in 'devenvaudit_config.json' and default to DEFAULT_ENV_RULES,
+which report what the original per-variable checks reported; OPTIONAL_ENV_RULES
+can be added to a configured list.
+
+Variables are evaluated in one pass. Path-valued checks go through the scan's
+FileSystemCache, so each distinct path is stat'ed once no matter how many
+variables or PATH entries mention it. Findings are de-duplicated: the same
+rule reporting the same path for several variables (or several times within
+one PATH) yields one finding with an occurrence count.
+
+Supported checks:
+    empty_value         value is empty or whitespace only
+    max_length          len(value) > params.max_length
+    min_length          len(value) > params.min_length (e.g. secrets)
+    name_format         name does not match params.pattern
+    path_entries_exist  an os.pathsep-separated entry does not exist
+    path_entries_dirs   an entry exists but is not a directory
+    home_contains       none of params.files exist below the value
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .fs_cache import FileSystemCache
+from .keyword_automaton import KeywordAutomaton
+
+logger = logging.getLogger(__name__)
+
+SENSITIVE_ENV_VARS = [
+    "API_KEY",
+    "SECRET",
+    "TOKEN",
+    "PASSWORD",
+    "PASSWD",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "GOOGLE_APPLICATION_CREDENTIALS",
+]
+
+# Placeholders available in descriptions: {name} (the variable, or a quoted,
+# comma-separated list when de-duplicated across variables), {value}, {path}
+# and the rule's params.
+DEFAULT_ENV_RULES: List[Dict[str, Any]] = [
+    {
+        "id": "empty_value",
+        "check": "empty_value",
+        "severity": "Info",
+        "category": "Value",
+        "description": "Environment variable {name} is empty or contains only whitespace.",
+    },
+    {
+        "id": "long_value",
+        "check": "max_length",
+        "params": {"max_length": 255},
+        "severity": "Warning",
+        "category": "Length",
+        "description": "Environment variable {name} has a very long value (>{max_length} characters).",
+    },
+    {
+        "id": "name_format",
+        "check": "name_format",
+        "params": {"pattern": "^[A-Z0-9_]+$"},
+        "severity": "Warning",
+        "category": "Format",
+        "description": "Environment variable {name} contains invalid characters (only A-Z, 0-9, and _ are allowed).",
+    },
+    {
+        "id": "missing_path_entry",
+        "name_contains": ["path"],
+        "check": "path_entries_exist",
+        "severity": "Warning",
+        "category": "Pathing",
+        "description": "Path '{path}' in environment variable {name} does not exist.",
+    },
+    {
+        "id": "java_home_invalid",
+        "name_contains": ["JAVA_HOME"],
+        "case_sensitive": True,
+        "check": "home_contains",
+        "params": {"files": ["bin/java.exe", "bin/java"]},
+        "severity": "Warning",
+        "category": "Configuration",
+        "description": "JAVA_HOME ('{value}') might not point to a valid JDK/JRE installation (missing bin/java).",
+    },
+    {
+        "id": "sensitive_value",
+        "name_contains": SENSITIVE_ENV_VARS,
+        "check": "min_length",
+        "params": {"min_length": 20},
+        "severity": "Warning",
+        "category": "Security",
+        "description": "Environment variable {name} might contain sensitive data.",
+    },
+]
+
+# Rules that are off by default; add them to "env_rules" to enable them
+OPTIONAL_ENV_RULES: List[Dict[str, Any]] = [
+    {
+        "id": "path_entry_not_directory",
+        "names": ["PATH"],
+        "check": "path_entries_dirs",
+        "severity": "Info",
+        "category": "Configuration",
+        "description": "PATH entry '{path}' exists but is not a directory.",
+    },
+]
+
+
+@dataclass
+class EnvFinding:
+    """One (de-duplicated) result of an environment variable rule."""
+
+    rule_id: str
+    severity: str
+    category: str
+    description: str
+    related_path: Optional[str] = None
+    variables: List[str] = field(default_factory=list)
+    occurrences: int = 1
+
+
+@dataclass
+class EnvRule:
+    id: str
+    check: str
+    severity: str
+    category: str
+    description: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    names: Tuple[str, ...] = ()
+    name_contains: Tuple[str, ...] = ()
+    name_regex: Optional[str] = None
+    case_sensitive: bool = False
+
+    @property
+    def applies_to_all(self) -> bool:
+        return not (self.names or self.name_contains or self.name_regex)
+
+
+# A check yields the paths it reports (None for a variable-level finding).
+CheckFunc = Callable[[EnvRule, str, str, List[str], FileSystemCache], List[Optional[str]]]
+
+
+def _check_empty_value(rule, name, value, entries, fs):
+    return [None] if not value.strip() else []
+
+
+def _check_max_length(rule, name, value, entries, fs):
+    return [None] if len(value) > int(rule.params.get("max_length", 255)) else []
+
+
+def _check_min_length(rule, name, value, entries, fs):
+    return [None] if len(value) > int(rule.params.get("min_length", 0)) else []
+
+
+def _check_name_format(rule, name, value, entries, fs):
+    pattern = rule.params["_compiled_pattern"]
+    return [None] if not pattern.match(name) else []
+
+
+def _check_path_entries_exist(rule, name, value, entries, fs):
+    return [entry for entry in entries if not fs.exists(entry)]
+
+
+def _check_path_entries_dirs(rule, name, value, entries, fs):
+    return [entry for entry in entries if fs.exists(entry) and not fs.isdir(entry)]
+
+
+def _check_home_contains(rule, name, value, entries, fs):
+    files = rule.params.get("files", [])
+    if any(fs.exists(os.path.join(value, *f.split("/"))) for f in files):
+        return []
+    return [None]
+
+
+CHECKS: Dict[str, CheckFunc] = {
+    "empty_value": _check_empty_value,
+    "max_length": _check_max_length,
+    "min_length": _check_min_length,
+    "name_format": _check_name_format,
+    "path_entries_exist": _check_path_entries_exist,
+    "path_entries_dirs": _check_path_entries_dirs,
+    "home_contains": _check_home_contains,
+}
+
+_PATH_CHECKS = {"path_entries_exist", "path_entries_dirs"}
+
+
+def _parse_rule(raw: Dict[str, Any]) -> Optional[EnvRule]:
+    try:
+        case_sensitive = bool(raw.get("case_sensitive", False))
+        rule = EnvRule(
+            id=str(raw["id"]),
+            check=str(raw["check"]),
+            severity=str(raw.get("severity", "Warning")),
+            category=str(raw.get("category", "Configuration")),
+            description=str(raw.get("description", "Rule '{rule_id}' matched {name}.")),
+            params=dict(raw.get("params") or {}),
+            names=tuple(n if case_sensitive else n.upper() for n in raw.get("names") or []),
+            name_contains=tuple(
+                n if case_sensitive else n.lower() for n in raw.get("name_contains") or []
+            ),
+            name_regex=raw.get("name_regex"),
+            case_sensitive=case_sensitive,
+        )
+    except (KeyError, TypeError, AttributeError) as e:
+        logger.error(f"Ignoring malformed environment rule {raw!r}: {e}")
+        return None
+    if rule.check not in CHECKS:
+        logger.error(f"Ignoring environment rule '{rule.id}': unknown check '{rule.check}'.")
+        return None
+    if rule.name_regex:
+        try:
+            rule.params["_compiled_name_regex"] = re.compile(
+                rule.name_regex, 0 if rule.case_sensitive else re.IGNORECASE
+            )
+        except re.error as e:
+            logger.error(f"Ignoring environment rule '{rule.id}': bad name_regex ({e}).")
+            return None
+    if rule.check == "name_format":
+        try:
+            rule.params["_compiled_pattern"] = re.compile(rule.params.get("pattern", ".*"))
+        except re.error as e:
+            logger.error(f"Ignoring environment rule '{rule.id}': bad pattern ({e}).")
+            return None
+    return rule
+
+
+class EnvRuleEngine:
+    """Evaluates a set of environment variable rules in a single pass."""
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None):
+        raw_rules = DEFAULT_ENV_RULES if rules is None else rules
+        self.rules: List[EnvRule] = [
+            rule for rule in (_parse_rule(raw) for raw in raw_rules) if rule
+        ]
+        self._global_rules: List[int] = []
+        self._exact: Dict[str, List[int]] = {}
+        self._exact_case_sensitive: Dict[str, List[int]] = {}
+        self._contains = KeywordAutomaton()
+        self._contains_case_sensitive = KeywordAutomaton()
+        self._regexes: List[Tuple[int, Any]] = []
+        for index, rule in enumerate(self.rules):
+            if rule.applies_to_all:
+                self._global_rules.append(index)
+            exact = self._exact_case_sensitive if rule.case_sensitive else self._exact
+            contains = self._contains_case_sensitive if rule.case_sensitive else self._contains
+            for exact_name in rule.names:
+                exact.setdefault(exact_name, []).append(index)
+            for substring in rule.name_contains:
+                contains.add(substring, index)
+            if rule.name_regex:
+                self._regexes.append((index, rule.params["_compiled_name_regex"]))
+        self._name_memo: Dict[str, Tuple[int, ...]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "EnvRuleEngine":
+        """Uses config['env_rules'] when present, DEFAULT_ENV_RULES otherwise."""
+        rules = config.get("env_rules")
+        if rules is not None and not isinstance(rules, list):
+            logger.error("'env_rules' in the configuration is not a list; using defaults.")
+            rules = None
+        return cls(rules)
+
+    def rules_for(self, name: str) -> Tuple[int, ...]:
+        """Indices of the rules that apply to variable `name`, in rule order."""
+        cached = self._name_memo.get(name)
+        if cached is not None:
+            return cached
+        matched = set(self._global_rules)
+        matched.update(self._exact.get(name.upper(), ()))
+        matched.update(self._exact_case_sensitive.get(name, ()))
+        matched.update(self._contains.all_matches(name.lower()))
+        matched.update(self._contains_case_sensitive.all_matches(name))
+        for index, regex in self._regexes:
+            if regex.search(name):
+                matched.add(index)
+        result = tuple(sorted(matched))
+        self._name_memo[name] = result
+        return result
+
+    def evaluate(
+        self,
+        variables: Dict[str, str],
+        filesystem: Optional[FileSystemCache] = None,
+        progress: Optional[Callable[[int, int, str], None]] = None,
+    ) -> List[EnvFinding]:
+        """Runs every applicable rule over every variable; returns de-duplicated findings."""
+        fs = filesystem if filesystem is not None else FileSystemCache()
+        findings: Dict[Tuple[str, Optional[str], Optional[str]], EnvFinding] = {}
+        total = len(variables)
+        for count, (name, value) in enumerate(variables.items(), start=1):
+            value = value if isinstance(value, str) else str(value)
+            entries: Optional[List[str]] = None
+            for index in self.rules_for(name):
+                rule = self.rules[index]
+                if rule.check in _PATH_CHECKS and entries is None:
+                    entries = [v.strip() for v in value.split(os.pathsep) if v.strip()]
+                for path in CHECKS[rule.check](rule, name, value, entries or [], fs):
+                    self._record(findings, rule, name, value, path)
+            if progress and (count % 50 == 0 or count == total):
+                progress(count, total, f"Analyzed {count} environment variables.")
+        return list(findings.values())
+
+    def _record(self, findings, rule: EnvRule, name: str, value: str, path: Optional[str]):
+        # Path findings are shared across variables; the others are per variable.
+        key = (rule.id, path, None if path is not None else name)
+        finding = findings.get(key)
+        if finding is not None:
+            finding.occurrences += 1
+            if name not in finding.variables:
+                finding.variables.append(name)
+                finding.description = self._describe(rule, finding.variables, value, path)
+            return
+        findings[key] = EnvFinding(
+            rule_id=rule.id,
+            severity=rule.severity,
+            category=rule.category,
+            description=self._describe(rule, [name], value, path),
+            related_path=path,
+            variables=[name],
+        )
+
+    @staticmethod
+    def _describe(rule: EnvRule, names: List[str], value: str, path: Optional[str]) -> str:
+        fields = {k: v for k, v in rule.params.items() if not k.startswith("_")}
+        fields.update(
+            name=", ".join(f"'{n}'" for n in names),
+            value=value,
+            path=path or "",
+            rule_id=rule.id,
+        )
+        try:
+            return rule.description.format(**fields)
+        except (KeyError, IndexError, ValueError):
+            return rule.description
@@ -0,0 +1,278 @@
+"""
+Scan event bus connecting scanners to their consumers (GUI, CLI, log, exporters).
+
+Scanners publish events from their worker threads; publishing never blocks
+and never waits for a consumer. Each subscriber has its own mailbox:
+
+* "progress" and "status" events are coalesced - the mailbox only keeps the
+  latest one of each, so a scanner reporting progress for every environment
+  variable costs the consumer at most one update per drain;
+* every other event (e.g. "component", "issue", "phase", "scan_finished") is
+  queued and delivered in order.
+
+Subscribers are drained either on a daemon thread the bus starts for them
+(`threaded=True`, delivering at most once per `interval` seconds), or by the
+consumer itself calling `Subscription.drain()` - e.g. the Tk GUI polls with
+`after()` so its callbacks run on the UI thread, and
+`EnvironmentScanner.iter_scan` blocks in `Subscription.wait()` between drains. A slow consumer only delays its own
+mailbox, never the scan or the other subscribers.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENT_INTERVAL = 0.1  # seconds between coalesced deliveries
+COALESCED_KINDS = ("status", "progress")
+
+
+@dataclass
+class ScanEvent:
+    """A single scanner event. `data` holds kind-specific fields."""
+
+    kind: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+    sequence: int = 0
+
+    def to_dict(self):
+        data = {}
+        for key, value in self.data.items():
+            data[key] = value.to_dict() if hasattr(value, "to_dict") else value
+        return {
+            "kind": self.kind,
+            "sequence": self.sequence,
+            "timestamp": self.timestamp,
+            "data": data,
+        }
+
+
+EventCallback = Callable[[ScanEvent], None]
+
+
+class Subscription:
+    """A subscriber's mailbox. Events are delivered to `callback` by `drain()`."""
+
+    def __init__(
+        self,
+        bus: "ScanEventBus",
+        callback: EventCallback,
+        kinds: Optional[Iterable[str]] = None,
+        interval: float = DEFAULT_EVENT_INTERVAL,
+    ):
+        self.bus = bus
+        self.callback = callback
+        self.kinds = frozenset(kinds) if kinds else None
+        self.interval = interval
+        self.delivered = 0
+        self.coalesced = 0
+        self.closed = False
+        self._events: Deque[ScanEvent] = deque()
+        self._latest: Dict[str, ScanEvent] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._queued = threading.Event()  # Set while discrete events are pending
+        self._thread: Optional[threading.Thread] = None
+
+    def wants(self, kind: str) -> bool:
+        return self.kinds is None or kind in self.kinds
+
+    def _offer(self, event: ScanEvent):
+        """Called on the publisher's thread; O(1) and never blocks on the consumer."""
+        with self._lock:
+            if event.kind in COALESCED_KINDS:
+                if event.kind in self._latest:
+                    self.coalesced += 1
+                self._latest[event.kind] = event
+            else:
+                self._events.append(event)
+                self._queued.set()
+
+    def _take(self) -> List[ScanEvent]:
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            self._queued.clear()
+            # Latest status/progress go last so consumers end on the current state.
+            events.extend(
+                self._latest.pop(kind) for kind in COALESCED_KINDS if kind in self._latest
+            )
+        return events
+
+    def drain(self) -> int:
+        """Delivers pending events on the calling thread. Returns how many were delivered."""
+        events = self._take()
+        for event in events:
+            try:
+                self.callback(event)
+            except Exception as e:
+                logger.error(
+                    f"Scan event subscriber {self.callback!r} failed on '{event.kind}': {e}",
+                    exc_info=True,
+                )
+        self.delivered += len(events)
+        return len(events)
+
+    def discard(self) -> int:
+        """Drops the pending events without delivering them. Returns how many were dropped."""
+        return len(self._take())
+
+    def pending(self) -> bool:
+        with self._lock:
+            return bool(self._events or self._latest)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until a discrete (non-coalesced) event is pending or `timeout`
+        passes. Returns True if one is pending.
+        """
+        return self._queued.wait(timeout)
+
+    def _run(self):
+        # One delivery per interval, however many events arrive in between.
+        while not self._stop.wait(self.interval):
+            self.drain()
+        self.drain()
+
+    def _start_thread(self):
+        self._thread = threading.Thread(
+            target=self._run, name="scan-event-subscriber", daemon=True
+        )
+        self._thread.start()
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Stops a threaded subscriber after a final drain. For polled subscribers
+        this only sets `closed`; the poller drains once more when it sees it,
+        so callbacks keep running on the poller's thread.
+        """
+        self.closed = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class ScanEventBus:
+    """Fan-out of scanner events to any number of subscribers."""
+
+    def __init__(self, interval: float = DEFAULT_EVENT_INTERVAL):
+        self.interval = interval
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.published = 0
+
+    def subscribe(
+        self,
+        callback: EventCallback,
+        kinds: Optional[Iterable[str]] = None,
+        threaded: bool = False,
+        interval: Optional[float] = None,
+    ) -> Subscription:
+        """
+        Registers `callback`. With threaded=True the bus delivers on its own
+        daemon thread; otherwise the caller must call drain() periodically.
+        """
+        subscription = Subscription(
+            self, callback, kinds, self.interval if interval is None else interval
+        )
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        if threaded:
+            subscription._start_thread()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+    def publish(self, kind: str, **data) -> ScanEvent:
+        with self._lock:
+            self._sequence += 1
+            event = ScanEvent(kind=kind, data=data, sequence=self._sequence)
+            subscriptions = self._subscriptions
+            self.published += 1
+        for subscription in subscriptions:
+            if subscription.wants(kind):
+                subscription._offer(event)
+        return event
+
+    def progress(self, current: int, total: int, message: str = "") -> ScanEvent:
+        return self.publish("progress", current=current, total=total, message=message)
+
+    def status(self, message: str) -> ScanEvent:
+        return self.publish("status", message=message)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Delivers what is left to every subscriber and stops their threads."""
+        with self._lock:
+            subscriptions = self._subscriptions
+            self._subscriptions = []
+        for subscription in subscriptions:
+            subscription.close(timeout)
+
+
+# --- Ready-made consumers ---
+
+
+def log_consumer(target_logger: Optional[logging.Logger] = None) -> EventCallback:
+    """Logs status messages at INFO and everything else at DEBUG."""
+    log = target_logger or logger
+
+    def consume(event: ScanEvent):
+        if event.kind == "status":
+            log.info(event.data.get("message", ""))
+        elif event.kind == "progress":
+            log.debug(
+                f"Progress {event.data.get('current')}/{event.data.get('total')}: {event.data.get('message', '')}"
+            )
+        else:
+            log.debug(f"Scan event '{event.kind}' #{event.sequence}")
+
+    return consume
+
+
+class CliProgressConsumer:
+    """Renders progress as a single, rewritten terminal line."""
+
+    def __init__(self, stream: Optional[TextIO] = None, width: int = 30):
+        self.stream = stream or sys.stderr
+        self.width = width
+        self.status = ""
+
+    def __call__(self, event: ScanEvent):
+        if event.kind == "status":
+            self.status = event.data.get("message", "")
+            self._render(None, None)
+        elif event.kind == "progress":
+            self._render(event.data.get("current"), event.data.get("total"))
+        elif event.kind == "scan_finished":
+            self.stream.write("\n")
+            self.stream.flush()
+
+    def _render(self, current: Optional[int], total: Optional[int]):
+        if current is not None and total:
+            filled = int(self.width * min(current, total) / total)
+            bar = "#" * filled + "-" * (self.width - filled)
+            line = f"\r[{bar}] {current}/{total} {self.status}"
+        else:
+            line = f"\r{self.status}"
+        self.stream.write(line[:120].ljust(120))
+        self.stream.flush()
+
+
+class JsonLinesEventExporter:
+    """Appends every delivered event to a text stream as one JSON object per line."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def __call__(self, event: ScanEvent):
+        self.stream.write(json.dumps(event.to_dict(), default=str) + "\n")
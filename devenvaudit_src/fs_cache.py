@@ -0,0 +1,326 @@
+"""
+Per-scan filesystem facade with memoized stat, access, realpath, listing and
+small-file read lookups.
+
+Scanners ask the same questions about the same paths many times (does the
+PATH entry exist, is it a directory, is this executable a regular file, what
+does this symlink resolve to). A `FileSystemCache` is created for one scan and
+answers those questions from memory after the first lookup, counting hits and
+misses per operation so the savings can be logged. Results are not
+invalidated, so a new instance (or `clear()`) is needed for every scan.
+
+`FakeFileSystem` answers the same calls from an in-memory description of a
+directory tree, for tests and benchmarks that should not touch the disk.
+"""
+
+import logging
+import os
+import stat
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class FileSystemCache:
+    """Memoizing facade over os.stat, os.access, os.path.realpath, os.scandir and small reads."""
+
+    OPERATIONS = ("stat", "access", "realpath", "list_files", "list_dirs", "read_text")
+    MAX_READ_BYTES = 65536  # read_text is meant for metadata files, not data
+
+    def __init__(self):
+        self._stat_cache: Dict[str, Optional[os.stat_result]] = {}
+        self._access_cache: Dict[Tuple[str, int], bool] = {}
+        self._realpath_cache: Dict[str, str] = {}
+        self._listing_cache: Dict[str, Optional[List[str]]] = {}
+        self._dir_listing_cache: Dict[str, Optional[List[str]]] = {}
+        self._text_cache: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = dict.fromkeys(self.OPERATIONS, 0)
+        self.misses: Dict[str, int] = dict.fromkeys(self.OPERATIONS, 0)
+
+    # --- Backend operations (overridden by FakeFileSystem) ---
+
+    def _stat_impl(self, path: str) -> Optional[os.stat_result]:
+        try:
+            return os.stat(path)
+        except (OSError, ValueError):
+            return None
+
+    def _access_impl(self, path: str, mode: int) -> bool:
+        try:
+            return os.access(path, mode)
+        except (OSError, ValueError):
+            return False
+
+    def _realpath_impl(self, path: str) -> str:
+        return os.path.realpath(path)
+
+    def _list_files_impl(self, directory: str) -> Optional[List[str]]:
+        names = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file():
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not list directory {directory}: {e}")
+            return None
+        return names
+
+    def _list_dirs_impl(self, directory: str) -> Optional[List[str]]:
+        names = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not list directory {directory}: {e}")
+            return None
+        return names
+
+    def _read_text_impl(self, path: str) -> Optional[str]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return f.read(self.MAX_READ_BYTES)
+        except (OSError, ValueError):
+            return None
+
+    # --- Memoized lookups ---
+
+    def _count(self, op: str, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits[op] += 1
+            else:
+                self.misses[op] += 1
+
+    def stat(self, path: Union[str, os.PathLike]) -> Optional[os.stat_result]:
+        """Returns os.stat(path) (following symlinks), or None if it can't be stat'ed."""
+        key = os.fspath(path)
+        result = self._stat_cache.get(key, _MISSING)
+        if result is not _MISSING:
+            self._count("stat", True)
+            return result
+        self._count("stat", False)
+        result = self._stat_impl(key)
+        self._stat_cache[key] = result
+        return result
+
+    def exists(self, path: Union[str, os.PathLike]) -> bool:
+        return self.stat(path) is not None
+
+    def isdir(self, path: Union[str, os.PathLike]) -> bool:
+        st = self.stat(path)
+        return st is not None and stat.S_ISDIR(st.st_mode)
+
+    def isfile(self, path: Union[str, os.PathLike]) -> bool:
+        st = self.stat(path)
+        return st is not None and stat.S_ISREG(st.st_mode)
+
+    def getsize(self, path: Union[str, os.PathLike]) -> int:
+        """Like os.path.getsize; raises FileNotFoundError for missing paths."""
+        st = self.stat(path)
+        if st is None:
+            raise FileNotFoundError(f"No such file or directory: '{os.fspath(path)}'")
+        return st.st_size
+
+    def access(self, path: Union[str, os.PathLike], mode: int) -> bool:
+        key = (os.fspath(path), mode)
+        result = self._access_cache.get(key)
+        if result is not None:
+            self._count("access", True)
+            return result
+        self._count("access", False)
+        result = self._access_impl(key[0], mode)
+        self._access_cache[key] = result
+        return result
+
+    def realpath(self, path: Union[str, os.PathLike]) -> str:
+        key = os.fspath(path)
+        result = self._realpath_cache.get(key)
+        if result is not None:
+            self._count("realpath", True)
+            return result
+        self._count("realpath", False)
+        result = self._realpath_impl(key)
+        self._realpath_cache[key] = result
+        return result
+
+    def list_files(self, directory: Union[str, os.PathLike]) -> Optional[List[str]]:
+        """Names of the regular files (symlinks followed) in `directory`, or None if unreadable."""
+        key = os.fspath(directory)
+        result = self._listing_cache.get(key, _MISSING)
+        if result is not _MISSING:
+            self._count("list_files", True)
+            return result
+        self._count("list_files", False)
+        result = self._list_files_impl(key)
+        self._listing_cache[key] = result
+        return result
+
+    def list_dirs(self, directory: Union[str, os.PathLike]) -> Optional[List[str]]:
+        """Names of the subdirectories (symlinks followed) of `directory`, or None if unreadable."""
+        key = os.fspath(directory)
+        result = self._dir_listing_cache.get(key, _MISSING)
+        if result is not _MISSING:
+            self._count("list_dirs", True)
+            return result
+        self._count("list_dirs", False)
+        result = self._list_dirs_impl(key)
+        self._dir_listing_cache[key] = result
+        return result
+
+    def read_text(self, path: Union[str, os.PathLike]) -> Optional[str]:
+        """The first MAX_READ_BYTES of a text file, or None if it can't be read."""
+        key = os.fspath(path)
+        result = self._text_cache.get(key, _MISSING)
+        if result is not _MISSING:
+            self._count("read_text", True)
+            return result
+        self._count("read_text", False)
+        result = self._read_text_impl(key)
+        self._text_cache[key] = result
+        return result
+
+    # --- Bookkeeping ---
+
+    def clear(self):
+        """Forgets all memoized results and counters (e.g. at the start of a scan)."""
+        with self._lock:
+            self._stat_cache.clear()
+            self._access_cache.clear()
+            self._realpath_cache.clear()
+            self._listing_cache.clear()
+            self._dir_listing_cache.clear()
+            self._text_cache.clear()
+            for counters in (self.hits, self.misses):
+                for op in counters:
+                    counters[op] = 0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns hits, misses and hit rate per operation."""
+        report = {}
+        for op in self.hits:
+            hits, misses = self.hits[op], self.misses[op]
+            total = hits + misses
+            report[op] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 3) if total else 0.0,
+            }
+        return report
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{op} {s['hits']}/{s['hits'] + s['misses']} hits ({s['hit_rate']:.0%})"
+            for op, s in self.stats().items()
+        )
+
+
+class FakeFileSystem(FileSystemCache):
+    """
+    In-memory filesystem for tests and benchmarks. `tree` maps absolute paths
+    to "dir", "file", "exe" or a dict with optional keys type ("dir"/"file"),
+    size, executable, content (text returned by read_text) and target
+    (symlink target path).
+    Parent directories of listed paths are created implicitly.
+    """
+
+    def __init__(self, tree: Optional[Dict[str, Union[str, Dict[str, Any]]]] = None):
+        super().__init__()
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[str, List[str]] = {}
+        for path, spec in (tree or {}).items():
+            self.add(path, spec)
+
+    def add(self, path: str, spec: Union[str, Dict[str, Any]] = "file"):
+        if isinstance(spec, str):
+            spec = {
+                "type": "dir" if spec == "dir" else "file",
+                "executable": spec in ("dir", "exe"),
+            }
+        node = {"type": "file", "size": 0, "executable": False, **spec}
+        path = os.path.normpath(path)
+        self._link(path)
+        self.nodes[path] = node
+        parent = os.path.dirname(path)
+        while parent and parent not in self.nodes and parent != os.path.dirname(parent):
+            self._link(parent)
+            self.nodes[parent] = {"type": "dir", "size": 0, "executable": True}
+            parent = os.path.dirname(parent)
+
+    def _link(self, path: str):
+        if path not in self.nodes:
+            self.children.setdefault(os.path.dirname(path), []).append(path)
+
+    def _resolve(self, path: str, depth: int = 0) -> str:
+        path = os.path.normpath(path)
+        node = self.nodes.get(path)
+        if node and node.get("target") and depth < 40:
+            return self._resolve(node["target"], depth + 1)
+        return path
+
+    def _stat_impl(self, path: str) -> Optional[os.stat_result]:
+        resolved = self._resolve(path)
+        node = self.nodes.get(resolved)
+        if node is None:
+            return None
+        if node["type"] == "dir":
+            mode = stat.S_IFDIR | 0o755
+        else:
+            mode = stat.S_IFREG | (0o755 if node["executable"] else 0o644)
+        ino = abs(hash(resolved)) % (2**31)
+        return os.stat_result((mode, ino, 0, 1, 0, 0, node["size"], 0, 0, 0))
+
+    def _access_impl(self, path: str, mode: int) -> bool:
+        node = self.nodes.get(self._resolve(path))
+        if node is None:
+            return False
+        if mode & os.X_OK:
+            return bool(node["executable"])
+        return True
+
+    def _realpath_impl(self, path: str) -> str:
+        return self._resolve(path)
+
+    def _list_files_impl(self, directory: str) -> Optional[List[str]]:
+        resolved = self._resolve(directory)
+        node = self.nodes.get(resolved)
+        if node is None or node["type"] != "dir":
+            return None
+        names = []
+        for path in self.children.get(resolved, []):
+            if path != resolved:
+                target = self.nodes.get(self._resolve(path))
+                if target is not None and target["type"] != "dir":
+                    names.append(os.path.basename(path))
+        return sorted(names)
+
+    def _list_dirs_impl(self, directory: str) -> Optional[List[str]]:
+        resolved = self._resolve(directory)
+        node = self.nodes.get(resolved)
+        if node is None or node["type"] != "dir":
+            return None
+        names = []
+        for path in self.children.get(resolved, []):
+            if path != resolved:
+                target = self.nodes.get(self._resolve(path))
+                if target is not None and target["type"] == "dir":
+                    names.append(os.path.basename(path))
+        return sorted(names)
+
+    def _read_text_impl(self, path: str) -> Optional[str]:
+        node = self.nodes.get(self._resolve(path))
+        if node is None or node["type"] == "dir":
+            return None
+        return node.get("content", "")[: self.MAX_READ_BYTES]
@@ -0,0 +1,324 @@
+"""
+Incremental JSON writers for large reports.
+
+StreamingJsonWriter writes one JSON document piece by piece - objects and
+arrays are opened and closed explicitly and rows are encoded one at a time -
+to a buffered '<path>.tmp' file that replaces `path` only once the document
+is complete. Memory use is bounded by a batch of rows (`batch_size`) rather
+than the whole report, and a failed or interrupted export never leaves a truncated
+file behind. The indented output is identical to json.dump(..., indent=N);
+indent=None writes compact JSON without any whitespace.
+
+    with StreamingJsonWriter(path) as writer:
+        with writer.object():
+            writer.write_array("systemInventory", software_list)
+            with writer.object("devEnvAudit"):
+                writer.write_array("detectedComponents", components)
+
+JsonLinesWriter writes NDJSON (JSON Lines) for log pipelines instead: one
+compact object per inventory row, component, environment variable and issue,
+each tagged with its record "type" and the "scan_id" of the scan. Rows are
+written as scanners produce them (e.g. as a ScanEventBus subscriber, see
+event_consumer()), flushed to disk in batches and optionally gzip-compressed
+on the fly.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 1 << 20  # Bytes buffered before each write to disk
+DEFAULT_BATCH_SIZE = 500  # Rows encoded together; bounds the memory of one encode()
+DEFAULT_FLUSH_ROWS = 200  # JSON Lines records buffered before they are written out...
+DEFAULT_FLUSH_INTERVAL = 1.0  # ...or once the oldest buffered record is this many seconds old
+
+# Scan events written by JsonLinesWriter.event_consumer(); the record type is the event kind
+EVENT_RECORD_KINDS = ("component", "environment_variable", "issue", "update_info")
+
+
+def _batches(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def to_jsonable(value: Any) -> Any:
+    """json `default` hook: scan results (DetectedComponent, ScanIssue, ...) become their to_dict()."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StreamingJsonWriter:
+    """One JSON document, written incrementally and moved into place when complete."""
+
+    def __init__(
+        self,
+        path: str,
+        indent: Optional[int] = 4,
+        ensure_ascii: bool = False,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.indent = indent
+        self.buffer_size = buffer_size
+        self.batch_size = max(1, int(batch_size))
+        self.encoder = json.JSONEncoder(
+            ensure_ascii=ensure_ascii,
+            indent=indent,
+            separators=(",", ": ") if indent is not None else (",", ":"),
+            default=to_jsonable,
+        )
+        self.rows_written = 0
+        self._file = None
+        # One entry per open container: [closing character, items written]
+        self._stack: List[list] = []
+
+    def __enter__(self) -> "StreamingJsonWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def open(self):
+        self._file = open(self.tmp_path, "w", encoding="utf-8", buffering=self.buffer_size)
+
+    def close(self):
+        """Finishes the document and moves it into place."""
+        if self._stack:
+            raise ValueError(f"JSON document still has {len(self._stack)} open container(s)")
+        self._file.close()
+        self._file = None
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Discards the partial document; `path` is left as it was."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.remove(self.tmp_path)
+        except OSError as e:
+            logger.debug(f"Could not remove partial JSON file {self.tmp_path}: {e}")
+
+    # --- Structure ---
+
+    def _newline(self, depth: int) -> str:
+        return "\n" + " " * (self.indent * depth) if self.indent is not None else ""
+
+    def _start_item(self, key: Optional[str]):
+        """Separator, indentation and key of the next item of the innermost container."""
+        if not self._stack:
+            if key is not None:
+                raise ValueError("The top-level value has no key")
+            return
+        container = self._stack[-1]
+        if (container[0] == "}") != (key is not None):
+            raise ValueError("Object members need a key; array items must not have one")
+        self._file.write(("," if container[1] else "") + self._newline(len(self._stack)))
+        container[1] += 1
+        if key is not None:
+            self._file.write(self.encoder.encode(key) + self.encoder.key_separator)
+
+    def _begin(self, key: Optional[str], opening: str, closing: str):
+        self._start_item(key)
+        self._file.write(opening)
+        self._stack.append([closing, 0])
+
+    def end(self):
+        """Closes the innermost object or array."""
+        closing, count = self._stack.pop()
+        self._file.write((self._newline(len(self._stack)) if count else "") + closing)
+
+    def begin_object(self, key: Optional[str] = None):
+        self._begin(key, "{", "}")
+
+    def begin_array(self, key: Optional[str] = None):
+        self._begin(key, "[", "]")
+
+    @contextmanager
+    def object(self, key: Optional[str] = None) -> Iterator["StreamingJsonWriter"]:
+        self.begin_object(key)
+        yield self
+        self.end()
+
+    @contextmanager
+    def array(self, key: Optional[str] = None) -> Iterator["StreamingJsonWriter"]:
+        self.begin_array(key)
+        yield self
+        self.end()
+
+    # --- Values ---
+
+    def write_value(self, value: Any, key: Optional[str] = None):
+        """Encodes one complete value (a member of an object if `key` is given)."""
+        self._start_item(key)
+        encoded = self.encoder.encode(value)
+        if self.indent is not None and self._stack:
+            encoded = encoded.replace("\n", self._newline(len(self._stack)))
+        self._file.write(encoded)
+
+    def write_rows(self, rows: Iterable[Any]) -> int:
+        """Appends every row to the innermost (array) container; returns the row count."""
+        container = self._stack[-1] if self._stack else None
+        if container is None or container[0] != "]":
+            raise ValueError("Rows can only be written into an array")
+        count = 0
+        for batch in _batches(rows, self.batch_size):
+            # One encode() per batch of rows: encoding rows one by one spends
+            # most of its time setting the encoder up again for every row.
+            encoded = self.encoder.encode(batch)
+            items = encoded[1 : -(len(self._newline(0)) + 1)]  # Without the batch's own brackets
+            if self.indent is not None:
+                items = items.replace("\n", self._newline(len(self._stack) - 1))
+            self._file.write(("," if container[1] else "") + items)
+            container[1] += len(batch)
+            count += len(batch)
+        self.rows_written += count
+        return count
+
+    def write_array(self, key: Optional[str], rows: Iterable[Any]) -> int:
+        """An array of `rows`, encoded one row at a time."""
+        with self.array(key):
+            return self.write_rows(rows)
+
+
+def new_scan_id() -> str:
+    return uuid.uuid4().hex
+
+
+class JsonLinesWriter:
+    """
+    NDJSON output, one {"type": ..., "scan_id": ..., <row fields>} object per
+    line. Thread-safe, so an inventory scan and a scanner's event bus can
+    write to the same file. Records are buffered and written (and flushed)
+    once `flush_rows` are pending or, checked on every write, the oldest is
+    `flush_interval` seconds old; close() writes the rest. The file is gzip-compressed if `compress` is set, or by default
+    when `path` ends in ".gz".
+    """
+
+    def __init__(
+        self,
+        path: str,
+        scan_id: Optional[str] = None,
+        compress: Optional[bool] = None,
+        flush_rows: int = DEFAULT_FLUSH_ROWS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = path
+        self.scan_id = scan_id or new_scan_id()
+        self.compress = path.endswith(".gz") if compress is None else bool(compress)
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = float(flush_interval)
+        self.clock = clock
+        self.counts: Dict[str, int] = {}  # record type -> records written
+        self._encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=to_jsonable
+        )
+        self._pending: List[str] = []
+        self._pending_since = 0.0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "JsonLinesWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def open(self):
+        if self.compress:
+            self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_locked()
+            self._file.close()
+            self._file = None
+        logger.debug(f"JSON Lines output {self.path}: {self.counts}")
+
+    def record(self, record_type: str, row: Any) -> Dict[str, Any]:
+        """The output object of `row`: type and scan_id first, then the row's own fields."""
+        record = {"type": record_type, "scan_id": self.scan_id}
+        fields = row.to_dict() if hasattr(row, "to_dict") else row
+        for key, value in fields.items():
+            record.setdefault(key, value)
+        return record
+
+    def write(self, record_type: str, row: Any):
+        line = self._encoder.encode(self.record(record_type, row)) + "\n"
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"JSON Lines output {self.path} is not open")
+            if not self._pending:
+                self._pending_since = self.clock()
+            self._pending.append(line)
+            self.counts[record_type] = self.counts.get(record_type, 0) + 1
+            if (
+                len(self._pending) >= self.flush_rows
+                or self.clock() - self._pending_since >= self.flush_interval
+            ):
+                self._flush_locked()
+
+    def write_rows(self, record_type: str, rows: Iterable[Any]) -> int:
+        count = 0
+        for row in rows:
+            self.write(record_type, row)
+            count += 1
+        return count
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._pending:
+            self._file.write("".join(self._pending))
+            self._pending = []
+        self._file.flush()  # A sync flush for gzip: readers can decompress what is there
+
+    def event_consumer(self) -> Callable[[Any], None]:
+        """
+        A ScanEventBus callback writing every component, environment variable
+        and issue event - and each component's update_info once its update
+        check finishes - as it is delivered.
+        """
+
+        def consume(event):
+            if event.kind == "update_info":
+                self.write(
+                    "update_info",
+                    dict(event.data["update_info"], component_id=event.data["component"].id),
+                )
+            elif event.kind in EVENT_RECORD_KINDS:
+                self.write(event.kind, event.data[event.kind])
+
+        return consume
@@ -0,0 +1,119 @@
+"""
+Aho-Corasick automaton for "which of these substrings occur in this text" lookups.
+
+Used by SoftwareCategorizer to match a component name against every entry name
+and keyword of the categorization database in a single pass over the name,
+instead of testing each keyword with `in`. Every pattern carries an integer
+priority (lower wins); `best_match` returns the lowest priority among all
+patterns occurring in the text, which reproduces "first entry in database
+order whose pattern matches" semantics; `all_matches` returns every matching
+priority instead (used by the environment variable rule engine).
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_NO_MATCH = float("inf")
+
+
+class KeywordAutomaton:
+    """Multi-pattern substring matcher with per-pattern priorities."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[float] = [_NO_MATCH]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._own_outputs: Dict[int, Set[int]] = {}
+        self._pattern_count = 0
+        self._finalized = False
+        for pattern, priority in patterns:
+            self.add(pattern, priority)
+
+    def add(self, pattern: str, priority: int):
+        """Adds a pattern. Adding after the first lookup rebuilds the failure links."""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(_NO_MATCH)
+                self._outputs.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        if priority < self._best[state]:
+            self._best[state] = priority
+        self._own_outputs.setdefault(state, set()).add(priority)
+        self._pattern_count += 1
+        self._finalized = False
+
+    def _finalize(self):
+        # Breadth-first construction of failure links; each state's best
+        # priority and outputs also cover the patterns that end at its failure state.
+        self._outputs = [
+            tuple(sorted(self._own_outputs.get(state, ())))
+            for state in range(len(self._goto))
+        ]
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._best[child] = min(self._best[child], self._best[0])
+            self._outputs[child] = tuple(
+                sorted(set(self._outputs[child]) | set(self._outputs[0]))
+            )
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fail_state = self._fail[state]
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                fallback = self._goto[fail_state].get(char, 0)
+                self._fail[child] = fallback if fallback != child else 0
+                self._best[child] = min(self._best[child], self._best[self._fail[child]])
+                inherited = self._outputs[self._fail[child]]
+                if inherited:
+                    self._outputs[child] = tuple(
+                        sorted(set(self._outputs[child]) | set(inherited))
+                    )
+                queue.append(child)
+        self._finalized = True
+
+    def best_match(self, text: str) -> Optional[int]:
+        """Returns the lowest priority of any pattern found in `text`, or None."""
+        if not self._finalized:
+            self._finalize()
+        goto = self._goto
+        fail = self._fail
+        best_table = self._best
+        best = best_table[0]  # Empty patterns match any text
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best_table[state] < best:
+                best = best_table[state]
+        return None if best == _NO_MATCH else int(best)
+
+    def all_matches(self, text: str) -> Set[int]:
+        """Returns the priorities of all patterns found in `text`."""
+        if not self._finalized:
+            self._finalize()
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        found = set(outputs[0])
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def __len__(self) -> int:
+        return self._pattern_count
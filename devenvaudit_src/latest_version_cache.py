@@ -0,0 +1,240 @@
+"""
+Persistent TTL cache for package-manager latest-version lookups.
+
+Results of package_manager_integrator.query_latest_versions are stored in
+'latest_version_cache.json' (next to 'devenvaudit_config.json'), keyed by
+(package manager id, package name). A lookup younger than the TTL is fresh.
+Older lookups are stale but still served immediately. The caller schedules a
+background refresh for them (stale-while-revalidate). Lookups the package
+manager answered with "not found" are cached too, so unknown packages aren't
+queried on every scan; failed lookups (errors, timeouts) are not cached.
+Entries older than `max_stale_seconds` are no longer served, and the file is
+capped at `max_entries` with the oldest lookups evicted first.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .config_manager import CONFIG_DIR_PATH
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_NAME = "latest_version_cache.json"
+CACHE_FILE_PATH = os.path.join(CONFIG_DIR_PATH, CACHE_FILE_NAME)
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_MAX_STALE_SECONDS = 7 * 86400.0
+DEFAULT_MAX_ENTRIES = 5000
+
+
+@dataclass
+class CachedLatestVersion:
+    version: Optional[str]  # None: the package manager doesn't know the package
+    fetched_at: float
+    age_seconds: float
+    stale: bool
+
+
+class LatestVersionCache:
+    """Thread-safe on-disk cache of (pm_id, package) -> latest version."""
+
+    def __init__(
+        self,
+        cache_path: str = CACHE_FILE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_stale_seconds: float = DEFAULT_MAX_STALE_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.cache_path = cache_path
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_stale_seconds = max(float(max_stale_seconds), self.ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self.clock = clock
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._refresh_futures: List[Future] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, scan_options: Dict[str, object]) -> "LatestVersionCache":
+        """Builds the cache from the latest_version_cache_* scan options."""
+        return cls(
+            ttl_seconds=float(scan_options.get("latest_version_cache_ttl_hours", 1)) * 3600,
+            max_stale_seconds=float(
+                scan_options.get("latest_version_cache_max_stale_days", 7)
+            )
+            * 86400,
+            max_entries=int(
+                scan_options.get("latest_version_cache_max_entries", DEFAULT_MAX_ENTRIES)
+            ),
+        )
+
+    @staticmethod
+    def make_key(pm_id: str, package_name: str) -> str:
+        return f"{pm_id}\t{package_name}"
+
+    def load(self):
+        """Loads the cache file. A missing or unreadable file yields an empty cache."""
+        with self._lock:
+            self._load_locked()
+
+    def _load_locked(self):
+        self._loaded = True
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != CACHE_FORMAT_VERSION:
+                logger.info(
+                    f"Ignoring latest-version cache {self.cache_path} with unsupported format."
+                )
+                return
+            self.entries = dict(data.get("entries", {}))
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Could not read latest-version cache {self.cache_path}: {e}")
+            self.entries = {}
+
+    def get(self, pm_id: str, package_name: str) -> Optional[CachedLatestVersion]:
+        """The cached lookup with its age, or None if there is none worth serving."""
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            entry = self.entries.get(self.make_key(pm_id, package_name))
+            if entry is None:
+                return None
+            age = max(0.0, self.clock() - float(entry.get("fetched_at", 0)))
+            if age > self.max_stale_seconds:
+                return None
+            return CachedLatestVersion(
+                version=entry.get("version"),
+                fetched_at=float(entry["fetched_at"]),
+                age_seconds=age,
+                stale=age > self.ttl_seconds,
+            )
+
+    def put(self, pm_id: str, package_name: str, version: Optional[str]):
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            self.entries[self.make_key(pm_id, package_name)] = {
+                "version": version,
+                "fetched_at": self.clock(),
+            }
+            self._dirty = True
+
+    def put_many(
+        self, pm_id: str, package_names: Iterable[str], versions: Dict[str, Optional[str]]
+    ):
+        """
+        Stores a batch lookup: `versions` maps each name the package manager
+        answered for to its version, or None if it doesn't know the package.
+        Names missing from `versions` weren't answered (the lookup failed)
+        and keep whatever entry they had.
+        """
+        for package_name in package_names:
+            if package_name in versions:
+                self.put(pm_id, package_name, versions[package_name])
+
+    def refresh_in_background(
+        self,
+        pm_id: str,
+        package_names: Iterable[str],
+        fetch: Callable[[List[str]], Dict[str, Optional[str]]],
+    ):
+        """
+        Re-queries `package_names` with `fetch(names) -> {name: version}` (see put_many) on a
+        background thread and saves the cache afterwards. Packages already
+        being refreshed are skipped.
+        """
+        with self._lock:
+            names = [
+                name
+                for name in package_names
+                if self.make_key(pm_id, name) not in self._refreshing
+            ]
+            if not names:
+                return
+            self._refreshing.update(self.make_key(pm_id, name) for name in names)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="latest-version-refresh"
+                )
+            executor = self._executor
+
+        def refresh():
+            try:
+                self.put_many(pm_id, names, fetch(names))
+                self.save()
+                logger.debug(f"Refreshed {len(names)} cached latest versions from {pm_id}.")
+            except Exception as e:
+                logger.warning(f"Background refresh of {pm_id} latest versions failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(self.make_key(pm_id, name) for name in names)
+
+        future = executor.submit(refresh)
+        with self._lock:
+            self._refresh_futures = [f for f in self._refresh_futures if not f.done()]
+            self._refresh_futures.append(future)
+
+    def wait_for_refreshes(self, timeout: Optional[float] = None) -> bool:
+        """Waits for pending background refreshes; returns False on timeout."""
+        with self._lock:
+            futures = list(self._refresh_futures)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in futures:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                future.result(timeout=remaining)
+            except Exception:
+                return False
+        return True
+
+    def _evict_locked(self):
+        now = self.clock()
+        expired = [
+            key
+            for key, entry in self.entries.items()
+            if now - float(entry.get("fetched_at", 0)) > self.max_stale_seconds
+        ]
+        for key in expired:
+            del self.entries[key]
+        overflow = len(self.entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(
+                self.entries, key=lambda k: float(self.entries[k].get("fetched_at", 0))
+            )[:overflow]
+            for key in oldest:
+                del self.entries[key]
+
+    def save(self) -> bool:
+        """Evicts expired entries and writes the cache if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return True
+            self._evict_locked()
+            data = {"format": CACHE_FORMAT_VERSION, "entries": self.entries}
+            tmp_path = f"{self.cache_path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.cache_path)
+            except (OSError, TypeError) as e:
+                logger.warning(
+                    f"Could not write latest-version cache {self.cache_path}: {e}"
+                )
+                return False
+            self._dirty = False
+        return True
@@ -0,0 +1,327 @@
+"""
+Offline index of available package versions, read from the package
+managers' own metadata on disk instead of starting `apt-cache` or `dnf`.
+
+* APT: /var/lib/apt/lists/*_Packages (plain, .gz or .xz). Each file is
+  streamed line by line and only the Package/Version fields are kept. Lists
+  from suites whose Release file says "NotAutomatic: yes" (experimental,
+  backports) are skipped, because apt never picks those as candidates by
+  default.
+* DNF/YUM: the primary metadata of the cached repositories that are enabled
+  in /etc/yum.repos.d (<cache>/<repo>[-<hash>]/repodata/repomd.xml ->
+  *-primary.xml[.gz|.xz|.bz2|.zst]; .zst needs the optional zstandard
+  package), streamed with iterparse so memory stays flat on large
+  repositories. Disabled repositories and ones only enabled for a single
+  command (`--enablerepo=updates-testing`) are left out, as dnf ignores them
+  when it picks a candidate.
+
+The candidate for a package is its highest version across all files,
+compared with the dpkg or rpm ordering (see versions.py). An index is
+`complete` if every list or enabled repository was read; only then does a
+package it doesn't list count as unknown to the package manager. Indexes are
+built once and kept until one of the files they were read from changes.
+"""
+
+import bz2
+import configparser
+import glob
+import gzip
+import logging
+import lzma
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .versions import debian_key, rpm_evr_key
+
+try:
+    import zstandard
+except ImportError:  # Optional: .zst repository metadata is then left unread
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+APT_LISTS_DIR = "/var/lib/apt/lists"
+DNF_CACHE_DIRS = ("/var/cache/dnf", "/var/cache/yum", "/var/cache/libdnf5")
+YUM_REPOS_DIR = "/etc/yum.repos.d"
+
+_OPENERS = {".gz": gzip.open, ".xz": lzma.open, ".bz2": bz2.open}
+_READ_ERRORS = (OSError, EOFError, lzma.LZMAError)
+if zstandard is not None:
+    _OPENERS[".zst"] = zstandard.open
+    _READ_ERRORS += (zstandard.ZstdError,)
+_REPO_NS = "{http://linux.duke.edu/metadata/repo}"
+_COMMON_NS = "{http://linux.duke.edu/metadata/common}"
+
+
+def _open_binary(path: str):
+    opener = _OPENERS.get(os.path.splitext(path)[1], open)
+    return opener(path, "rb")
+
+
+# --- Index ---
+
+
+class OfflinePackageIndex:
+    """package name -> candidate (highest available) version for one package manager."""
+
+    def __init__(self, pm_id: str, files: Sequence[str]):
+        self.pm_id = pm_id
+        self.files = list(files)
+        self.candidates: Dict[str, str] = {}
+        self.packages_read = 0
+        self.complete = True  # False if a list or enabled repository could not be read
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def get(self, package_name: str) -> Optional[str]:
+        return self.candidates.get(package_name)
+
+    def lookup(self, package_names: Sequence[str]) -> Dict[str, str]:
+        return {name: self.candidates[name] for name in package_names if name in self.candidates}
+
+
+def _apt_suite_is_not_automatic(lists_dir: str, file_name: str) -> bool:
+    match = re.match(r"^(.*_dists_[^_]+)_", file_name)
+    if not match:
+        return False
+    for release_name in ("InRelease", "Release"):
+        release_path = os.path.join(lists_dir, f"{match.group(1)}_{release_name}")
+        try:
+            with open(release_path, "rb") as f:
+                header = f.read(8192)
+        except OSError:
+            continue
+        return re.search(rb"^NotAutomatic:\s*yes", header, re.MULTILINE) is not None
+    return False
+
+
+def _iter_apt_packages(path: str) -> Iterator[Tuple[str, str]]:
+    name = version = None
+    with _open_binary(path) as f:
+        for line in f:
+            if line.startswith(b"Package: "):
+                name = line[9:].strip().decode("utf-8", "replace")
+            elif line.startswith(b"Version: "):
+                version = line[9:].strip().decode("utf-8", "replace")
+            elif not line.strip():
+                if name and version:
+                    yield name, version
+                name = version = None
+    if name and version:
+        yield name, version
+
+
+def apt_list_files(lists_dir: str = APT_LISTS_DIR) -> List[str]:
+    files = []
+    for pattern in ("*_Packages", "*_Packages.gz", "*_Packages.xz"):
+        files.extend(glob.glob(os.path.join(lists_dir, pattern)))
+    return sorted(
+        path
+        for path in files
+        if not _apt_suite_is_not_automatic(lists_dir, os.path.basename(path))
+    )
+
+
+def build_apt_index(lists_dir: str = APT_LISTS_DIR) -> OfflinePackageIndex:
+    index = OfflinePackageIndex("apt", apt_list_files(lists_dir))
+    candidates = index.candidates
+    best_keys: Dict[str, tuple] = {}
+    for path in index.files:
+        try:
+            for name, version in _iter_apt_packages(path):
+                index.packages_read += 1
+                key = debian_key(version)  # Not memoized: most versions are seen once
+                current = best_keys.get(name)
+                if current is None or key > current:
+                    best_keys[name] = key
+                    candidates[name] = version
+        except _READ_ERRORS as e:
+            index.complete = False
+            logger.warning(f"Could not read APT list {path}: {e}")
+    logger.info(
+        f"Offline APT index: {len(candidates)} packages from {len(index.files)} lists."
+    )
+    return index
+
+
+def _primary_location(repodata_dir: str) -> Optional[str]:
+    repomd_path = os.path.join(repodata_dir, "repomd.xml")
+    try:
+        root = ET.parse(repomd_path).getroot()
+    except (OSError, ET.ParseError):
+        return None
+    for data in root.iter(f"{_REPO_NS}data"):
+        if data.get("type") == "primary":
+            location = data.find(f"{_REPO_NS}location")
+            if location is not None and location.get("href"):
+                return os.path.join(os.path.dirname(repodata_dir), location.get("href"))
+    return None
+
+
+def enabled_repo_ids(repos_dir: str = YUM_REPOS_DIR) -> List[str]:
+    """Ids of the repositories enabled in the *.repo files of `repos_dir`."""
+    repo_ids = []
+    for path in sorted(glob.glob(os.path.join(repos_dir, "*.repo"))):
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        try:
+            parser.read(path, encoding="utf-8")
+        except (OSError, configparser.Error) as e:
+            logger.warning(f"Could not read repository file {path}: {e}")
+            continue
+        for repo_id in parser.sections():
+            enabled = parser.get(repo_id, "enabled", fallback="1").strip().lower()
+            if enabled in ("1", "yes", "true", "on"):
+                repo_ids.append(repo_id)
+    return repo_ids
+
+
+def _cache_repo_id(cache_entry: str) -> str:
+    # dnf and libdnf5 name a repository's cache "<repo id>-<16 hex digits>", yum just "<repo id>"
+    return re.sub(r"-[0-9a-f]{16}$", "", cache_entry)
+
+
+def dnf_repositories(
+    cache_dirs: Sequence[str] = DNF_CACHE_DIRS, repos_dir: str = YUM_REPOS_DIR
+) -> Dict[str, Optional[str]]:
+    """
+    Enabled repository id -> its cached primary metadata file, or None if
+    there is none that can be read (never downloaded, unsupported compression).
+    """
+    primaries: Dict[str, Optional[str]] = {repo_id: None for repo_id in enabled_repo_ids(repos_dir)}
+    for cache_dir in cache_dirs:
+        # dnf/libdnf5: <cache>/<repo>-<hash>; yum: <cache>/<basearch>/<releasever>/<repo>
+        for pattern in ("*", os.path.join("*", "*", "*")):
+            for repomd in sorted(glob.glob(os.path.join(cache_dir, pattern, "repodata", "repomd.xml"))):
+                repo_id = _cache_repo_id(os.path.basename(os.path.dirname(os.path.dirname(repomd))))
+                if repo_id not in primaries or primaries[repo_id] is not None:
+                    continue
+                primary = _primary_location(os.path.dirname(repomd))
+                if (
+                    primary
+                    and os.path.splitext(primary)[1] in (".xml", *_OPENERS)
+                    and os.path.isfile(primary)
+                ):
+                    primaries[repo_id] = primary
+    return primaries
+
+
+def dnf_primary_files(
+    cache_dirs: Sequence[str] = DNF_CACHE_DIRS, repos_dir: str = YUM_REPOS_DIR
+) -> List[str]:
+    return sorted(path for path in dnf_repositories(cache_dirs, repos_dir).values() if path)
+
+
+def dnf_index_files(
+    cache_dirs: Sequence[str] = DNF_CACHE_DIRS, repos_dir: str = YUM_REPOS_DIR
+) -> List[str]:
+    """Files a dnf index is built from: the primaries and, as they pick the repositories, the .repo files."""
+    primaries = dnf_primary_files(cache_dirs, repos_dir)
+    if not primaries:
+        return []
+    return primaries + sorted(glob.glob(os.path.join(repos_dir, "*.repo")))
+
+
+def _iter_rpm_packages(path: str) -> Iterator[Tuple[str, Tuple[int, str, str]]]:
+    with _open_binary(path) as f:
+        for _, element in ET.iterparse(f, events=("end",)):
+            if element.tag != f"{_COMMON_NS}package":
+                continue
+            name = element.findtext(f"{_COMMON_NS}name")
+            version = element.find(f"{_COMMON_NS}version")
+            if name and version is not None and element.get("type", "rpm") == "rpm":
+                epoch = version.get("epoch", "0")
+                yield name, (
+                    int(epoch) if epoch.isdigit() else 0,
+                    version.get("ver", ""),
+                    version.get("rel", ""),
+                )
+            element.clear()  # Keep memory flat on large repositories
+
+
+def build_dnf_index(
+    cache_dirs: Sequence[str] = DNF_CACHE_DIRS, pm_id: str = "dnf", repos_dir: str = YUM_REPOS_DIR
+) -> OfflinePackageIndex:
+    repositories = dnf_repositories(cache_dirs, repos_dir)
+    index = OfflinePackageIndex(pm_id, sorted(path for path in repositories.values() if path))
+    unread = sorted(repo_id for repo_id, path in repositories.items() if path is None)
+    if unread:
+        index.complete = False
+        logger.info(f"Offline {pm_id} index: no readable metadata for {', '.join(unread)}.")
+    best: Dict[str, Tuple[int, str, str]] = {}
+    best_keys: Dict[str, tuple] = {}
+    for path in index.files:
+        try:
+            for name, evr in _iter_rpm_packages(path):
+                index.packages_read += 1
+                key = rpm_evr_key(evr)
+                current = best_keys.get(name)
+                if current is None or key > current:
+                    best_keys[name] = key
+                    best[name] = evr
+        except (ET.ParseError, *_READ_ERRORS) as e:
+            index.complete = False
+            logger.warning(f"Could not read repository metadata {path}: {e}")
+    # Same form as `dnf info`'s Version field, which the online path reports.
+    index.candidates = {name: evr[1] for name, evr in best.items()}
+    logger.info(
+        f"Offline {pm_id} index: {len(best)} packages from {len(index.files)} repositories."
+    )
+    return index
+
+
+OFFLINE_INDEX_BUILDERS: Dict[str, Tuple[Callable[[], List[str]], Callable[[], OfflinePackageIndex]]] = {
+    "apt": (lambda: apt_list_files(APT_LISTS_DIR), lambda: build_apt_index(APT_LISTS_DIR)),
+    "dnf": (
+        lambda: dnf_index_files(DNF_CACHE_DIRS, YUM_REPOS_DIR),
+        lambda: build_dnf_index(DNF_CACHE_DIRS, "dnf", YUM_REPOS_DIR),
+    ),
+    "yum": (
+        lambda: dnf_index_files(DNF_CACHE_DIRS, YUM_REPOS_DIR),
+        lambda: build_dnf_index(DNF_CACHE_DIRS, "yum", YUM_REPOS_DIR),
+    ),
+}
+
+_index_cache: Dict[str, Tuple[Tuple, OfflinePackageIndex]] = {}
+_index_lock = threading.Lock()
+
+
+def _files_fingerprint(files: Sequence[str]) -> Tuple:
+    fingerprint = []
+    for path in files:
+        try:
+            st = os.stat(path)
+            fingerprint.append((path, st.st_size, st.st_mtime_ns))
+        except OSError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+
+def get_offline_index(pm_id: str) -> Optional[OfflinePackageIndex]:
+    """
+    The offline index for `pm_id`, built on first use and rebuilt when its
+    files change. None if the package manager has no offline metadata here.
+    """
+    builders = OFFLINE_INDEX_BUILDERS.get(pm_id)
+    if builders is None:
+        return None
+    list_files, build = builders
+    with _index_lock:
+        files = list_files()
+        if not files:
+            return None
+        fingerprint = _files_fingerprint(files)
+        cached = _index_cache.get(pm_id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        index = build()
+        _index_cache[pm_id] = (fingerprint, index)
+        return index
+
+
+def clear_offline_indexes():
+    with _index_lock:
+        _index_cache.clear()
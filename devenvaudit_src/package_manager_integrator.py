@@ -3,17 +3,32 @@ Detects installed package managers and queries them for latest versions and upda
 te commands.
 """
 
+import json
 import platform
 import subprocess
 import re
 import logging
 import shutil  # For shutil.which
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+
+from .offline_index import get_offline_index
+from .versions import is_newer, scheme_for_package_manager
 
 logger = logging.getLogger(__name__)
 
 # Structure for package manager commands
 # { 'name': 'readable_name', 'detection_command': ['cmd', '--version'], 'list_command': ..., 'search_command_template': ..., 'update_command_template': ...}
 # For search/update, use {package_name} as placeholder
+# batch_query_cmds: commands that answer for many packages at once; {package_names}
+# expands to one argument per package. When batch_query_exhaustive is False the
+# commands only list installed packages, so packages missing from their output
+# are still searched for one at a time.
+# max_concurrent_calls: how many of the PM's commands PackageManagerExecutor runs
+# at once (DEFAULT_MAX_CONCURRENT_CALLS if absent).
 
 PACKAGE_MANAGERS = {
     "winget": {
@@ -33,13 +48,16 @@ PACKAGE_MANAGERS = {
             "--exact",
             "{package_name}",
         ],  # winget upgrade --exact <package_id>
+        # Name Id Version Available Source, for every installed package
+        "batch_query_cmds": [["winget", "list", "--accept-source-agreements"]],
+        "batch_query_exhaustive": False,
         "os": ["Windows"],
     },
     "choco": {
         "name": "Chocolatey",
         "detection_exe": "choco",
         "version_args": ["--version"],  # choco --version or choco -v
-        "list_installed_cmd": ["choco", "list", "--local-only"],  # [11, 20, 27]
+        "list_installed_cmd": ["choco", "list", "--local-only", "--limit-output"],  # [11, 20, 27]
         "search_latest_cmd_template": [
             "choco",
             "search",
@@ -47,6 +65,12 @@ PACKAGE_MANAGERS = {
             "--exact",
         ],  # choco search <package_id> --exact
         "update_cmd_template": ["choco", "upgrade", "{package_name}", "-y"],
+        # name|version, then name|current|available|pinned for outdated ones
+        "batch_query_cmds": [
+            ["choco", "list", "--local-only", "--limit-output"],
+            ["choco", "outdated", "--limit-output"],
+        ],
+        "batch_query_exhaustive": False,
         "os": ["Windows"],
     },
     "scoop": {
@@ -73,6 +97,8 @@ PACKAGE_MANAGERS = {
             "{package_name}",
         ],  # brew info <formula>
         "update_cmd_template": ["brew", "upgrade", "{package_name}"],
+        "batch_query_cmds": [["brew", "info", "--json=v2", "{package_names}"]],
+        "batch_query_exhaustive": True,
         "os": ["Darwin", "Linux"],  # Linuxbrew
     },
     "apt": {
@@ -80,6 +106,7 @@ PACKAGE_MANAGERS = {
         "detection_exe": "apt-get",  # apt itself is often a script, apt-get is more fundamental
         "version_args": ["--version"],
         # apt list --installed {package_name} is better for specific check
+        "list_installed_cmd": ["dpkg-query", "-W", "-f=${db:Status-Abbrev}\t${Package}\t${Version}\n"],
         "search_latest_cmd_template": ["apt-cache", "policy", "{package_name}"],
         # apt-cache policy <package_name> or apt show <package_name>
         "update_cmd_template": [
@@ -89,6 +116,9 @@ PACKAGE_MANAGERS = {
             "--only-upgrade",
             "{package_name}",
         ],  # Or apt upgrade {package_name}
+        "batch_query_cmds": [["apt-cache", "policy", "{package_names}"]],
+        "batch_query_exhaustive": True,
+        "max_concurrent_calls": 1,  # Holds the package database lock
         "os": ["Linux"],
     },
     "dnf": {
@@ -102,6 +132,9 @@ PACKAGE_MANAGERS = {
             "{package_name}",
         ],  # dnf info <package_name>
         "update_cmd_template": ["sudo", "dnf", "upgrade", "-y", "{package_name}"],
+        "batch_query_cmds": [["dnf", "info", "{package_names}"]],
+        "batch_query_exhaustive": True,
+        "max_concurrent_calls": 1,  # Holds the package database lock
         "os": ["Linux"],
     },
     "yum": {
@@ -115,6 +148,9 @@ PACKAGE_MANAGERS = {
             "{package_name}",
         ],  # yum info <package_name>
         "update_cmd_template": ["sudo", "yum", "update", "-y", "{package_name}"],
+        "batch_query_cmds": [["yum", "info", "{package_names}"]],
+        "batch_query_exhaustive": True,
+        "max_concurrent_calls": 1,  # Holds the package database lock
         "os": ["Linux"],
     },
     "pacman": {
@@ -133,6 +169,9 @@ PACKAGE_MANAGERS = {
             "-Syu",
             "{package_name}",
         ],  # This updates all then installs, or just -S for specific
+        "batch_query_cmds": [["pacman", "-Si", "{package_names}"]],
+        "batch_query_exhaustive": True,
+        "max_concurrent_calls": 1,  # Holds the package database lock
         "os": ["Linux"],
     },
     "snap": {
@@ -146,13 +185,15 @@ PACKAGE_MANAGERS = {
             "{package_name}",
         ],  # snap info <snap_name>
         "update_cmd_template": ["sudo", "snap", "refresh", "{package_name}"],
+        "batch_query_cmds": [["snap", "info", "{package_names}"]],
+        "batch_query_exhaustive": True,
         "os": ["Linux"],
     },
     "flatpak": {
         "name": "Flatpak",
         "detection_exe": "flatpak",
         "version_args": ["--version"],
-        "list_installed_cmd": ["flatpak", "list"],  # [1, 14, 36]
+        "list_installed_cmd": ["flatpak", "list", "--columns=application,version"],  # [1, 14, 36]
         "search_latest_cmd_template": [
             "flatpak",
             "remote-info",
@@ -268,7 +309,12 @@ def _run_pm_command(command_parts, timeout=15):
             encoding="utf-8",
             errors="replace",
         )
-        stdout, stderr = process.communicate(timeout=timeout)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()  # Don't leave it holding the package database lock
+            process.communicate()
+            raise
         if process.returncode != 0:
             logger.warning(
                 f"PM Command '{' '.join(command_parts)}' failed with code {process.returncode}. Stderr: {stderr.strip()}"
@@ -286,6 +332,155 @@ def _run_pm_command(command_parts, timeout=15):
         return None, str(e)
 
 
+# --- Executor: package managers in parallel, each within its own limits ---
+
+DEFAULT_MAX_CONCURRENT_CALLS = 2
+DEFAULT_CALL_TIMEOUT_SECONDS = 15.0
+DEFAULT_STAGE_TIMEOUT_SECONDS = 120.0
+LIST_INSTALLED_TIMEOUT_SECONDS = 60.0
+
+
+@dataclass
+class PackageManagerTiming:
+    """Time spent in one package manager's commands during a stage."""
+
+    pm_id: str
+    calls: int = 0
+    seconds: float = 0.0
+    timeouts: int = 0
+    skipped: int = 0  # Not started because the stage deadline had passed
+
+
+class PackageManagerExecutor:
+    """
+    Runs package-manager commands for one stage (an update check, an
+    installed-package listing). Different managers run in parallel; each
+    manager runs at most `max_concurrent_calls` commands at once (1 for the
+    ones that lock their database). Every command gets the per-call timeout,
+    cut short by the stage deadline, and commands that would start after the
+    deadline are not run at all. Time spent per manager is kept in `timings`.
+    """
+
+    def __init__(
+        self,
+        call_timeout=DEFAULT_CALL_TIMEOUT_SECONDS,
+        stage_timeout=DEFAULT_STAGE_TIMEOUT_SECONDS,
+        max_workers=8,
+        clock=time.monotonic,
+    ):
+        self.call_timeout = float(call_timeout)
+        self.stage_timeout = float(stage_timeout)
+        self.max_workers = max(1, int(max_workers))
+        self.clock = clock
+        self.deadline = clock() + self.stage_timeout
+        self.timings = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, scan_options):
+        """Builds the executor from the package_manager_* scan options."""
+        return cls(
+            call_timeout=float(
+                scan_options.get("package_manager_call_timeout_seconds", DEFAULT_CALL_TIMEOUT_SECONDS)
+            ),
+            stage_timeout=float(
+                scan_options.get("package_manager_stage_timeout_seconds", DEFAULT_STAGE_TIMEOUT_SECONDS)
+            ),
+        )
+
+    def remaining(self):
+        """Seconds left until the stage deadline (never negative)."""
+        return max(0.0, self.deadline - self.clock())
+
+    def _slot(self, pm_id):
+        with self._lock:
+            if pm_id not in self._slots:
+                limit = PACKAGE_MANAGERS.get(pm_id, {}).get(
+                    "max_concurrent_calls", DEFAULT_MAX_CONCURRENT_CALLS
+                )
+                self._slots[pm_id] = threading.BoundedSemaphore(max(1, int(limit)))
+                self.timings[pm_id] = PackageManagerTiming(pm_id)
+            return self._slots[pm_id]
+
+    def run(self, pm_id, command_parts, timeout=None):
+        """_run_pm_command within the manager's concurrency limit and the deadlines."""
+        with self._slot(pm_id):
+            timing = self.timings[pm_id]
+            remaining = self.remaining()
+            if remaining <= 0:
+                with self._lock:
+                    timing.skipped += 1
+                logger.warning(
+                    f"Skipping PM command '{' '.join(command_parts)}': stage deadline passed."
+                )
+                return None, "DeadlineExceeded"
+            call_timeout = self.call_timeout if timeout is None else float(timeout)
+            started = self.clock()
+            stdout, stderr = _run_pm_command(command_parts, timeout=min(call_timeout, remaining))
+            with self._lock:
+                timing.calls += 1
+                timing.seconds += self.clock() - started
+                if stderr == "TimeoutExpired":
+                    timing.timeouts += 1
+            return stdout, stderr
+
+    def run_many(self, pm_id, commands, timeout=None):
+        """Runs `commands` of one manager, as concurrently as its limit allows, in order."""
+        commands = list(commands)
+        if len(commands) <= 1:
+            return [self.run(pm_id, command, timeout) for command in commands]
+        limit = PACKAGE_MANAGERS.get(pm_id, {}).get(
+            "max_concurrent_calls", DEFAULT_MAX_CONCURRENT_CALLS
+        )
+        with ThreadPoolExecutor(
+            max_workers=min(len(commands), max(1, int(limit))), thread_name_prefix=f"pm-{pm_id}"
+        ) as pool:
+            return list(pool.map(lambda command: self.run(pm_id, command, timeout), commands))
+
+    def map(self, calls):
+        """
+        Runs {pm_id: callable} with one thread per manager and returns
+        {pm_id: result}. A manager whose call fails or is still running at
+        the stage deadline gets None.
+        """
+        results = {pm_id: None for pm_id in calls}
+        if not calls:
+            return results
+        pool = ThreadPoolExecutor(
+            max_workers=min(len(calls), self.max_workers), thread_name_prefix="pm-stage"
+        )
+        try:
+            futures = {pm_id: pool.submit(call) for pm_id, call in calls.items()}
+            for pm_id, future in futures.items():
+                try:
+                    # A little grace: the command itself is cut off at the deadline
+                    results[pm_id] = future.result(timeout=self.remaining() + 1.0)
+                except FutureTimeoutError:
+                    logger.warning(f"{pm_id} did not finish before the stage deadline.")
+                except Exception as e:
+                    logger.error(f"Package manager {pm_id} failed: {e}", exc_info=True)
+        finally:
+            pool.shutdown(wait=False)
+        return results
+
+    def timing_summary(self):
+        with self._lock:
+            timings = sorted(self.timings.values(), key=lambda t: -t.seconds)
+        return ", ".join(
+            f"{t.pm_id}: {t.calls} calls in {t.seconds:.2f}s"
+            + (f" ({t.timeouts} timed out)" if t.timeouts else "")
+            + (f" ({t.skipped} skipped)" if t.skipped else "")
+            for t in timings
+        )
+
+
+def _run_with(executor, pm_id, command_parts, timeout=None):
+    if executor is None:
+        return _run_pm_command(command_parts, timeout=timeout or DEFAULT_CALL_TIMEOUT_SECONDS)
+    return executor.run(pm_id, command_parts, timeout)
+
+
 def detect_package_managers():
     """
     Detects available package managers on the system.
@@ -481,134 +676,666 @@ def parse_version_from_output(output, pm_id, package_name_in_pm):
     return version
 
 
-def get_latest_version_and_update_command(
-    tool_id, tool_name, installed_version, preferred_pms_os_specific
+def _build_command(template, package_names, pm_id, detected_pms):
+    """
+    Fills a command template. {package_name}/{package_id} take the single
+    package, {package_names} expands to one argument per package. The
+    package manager's executable is replaced by its detected path.
+    """
+    pm_config = PACKAGE_MANAGERS[pm_id]
+    command = []
+    for part in template:
+        if part == "{package_names}":
+            command.extend(package_names)
+        else:
+            name = package_names[0] if package_names else ""
+            command.append(
+                part.replace("{package_name}", name).replace("{package_id}", name)
+            )
+    if command and command[0] == pm_config["detection_exe"] and pm_id in detected_pms:
+        command[0] = detected_pms[pm_id]["path"]
+    return command
+
+
+def _update_command_string(pm_id, package_name_in_pm):
+    pm_config = PACKAGE_MANAGERS[pm_id]
+    update_command_template = pm_config.get("update_cmd_template")
+    if not update_command_template:
+        return ""
+    base_cmd_parts = [
+        part.replace("{package_name}", package_name_in_pm).replace(
+            "{package_id}", package_name_in_pm
+        )
+        for part in update_command_template
+    ]
+    # Templates name their own executable ("apt", not the detected "apt-get"),
+    # so nothing is prepended.
+    return " ".join(base_cmd_parts)
+
+
+def _is_update_available(installed_version, latest_version, pm_id=None):
+    if not installed_version or installed_version == "Unknown":
+        return True
+    if not latest_version:
+        return False
+    return is_newer(latest_version, installed_version, scheme_for_package_manager(pm_id))
+
+
+def _update_info(
+    pm_id, package_name_in_pm, latest_version, installed_version, age_seconds=0.0, is_stale=False
+):
+    return {
+        "latest_version": latest_version,
+        "package_manager_id": pm_id,
+        "package_manager_name": PACKAGE_MANAGERS[pm_id]["name"],
+        "update_command": _update_command_string(pm_id, package_name_in_pm),
+        "package_name_in_pm": package_name_in_pm,
+        "is_update_available": _is_update_available(installed_version, latest_version, pm_id),
+        "latest_version_age_seconds": age_seconds,  # 0 for a lookup made just now
+        "latest_version_is_stale": is_stale,
+    }
+
+
+# --- Multi-package output parsers: output(s) -> {requested package name: version} ---
+
+
+def _parse_apt_policy_batch(outputs, package_names):
+    # python3:
+    #   Installed: 3.11.2-1+b1
+    #   Candidate: 3.11.2-1+b1
+    versions = {}
+    current = None
+    for line in outputs[0].splitlines():
+        header = re.match(r"^(\S+):\s*$", line)
+        if header:
+            current = header.group(1)
+            continue
+        match = re.match(r"^\s+Candidate:\s*([0-9a-zA-Z\.\-\+\~\:]+)", line)
+        if current and match and match.group(1) != "(none)":
+            versions[current] = match.group(1)
+    return {name: versions[name] for name in package_names if name in versions}
+
+
+def _parse_brew_json_batch(outputs, package_names):
+    try:
+        data = json.loads(outputs[0])
+    except ValueError as e:
+        logger.warning(f"Could not parse 'brew info --json=v2' output: {e}")
+        return {}
+    versions = {}
+    for formula in data.get("formulae", []):
+        stable = (formula.get("versions") or {}).get("stable")
+        names = [formula.get("name"), formula.get("full_name")]
+        names += formula.get("aliases", []) + formula.get("oldnames", [])
+        for name in names:
+            if name and stable:
+                versions.setdefault(name, stable)
+    for cask in data.get("casks", []):
+        for name in (cask.get("token"), cask.get("full_token")):
+            if name and cask.get("version"):
+                versions.setdefault(name, cask["version"])
+    return {name: versions[name] for name in package_names if name in versions}
+
+
+def _parse_key_value_batch(outputs, package_names):
+    """dnf/yum info and pacman -Si: 'Key : Value' records, one per package."""
+    available, installed = {}, {}
+    section = "Available"
+    name = None
+    for line in outputs[0].splitlines():
+        stripped = line.strip()
+        if stripped in ("Installed Packages", "Available Packages", "Available Upgrades"):
+            section = stripped.split()[0]
+            continue
+        match = re.match(r"^(\w[\w ]*?)\s*:\s*(.*)$", line)
+        if not match:
+            continue
+        key, value = match.group(1), match.group(2).strip()
+        if key == "Name":
+            name = value
+        elif key == "Version" and name:
+            target = installed if section == "Installed" else available
+            target.setdefault(name, value)
+    versions = {**installed, **available}  # A newer available version wins
+    return {name: versions[name] for name in package_names if name in versions}
+
+
+def _parse_snap_info_batch(outputs, package_names):
+    versions = {}
+    for document in re.split(r"^---\s*$", outputs[0], flags=re.MULTILINE):
+        name = re.search(r"^name:\s*(\S+)", document, re.MULTILINE)
+        if name:
+            version = parse_version_from_output(document, "snap", name.group(1))
+            if version:
+                versions[name.group(1)] = version
+    return {name: versions[name] for name in package_names if name in versions}
+
+
+def _parse_winget_table(output):
+    """winget list -> {Id: (installed version, available version or "")}."""
+    # Columns are fixed-width, so rows are sliced at the header's column offsets.
+    packages = {}
+    lines = output.splitlines()
+    for i, line in enumerate(lines):
+        if " Id " in f" {line} " and "Version" in line:
+            header = line
+            rows = lines[i + 1 :]
+            break
+    else:
+        return packages
+    id_col = header.index("Id")
+    version_col = header.index("Version")
+    available_col = header.index("Available") if "Available" in header else None
+    source_col = header.index("Source") if "Source" in header else None
+    version_end = available_col or source_col
+    for row in rows:
+        if not row.strip() or set(row.strip()) == {"-"}:
+            continue
+        package_id = row[id_col:version_col].strip()
+        installed = row[version_col:version_end].strip()
+        latest = row[available_col:source_col].strip() if available_col is not None else ""
+        if package_id:
+            packages[package_id] = (installed, latest)
+    return packages
+
+
+def _parse_winget_list_batch(outputs, package_names):
+    versions = {
+        package_id: latest or installed
+        for package_id, (installed, latest) in _parse_winget_table(outputs[0]).items()
+    }
+    return {name: versions[name] for name in package_names if name in versions}
+
+
+def _parse_choco_batch(outputs, package_names):
+    versions = {}
+    for line in outputs[0].splitlines():  # choco list: name|version
+        parts = line.strip().split("|")
+        if len(parts) == 2:
+            versions[parts[0].lower()] = parts[1]
+    if len(outputs) > 1:
+        for line in outputs[1].splitlines():  # choco outdated: name|current|available|pinned
+            parts = line.strip().split("|")
+            if len(parts) >= 3:
+                versions[parts[0].lower()] = parts[2]
+    return {
+        name: versions[name.lower()] for name in package_names if name.lower() in versions
+    }
+
+
+BATCH_OUTPUT_PARSERS = {
+    "apt": _parse_apt_policy_batch,
+    "brew": _parse_brew_json_batch,
+    "dnf": _parse_key_value_batch,
+    "yum": _parse_key_value_batch,
+    "pacman": _parse_key_value_batch,
+    "snap": _parse_snap_info_batch,
+    "winget": _parse_winget_list_batch,
+    "choco": _parse_choco_batch,
+}
+
+
+def _query_latest_singles(pm_id, package_names, detected_pms, executor=None, answered=None):
+    search_cmd_template = PACKAGE_MANAGERS[pm_id].get("search_latest_cmd_template")
+    if not search_cmd_template:
+        logger.warning(f"No search command template for {pm_id}.")
+        return {}
+    commands = [
+        _build_command(search_cmd_template, [package_name_in_pm], pm_id, detected_pms)
+        for package_name_in_pm in package_names
+    ]
+    if executor is not None:
+        outputs = executor.run_many(pm_id, commands)
+    else:
+        outputs = [_run_pm_command(command) for command in commands]
+    versions = {}
+    for package_name_in_pm, (stdout, _) in zip(package_names, outputs):
+        if stdout is not None and answered is not None:
+            answered.add(package_name_in_pm)  # None: the command failed, timed out or was skipped
+        if not stdout:
+            logger.debug(f"No output from {pm_id} for package {package_name_in_pm}.")
+            continue
+        latest_version = parse_version_from_output(stdout, pm_id, package_name_in_pm)
+        if latest_version:
+            versions[package_name_in_pm] = latest_version
+    return versions
+
+
+def query_latest_versions(
+    pm_id, package_names, detected_pms, use_offline_index=True, executor=None, answered=None
 ):
     """
-        Queries preferred package managers for the latest version of a given tool and its update command.
+    Latest versions of `package_names` in one package manager, as
+    {package name: version}. Answered from the PM's metadata on disk when
+    there is an offline index for it (see offline_index.py), without
+    starting any process; packages missing from an incomplete index go on
+    to the commands. Otherwise uses the PM's multi-package query when
+    it has one and falls back to one search per package when the batch
+    command fails or (for installed-package listings) doesn't mention a
+    package. Commands run through `executor` (a PackageManagerExecutor) when
+    one is given.
 
-        Args:
-            tool_id (str): The internal ID of the tool (e.g., "python").
-            tool_name (str): The display name of the tool (e.g., "Python").
-            installed_version (str): The currently installed version.
-            preferred_pms_os_specific (list): List of preferred package manager IDs
-    for the current OS.
+    A package missing from the result is either unknown to the PM or its
+    lookup failed. If `answered` (a set) is given, the names the PM did
+    answer for - found or not - are added to it; failed, timed-out and
+    skipped lookups are not.
+    """
+    pm_config = PACKAGE_MANAGERS[pm_id]
+    package_names = list(dict.fromkeys(package_names))
+    answered = set() if answered is None else answered
+    versions = {}
+    remaining = package_names
+    if use_offline_index:
+        offline_index = get_offline_index(pm_id)
+        if offline_index is not None and len(offline_index):
+            versions = offline_index.lookup(package_names)
+            logger.info(
+                f"{pm_config['name']}: offline index resolved {len(versions)} of {len(package_names)} packages."
+            )
+            answered.update(versions)
+            if offline_index.complete:
+                # Every configured repository was read, so a package the
+                # index doesn't list is unknown to the PM as well.
+                answered.update(package_names)
+                return versions
+            remaining = [name for name in package_names if name not in versions]
+    batch_cmds = pm_config.get("batch_query_cmds")
+    parser = BATCH_OUTPUT_PARSERS.get(pm_id)
+    if batch_cmds and parser and remaining:
+        outputs = []
+        for template in batch_cmds:
+            stdout, _ = _run_with(
+                executor, pm_id, _build_command(template, remaining, pm_id, detected_pms)
+            )
+            if stdout is None:
+                outputs = None
+                break
+            outputs.append(stdout)
+        if outputs is not None:
+            batch_versions = parser(outputs, remaining)
+            logger.info(
+                f"{pm_config['name']}: batch query resolved {len(batch_versions)} of {len(remaining)} packages."
+            )
+            versions.update(batch_versions)
+            if pm_config.get("batch_query_exhaustive"):
+                answered.update(remaining)
+                remaining = []
+            else:
+                answered.update(batch_versions)
+                remaining = [name for name in remaining if name not in versions]
+        else:
+            logger.info(f"{pm_config['name']}: batch query failed, querying packages one at a time.")
+    if remaining:
+        versions.update(_query_latest_singles(pm_id, remaining, detected_pms, executor, answered))
+    return versions
 
-        Returns:
-            dict or None: A dictionary with 'latest_version', 'package_manager', 'update_command',
-                          'package_name_in_pm' if an update is found, else None.
+
+# --- Installed packages: one list_installed_cmd per package manager ---
+
+# Package names that these managers match case-insensitively
+CASE_INSENSITIVE_PMS = {"winget", "choco", "scoop"}
+
+
+def _rpm_version(evr):
+    # "1:2.43.0-1.fc39" -> "2.43.0", the form `dnf info` reports as Version
+    return evr.split(":", 1)[-1].rsplit("-", 1)[0]
+
+
+def _parse_installed_columns(output, skip_header=True):
+    """'name version ...' rows, skipping headers, dashes and summary lines."""
+    installed = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) < 2 or set(parts[0]) == {"-"}:
+            continue
+        if skip_header and parts[0] == "Name" and parts[1] == "Version":
+            continue
+        installed[parts[0]] = parts[1]
+    return installed
+
+
+def _parse_dpkg_query_installed(output):
+    # "ii " = wanted and installed ("hi " if held); removed packages whose
+    # config files are left ("rc ") are still listed by dpkg-query -W.
+    return {
+        parts[1]: parts[2]
+        for parts in (line.split("\t", 2) for line in output.splitlines())
+        if len(parts) == 3 and parts[0][1:2] == "i" and parts[2]
+    }
+
+
+def _parse_choco_installed(output):
+    return {
+        parts[0]: parts[1]
+        for parts in (line.strip().split("|") for line in output.splitlines())
+        if len(parts) == 2
+    }
+
+
+def _parse_winget_installed(output):
+    return {
+        package_id: installed
+        for package_id, (installed, _) in _parse_winget_table(output).items()
+    }
+
+
+def _parse_brew_installed(output):
+    installed = {}
+    for line in output.splitlines():  # "python@3.12 3.12.0 3.12.1": newest last
+        parts = line.split()
+        if len(parts) >= 2:
+            installed[parts[0]] = parts[-1]
+    return installed
+
+
+def _parse_rpm_list_installed(output):
+    installed = {}
+    for line in output.splitlines():  # "git.x86_64   2.43.0-1.fc39   @updates"
+        parts = line.split()
+        if len(parts) >= 2 and "." in parts[0] and parts[1][:1].isdigit():
+            installed[parts[0].rsplit(".", 1)[0]] = _rpm_version(parts[1])
+    return installed
+
+
+INSTALLED_LIST_PARSERS = {
+    "apt": _parse_dpkg_query_installed,
+    "winget": _parse_winget_installed,
+    "choco": _parse_choco_installed,
+    "scoop": _parse_installed_columns,
+    "brew": _parse_brew_installed,
+    "dnf": _parse_rpm_list_installed,
+    "yum": _parse_rpm_list_installed,
+    "pacman": lambda output: _parse_installed_columns(output, skip_header=False),
+    "snap": _parse_installed_columns,
+    "flatpak": lambda output: _parse_installed_columns(output, skip_header=False),
+}
+
+
+class InstalledPackageIndex:
+    """Installed packages of every queried package manager, as pm_id -> {package: version}."""
+
+    def __init__(self, packages_by_pm=None):
+        self.packages = {}
+        for pm_id, packages in (packages_by_pm or {}).items():
+            self.add(pm_id, packages)
+
+    def add(self, pm_id, packages):
+        if pm_id in CASE_INSENSITIVE_PMS:
+            packages = {name.lower(): version for name, version in packages.items()}
+        self.packages[pm_id] = dict(packages)
+
+    def version_of(self, pm_id, package_name):
+        """The installed version of `package_name` through `pm_id`, or None."""
+        if pm_id in CASE_INSENSITIVE_PMS:
+            package_name = package_name.lower()
+        return self.packages.get(pm_id, {}).get(package_name)
+
+    def __contains__(self, pm_id):
+        return pm_id in self.packages
+
+    def __len__(self):
+        return sum(len(packages) for packages in self.packages.values())
+
+
+def _list_installed(pm_id, detected_pms, executor=None):
+    template = PACKAGE_MANAGERS[pm_id].get("list_installed_cmd")
+    parser = INSTALLED_LIST_PARSERS.get(pm_id)
+    if not template or not parser:
+        return None
+    stdout, _ = _run_with(
+        executor,
+        pm_id,
+        _build_command(template, [], pm_id, detected_pms),
+        timeout=LIST_INSTALLED_TIMEOUT_SECONDS,
+    )
+    if stdout is None:
+        return None
+    return parser(stdout)
+
+
+def build_installed_package_index(detected_pms=None, pm_ids=None, executor=None):
     """
-    logger.debug(
-        f"Checking updates for {tool_name} (ID: {tool_id}, Installed: {installed_version}) via {preferred_pms_os_specific}"
+    Runs the list_installed_cmd of every detected package manager (or of
+    `pm_ids`) once, concurrently across managers, into an InstalledPackageIndex.
+    Managers whose list command fails or misses the stage deadline of
+    `executor` (a new PackageManagerExecutor if omitted) are left out of the
+    index.
+    """
+    if detected_pms is None:
+        detected_pms = detect_package_managers()
+    pm_ids = [
+        pm_id
+        for pm_id in (pm_ids if pm_ids is not None else detected_pms)
+        if pm_id in detected_pms and PACKAGE_MANAGERS.get(pm_id, {}).get("list_installed_cmd")
+    ]
+    index = InstalledPackageIndex()
+    if not pm_ids:
+        return index
+    if executor is None:
+        executor = PackageManagerExecutor()
+    listed = executor.map(
+        {
+            pm_id: (lambda pm_id=pm_id: _list_installed(pm_id, detected_pms, executor))
+            for pm_id in pm_ids
+        }
     )
-    detected_system_pms = detect_package_managers()  # Get paths to PMs
+    for pm_id, packages in listed.items():
+        if packages is not None:
+            index.add(pm_id, packages)
+            logger.info(f"{PACKAGE_MANAGERS[pm_id]['name']}: {len(packages)} installed packages.")
+    logger.info(f"Installed-package listing: {executor.timing_summary()}")
+    return index
 
-    for pm_id in preferred_pms_os_specific:
-        if pm_id not in PACKAGE_MANAGERS or pm_id not in detected_system_pms:
-            logger.debug(f"Skipping {pm_id}: not configured or not detected on system.")
+
+def find_tools_installed_via_package_managers(installed_index, exclude_tool_ids=()):
+    """
+    Tools from TOOL_TO_PM_PACKAGE_MAP that a package manager reports as
+    installed, excluding `exclude_tool_ids` (e.g. the tools a scan already
+    detected). Returns dicts with tool_id, package_manager_id,
+    package_name_in_pm and installed_version.
+    """
+    excluded = set(exclude_tool_ids)
+    found = []
+    for tool_id, packages in TOOL_TO_PM_PACKAGE_MAP.items():
+        if tool_id in excluded:
             continue
+        for pm_id, package_name_in_pm in packages.items():
+            version = installed_index.version_of(pm_id, package_name_in_pm)
+            if version is not None:
+                found.append(
+                    {
+                        "tool_id": tool_id,
+                        "package_manager_id": pm_id,
+                        "package_name_in_pm": package_name_in_pm,
+                        "installed_version": version,
+                    }
+                )
+                break
+    return found
 
-        pm_config = PACKAGE_MANAGERS[pm_id]
-        package_name_in_pm = get_pm_package_name(tool_id, pm_id)
 
-        if not package_name_in_pm:
-            logger.debug(
-                f"No package mapping for tool '{tool_id}' in package manager '{pm_id}'."
-            )
-            continue
+def _cached_latest_versions(pm_id, package_names, detected_pms, cache, block_on_miss, executor=None):
+    """
+    {package name: (version, age in seconds, stale)}. Cached lookups are
+    served as they are; stale ones are refreshed in the background. Missing
+    ones are queried now, through `executor`, or only in the background if
+    not `block_on_miss`. Background refreshes outlive the stage, so they
+    don't use its executor.
+    """
+    def fetch(names, executor=None):
+        # {name: version, or None if the PM doesn't know it}; failed lookups are left out
+        answered = set()
+        versions = query_latest_versions(pm_id, names, detected_pms, executor=executor, answered=answered)
+        return {name: versions.get(name) for name in names if name in answered or name in versions}
 
-        logger.info(
-            f"Querying {pm_config['name']} for {tool_name} (package: {package_name_in_pm})..."
-        )
+    def fetch_now(names):
+        return fetch(names, executor)
+
+    if cache is None:
+        return {
+            name: (version, 0.0, False)
+            for name, version in fetch_now(package_names).items()
+            if version
+        }
 
-        search_cmd_template = pm_config.get("search_latest_cmd_template")
-        if not search_cmd_template:
-            logger.warning(f"No search command template for {pm_id}.")
+    results, stale, missing = {}, [], []
+    for name in package_names:
+        entry = cache.get(pm_id, name)
+        if entry is None:
+            missing.append(name)
             continue
+        if entry.stale:
+            stale.append(name)
+        if entry.version:
+            results[name] = (entry.version, entry.age_seconds, entry.stale)
+    if stale:
+        cache.refresh_in_background(pm_id, stale, fetch)
+    if missing and block_on_miss:
+        fetched = fetch_now(missing)
+        cache.put_many(pm_id, missing, fetched)
+        cache.save()
+        results.update({name: (version, 0.0, False) for name, version in fetched.items() if version})
+    elif missing:
+        cache.refresh_in_background(pm_id, missing, fetch)
+    logger.debug(
+        f"{pm_id}: {len(package_names) - len(missing)} cached latest versions "
+        f"({len(stale)} stale), {len(missing)} not cached."
+    )
+    return results
 
-        search_cmd = [
-            part.replace("{package_name}", package_name_in_pm).replace(
-                "{package_id}", package_name_in_pm
-            )
-            for part in search_cmd_template
-        ]
 
-        # Prepend PM executable path if not already in command
-        if not any(pm_config["detection_exe"] in part for part in search_cmd):
-            search_cmd.insert(0, detected_system_pms[pm_id]["path"])
+def get_latest_versions_and_update_commands(
+    tools,
+    preferred_pms_os_specific,
+    detected_pms=None,
+    cache=None,
+    block_on_miss=True,
+    installed_index=None,
+    executor=None,
+):
+    """
+    Batch form of get_latest_version_and_update_command.
+
+    Args:
+        tools (iterable): (tool_id, tool_name, installed_version) tuples.
+        preferred_pms_os_specific (list): Preferred package manager IDs, in order.
+        detected_pms (dict, optional): Result of detect_package_managers(); detected once if omitted.
+        cache (LatestVersionCache, optional): Serves cached lookups immediately and
+            refreshes stale ones in the background.
+        block_on_miss (bool): Query packages that aren't cached now (True) or only
+            in the background (False), so the call never waits for a package manager.
+        installed_index (InstalledPackageIndex, optional): Supplies the installed
+            version when a tool's own version is unknown, and is reported as
+            installed_version_in_pm.
+        executor (PackageManagerExecutor, optional): Runs the package manager
+            commands; a new one with the default timeouts if omitted.
+
+    Package managers are queried in rounds. Each round asks every tool's most
+    preferred remaining manager, all managers of the round in parallel, so
+    the first preferred manager that knows a tool still wins.
+
+    Returns:
+        dict: tool_id -> update info dict (see get_latest_version_and_update_command) or None.
+    """
+    tools = list(tools)
+    if detected_pms is None:
+        detected_pms = detect_package_managers()
+    if executor is None:
+        executor = PackageManagerExecutor()
+    results = {tool_id: None for tool_id, _, _ in tools}
+    pending = {tool_id: installed_version for tool_id, _, installed_version in tools}
 
-        stdout, _ = _run_pm_command(search_cmd)
+    usable_pms = []
+    for pm_id in preferred_pms_os_specific:
+        if pm_id not in PACKAGE_MANAGERS or pm_id not in detected_pms:
+            logger.debug(f"Skipping {pm_id}: not configured or not detected on system.")
+        elif pm_id not in usable_pms:
+            usable_pms.append(pm_id)
+    candidates = {
+        tool_id: [
+            (pm_id, get_pm_package_name(tool_id, pm_id))
+            for pm_id in usable_pms
+            if get_pm_package_name(tool_id, pm_id)
+        ]
+        for tool_id in pending
+    }
 
-        if stdout:
-            latest_version = parse_version_from_output(
-                stdout, pm_id, package_name_in_pm
+    while pending:
+        round_packages = {}  # pm_id -> {package name: [tool ids]}
+        for tool_id in pending:
+            if candidates[tool_id]:
+                pm_id, package_name_in_pm = candidates[tool_id].pop(0)
+                round_packages.setdefault(pm_id, {}).setdefault(package_name_in_pm, []).append(tool_id)
+        if not round_packages:
+            break
+        for pm_id, tools_by_package in round_packages.items():
+            logger.info(
+                f"Querying {PACKAGE_MANAGERS[pm_id]['name']} for {len(tools_by_package)} packages..."
             )
-            if latest_version:
-                update_command_template = pm_config.get("update_cmd_template")
-                update_cmd_str = ""
-                if update_command_template:
-                    # Construct the update command string, ensuring the PM executable is present
-                    base_cmd_parts = [
-                        part.replace("{package_name}", package_name_in_pm).replace(
-                            "{package_id}", package_name_in_pm
-                        )
-                        for part in update_command_template
-                    ]
-                    if not any(
-                        pm_config["detection_exe"] in part for part in base_cmd_parts
-                    ):
-                        update_cmd_str = (
-                            f"{pm_config['detection_exe']} {' '.join(base_cmd_parts)}"
-                        )
-                    else:
-                        update_cmd_str = " ".join(base_cmd_parts)
+        round_results = executor.map(
+            {
+                pm_id: (
+                    lambda pm_id=pm_id, names=list(tools_by_package): _cached_latest_versions(
+                        pm_id, names, detected_pms, cache, block_on_miss, executor
+                    )
+                )
+                for pm_id, tools_by_package in round_packages.items()
+            }
+        )
+        for pm_id, latest_versions in round_results.items():
+            tools_by_package = round_packages[pm_id]
+            for package_name_in_pm, (latest_version, age, stale) in (latest_versions or {}).items():
+                in_pm = (
+                    installed_index.version_of(pm_id, package_name_in_pm)
+                    if installed_index is not None
+                    else None
+                )
+                for tool_id in tools_by_package.get(package_name_in_pm, []):
+                    installed_version = pending.pop(tool_id)
+                    if in_pm and (not installed_version or installed_version == "Unknown"):
+                        installed_version = in_pm
+                    info = _update_info(
+                        pm_id, package_name_in_pm, latest_version, installed_version, age, stale
+                    )
+                    info["installed_version_in_pm"] = in_pm
+                    results[tool_id] = info
 
-                # Basic version comparison (can be improved with packaging library for semantic versioning)
-                is_update_available = False
-                if (
-                    installed_version
-                    and latest_version
-                    and installed_version != "Unknown"
-                ):
-                    try:
-                        from packaging.version import (
-                            parse as parse_version,
-                        )  # KKeep import here for clarity
-
-                        if parse_version(latest_version) > parse_version(
-                            installed_version
-                        ):
-                            is_update_available = True
-                    except ImportError:
-                        logger.warning(
-                            "The 'packaging' library is not installed. Falling back to string comparison for versions. Run 'pip install packaging' for more accurate version handling."
-                        )
-                        if latest_version > installed_version:  # Lexicographical
-                            is_update_available = True
-                    except Exception as e_parse:  # Handles packaging.version.InvalidVersion and other parsing errors
-                        logger.warning(
-                            f"Could not parse/compare versions '{installed_version}' and '{latest_version}' using packaging.version: {e_parse}. Falling back to string comparison."
-                        )
-                        if latest_version > installed_version:  # Lexicographical
-                            is_update_available = True
-                elif not installed_version or installed_version == "Unknown":
-                    is_update_available = True
-
-                return {
-                    "latest_version": latest_version,
-                    "package_manager_id": pm_id,
-                    "package_manager_name": pm_config["name"],
-                    "update_command": update_cmd_str,
-                    "package_name_in_pm": package_name_in_pm,
-                    "is_update_available": is_update_available,
-                }
-        else:
-            logger.debug(f"No output from {pm_id} for package {package_name_in_pm}.")
+    if executor.timings:
+        logger.info(f"Update check: {executor.timing_summary()}")
+    for tool_id in pending:
+        logger.info(
+            f"No update information found for {tool_id} via preferred package managers."
+        )
+    return results
+
+
+def get_latest_version_and_update_command(
+    tool_id, tool_name, installed_version, preferred_pms_os_specific, detected_pms=None
+):
+    """
+        Queries preferred package managers for the latest version of a given tool and its update command.
 
-    logger.info(
-        f"No update information found for {tool_name} via preferred package managers."
+        Args:
+            tool_id (str): The internal ID of the tool (e.g., "python").
+            tool_name (str): The display name of the tool (e.g., "Python").
+            installed_version (str): The currently installed version.
+            preferred_pms_os_specific (list): List of preferred package manager IDs
+    for the current OS.
+            detected_pms (dict, optional): Result of detect_package_managers(), to
+    avoid detecting the package managers again for every tool.
+
+        Returns:
+            dict or None: A dictionary with 'latest_version', 'package_manager', 'update_command',
+                          'package_name_in_pm' if an update is found, else None.
+    """
+    logger.debug(
+        f"Checking updates for {tool_name} (ID: {tool_id}, Installed: {installed_version}) via {preferred_pms_os_specific}"
     )
-    return None
+    return get_latest_versions_and_update_commands(
+        [(tool_id, tool_name, installed_version)],
+        preferred_pms_os_specific,
+        detected_pms,
+    )[tool_id]
 
 
 if __name__ == "__main__":
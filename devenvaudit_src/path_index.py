@@ -0,0 +1,116 @@
+"""
+One-pass index of the executables reachable through the PATH environment variable.
+
+Instead of stat'ing `<dir>/<name>` for every executable name of every tool in
+every PATH directory, each PATH directory is listed once with `os.scandir` and
+its file names are recorded in PATH order. Lookups are then dictionary
+accesses. On Windows names are matched case-insensitively and, for files whose
+extension is listed in PATHEXT, also by their stem (so 'python' finds
+'python.exe'); within one directory, stems are registered in PATHEXT order,
+as cmd.exe tries the extensions. Whether a candidate is actually executable is checked lazily,
+only for names that are looked up. Directory listings and access checks go
+through the scan's FileSystemCache.
+"""
+
+import logging
+import os
+import platform
+from typing import Dict, List, Optional
+
+from .fs_cache import FileSystemCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATHEXT = ".COM;.EXE;.BAT;.CMD"
+
+
+class PathIndex:
+    """Maps executable names to their locations in PATH directories."""
+
+    def __init__(
+        self,
+        path_value: Optional[str] = None,
+        system: Optional[str] = None,
+        pathext: Optional[str] = None,
+        filesystem: Optional[FileSystemCache] = None,
+    ):
+        self.fs = filesystem if filesystem is not None else FileSystemCache()
+        self.system = system or platform.system()
+        self.path_value = (
+            path_value if path_value is not None else os.environ.get("PATH", "")
+        )
+        self.case_insensitive = self.system == "Windows"
+        pathext_value = (
+            pathext
+            if pathext is not None
+            else os.environ.get("PATHEXT", DEFAULT_PATHEXT)
+        )
+        # Extension -> position in PATHEXT; the first listed extension wins
+        self.pathext: Dict[str, int] = {}
+        for ext in pathext_value.split(";"):
+            if ext:
+                self.pathext.setdefault(ext.lower(), len(self.pathext))
+        self.directories: List[str] = []
+        self._entries: Dict[str, List[str]] = {}
+        self._built = False
+
+    def _key(self, name: str) -> str:
+        return name.lower() if self.case_insensitive else name
+
+    def build(self) -> "PathIndex":
+        """Lists every PATH directory once. Duplicate and empty entries are skipped."""
+        self._entries = {}
+        self.directories = []
+        seen_dirs = set()
+        for path_dir in self.path_value.split(os.pathsep):
+            path_dir = path_dir.strip().strip('"')
+            if not path_dir:
+                continue
+            dir_key = os.path.normcase(os.path.abspath(path_dir))
+            if dir_key in seen_dirs:
+                continue
+            seen_dirs.add(dir_key)
+            self.directories.append(path_dir)
+            stems = []  # (PATHEXT position, stem, path) of this directory
+            for name in self.fs.list_files(path_dir) or []:
+                full_path = os.path.join(path_dir, name)
+                self._add(name, full_path)
+                if self.case_insensitive:
+                    stem, ext = os.path.splitext(name)
+                    if stem and ext.lower() in self.pathext:
+                        stems.append((self.pathext[ext.lower()], stem, full_path))
+            # Listing order is arbitrary; 'tool' must find tool.exe before tool.bat
+            for _, stem, full_path in sorted(stems, key=lambda candidate: candidate[0]):
+                self._add(stem, full_path)
+        self._built = True
+        logger.debug(
+            f"Indexed {len(self._entries)} executable names in {len(self.directories)} PATH directories."
+        )
+        return self
+
+    def _add(self, name: str, full_path: str):
+        locations = self._entries.setdefault(self._key(name), [])
+        if full_path not in locations:
+            locations.append(full_path)
+
+    def _is_executable(self, full_path: str) -> bool:
+        return self.fs.access(full_path, os.X_OK)
+
+    def find_all(self, exe_name: str) -> List[str]:
+        """Returns every executable location of `exe_name`, in PATH order."""
+        if not self._built:
+            self.build()
+        candidates = self._entries.get(self._key(exe_name), [])
+        return [path for path in candidates if self._is_executable(path)]
+
+    def find(self, exe_name: str) -> Optional[str]:
+        """Returns the location PATH resolution would pick for `exe_name`, or None."""
+        if not self._built:
+            self.build()
+        for path in self._entries.get(self._key(exe_name), []):
+            if self._is_executable(path):
+                return path
+        return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
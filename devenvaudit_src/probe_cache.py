@@ -0,0 +1,175 @@
+"""
+Persistent cache for DevEnvAudit version probes.
+
+Results of `EnvironmentScanner._get_version_from_command` are stored in
+'version_probe_cache.json' (next to 'devenvaudit_config.json'). Entries are
+keyed by the executable's resolved path and (size, mtime, inode) signature
+plus the probe arguments and version regex, so a cached version is only
+reused while the binary on disk is unchanged. The file is capped at a
+maximum number of entries; the least recently used entries are evicted
+first, and entries not used for `max_age_days` are dropped on save.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config_manager import CONFIG_DIR_PATH
+from .fs_cache import FileSystemCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_NAME = "version_probe_cache.json"
+CACHE_FILE_PATH = os.path.join(CONFIG_DIR_PATH, CACHE_FILE_NAME)
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_AGE_DAYS = 30
+
+ExecutableSignature = Tuple[str, int, int, int]
+
+
+class VersionProbeCache:
+    """Thread-safe on-disk cache of executable -> probed version."""
+
+    def __init__(
+        self,
+        cache_path: str = CACHE_FILE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.cache_path = cache_path
+        self.max_entries = max(1, int(max_entries))
+        self.max_age_seconds = float(max_age_days) * 86400
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def executable_signature(
+        exe_path: str, filesystem: Optional[FileSystemCache] = None
+    ) -> Optional[ExecutableSignature]:
+        """Returns (resolved path, size, mtime_ns, inode) or None if the file can't be stat'ed."""
+        fs = filesystem if filesystem is not None else FileSystemCache()
+        resolved = fs.realpath(exe_path)
+        st = fs.stat(resolved)
+        if st is None:
+            return None
+        return resolved, st.st_size, st.st_mtime_ns, st.st_ino
+
+    @staticmethod
+    def make_key(
+        signature: ExecutableSignature, version_args: List[str], version_regex: str
+    ) -> str:
+        raw = json.dumps([list(signature), list(version_args), version_regex])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def load(self):
+        """Loads the cache file. A missing or unreadable file yields an empty cache."""
+        with self._lock:
+            self._load_locked()
+
+    def _load_locked(self):
+        self._loaded = True
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != CACHE_FORMAT_VERSION:
+                logger.info(
+                    f"Ignoring version probe cache {self.cache_path} with unsupported format."
+                )
+                return
+            self.entries = dict(data.get("entries", {}))
+            logger.debug(
+                f"Loaded {len(self.entries)} version probe cache entries from {self.cache_path}"
+            )
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Could not read version probe cache {self.cache_path}: {e}")
+            self.entries = {}
+
+    def get(self, key: str) -> Tuple[bool, Optional[str]]:
+        """Returns (found, version). A cached version may legitimately be None."""
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            entry["last_used"] = time.time()
+            self._dirty = True
+            return True, entry.get("version")
+
+    def put(
+        self, key: str, exe_path: str, version: Optional[str], source: Optional[str] = None
+    ):
+        """`source` records which probe tier produced the version (e.g. "process")."""
+        now = time.time()
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            self.entries[key] = {
+                "path": exe_path,
+                "version": version,
+                "source": source,
+                "created": now,
+                "last_used": now,
+            }
+            self._dirty = True
+
+    def source(self, key: str) -> Optional[str]:
+        """The probe tier recorded with a cached entry, if any."""
+        with self._lock:
+            return (self.entries.get(key) or {}).get("source")
+
+    def _evict_locked(self):
+        now = time.time()
+        if self.max_age_seconds > 0:
+            expired = [
+                key
+                for key, entry in self.entries.items()
+                if now - entry.get("last_used", 0) > self.max_age_seconds
+            ]
+            for key in expired:
+                del self.entries[key]
+        overflow = len(self.entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(
+                self.entries, key=lambda k: self.entries[k].get("last_used", 0)
+            )[:overflow]
+            for key in oldest:
+                del self.entries[key]
+
+    def save(self) -> bool:
+        """Evicts stale entries and writes the cache if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return True
+            self._evict_locked()
+            data = {"format": CACHE_FORMAT_VERSION, "entries": self.entries}
+            tmp_path = f"{self.cache_path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.cache_path)
+            except (OSError, TypeError) as e:
+                logger.warning(
+                    f"Could not write version probe cache {self.cache_path}: {e}"
+                )
+                return False
+            self._dirty = False
+        logger.debug(
+            f"Version probe cache saved ({len(self.entries)} entries, "
+            f"{self.hits} hits, {self.misses} misses)."
+        )
+        return True
@@ -5,13 +5,22 @@ Handles formatting for TXT, MD, JSON, and HTML reports.
 
 import json
 import logging
+import os
 import html
 from datetime import datetime
-from typing import List  # Add typing imports
+from typing import Any, Dict, Iterable, List, Optional  # Add typing imports
+
+from .json_stream import JsonLinesWriter, StreamingJsonWriter
 
 # Attempt to import data classes for type hinting
 # These might still show as unresolved in Pylance if the root workspace/PYTHONPATH issue persists
-from .scan_logic import DetectedComponent, EnvironmentVariableInfo, ScanIssue
+from .scan_logic import (
+    DetectedComponent,
+    EnvironmentVariableInfo,
+    ScanIssue,
+    ScanResult,
+    partition_scan_results,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +41,14 @@ class ReportGenerator:
         )
         self.report_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    @classmethod
+    def from_scan_stream(cls, results: Iterable[ScanResult]) -> "ReportGenerator":
+        """
+        Builds a report from a stream of scan results, e.g.
+        `ReportGenerator.from_scan_stream(scanner.iter_scan())`.
+        """
+        return cls(*partition_scan_results(results))
+
     def _format_component(self, component, format_type="txt"):
         """Formats a single component for different output types."""
         if format_type == "html":
@@ -42,12 +59,13 @@ class ReportGenerator:
 
             # Details Summary
             details_summary_parts = []
-            if component.details:
+            if component.update_info and component.update_info.get("is_update_available"):
                 details_summary_parts.append(
                     f"Update: {component.version} -> {component.update_info.get('latest_version', 'N/A')}"
                 )
-            if component.issues:
-                details_summary_parts.append(f"Issues: {len(component.issues)}")
+            component_issues = getattr(component, "issues", None)
+            if component_issues:
+                details_summary_parts.append(f"Issues: {len(component_issues)}")
             details_summary_str = "; ".join(details_summary_parts)
             if not details_summary_str:
                 details_summary_str = "N/A"
@@ -125,14 +143,15 @@ class ReportGenerator:
                     if cmd_line:
                         lines.append(f"    {cmd_line}")
 
-        if component.issues:
+        component_issues = getattr(component, "issues", None)  # Not a DetectedComponent field
+        if component_issues:
             # if format_type == "html": lines.append("<li><b>Issues:</b><ul>") # Removed for table
             # else: lines.append(f"  Issues:") # Keep for TXT/MD
             if format_type != "html":
                 lines.append("  Issues:")
             for (
                 issue
-            ) in component.issues:  # issue is already a string or ScanIssue object
+            ) in component_issues:  # issue is already a string or ScanIssue object
                 desc = (
                     issue.description if hasattr(issue, "description") else str(issue)
                 )
@@ -338,18 +357,41 @@ class ReportGenerator:
             logger.error(f"Failed to write Markdown report to {filepath}: {e}")
             return False
 
-    def export_to_json(self, filepath):
+    def export_to_json(self, filepath, compact=False):
         logger.info(f"Exporting report to JSON: {filepath}")
-        report_data = self.generate_report_data_for_gui()  # Use the same structure
+        # Same structure as generate_report_data_for_gui, written row by row
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(report_data, f, indent=2)
+            with StreamingJsonWriter(
+                filepath, indent=None if compact else 2, ensure_ascii=True
+            ) as writer:
+                with writer.object():
+                    writer.write_value(self.report_time, "report_time")
+                    writer.write_array("detected_components", self.detected_components)
+                    writer.write_array("environment_variables", self.environment_variables)
+                    writer.write_array("issues", self.issues)
             logger.info(f"JSON report saved to {filepath}")
             return True
         except (IOError, TypeError) as e:  # TypeError for objects not serializable
             logger.error(f"Failed to write JSON report to {filepath}: {e}")
             return False
 
+    def export_to_ndjson(self, filepath, scan_id=None, compress=None):
+        """
+        JSON Lines: one "component", "environment_variable" or "issue" record
+        per line (see JsonLinesWriter), gzip-compressed for '.gz' paths.
+        """
+        logger.info(f"Exporting report to JSON Lines: {filepath}")
+        try:
+            with JsonLinesWriter(filepath, scan_id=scan_id, compress=compress) as writer:
+                writer.write_rows("component", self.detected_components)
+                writer.write_rows("environment_variable", self.environment_variables)
+                writer.write_rows("issue", self.issues)
+            logger.info(f"JSON Lines report saved to {filepath}")
+            return True
+        except (IOError, TypeError) as e:
+            logger.error(f"Failed to write JSON Lines report to {filepath}: {e}")
+            return False
+
     def export_to_html(self, filepath):
         logger.info(f"Exporting report to HTML: {filepath}")
         # Define HTML template as a raw string literal
@@ -516,6 +558,85 @@ class ReportGenerator:
             return False
 
 
+def write_combined_json_report(
+    filepath: str,
+    system_inventory: Optional[List[Dict[str, Any]]],
+    detected_components: Optional[Iterable[DetectedComponent]],
+    environment_variables: Optional[Iterable[EnvironmentVariableInfo]],
+    issues: Optional[Iterable[ScanIssue]],
+    compact: bool = False,
+) -> bool:
+    """
+    Writes the combined System Inventory + DevEnvAudit report (the
+    "systemInventory" and "devEnvAudit" sections) with StreamingJsonWriter:
+    rows are encoded one at a time and the file is replaced atomically.
+    An inventory that only holds the "Informational" placeholder row is
+    written only when there is nothing else. Returns False, writing nothing,
+    if there is no data at all.
+    """
+    is_sys_inv_placeholder = bool(
+        system_inventory
+        and len(system_inventory) == 1
+        and system_inventory[0].get("Category") == "Informational"
+    )
+    devenv_sections = [
+        (key, rows)
+        for key, rows in (
+            ("detectedComponents", detected_components),
+            ("environmentVariables", environment_variables),
+            ("identifiedIssues", issues),
+        )
+        if rows
+    ]
+    include_inventory = bool(system_inventory) and (
+        not is_sys_inv_placeholder or not devenv_sections
+    )
+    if not include_inventory and not devenv_sections:
+        return False
+    with StreamingJsonWriter(filepath, indent=None if compact else 4) as writer:
+        with writer.object():
+            if include_inventory:
+                writer.write_array("systemInventory", system_inventory)
+            if devenv_sections:
+                with writer.object("devEnvAudit"):
+                    for key, rows in devenv_sections:
+                        writer.write_array(key, rows)
+    logger.debug(f"Combined JSON report: {writer.rows_written} rows written to {filepath}")
+    return True
+
+
+def write_combined_ndjson_report(
+    filepath: str,
+    system_inventory: Optional[List[Dict[str, Any]]],
+    detected_components: Optional[Iterable[DetectedComponent]],
+    environment_variables: Optional[Iterable[EnvironmentVariableInfo]],
+    issues: Optional[Iterable[ScanIssue]],
+    scan_id: Optional[str] = None,
+    compress: Optional[bool] = None,
+) -> bool:
+    """
+    JSON Lines counterpart of write_combined_json_report: "inventory",
+    "component", "environment_variable" and "issue" records sharing one
+    scan_id. Returns False, writing nothing, if there is no data at all.
+    """
+    is_sys_inv_placeholder = bool(
+        system_inventory
+        and len(system_inventory) == 1
+        and system_inventory[0].get("Category") == "Informational"
+    )
+    has_devenv = bool(detected_components or environment_variables or issues)
+    include_inventory = bool(system_inventory) and (not is_sys_inv_placeholder or not has_devenv)
+    if not include_inventory and not has_devenv:
+        return False
+    with JsonLinesWriter(filepath, scan_id=scan_id, compress=compress) as writer:
+        if include_inventory:
+            writer.write_rows("inventory", system_inventory)
+        writer.write_rows("component", detected_components or [])
+        writer.write_rows("environment_variable", environment_variables or [])
+        writer.write_rows("issue", issues or [])
+    return True
+
+
 if __name__ == "__main__":
     # Ensure os is imported if running directly for os.path.basename used in _format_component
     import os
@@ -1,18 +1,71 @@
+import asyncio
 import os
 import platform
 import subprocess
 import re
 import logging
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 import json  # For parsing specific config files if needed
 
 if platform.system() == "Windows":
     pass  # Keep for potential future use, though not used in current logic
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, Tuple
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
 
 # Assuming config_manager.py and models.py are in the same directory or PYTHONPATH
 from .config_manager import load_config
+from .discovery import (
+    DEFAULT_DISCOVERY_MAX_DEPTH,
+    DEFAULT_DISCOVERY_TIME_BUDGET,
+    DEFAULT_DISCOVERY_WORKERS,
+    DEFAULT_PRUNED_DIR_NAMES,
+    DiscoveryResult,
+    DiscoveryWalker,
+)
+from .cross_reference import CrossReferenceAnalyzer, CrossReferenceFinding
+from .ecosystems import (
+    DEFAULT_COLLECTOR_WORKERS,
+    DEFAULT_COMMAND_TIMEOUT,
+    collect_ecosystem_packages,
+)
+from .env_rules import SENSITIVE_ENV_VARS, EnvFinding, EnvRuleEngine
+from .events import DEFAULT_EVENT_INTERVAL, ScanEventBus
+from .fs_cache import FileSystemCache
+from .keyword_automaton import KeywordAutomaton
+from .path_index import PathIndex
+from .probe_cache import VersionProbeCache
+from .snapshot import (
+    SNAPSHOT_FILE_PATH,
+    ChangeSet,
+    ScanSnapshot,
+    probe_environment_hash,
+    probe_key,
+)
+from .static_probe import static_version
+from .update_stage import UpdateCheckStage
+from .tools_db import (
+    TOOLS_DB_PATH,
+    CompiledTool,
+    CompiledToolsDB,
+    load_tools_db,
+)
+from .version_managers import discover_managed_installs
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +83,7 @@ class DetectedComponent:
     details: dict = field(default_factory=dict)
     source_detection: Optional[str] = None  # Added field
     matched_db_name: Optional[str] = None  # Added field
+    update_info: Optional[dict] = None  # Filled in by the update-check stage, if enabled
 
     def to_dict(self):
         return {
@@ -42,6 +96,7 @@ class DetectedComponent:
             "details": self.details,
             "source_detection": self.source_detection,  # Added to dict
             "matched_db_name": self.matched_db_name,  # Added to dict
+            "update_info": self.update_info,
         }
 
 
@@ -66,66 +121,118 @@ class ScanIssue:
     category: str  # e.g., "Pathing", "Version", "Configuration"
     component_id: Optional[str] = None
     related_path: Optional[str] = None
+    occurrences: int = 1  # How many times the same issue was found (de-duplicated)
 
     def to_dict(self):
         return {
             "severity": self.severity,
             "description": self.description,
             "category": self.category,
+            "occurrences": self.occurrences,
             "component_id": self.component_id,
             "related_path": self.related_path,
         }
 
 
+# What EnvironmentScanner.iter_scan yields, and the scan event kinds that carry
+# them; each such event stores the object under a data key equal to its kind.
+ScanResult = Union[DetectedComponent, EnvironmentVariableInfo, ScanIssue]
+RESULT_EVENT_KINDS = ("component", "environment_variable", "issue")
+
+
+def partition_scan_results(
+    results: Iterable[ScanResult],
+) -> Tuple[List[DetectedComponent], List[EnvironmentVariableInfo], List[ScanIssue]]:
+    """Splits a stream of scan results into the three lists run_scan returns."""
+    components: List[DetectedComponent] = []
+    environment_variables: List[EnvironmentVariableInfo] = []
+    issues: List[ScanIssue] = []
+    for item in results:
+        if isinstance(item, DetectedComponent):
+            components.append(item)
+        elif isinstance(item, EnvironmentVariableInfo):
+            environment_variables.append(item)
+        elif isinstance(item, ScanIssue):
+            issues.append(item)
+    return components, environment_variables, issues
+
+
 # --- Constants ---
 # Correct pathing assumes this script is in devenvaudit_src
 SOFTWARE_CATEGORIZATION_DB_PATH = os.path.join(
     os.path.dirname(__file__), "software categorization database.json"
 )
-TOOLS_DB_PATH = os.path.join(os.path.dirname(__file__), "tools_database.json")
-
-try:
-    with open(TOOLS_DB_PATH, "r", encoding="utf-8") as f:
-        TOOLS_DB = json.load(f)
-    if not isinstance(TOOLS_DB, list):
-        logger.error(
-            f"TOOLS_DB loaded from {TOOLS_DB_PATH} is not a list. Defaulting to empty list."
-        )
-        TOOLS_DB = []
-except FileNotFoundError:
-    logger.error(
-        f"Tools database file not found at {TOOLS_DB_PATH}. TOOLS_DB will be empty."
-    )
-    TOOLS_DB = []
-except json.JSONDecodeError as e:
-    logger.error(
-        f"Error decoding JSON from {TOOLS_DB_PATH}: {e}. TOOLS_DB will be empty."
-    )
-    TOOLS_DB = []
-except Exception as e:
-    logger.error(
-        f"Unexpected error loading {TOOLS_DB_PATH}: {e}. TOOLS_DB will be empty."
-    )
-    TOOLS_DB = []
+# The tools DB is compiled (per-OS executable index, precompiled regexes) and
+# cached next to the JSON by tools_db.load_tools_db.
+COMPILED_TOOLS_DB = load_tools_db(TOOLS_DB_PATH)
+TOOLS_DB = COMPILED_TOOLS_DB.configs  # Raw tool definitions, kept for compatibility
 
 if not TOOLS_DB:
     logger.warning(
         f"TOOLS_DB is empty after attempting to load from {TOOLS_DB_PATH}. Tool identification will be limited."
     )
 
-SENSITIVE_ENV_VARS = [
-    "API_KEY",
-    "SECRET",
-    "TOKEN",
-    "PASSWORD",
-    "PASSWD",
-    "AWS_ACCESS_KEY_ID",
-    "AWS_SECRET_ACCESS_KEY",
-    "GOOGLE_APPLICATION_CREDENTIALS",
-]
+
+# Version probing defaults; overridable through scan_options in devenvaudit_config.json
+DEFAULT_VERSION_PROBE_WORKERS = 8
+DEFAULT_VERSION_PROBE_TIMEOUT = 5  # seconds per probe
+DEFAULT_VERSION_PROBE_DEADLINE = 60  # seconds for all probes of one scan
+PROBE_POLL_INTERVAL = 0.2  # seconds between cancellation checks while probing
+
+# Values of DetectedComponent.details["version_source"]
+VERSION_SOURCE_STATIC = "static"  # read from the executable file
+VERSION_SOURCE_PROCESS = "process"  # parsed from '<exe> <version_args>' output
+VERSION_SOURCE_METADATA = "metadata"  # version manager metadata files
+
+
+def _kill_process_tree(process: subprocess.Popen):
+    """Kills a probe process together with any children it spawned."""
+    try:
+        if platform.system() == "Windows":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=5,
+            )
+        else:
+            # Probes are started in their own session, so the pid is the process group id.
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError, TypeError, ValueError) as e:
+        logger.debug(f"Could not kill process group of pid {process.pid}: {e}")
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def load_software_categorization_db(path: Optional[str] = None) -> Dict[str, Any]:
+    """The software categorization database, or {} if it is missing or invalid."""
+    path = path or SOFTWARE_CATEGORIZATION_DB_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f_cat:
+            data = json.load(f_cat)
+        logger.info(f"Successfully loaded software categorization database from {path}")
+        return data
+    except FileNotFoundError:
+        logger.error(
+            f"Software categorization database file not found at {path}. Categorization will be basic."
+        )
+    except json.JSONDecodeError as e:
+        logger.error(f"Error decoding JSON from {path}: {e}. Categorization will be basic.")
+    return {}
 
 
 class SoftwareCategorizer:
+    """
+    Maps component names / executables to categories of the software
+    categorization database. The database is indexed once at construction:
+    an executable-name dict and a keyword automaton over entry names and
+    keywords, both resolving ties to the first entry in database order.
+    """
+
+    MEMO_MAX_ENTRIES = 100000
+
     def __init__(self, categorization_data: Optional[Dict[str, Any]] = None):
         self.categorization_data = (
             categorization_data if categorization_data is not None else {}
@@ -134,6 +241,32 @@ class SoftwareCategorizer:
             logger.warning(
                 "SoftwareCategorizer initialized with no categorization data. Categorization will be limited."
             )
+        self._entries: List[Tuple[str, Optional[str]]] = []  # (category, entry name)
+        self._exe_index: Dict[str, int] = {}
+        self._keyword_automaton = KeywordAutomaton()
+        self._memo: Dict[Tuple[str, Optional[str]], Tuple[Optional[str], Optional[str]]] = {}
+        self._build_indexes()
+
+    def _build_indexes(self):
+        for category, entries in self.categorization_data.items():
+            for entry in entries or []:
+                if not isinstance(entry, dict):
+                    continue
+                ordinal = len(self._entries)
+                self._entries.append((category, entry.get("name")))
+                for exe in entry.get("executables") or []:
+                    if exe:
+                        self._exe_index.setdefault(exe.lower(), ordinal)
+                entry_name_lower = (entry.get("name") or "").lower()
+                if entry_name_lower:
+                    self._keyword_automaton.add(entry_name_lower, ordinal)
+                for kw in entry.get("keywords") or []:
+                    if isinstance(kw, str):
+                        self._keyword_automaton.add(kw.lower(), ordinal)
+        logger.debug(
+            f"Indexed {len(self._entries)} categorization entries "
+            f"({len(self._exe_index)} executables, {len(self._keyword_automaton)} name/keyword patterns)."
+        )
 
     def categorize_component(
         self,
@@ -141,49 +274,46 @@ class SoftwareCategorizer:
         component_path: Optional[str] = None,
         publisher: Optional[str] = None,
     ) -> Tuple[Optional[str], Optional[str]]:
-        """Categorizes a component based on its name, path, and publisher."""
+        """
+        Categorizes a component based on its executable name, then its name.
+        `publisher` is accepted for compatibility; a publisher match only ever
+        confirmed an entry the name match had already returned.
+        """
         if not self.categorization_data:
             return "Unknown", None
 
         comp_name_lower = component_name.lower() if component_name else ""
         exe_name_lower = self._get_executable_name(component_path)
-        publisher_lower = publisher.lower() if publisher else ""
-
-        if exe_name_lower:
-            for category, entries in self.categorization_data.items():
-                for entry in entries:
-                    db_executables = [
-                        e.lower() for e in entry.get("executables", []) if e
-                    ]
-                    if exe_name_lower in db_executables:
-                        return category, entry.get("name")
-
-        if comp_name_lower:
-            for category, entries in self.categorization_data.items():
-                for entry in entries:
-                    db_entry_name_lower = entry.get("name", "").lower()
-                    if db_entry_name_lower and db_entry_name_lower in comp_name_lower:
-                        return category, entry.get("name")
-
-                    keywords = [kw.lower() for kw in entry.get("keywords", [])]
-                    if any(kw in comp_name_lower for kw in keywords):
-                        return category, entry.get("name")
-        if publisher_lower:
-            for category, entries in self.categorization_data.items():
-                for entry in entries:
-                    db_publisher_lower = entry.get("publisher", "").lower()
-                    if db_publisher_lower and db_publisher_lower in publisher_lower:
-                        db_entry_name_lower = entry.get("name", "").lower()
-                        keywords = [kw.lower() for kw in entry.get("keywords", [])]
-                        if comp_name_lower:
-                            if (
-                                db_entry_name_lower
-                                and db_entry_name_lower in comp_name_lower
-                            ):
-                                return category, entry.get("name")
-                            if any(kw in comp_name_lower for kw in keywords):
-                                return category, entry.get("name")
-        return None, None
+        memo_key = (comp_name_lower, exe_name_lower)
+        result = self._memo.get(memo_key)
+        if result is not None:
+            return result
+
+        ordinal = self._exe_index.get(exe_name_lower) if exe_name_lower else None
+        if ordinal is None and comp_name_lower:
+            ordinal = self._keyword_automaton.best_match(comp_name_lower)
+        result = self._entries[ordinal] if ordinal is not None else (None, None)
+
+        if len(self._memo) >= self.MEMO_MAX_ENTRIES:
+            self._memo.clear()
+        self._memo[memo_key] = result
+        return result
+
+    def categorize_many(
+        self, components: Iterable[Union[str, Tuple[Optional[str], ...]]]
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Categorizes many components at once. Each item is either a component
+        name or a (name, path[, publisher]) tuple; results are returned in
+        input order. Repeated names/executables are answered from the memo.
+        """
+        results = []
+        for item in components:
+            if isinstance(item, str) or item is None:
+                results.append(self.categorize_component(item))
+            else:
+                results.append(self.categorize_component(*item))
+        return results
 
     def _get_executable_name(self, path_string: Optional[str]) -> Optional[str]:
         if not path_string:
@@ -205,7 +335,13 @@ class SoftwareCategorizer:
 
 
 class EnvironmentScanner:
-    def __init__(self, progress_callback=None, status_callback=None):
+    def __init__(
+        self,
+        progress_callback=None,
+        status_callback=None,
+        filesystem: Optional[FileSystemCache] = None,
+        event_bus: Optional[ScanEventBus] = None,
+    ):
         self.system = platform.system()
         self.config = load_config()  # Loads the main devenvaudit_config.json
         self.scan_options = self.config.get("scan_options", {})
@@ -216,46 +352,147 @@ class EnvironmentScanner:
         self.environment_variables: List[EnvironmentVariableInfo] = []
         self.issues: List[ScanIssue] = []
         self.found_executables: Dict[str, str] = {}  # Initialize found_executables
+        # Memoized stat/access/realpath lookups, cleared at the start of every scan.
+        # Tests and benchmarks may pass a FakeFileSystem instead.
+        self.fs: FileSystemCache = (
+            filesystem if filesystem is not None else FileSystemCache()
+        )
+        # Built lazily, once per scan, from the PATH environment variable.
+        self.path_index: Optional[PathIndex] = None
+        # Walk of scan_paths for tools not on PATH; also built lazily once per scan.
+        self.discovery: Optional[DiscoveryResult] = None
+        # Executable name -> PATH entries it resolves to, first one wins (phase 3).
+        self.path_shadowing: Dict[str, List[str]] = {}
+        self.tools_db: CompiledToolsDB = COMPILED_TOOLS_DB
+
+        # Version probes run concurrently; these track the running processes so
+        # they can be killed when the scan-wide probe deadline passes.
+        self._active_processes: set = set()
+        self._process_lock = threading.Lock()
+        self._probe_deadline: Optional[float] = None
+        # Set by cancel(); checked between tools, probes and phases.
+        self._cancel_requested = threading.Event()
+
+        # Versions are read from the executable file first and only probed by
+        # running it when that fails; version_sources records the tier per path.
+        self.static_version_probe = self.scan_options.get(
+            "static_version_probe_enabled", True
+        )
+        self.version_sources: Dict[str, str] = {}
+
+        # Incremental audits: versions of executables whose signature and
+        # relevant environment match the last scan's snapshot are reused, and
+        # every scan produces a change set against that snapshot.
+        self.incremental_scan = self.scan_options.get("incremental_scan_enabled", True)
+        self.snapshot_path = SNAPSHOT_FILE_PATH
+        self.baseline_snapshot: Optional[ScanSnapshot] = None
+        self.change_set: Optional[ChangeSet] = None
+        self._probe_env_hash = ""
+        self._probed_executables: Dict[str, Dict[str, Any]] = {}
+
+        # Update checks of the running scan; components are queued as they are
+        # detected so package managers are queried while the scan continues.
+        self.update_stage: Optional[UpdateCheckStage] = None
+        # Tools a package manager reports as installed that the last scan didn't detect
+        self.package_only_tools: List[Dict[str, Any]] = []
+
+        # Persistent cache of version probe results, keyed by executable identity.
+        self.probe_cache: Optional[VersionProbeCache] = None
+        if self.scan_options.get("version_probe_cache_enabled", True):
+            self.probe_cache = VersionProbeCache(
+                max_entries=self.scan_options.get(
+                    "version_probe_cache_max_entries", 2000
+                ),
+                max_age_days=self.scan_options.get(
+                    "version_probe_cache_max_age_days", 30
+                ),
+            )
 
         # Assign callbacks
         self.progress_callback = progress_callback
         self.status_callback = status_callback
+        # Throttled, thread-safe fan-out of progress/status/component events.
+        # Consumers subscribe before run_scan and close the bus afterwards.
+        self.events: ScanEventBus = (
+            event_bus
+            if event_bus is not None
+            else ScanEventBus(
+                interval=float(
+                    self.scan_options.get(
+                        "progress_event_interval_seconds", DEFAULT_EVENT_INTERVAL
+                    )
+                )
+            )
+        )
 
         # Load tools_database.json and software_categorization_database.json directly
         # The TOOLS_DB_PATH loading block has been removed.
 
-        try:
-            with open(SOFTWARE_CATEGORIZATION_DB_PATH, "r", encoding="utf-8") as f_cat:
-                self.software_categorization_db = json.load(f_cat)
-            logger.info(
-                f"Successfully loaded software categorization database from {SOFTWARE_CATEGORIZATION_DB_PATH}"
-            )
-        except FileNotFoundError:
-            logger.error(
-                f"Software categorization database file not found at {SOFTWARE_CATEGORIZATION_DB_PATH}. Categorization will be basic."
-            )
-            self.software_categorization_db = {}
-        except json.JSONDecodeError as e:
-            logger.error(
-                f"Error decoding JSON from {SOFTWARE_CATEGORIZATION_DB_PATH}: {e}. Categorization will be basic."
-            )
-            self.software_categorization_db = {}
-
+        self.software_categorization_db = load_software_categorization_db()
         self.categorizer = SoftwareCategorizer(
             self.software_categorization_db
         )  # Pass loaded data to categorizer
+        self.env_rule_engine = EnvRuleEngine.from_config(self.config)
 
     def _update_progress(self, current, total, message):
+        self.events.progress(current, total, message)
         if self.progress_callback:
             self.progress_callback(current, total, message)
 
     def _update_status(self, message):
+        self.events.status(message)
         if self.status_callback:
             self.status_callback(message)
 
+    def cancel(self):
+        """
+        Asks a running scan to stop. Safe to call from any thread: running
+        version probes are killed and run_scan returns what it has found so far.
+        """
+        if not self._cancel_requested.is_set():
+            logger.info("Scan cancellation requested.")
+        self._cancel_requested.set()
+        self._kill_active_processes()
+        stage = self.update_stage
+        if stage is not None:
+            stage.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def _add_issue(self, issue: ScanIssue):
+        self.issues.append(issue)
+        self.events.publish("issue", issue=issue)
+
+    def _add_environment_variable(self, variable: EnvironmentVariableInfo):
+        self.environment_variables.append(variable)
+        self.events.publish("environment_variable", environment_variable=variable)
+
     def _run_command(
-        self, command_parts: List[str], timeout: int = 5
+        self, command_parts: List[str], timeout: Optional[float] = None
     ) -> Tuple[str, str, int]:
+        if timeout is None:
+            timeout = self.scan_options.get(
+                "version_probe_timeout_seconds", DEFAULT_VERSION_PROBE_TIMEOUT
+            )
+        if self._probe_deadline is not None:
+            # Never let a single probe run past the scan-wide deadline.
+            timeout = min(timeout, self._probe_deadline - time.monotonic())
+            if timeout <= 0:
+                logger.debug(
+                    f"Skipping '{' '.join(command_parts)}': version probe deadline passed."
+                )
+                return "", "TimeoutExpired: scan deadline passed", -1
+
+        popen_kwargs: Dict[str, Any] = {}
+        if platform.system() == "Windows":
+            popen_kwargs["creationflags"] = getattr(
+                subprocess, "CREATE_NEW_PROCESS_GROUP", 0
+            )
+        else:
+            popen_kwargs["start_new_session"] = True
+
         process: Optional[subprocess.Popen] = None
         try:
             logger.debug(f"Running command: {' '.join(command_parts)}")
@@ -263,18 +500,22 @@ class EnvironmentScanner:
                 command_parts,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
+                stdin=subprocess.DEVNULL,
                 text=True,
                 encoding="utf-8",
                 errors="replace",
+                **popen_kwargs,
             )
+            with self._process_lock:
+                self._active_processes.add(process)
             stdout, stderr = process.communicate(timeout=timeout)
             return stdout, stderr, process.returncode
         except subprocess.TimeoutExpired:
             logger.warning(
-                f"Command '{' '.join(command_parts)}' timed out after {timeout}s."
+                f"Command '{' '.join(command_parts)}' timed out after {timeout:.1f}s."
             )
             if process:
-                process.kill()
+                _kill_process_tree(process)
                 stdout, stderr_timeout = process.communicate()
                 return stdout, f"TimeoutExpired: {stderr_timeout}", -1
             return (
@@ -288,24 +529,129 @@ class EnvironmentScanner:
         except Exception as e:
             logger.error(f"Error running command '{' '.join(command_parts)}': {e}")
             return "", str(e), -1
+        finally:
+            if process is not None:
+                with self._process_lock:
+                    self._active_processes.discard(process)
+
+    def _kill_active_processes(self):
+        """Kills every version probe that is still running."""
+        with self._process_lock:
+            processes = list(self._active_processes)
+        for process in processes:
+            logger.warning(f"Killing version probe pid {process.pid}.")
+            _kill_process_tree(process)
 
     def _get_version_from_command(
-        self, exe_path: str, version_args: List[str], version_regex_str: str
+        self,
+        exe_path: str,
+        version_args: List[str],
+        version_regex_str: Union[str, Pattern],
     ) -> Optional[str]:
         # FIX: Added a strict check to ensure we only try to execute valid program files.
-        if not exe_path or not os.path.exists(exe_path) or not os.path.isfile(exe_path):
+        if not exe_path or not self.fs.isfile(exe_path):
             return None
 
         if self.system == "Windows":
             if not exe_path.lower().endswith((".exe", ".bat", ".cmd", ".com", ".ps1")):
                 return None
         else:
-            if not os.access(exe_path, os.X_OK):
+            if not self.fs.access(exe_path, os.X_OK):
                 return None
 
+        signature = None
+        if self.probe_cache is not None or self.incremental_scan:
+            signature = VersionProbeCache.executable_signature(exe_path, self.fs)
+        regex_pattern = getattr(version_regex_str, "pattern", version_regex_str)
+
+        snapshot_key: Optional[str] = None
+        if self.incremental_scan and signature:
+            snapshot_key = probe_key(signature, version_args, regex_pattern, self._probe_env_hash)
+            if self.baseline_snapshot is not None:
+                found, version, source = self.baseline_snapshot.reusable_version(exe_path, snapshot_key)
+                if found:
+                    logger.debug(f"{exe_path} unchanged since the last scan: {version}")
+                    self.version_sources[exe_path] = f"{source or VERSION_SOURCE_PROCESS}, unchanged"
+                    self._record_probe(exe_path, signature, snapshot_key, version, source, reused=True)
+                    return version
+
+        version = self._probe_version(exe_path, version_args, version_regex_str, signature)
+        # Failed probes are retried next scan rather than remembered.
+        if snapshot_key is not None and version is not None:
+            source = self.version_sources.get(exe_path, VERSION_SOURCE_PROCESS)
+            self._record_probe(exe_path, signature, snapshot_key, version, source.split(",")[0])
+        return version
+
+    def _record_probe(
+        self,
+        exe_path: str,
+        signature,
+        snapshot_key: str,
+        version: Optional[str],
+        source: Optional[str],
+        reused: bool = False,
+    ):
+        self._probed_executables[exe_path] = {
+            "signature": list(signature),
+            "probe_key": snapshot_key,
+            "version": version,
+            "version_source": source,
+            "reused": reused,
+        }
+
+    def _probe_version(
+        self,
+        exe_path: str,
+        version_args: List[str],
+        version_regex_str: Union[str, Pattern],
+        signature=None,
+    ) -> Optional[str]:
+        """Probe cache, then the static reader, then running the executable."""
+        cache_key: Optional[str] = None
+        if self.probe_cache is not None and signature:
+            cache_key = VersionProbeCache.make_key(
+                signature,
+                version_args,
+                getattr(version_regex_str, "pattern", version_regex_str),
+            )
+            found, cached_version = self.probe_cache.get(cache_key)
+            if found:
+                logger.debug(f"Using cached version for {exe_path}: {cached_version}")
+                source = self.probe_cache.source(cache_key) or VERSION_SOURCE_PROCESS
+                self.version_sources[exe_path] = f"{source}, cached"
+                return cached_version
+
+        # Tier 1: read the version from the file (PE version resource, ELF notes/data).
+        if self.static_version_probe:
+            static = static_version(exe_path, version_regex_str)
+            if static is not None:
+                source = f"{VERSION_SOURCE_STATIC} ({static.method})"
+                logger.info(f"Found version for {exe_path}: {static.version} ({source}).")
+                self.version_sources[exe_path] = source
+                if cache_key is not None:
+                    self.probe_cache.put(cache_key, exe_path, static.version, source)
+                return static.version
+
+        # Tier 2: run the executable with the tool's version arguments.
         full_command = [exe_path] + version_args
         stdout, stderr, return_code = self._run_command(full_command)
-
+        version = self._parse_version_output(
+            exe_path, stdout, stderr, version_regex_str
+        )
+        self.version_sources[exe_path] = VERSION_SOURCE_PROCESS
+        # return_code -1 means the probe itself failed (timeout, spawn error),
+        # which says nothing about the binary, so it is not cached.
+        if cache_key is not None and return_code != -1:
+            self.probe_cache.put(cache_key, exe_path, version, VERSION_SOURCE_PROCESS)
+        return version
+
+    def _parse_version_output(
+        self,
+        exe_path: str,
+        stdout: Optional[str],
+        stderr: Optional[str],
+        version_regex_str: Union[str, Pattern],
+    ) -> Optional[str]:
         output_to_parse = ""
         if stdout:
             output_to_parse += stdout
@@ -326,9 +672,12 @@ class EnvironmentScanner:
             except Exception as e:
                 logger.warning(f"Could not re-decode output for {exe_path}: {e}")
 
-        match = re.search(
-            version_regex_str, output_to_parse, re.MULTILINE | re.IGNORECASE
-        )
+        if isinstance(version_regex_str, str):
+            match = re.search(
+                version_regex_str, output_to_parse, re.MULTILINE | re.IGNORECASE
+            )
+        else:  # Precompiled by tools_db with the same flags
+            match = version_regex_str.search(output_to_parse)
         if match:
             if match.groups():
                 version = match.group(1).strip()
@@ -344,58 +693,82 @@ class EnvironmentScanner:
             )
         return None
 
+    def _get_path_index(self) -> PathIndex:
+        if self.path_index is None:
+            self.path_index = PathIndex(system=self.system, filesystem=self.fs).build()
+        return self.path_index
+
+    def _get_discovery(self) -> Optional[DiscoveryResult]:
+        """Walks scan_paths once per scan; None when discovery is disabled."""
+        if self.discovery is not None:
+            return self.discovery
+        scan_paths = self.scan_options.get("scan_paths", [])
+        if not scan_paths or not self.scan_options.get("discovery_enabled", True):
+            return None
+        self._update_status("Searching scan paths for tools not on PATH...")
+        walker = DiscoveryWalker(
+            self.tools_db.view(self.system),
+            scan_paths,
+            excluded_paths=self.scan_options.get("excluded_paths", []),
+            pruned_dir_names=self.scan_options.get(
+                "discovery_pruned_dir_names", DEFAULT_PRUNED_DIR_NAMES
+            ),
+            max_workers=self.scan_options.get(
+                "discovery_max_workers", DEFAULT_DISCOVERY_WORKERS
+            ),
+            time_budget_seconds=self.scan_options.get(
+                "discovery_time_budget_seconds", DEFAULT_DISCOVERY_TIME_BUDGET
+            ),
+            max_depth=self.scan_options.get(
+                "discovery_max_depth", DEFAULT_DISCOVERY_MAX_DEPTH
+            ),
+            system=self.system,
+        )
+        self.discovery = walker.walk(should_stop=lambda: self.cancelled)
+        if self.discovery.timed_out:
+            self._add_issue(
+                ScanIssue(
+                    severity="Info",
+                    description=f"Searching scan paths stopped after {walker.time_budget_seconds:g}s; tools in directories not reached yet are missing from the results.",
+                    category="Performance",
+                )
+            )
+        return self.discovery
+
     def _find_executable_in_path(self, exe_name: str) -> Optional[str]:
         if exe_name in self.found_executables:
             return self.found_executables[exe_name]
 
-        for path_dir in os.environ.get("PATH", "").split(os.pathsep):
-            if not path_dir:
-                continue
-            try:
-                exe_path = Path(path_dir) / exe_name
-                if exe_path.is_file() and os.access(exe_path, os.X_OK):
-                    resolved_path = str(exe_path.resolve())
-                    self.found_executables[exe_name] = resolved_path
-                    return resolved_path
-            except OSError:
-                logger.warning(
-                    f"Could not process PATH entry: {path_dir} when searching for {exe_name}"
-                )
-                continue
-            except Exception as e:
-                logger.error(f"Error checking executable {exe_name} in {path_dir}: {e}")
-                continue
-        return None
+        exe_path = self._get_path_index().find(exe_name)
+        if exe_path is None:
+            return None
+        resolved_path = self.fs.realpath(exe_path)
+        self.found_executables[exe_name] = resolved_path
+        return resolved_path
 
-    def _find_executables_for_tool(self, tool_config: Dict[str, Any]) -> List[str]:
+    def _find_executables_for_tool(self, tool: CompiledTool) -> List[str]:
         exe_paths_found = set()
-        current_system = platform.system()
-        os_specific_executables = tool_config.get("executables", {}).get(
-            current_system, []
-        )
-        if not os_specific_executables and current_system != "Windows":
-            os_specific_executables = tool_config.get("executables", {}).get(
-                "Linux", []
-            )
-
-        for exe_name in os_specific_executables:
+        for exe_name in tool.executables:
             path_in_env = self._find_executable_in_path(exe_name)
             if path_in_env:
-                exe_paths_found.add(os.path.realpath(path_in_env))
+                exe_paths_found.add(path_in_env)
 
-        common_install_paths = tool_config.get("install_paths", {}).get(
-            current_system, []
-        )
-        for common_path_str in common_install_paths:
+        for common_path_str in tool.install_paths:
             try:
-                common_path = Path(common_path_str)
-                if common_path.is_file() and os.access(common_path, os.X_OK):
-                    if common_path.name in os_specific_executables:
-                        exe_paths_found.add(os.path.realpath(str(common_path)))
+                if self.fs.isfile(common_path_str) and self.fs.access(
+                    common_path_str, os.X_OK
+                ):
+                    if Path(common_path_str).name in tool.executables:
+                        exe_paths_found.add(self.fs.realpath(common_path_str))
             except Exception as e:
                 logger.warning(
                     f"Error processing common install path {common_path_str}: {e}"
                 )
+
+        discovery = self._get_discovery()
+        if discovery is not None:
+            for discovered_path in discovery.paths_for(tool.id):
+                exe_paths_found.add(self.fs.realpath(discovered_path))
         return list(exe_paths_found)
 
     def _generate_component_id(
@@ -445,7 +818,7 @@ class EnvironmentScanner:
                     if base_dir_str:
                         conf_path = Path(base_dir_str) / raw_path_str
 
-                if conf_path and conf_path.exists() and conf_path.is_file():
+                if conf_path and self.fs.isfile(conf_path):
                     parser_name = cf_info.get("parser")
                     if parser_name == "parse_gitconfig":
                         parsed_data = self._parse_gitconfig(str(conf_path))
@@ -460,18 +833,23 @@ class EnvironmentScanner:
 
     def identify_tools(self):
         self._update_status("Identifying installed tools...")
-        if not TOOLS_DB:
+        if not self.tools_db:
             logger.warning("TOOLS_DB is empty. Cannot identify specific tools.")
             self._update_progress(1, 1, "Tool identification skipped (TOOLS_DB empty).")
             return
 
-        num_tools_defined = len(TOOLS_DB)
-        for i, tool_cfg in enumerate(TOOLS_DB):
-            tool_name = tool_cfg.get("name", "UnknownTool")
+        # Step 1: locate executables for every tool (cheap, sequential).
+        tools = self.tools_db.view(self.system).tools
+        probe_jobs: List[Tuple[CompiledTool, str]] = []
+        num_tools_defined = len(tools)
+        for i, tool in enumerate(tools):
+            if self.cancelled:
+                return
+            tool_name = tool.name
             self._update_status(f"Scanning for {tool_name}...")
             self._update_progress(i + 1, num_tools_defined, f"Scanning for {tool_name}")
 
-            found_exe_paths = self._find_executables_for_tool(tool_cfg)
+            found_exe_paths = self._find_executables_for_tool(tool)
 
             if not found_exe_paths:
                 logger.info(
@@ -479,274 +857,555 @@ class EnvironmentScanner:
                 )
                 continue
 
-            for exe_path_str in found_exe_paths:
-                exe_path_obj = Path(exe_path_str)
-                version = self._get_version_from_command(
-                    str(exe_path_obj),
-                    tool_cfg.get("version_args", ["--version"]),
-                    tool_cfg.get("version_regex", r"([0-9]+\.[0-9]+(?:\.[0-9]+)?)"),
-                )
-
-                version = version if version else "Unknown"
-                install_path = str(exe_path_obj.parent)
-                component_id = self._generate_component_id(
-                    tool_name, version, str(exe_path_obj)
-                )
-
-                if any(c.id == component_id for c in self.detected_components):
-                    logger.debug(f"Skipping already detected instance: {component_id}")
-                    continue
-                if component_id in self.ignored_identifiers:
-                    logger.info(f"Skipping ignored component: {component_id}")
-                    continue
-
-                details = self._get_tool_details(
-                    tool_cfg, install_path, str(exe_path_obj)
+            for exe_path_str in sorted(found_exe_paths):
+                probe_jobs.append((tool, exe_path_str))
+
+        # Step 2: run the version probes concurrently under a scan-wide deadline.
+        # Step 3: build components in probe-job order, so detected_components
+        # is deterministic regardless of which probe finished first. A component
+        # is added (and streamed) as soon as it and every job before it are probed.
+        probed: Dict[int, Optional[str]] = {}
+        next_job = 0
+
+        def add_ready_components(index: int, version: Optional[str]):
+            nonlocal next_job
+            probed[index] = version
+            while next_job in probed:
+                tool, exe_path_str = probe_jobs[next_job]
+                self._add_detected_component(
+                    tool.config, exe_path_str, probed.pop(next_job)
                 )
-                related_env_vars_info = {}
-                for env_var_name in tool_cfg.get("env_vars", []):
-                    env_var_value = os.environ.get(env_var_name)
-                    if env_var_value is not None:
-                        if any(
-                            s.lower() in env_var_name.lower()
-                            for s in SENSITIVE_ENV_VARS
-                        ):
-                            related_env_vars_info[env_var_name] = "Present (sensitive)"
-                        else:
-                            related_env_vars_info[env_var_name] = env_var_value
-                    else:
-                        related_env_vars_info[env_var_name] = "Not set"
-                if related_env_vars_info:
-                    details["environment_variables"] = related_env_vars_info
+                next_job += 1
 
-                category, matched_db_name = self.categorizer.categorize_component(
-                    tool_name, str(exe_path_obj)
-                )
+        versions = self._probe_versions(probe_jobs, on_result=add_ready_components)
+        if self.cancelled:
+            return  # Don't report abandoned probes as "Unknown" versions
+        for index in range(next_job, len(probe_jobs)):
+            add_ready_components(index, versions[index])
 
-                component = DetectedComponent(
-                    id=component_id,
-                    name=tool_name,
-                    category=category or tool_cfg.get("category", "Unknown"),
-                    version=version,
-                    path=install_path,
-                    executable_path=str(exe_path_obj),
-                    details=details,
-                    source_detection=f"TOOLS_DB ({exe_path_obj.name})",
-                    matched_db_name=matched_db_name,
-                )
-                self.detected_components.append(component)
-                logger.info(
-                    f"Detected via TOOLS_DB: {tool_name} {version} at {exe_path_obj}"
-                )
         self._update_progress(
             num_tools_defined, num_tools_defined, "Tool identification complete."
         )
 
-    def _analyze_env_var_for_issues(
-        self, name: str, value: str, scope: str
-    ) -> List[ScanIssue]:  # Changed IdentifiedIssue to ScanIssue
-        """Analyzes a single environment variable for common issues."""
-        issues: List[ScanIssue] = []  # Changed IdentifiedIssue to ScanIssue
-        path_values = []
-
-        # Check for multiple values in PATH-like variables
-        if "path" in name.lower():
-            path_values = [v.strip() for v in value.split(os.pathsep) if v.strip()]
-
-        # Common checks for all environment variables
-        # Issue: Empty or whitespace-only value
-        if not value.strip():
-            issues.append(
-                ScanIssue(  # Changed IdentifiedIssue to ScanIssue
-                    severity="Info",
-                    description=f"Environment variable '{name}' is empty or contains only whitespace.",
-                    category="Value",
-                    component_id=None,
-                    related_path=None,
+    def _probe_versions(
+        self,
+        probe_jobs: List[Tuple[CompiledTool, str]],
+        on_result: Optional[Callable[[int, Optional[str]], None]] = None,
+    ) -> List[Optional[str]]:
+        """
+        Runs _get_version_from_command for every (tool, exe_path) job on a
+        bounded thread pool. Probes still running when the deadline passes (or
+        the scan is cancelled) are killed and their version is reported as None.
+        `on_result(job_index, version)` is called on the calling thread for
+        every job as soon as its probe has finished.
+        """
+        versions: List[Optional[str]] = [None] * len(probe_jobs)
+        if not probe_jobs:
+            return versions
+
+        max_workers = max(
+            1,
+            int(
+                self.scan_options.get(
+                    "max_version_probe_workers", DEFAULT_VERSION_PROBE_WORKERS
                 )
+            ),
+        )
+        deadline_seconds = float(
+            self.scan_options.get(
+                "version_probe_deadline_seconds", DEFAULT_VERSION_PROBE_DEADLINE
             )
+        )
+        self._probe_deadline = time.monotonic() + deadline_seconds
+        self._update_status(f"Probing versions of {len(probe_jobs)} executables...")
 
-        # Issue: Very long value (potentially suspicious)
-        if len(value) > 255:
-            issues.append(
-                ScanIssue(  # Changed IdentifiedIssue to ScanIssue
-                    severity="Warning",
-                    description=f"Environment variable '{name}' has a very long value (>{255} characters).",
-                    category="Length",
-                    component_id=None,
-                    related_path=None,
-                )
+        executor = ThreadPoolExecutor(
+            max_workers=min(max_workers, len(probe_jobs)),
+            thread_name_prefix="version-probe",
+        )
+        futures = {}
+        for index, (tool, exe_path_str) in enumerate(probe_jobs):
+            if tool.version_regex is None:
+                # Invalid regex in the tools DB; already logged at load
+                if on_result is not None:
+                    on_result(index, None)
+                continue
+            future = executor.submit(
+                self._get_version_from_command,
+                exe_path_str,
+                list(tool.version_args),
+                tool.version_regex,
             )
+            futures[future] = index
 
-        # Issue: Invalid characters in the name
-        if not re.match(r"^[A-Z0-9_]+$", name):
-            issues.append(
-                ScanIssue(  # Changed IdentifiedIssue to ScanIssue
-                    severity="Warning",
-                    description=f"Environment variable '{name}' contains invalid characters (only A-Z, 0-9, and _ are allowed).",
-                    category="Format",
-                    component_id=None,
-                    related_path=None,
+        completed = 0
+        pending = set(futures)
+        try:
+            while pending:
+                if self.cancelled:
+                    logger.info(
+                        f"Scan cancelled; {len(pending)} version probe(s) abandoned."
+                    )
+                    self._kill_active_processes()
+                    break
+                remaining = self._probe_deadline - time.monotonic()
+                if remaining <= 0:
+                    unfinished = len(probe_jobs) - completed
+                    logger.warning(
+                        f"Version probing exceeded the {deadline_seconds}s scan deadline; "
+                        f"{unfinished} probe(s) abandoned."
+                    )
+                    self._kill_active_processes()
+                    self._add_issue(
+                        ScanIssue(
+                            severity="Info",
+                            description=f"Version detection timed out for {unfinished} executable(s); their version is reported as Unknown.",
+                            category="Performance",
+                        )
+                    )
+                    break
+                # Short waits so cancellation is noticed while probes are running.
+                done, pending = wait(
+                    pending,
+                    timeout=min(remaining, PROBE_POLL_INTERVAL),
+                    return_when=FIRST_COMPLETED,
                 )
+                for future in done:
+                    index = futures[future]
+                    try:
+                        versions[index] = future.result()
+                    except Exception as e:
+                        logger.error(
+                            f"Version probe for {probe_jobs[index][1]} failed: {e}",
+                            exc_info=True,
+                        )
+                    completed += 1
+                    self._update_progress(
+                        completed,
+                        len(probe_jobs),
+                        f"Probed version of {Path(probe_jobs[index][1]).name}",
+                    )
+                    if on_result is not None and not self.cancelled:
+                        on_result(index, versions[index])
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._probe_deadline = None
+            if self.probe_cache is not None:
+                self.probe_cache.save()
+        return versions
+
+    def identify_managed_installs(self):
+        """
+        Adds every toolchain version installed by a version manager (pyenv, nvm,
+        SDKMAN!, asdf, rustup, conda). Versions come from the installs' metadata
+        files, so no executable is run (see version_managers.py).
+        """
+        if not self.scan_options.get("version_manager_discovery_enabled", True):
+            return
+        self._update_status("Looking for toolchains installed by version managers...")
+        installs = discover_managed_installs(self.fs, self.system, os.environ)
+        tool_configs = {cfg.get("id"): cfg for cfg in self.tools_db.configs}
+        known_executables = {c.executable_path for c in self.detected_components}
+        for install in installs:
+            if self.cancelled:
+                return
+            exe_path_str = self.fs.realpath(install.executable_path)
+            if exe_path_str in known_executables:
+                continue  # Already found (and probed) through PATH
+            known_executables.add(exe_path_str)
+            tool_cfg = tool_configs.get(install.tool_id) or {
+                "id": install.tool_id,
+                "name": install.tool_name,
+                "category": install.category,
+            }
+            self._add_detected_component(
+                tool_cfg,
+                exe_path_str,
+                install.version,
+                source=f"{install.manager} ({install.install_path})",
+                extra_details={
+                    "version_manager": install.manager,
+                    "version_source": VERSION_SOURCE_METADATA,
+                },
             )
+        logger.debug(f"Version managers: {len(installs)} installed toolchain version(s).")
 
-        # Issue: Path does not exist
-        for p in path_values:
-            if not os.path.exists(p):
-                issues.append(
-                    ScanIssue(  # Changed IdentifiedIssue to ScanIssue
-                        severity="Warning",
-                        description=f"Path '{p}' in environment variable '{name}' does not exist.",
-                        category="Pathing",
-                        component_id=None,
-                        related_path=p,
-                    )
+    def collect_ecosystem_packages(self):
+        """
+        Lists the pip, npm, cargo, go and gem packages of the detected
+        interpreters (see ecosystems.py) into each component's
+        details["packages"][<ecosystem>].
+        """
+        if not self.scan_options.get("ecosystem_inventory_enabled", True):
+            return
+        self._update_status("Listing language packages of detected interpreters...")
+        inventories = collect_ecosystem_packages(
+            self.detected_components,
+            fs=self.fs,
+            system=self.system,
+            run_command=self._run_command,
+            max_workers=int(
+                self.scan_options.get("ecosystem_collector_max_workers", DEFAULT_COLLECTOR_WORKERS)
+            ),
+            timeout=float(
+                self.scan_options.get("ecosystem_command_timeout_seconds", DEFAULT_COMMAND_TIMEOUT)
+            ),
+        )
+        components = {c.id: c for c in self.detected_components}
+        for inventory in inventories:
+            component = components.get(inventory.component_id)
+            if component is not None:
+                component.details.setdefault("packages", {})[inventory.ecosystem] = (
+                    inventory.to_details()
                 )
 
-        # Issue: JAVA_HOME points to an invalid location (example check)
-        if (
-            "JAVA_HOME" in name
-            and not os.path.exists(os.path.join(value, "bin", "java.exe"))
-            and not os.path.exists(os.path.join(value, "bin", "java"))
-        ):
-            issues.append(
-                ScanIssue(  # Changed IdentifiedIssue to ScanIssue
-                    severity="Warning",
-                    description=f"JAVA_HOME ('{value}') might not point to a valid JDK/JRE installation (missing bin/java).",
-                    category="Configuration",
-                    component_id=None,
-                    related_path=None,
-                )
-            )
+    def _add_detected_component(
+        self,
+        tool_cfg: Dict[str, Any],
+        exe_path_str: str,
+        version: Optional[str],
+        source: Optional[str] = None,
+        extra_details: Optional[Dict[str, Any]] = None,
+    ):
+        """Builds a DetectedComponent for a probed executable and records it."""
+        tool_name = tool_cfg.get("name", "UnknownTool")
+        exe_path_obj = Path(exe_path_str)
+        version = version if version else "Unknown"
+        install_path = str(exe_path_obj.parent)
+        component_id = self._generate_component_id(
+            tool_name, version, str(exe_path_obj)
+        )
 
-        # Check for potentially sensitive information (very basic example)
-        # A more robust solution would involve regex patterns for keys, tokens, etc.
-        if (
-            any(s.lower() in name.lower() for s in SENSITIVE_ENV_VARS)
-            and len(value) > 20
-        ):  # Arbitrary length check
-            issues.append(
-                ScanIssue(  # Changed IdentifiedIssue to ScanIssue
-                    severity="Warning",
-                    description=f"Environment variable '{name}' might contain sensitive data.",
-                    category="Security",
-                    component_id=None,
-                    related_path=None,
-                )
+        if any(c.id == component_id for c in self.detected_components):
+            logger.debug(f"Skipping already detected instance: {component_id}")
+            return
+        if component_id in self.ignored_identifiers:
+            logger.info(f"Skipping ignored component: {component_id}")
+            return
+
+        details = self._get_tool_details(tool_cfg, install_path, str(exe_path_obj))
+        if exe_path_str in self.version_sources:
+            details["version_source"] = self.version_sources[exe_path_str]
+        if extra_details:
+            details.update(extra_details)
+        related_env_vars_info = {}
+        for env_var_name in tool_cfg.get("env_vars", []):
+            env_var_value = os.environ.get(env_var_name)
+            if env_var_value is not None:
+                if any(s.lower() in env_var_name.lower() for s in SENSITIVE_ENV_VARS):
+                    related_env_vars_info[env_var_name] = "Present (sensitive)"
+                else:
+                    related_env_vars_info[env_var_name] = env_var_value
+            else:
+                related_env_vars_info[env_var_name] = "Not set"
+        if related_env_vars_info:
+            details["environment_variables"] = related_env_vars_info
+
+        category, matched_db_name = self.categorizer.categorize_component(
+            tool_name, str(exe_path_obj)
+        )
+
+        component = DetectedComponent(
+            id=component_id,
+            name=tool_name,
+            category=category or tool_cfg.get("category", "Unknown"),
+            version=version,
+            path=install_path,
+            executable_path=str(exe_path_obj),
+            details=details,
+            source_detection=source or f"TOOLS_DB ({exe_path_obj.name})",
+            matched_db_name=matched_db_name,
+        )
+        self.detected_components.append(component)
+        self.events.publish("component", component=component)
+        logger.info(
+            f"Detected via {component.source_detection}: {tool_name} {version} at {exe_path_obj}"
+        )
+        if self.update_stage is not None:
+            self.update_stage.submit(component, tool_cfg.get("id"))
+
+    def _on_update_info(self, component: DetectedComponent, update_info: Dict[str, Any]):
+        """Called from the update-check thread for every component a package manager knows."""
+        component.update_info = update_info
+        self.events.publish("update_info", component=component, update_info=update_info)
+
+    def finish_update_checks(self):
+        """Waits for the update checks still running (phase 4), or drops them if cancelled."""
+        stage, self.update_stage = self.update_stage, None
+        if stage is None:
+            return
+        if self.cancelled:
+            stage.cancel()
+            return
+        if stage.started:
+            self._update_status("Waiting for package manager update checks...")
+        stage.finish()
+        found = sum(1 for c in self.detected_components if c.update_info)
+        logger.info(f"Update checks: {found} of {stage.checked} checked components found in a package manager.")
+        self.package_only_tools = stage.package_only_tools
+        for tool in self.package_only_tools:
+            logger.info(
+                f"Installed through {tool['package_manager_id']} but not detected: "
+                f"{tool['package_name_in_pm']} {tool['installed_version']}"
             )
+        if self.package_only_tools:
+            self.events.publish("package_only_tools", tools=list(self.package_only_tools))
+
+    @staticmethod
+    def _issue_from_finding(finding: EnvFinding) -> ScanIssue:
+        return ScanIssue(
+            severity=finding.severity,
+            description=finding.description,
+            category=finding.category,
+            component_id=None,
+            related_path=finding.related_path,
+            occurrences=finding.occurrences,
+        )
 
-        return issues
+    def _analyze_env_var_for_issues(
+        self, name: str, value: str, scope: str
+    ) -> List[ScanIssue]:
+        """Analyzes a single environment variable with the environment rule engine."""
+        findings = self.env_rule_engine.evaluate({name: value}, self.fs)
+        return [self._issue_from_finding(f) for f in findings]
 
     def collect_environment_variables(self):
         """
-        Collects and analyzes environment variables.
+        Collects environment variables and evaluates the environment rules
+        over all of them in one pass (see env_rules.py).
         """
         self._update_status("Collecting environment variables...")
         self.environment_variables.clear()
         env_vars_dict = dict(os.environ)
-        total_env_vars = len(env_vars_dict)
-        processed_count = 0
-
+        scope = "System/User"  # Default, difficult to determine exact scope without platform-specific calls
         for name, value in env_vars_dict.items():
-            processed_count += 1
-            self._update_progress(
-                processed_count,
-                total_env_vars,
-                f"Processing environment variable: {name}",
+            self._add_environment_variable(
+                EnvironmentVariableInfo(name=name, value=value, scope=scope)
             )
+        if self.cancelled:
+            return
 
-            issues: List[ScanIssue] = []
-            scope = "System/User"  # Default, difficult to determine exact scope without platform-specific calls
-
-            # Check for sensitive information
-            if any(keyword in name.upper() for keyword in SENSITIVE_ENV_VARS):
-                issues.append(
-                    ScanIssue(
-                        severity="Warning",
-                        description=f"Environment variable '{name}' might contain sensitive information.",
-                        category="Security",
-                        related_path=None,
-                        component_id=None,
-                    )
-                )
-
-            # Check PATH for invalid entries
-            if name.upper() == "PATH":
-                paths = value.split(os.pathsep)
-                for i, path_entry in enumerate(paths):
-                    if not path_entry:
-                        continue  # Skip empty entries
-                    # Check if path exists and is a directory
-                    try:
-                        if not os.path.exists(path_entry):
-                            issues.append(
-                                ScanIssue(
-                                    severity="Warning",
-                                    description=f"PATH entry '{path_entry}' does not exist.",
-                                    category="Configuration",
-                                    related_path=path_entry,
-                                    component_id=None,
-                                )
-                            )
-                        elif not os.path.isdir(path_entry):
-                            issues.append(
-                                ScanIssue(
-                                    severity="Info",
-                                    description=f"PATH entry '{path_entry}' exists but is not a directory.",
-                                    category="Configuration",
-                                    related_path=path_entry,
-                                    component_id=None,
-                                )
-                            )
-                    except Exception as e:
-                        logger.warning(f"Error checking PATH entry '{path_entry}': {e}")
-                        issues.append(
-                            ScanIssue(
-                                severity="Warning",
-                                description=f"Could not validate PATH entry '{path_entry}': {e}",
-                                category="Configuration",
-                                related_path=path_entry,
-                                component_id=None,
-                            )
-                        )
+        findings = self.env_rule_engine.evaluate(
+            env_vars_dict, self.fs, progress=self._update_progress
+        )
+        for finding in findings:
+            self._add_issue(self._issue_from_finding(finding))
+        logger.debug(
+            f"Environment rules: {len(env_vars_dict)} variables, {len(findings)} distinct issues."
+        )
+        self._update_status("Environment variables collected.")
 
-            env_var_info = EnvironmentVariableInfo(name=name, value=value, scope=scope)
-            self.environment_variables.append(env_var_info)
-            # Analyze each variable for issues
-            var_issues = self._analyze_env_var_for_issues(name, value, scope)
-            self.issues.extend(var_issues)
-
-            processed_count += 1
-            if processed_count % 20 == 0:  # Update progress every 20 variables
-                self._update_progress(
-                    processed_count,
-                    total_env_vars,
-                    f"Processed {processed_count} environment variables.",
-                )
+    def cross_reference_and_analyze(self):
+        """
+        Joins detected components with PATH and the environment variables:
+        PATH shadowing, home variables and duplicate/conflicting installs
+        (see cross_reference.py).
+        """
+        self.path_shadowing = {}
+        if not self.scan_options.get("cross_reference_tools", True):
+            return
+        self._update_status("Cross-referencing tools with PATH and environment...")
+        tool_executables: Dict[str, List[str]] = {}
+        for tool in self.tools_db.view(self.system).tools if self.tools_db else []:
+            tool_executables.setdefault(tool.name, []).extend(tool.executables)
+        analyzer = CrossReferenceAnalyzer(
+            self.detected_components,
+            {var.name: var.value for var in self.environment_variables},
+            self._get_path_index(),
+            filesystem=self.fs,
+            tool_executables=tool_executables,
+        )
+        findings = analyzer.run()
+        for name, chain in analyzer.shadowing.items():
+            self.path_shadowing[name] = chain.paths
+        by_id = {c.id: c for c in self.detected_components}
+        for name, chain in analyzer.shadowing.items():
+            winner = by_id.get(chain.winner.component_id)
+            if winner is not None and len(chain.entries) > 1:
+                winner.details.setdefault("path_shadowing", {})[name] = chain.paths
+        for finding in findings:
+            self._add_issue(self._issue_from_cross_reference(finding))
+        logger.debug(
+            f"Cross-reference: {len(self.path_shadowing)} executable names on PATH, {len(findings)} issues."
+        )
+        self._update_status("Cross-reference complete.")
+
+    @staticmethod
+    def _issue_from_cross_reference(finding: CrossReferenceFinding) -> ScanIssue:
+        return ScanIssue(
+            severity=finding.severity,
+            description=finding.description,
+            category=finding.category,
+            component_id=finding.component_id,
+            related_path=finding.related_path,
+        )
 
-        self._update_status("Environment variables collected.")
+    def _update_snapshot(self):
+        """Diffs this scan against the baseline snapshot and persists it as the new baseline."""
+        snapshot = ScanSnapshot.capture(
+            self.detected_components,
+            self.issues,
+            {
+                path: {k: v for k, v in entry.items() if k != "reused"}
+                for path, entry in self._probed_executables.items()
+            },
+            os.environ,
+        )
+        self.change_set = snapshot.diff(self.baseline_snapshot)
+        reused = sum(1 for entry in self._probed_executables.values() if entry["reused"])
+        self.change_set.reused = reused
+        self.change_set.reprobed = len(self._probed_executables) - reused
+        logger.info(f"Changes since the last scan: {self.change_set.summary()}")
+        snapshot.save(self.snapshot_path)
+        self.baseline_snapshot = snapshot
 
     def run_scan(self):
         """
         Executes the full environment scan.
         """
+        self._cancel_requested.clear()
+        return self._run_scan()
+
+    def run_incremental_scan(self):
+        """
+        Like run_scan, but also returns the change set against the previous
+        scan's snapshot (None if incremental scans are disabled or the scan
+        was cancelled).
+        """
+        components, env_vars, issues = self.run_scan()
+        return components, env_vars, issues, self.change_set
+
+    def _run_scan(self):
+        self.events.publish("scan_started")
         self._update_status("Starting environment scan...")
         self.detected_components.clear()
         self.environment_variables.clear()
         self.issues.clear()
         self.found_executables.clear()
+        self.path_index = None  # PATH may have changed since the last scan
+        self.discovery = None
+        self.path_shadowing = {}
+        self.package_only_tools = []
+        self.version_sources.clear()
+        self.fs.clear()
+        self.change_set = None
+        self._probed_executables = {}
+        self._probe_env_hash = probe_environment_hash(os.environ)
+        if self.incremental_scan:
+            self.baseline_snapshot = ScanSnapshot.load(self.snapshot_path)
+        self.update_stage = (
+            UpdateCheckStage(self.scan_options, self.system, self._on_update_info)
+            if self.scan_options.get("perform_update_checks", True)
+            else None
+        )
 
-        # Phase 1: Identify known tools from the database
+        # Phase 1: Identify known tools from the database, then every version
+        # installed through a version manager (not only the one on PATH), and
+        # the packages installed into each of them
         self.identify_tools()
+        if not self.cancelled:
+            self.identify_managed_installs()
+        if not self.cancelled:
+            self.collect_ecosystem_packages()
 
         # Phase 2: Analyze environment variables
-        self.collect_environment_variables()
-
-        # Phase 3: Cross-reference and analyze findings
-        # self.cross_reference_and_analyze() # This phase is not yet implemented
-
-        self._update_status("Scan complete.")
-        logger.info("Full scan process finished.")
+        if not self.cancelled:
+            self.collect_environment_variables()
+
+        # Phase 3: Cross-reference components with PATH and the environment
+        if not self.cancelled:
+            self.cross_reference_and_analyze()
+
+        # Phase 4: Update checks, queried since the first component was detected
+        self.finish_update_checks()
+
+        cancelled = self.cancelled
+        if self.incremental_scan and not cancelled:
+            self._update_snapshot()
+        self._update_status("Scan cancelled." if cancelled else "Scan complete.")
+        self.events.publish(
+            "scan_finished",
+            components=len(self.detected_components),
+            environment_variables=len(self.environment_variables),
+            issues=len(self.issues),
+            cancelled=cancelled,
+        )
+        logger.info(f"Filesystem cache: {self.fs.summary()}")
+        logger.info("Full scan process cancelled." if cancelled else "Full scan process finished.")
         # The main 'systemsage_main.py' seems to expect these three lists.
         # Let's ensure empty ones are returned for now for any logic not yet ported.
         return self.detected_components, self.environment_variables, self.issues
+
+    def iter_scan(
+        self, cancel_event: Optional[threading.Event] = None
+    ) -> Iterator[ScanResult]:
+        """
+        Runs the scan on a worker thread and yields every DetectedComponent,
+        EnvironmentVariableInfo and ScanIssue as soon as it is found.
+
+        The scan is cancelled when `cancel_event` is set or when the consumer
+        stops iterating early (closing the generator); the iterator then ends
+        after the results found so far. Exceptions raised by the scan are
+        re-raised here once the results found before them have been yielded.
+        The lists run_scan returns are filled in as usual.
+        """
+        self._cancel_requested.clear()
+        results = []
+        subscription = self.events.subscribe(results.append, kinds=RESULT_EVENT_KINDS)
+        failure: List[BaseException] = []
+
+        def worker():
+            try:
+                self._run_scan()
+            except BaseException as e:
+                failure.append(e)
+
+        thread = threading.Thread(target=worker, name="environment-scan", daemon=True)
+        thread.start()
+        try:
+            while True:
+                finished = not thread.is_alive()
+                subscription.drain()
+                for event in results:
+                    yield event.data[event.kind]
+                results.clear()
+                if finished:
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    self.cancel()
+                subscription.wait(PROBE_POLL_INTERVAL)
+        finally:
+            if thread.is_alive():
+                self.cancel()  # Consumer stopped early
+                thread.join()
+            self.events.unsubscribe(subscription)
+        if failure:
+            raise failure[0]
+
+    async def aiter_scan(
+        self, cancel_event: Optional[threading.Event] = None
+    ) -> AsyncIterator[ScanResult]:
+        """
+        Async counterpart of iter_scan. Cancelling the consuming task (or
+        leaving the `async for` early) cancels the scan.
+        """
+        loop = asyncio.get_running_loop()
+        results = self.iter_scan(cancel_event)
+        done = object()
+        # One thread, so closing the iterator waits for any in-flight next().
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="environment-scan-async"
+        )
+        exhausted = False
+        try:
+            while True:
+                item = await loop.run_in_executor(executor, next, results, done)
+                if item is done:
+                    exhausted = True
+                    break
+                yield item
+        finally:
+            if not exhausted:
+                self.cancel()
+            executor.submit(results.close)
+            executor.shutdown(wait=False)
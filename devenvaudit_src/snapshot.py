@@ -0,0 +1,281 @@
+"""
+Persisted snapshot of the last DevEnvAudit scan, for incremental audits.
+
+The snapshot is stored in 'devenv_audit_snapshot.json' (next to
+'devenvaudit_config.json') and records:
+
+* for every probed executable, its (resolved path, size, mtime, inode)
+  signature, the probe arguments/regex and a hash of the environment
+  variables that can change what the probe reports (PROBE_ENV_VARS: PATH for
+  shims, PYENV_VERSION, JAVA_HOME, ...), together with the version found;
+* a hash of the whole environment;
+* the detected tools and the issues of that scan.
+
+The next scan reuses a version only while the executable's signature, the
+probe definition and the relevant environment are all unchanged, so only
+tools whose binaries or environment changed are probed again. Comparing the
+previous snapshot with the new one gives a ChangeSet: added, removed and
+upgraded tools, new and resolved issues.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .config_manager import CONFIG_DIR_PATH
+from .versions import version_key
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE_NAME = "devenv_audit_snapshot.json"
+SNAPSHOT_FILE_PATH = os.path.join(CONFIG_DIR_PATH, SNAPSHOT_FILE_NAME)
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Variables whose value can change the version a probe reports without the
+# probed file changing (version manager shims, *_HOME wrappers, virtualenvs).
+PROBE_ENV_VARS = (
+    "PATH",
+    "PATHEXT",
+    "PYENV_VERSION",
+    "VIRTUAL_ENV",
+    "CONDA_PREFIX",
+    "NODE_VERSION",
+    "NVM_BIN",
+    "JAVA_HOME",
+    "GOROOT",
+    "RUSTUP_TOOLCHAIN",
+    "RBENV_VERSION",
+    "ASDF_DEFAULT_TOOL_VERSIONS_FILENAME",
+)
+# asdf reads per-tool overrides such as ASDF_PYTHON_VERSION
+_PROBE_ENV_PATTERN = re.compile(r"^ASDF_[A-Z0-9_]+_VERSION$")
+
+
+def _hash(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def environment_hash(environ: Mapping[str, str]) -> str:
+    """Hash of the whole environment."""
+    return _hash(dict(environ))
+
+
+def probe_environment_hash(environ: Mapping[str, str]) -> str:
+    """Hash of the variables that can change what a version probe reports."""
+    relevant = {
+        name: value
+        for name, value in environ.items()
+        if name in PROBE_ENV_VARS or _PROBE_ENV_PATTERN.match(name)
+    }
+    return _hash(relevant)
+
+
+def probe_key(
+    signature: Sequence[Any], version_args: Sequence[str], version_regex: str, probe_env: str
+) -> str:
+    """Identifies one probe of one executable under one environment."""
+    return _hash([list(signature), list(version_args), version_regex, probe_env])
+
+
+def _tool_key(tool: Mapping[str, Any]) -> str:
+    return f"{tool.get('name')}|{tool.get('executable_path')}"
+
+
+def _issue_key(issue: Mapping[str, Any]) -> str:
+    # Occurrence counts may change between scans without the issue changing.
+    return _hash(
+        [
+            issue.get("severity"),
+            issue.get("category"),
+            issue.get("description"),
+            issue.get("component_id"),
+            issue.get("related_path"),
+        ]
+    )
+
+
+def _version_key(version: Optional[str]) -> Optional[tuple]:
+    # "Unknown" and other versions without a number can't be ordered
+    return version_key(version, "generic") if version and re.search(r"\d", version) else None
+
+
+@dataclass
+class ToolChange:
+    name: str
+    executable_path: Optional[str]
+    old_version: Optional[str] = None
+    new_version: Optional[str] = None
+    component_id: Optional[str] = None
+
+
+@dataclass
+class ChangeSet:
+    """Differences between two scans. `baseline_taken_at` is None for a first scan."""
+
+    baseline_taken_at: Optional[float] = None
+    added: List[ToolChange] = field(default_factory=list)
+    removed: List[ToolChange] = field(default_factory=list)
+    upgraded: List[ToolChange] = field(default_factory=list)
+    downgraded: List[ToolChange] = field(default_factory=list)
+    new_issues: List[Dict[str, Any]] = field(default_factory=list)
+    resolved_issues: List[Dict[str, Any]] = field(default_factory=list)
+    reprobed: int = 0  # Executables whose version was probed this scan
+    reused: int = 0  # Executables whose version came from the snapshot
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.added
+            or self.removed
+            or self.upgraded
+            or self.downgraded
+            or self.new_issues
+            or self.resolved_issues
+        )
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.removed)} removed, "
+            f"{len(self.upgraded)} upgraded, {len(self.downgraded)} downgraded tools; "
+            f"{len(self.new_issues)} new, {len(self.resolved_issues)} resolved issues "
+            f"({self.reprobed} probed, {self.reused} reused)"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ScanSnapshot:
+    """The persisted state of one scan."""
+
+    def __init__(
+        self,
+        taken_at: Optional[float] = None,
+        environment_hash: str = "",
+        probe_environment_hash: str = "",
+        executables: Optional[Dict[str, Dict[str, Any]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        issues: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self.environment_hash = environment_hash
+        self.probe_environment_hash = probe_environment_hash
+        # executable path -> {"signature", "probe_key", "version", "version_source"}
+        self.executables: Dict[str, Dict[str, Any]] = executables or {}
+        self.tools: List[Dict[str, Any]] = tools or []
+        self.issues: List[Dict[str, Any]] = issues or []
+
+    @classmethod
+    def capture(
+        cls,
+        components: Iterable[Any],
+        issues: Iterable[Any],
+        executables: Dict[str, Dict[str, Any]],
+        environ: Mapping[str, str],
+    ) -> "ScanSnapshot":
+        """Builds a snapshot from a finished scan's components and issues."""
+        return cls(
+            environment_hash=environment_hash(environ),
+            probe_environment_hash=probe_environment_hash(environ),
+            executables=dict(executables),
+            tools=[
+                {
+                    "id": c.id,
+                    "name": c.name,
+                    "version": c.version,
+                    "executable_path": c.executable_path,
+                }
+                for c in components
+            ],
+            issues=[issue.to_dict() for issue in issues],
+        )
+
+    def reusable_version(self, exe_path: str, key: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Returns (found, version, version source) if `exe_path` was probed with the same key."""
+        entry = self.executables.get(exe_path)
+        if entry is None or entry.get("probe_key") != key:
+            return False, None, None
+        return True, entry.get("version"), entry.get("version_source")
+
+    def diff(self, previous: Optional["ScanSnapshot"]) -> ChangeSet:
+        """Change set from `previous` (the older snapshot) to this one."""
+        changes = ChangeSet(baseline_taken_at=previous.taken_at if previous else None)
+        old_tools = {_tool_key(t): t for t in (previous.tools if previous else [])}
+        new_tools = {_tool_key(t): t for t in self.tools}
+        for key, tool in new_tools.items():
+            old = old_tools.get(key)
+            if old is None:
+                changes.added.append(
+                    ToolChange(tool["name"], tool["executable_path"], None, tool["version"], tool["id"])
+                )
+            elif old.get("version") != tool.get("version"):
+                change = ToolChange(
+                    tool["name"], tool["executable_path"], old.get("version"), tool["version"], tool["id"]
+                )
+                old_key, new_key = _version_key(change.old_version), _version_key(change.new_version)
+                if old_key is not None and new_key is not None and new_key < old_key:
+                    changes.downgraded.append(change)
+                else:
+                    changes.upgraded.append(change)
+        for key, tool in old_tools.items():
+            if key not in new_tools:
+                changes.removed.append(
+                    ToolChange(tool["name"], tool["executable_path"], tool["version"], None, tool.get("id"))
+                )
+        old_issues = {_issue_key(i): i for i in (previous.issues if previous else [])}
+        new_issues = {_issue_key(i): i for i in self.issues}
+        changes.new_issues = [i for k, i in new_issues.items() if k not in old_issues]
+        changes.resolved_issues = [i for k, i in old_issues.items() if k not in new_issues]
+        return changes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": SNAPSHOT_FORMAT_VERSION,
+            "taken_at": self.taken_at,
+            "environment_hash": self.environment_hash,
+            "probe_environment_hash": self.probe_environment_hash,
+            "executables": self.executables,
+            "tools": self.tools,
+            "issues": self.issues,
+        }
+
+    @classmethod
+    def load(cls, path: str = SNAPSHOT_FILE_PATH) -> Optional["ScanSnapshot"]:
+        """Loads a snapshot; a missing, unreadable or outdated file yields None."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != SNAPSHOT_FORMAT_VERSION:
+                logger.info(f"Ignoring scan snapshot {path} with unsupported format.")
+                return None
+            return cls(
+                taken_at=data.get("taken_at"),
+                environment_hash=data.get("environment_hash", ""),
+                probe_environment_hash=data.get("probe_environment_hash", ""),
+                executables=dict(data.get("executables", {})),
+                tools=list(data.get("tools", [])),
+                issues=list(data.get("issues", [])),
+            )
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Could not read scan snapshot {path}: {e}")
+            return None
+
+    def save(self, path: str = SNAPSHOT_FILE_PATH) -> bool:
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not write scan snapshot {path}: {e}")
+            return False
+        logger.debug(f"Scan snapshot saved to {path} ({len(self.executables)} executables).")
+        return True
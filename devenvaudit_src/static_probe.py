@@ -0,0 +1,327 @@
+"""
+Static version extraction from executables, without running them.
+
+Running `<tool> --version` is the slowest part of an audit and executes
+whatever binary happens to be on disk. Most release builds carry their version
+as data, so `static_version` memory-maps the file and looks there first:
+
+* PE (Windows) files: the VS_VERSIONINFO resource, parsed in pure Python so it
+  works on any OS. ProductVersion, then FileVersion from the StringFileInfo
+  table, then the numeric VS_FIXEDFILEINFO product version.
+* ELF files: the upstream part of the FDO packaging metadata note's version
+  (`.note.package`, JSON written by distribution builds; '1:2.39.2-1' ->
+  '2.39.2'), then the tool's version regex run over `.rodata`.
+* PE files without a version resource: the version regex over `.rdata`.
+  A section scan only counts if all its matches capture the same version.
+
+Only a few header bytes and the searched sections are paged in. Anything
+unexpected in the file (truncated headers, offsets out of range) makes the
+probe return None, and the caller falls back to running the process.
+"""
+
+import functools
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Pattern, Tuple, Union
+
+from .versions import upstream_version
+
+logger = logging.getLogger(__name__)
+
+MAX_SCAN_BYTES = 32 * 1024 * 1024  # Cap on the data section searched with the regex
+
+RT_VERSION = 16
+VS_FIXEDFILEINFO_SIGNATURE = 0xFEEF04BD
+FDO_PACKAGING_NOTE_TYPE = 0xCAFE1A7E
+SHT_NOTE = 7
+
+_VERSION_STRING_RE = re.compile(r"\d+(?:\s*[.,]\s*\d+)+(?:[-+.]?[0-9A-Za-z]+)*")
+
+
+@dataclass(frozen=True)
+class StaticVersion:
+    version: str
+    method: str  # "pe-versioninfo", "elf-package-note" or "section-scan"
+
+
+@functools.lru_cache(maxsize=256)
+def _bytes_pattern(pattern: str, flags: int) -> Optional[Pattern]:
+    try:
+        return re.compile(pattern.encode("utf-8"), flags & ~re.UNICODE)
+    except re.error:
+        return None
+
+
+def _as_bytes_regex(version_regex: Union[str, Pattern, None]) -> Optional[Pattern]:
+    if version_regex is None:
+        return None
+    if isinstance(version_regex, str):
+        return _bytes_pattern(version_regex, re.MULTILINE | re.IGNORECASE)
+    if isinstance(version_regex.pattern, bytes):
+        return version_regex
+    return _bytes_pattern(version_regex.pattern, version_regex.flags)
+
+
+def _search_regex(data, regex: Pattern, start: int, end: int) -> Optional[str]:
+    """
+    The version captured by `regex` in data[start:end], if every match agrees.
+    Data sections also hold messages like "deprecated since Python 3.6", so
+    several distinct candidates mean the scan can't tell and returns None.
+    """
+    end = min(end, start + MAX_SCAN_BYTES, len(data))
+    found = set()
+    for match in regex.finditer(data, start, end):
+        if match.groups() and match.group(1):
+            found.add(match.group(1).strip())
+            if len(found) > 1:
+                return None
+    if found:
+        return found.pop().decode("utf-8", errors="replace")
+    return None
+
+
+def _normalize_version_string(value: str) -> Optional[str]:
+    match = _VERSION_STRING_RE.search(value)
+    if not match:
+        return None
+    return re.sub(r"\s*[.,]\s*", ".", match.group(0))
+
+
+# --- PE ---
+
+
+def _align4(offset: int) -> int:
+    return (offset + 3) & ~3
+
+
+def _pe_sections(data, pe_offset: int) -> Tuple[int, list]:
+    """Returns (resource directory RVA, [(name, rva, virtual size, raw offset, raw size)])."""
+    number_of_sections, = struct.unpack_from("<H", data, pe_offset + 6)
+    optional_size, = struct.unpack_from("<H", data, pe_offset + 20)
+    optional = pe_offset + 24
+    magic, = struct.unpack_from("<H", data, optional)
+    if magic == 0x10B:  # PE32
+        count_offset, directories = optional + 92, optional + 96
+    elif magic == 0x20B:  # PE32+
+        count_offset, directories = optional + 108, optional + 112
+    else:
+        raise ValueError(f"unknown optional header magic {magic:#x}")
+    directory_count, = struct.unpack_from("<I", data, count_offset)
+    resource_rva = 0
+    if directory_count > 2:
+        resource_rva, _ = struct.unpack_from("<II", data, directories + 2 * 8)
+    sections = []
+    table = optional + optional_size
+    for i in range(number_of_sections):
+        name, vsize, rva, raw_size, raw_offset = struct.unpack_from(
+            "<8sIIII", data, table + 40 * i
+        )
+        sections.append((name.rstrip(b"\0").decode("ascii", "replace"), rva, vsize, raw_offset, raw_size))
+    return resource_rva, sections
+
+
+def _rva_to_offset(rva: int, sections) -> Optional[int]:
+    for _, section_rva, vsize, raw_offset, raw_size in sections:
+        if section_rva <= rva < section_rva + max(vsize, raw_size):
+            return raw_offset + (rva - section_rva)
+    return None
+
+
+def _resource_entries(data, base: int, directory: int) -> Iterator[Tuple[int, bool, int]]:
+    """Yields (name or id, is subdirectory, offset relative to the resource base)."""
+    named, ids = struct.unpack_from("<HH", data, base + directory + 12)
+    for i in range(named + ids):
+        name, target = struct.unpack_from("<II", data, base + directory + 16 + 8 * i)
+        yield name, bool(target & 0x80000000), target & 0x7FFFFFFF
+
+
+def _find_version_resource(data, resource_rva: int, sections) -> Optional[Tuple[int, int]]:
+    base = _rva_to_offset(resource_rva, sections)
+    if base is None:
+        return None
+    for type_id, is_dir, type_dir in _resource_entries(data, base, 0):
+        if type_id != RT_VERSION or not is_dir:
+            continue
+        for _, name_is_dir, name_dir in _resource_entries(data, base, type_dir):
+            if not name_is_dir:
+                continue
+            for _, lang_is_dir, data_entry in _resource_entries(data, base, name_dir):
+                if lang_is_dir:
+                    continue
+                rva, size = struct.unpack_from("<II", data, base + data_entry)
+                offset = _rva_to_offset(rva, sections)
+                if offset is not None:
+                    return offset, size
+    return None
+
+
+def _read_version_block(data, offset: int, limit: int):
+    """Returns (key, value bytes, value type, children offset, block end) of a VS_VERSIONINFO node."""
+    length, value_length, value_type = struct.unpack_from("<HHH", data, offset)
+    end = offset + length
+    if length < 6 or end > limit:
+        raise ValueError("version block out of range")
+    key_end = offset + 6
+    while key_end + 1 < end and data[key_end : key_end + 2] != b"\0\0":
+        key_end += 2
+    key = bytes(data[offset + 6 : key_end]).decode("utf-16-le", errors="replace")
+    value_start = _align4(key_end + 2)
+    value_size = value_length * 2 if value_type == 1 else value_length
+    value = bytes(data[value_start : min(value_start + value_size, end)])
+    return key, value, value_type, _align4(value_start + value_size), end
+
+
+def parse_version_info(data, offset: int = 0, size: Optional[int] = None) -> Dict[str, str]:
+    """
+    Parses a VS_VERSIONINFO structure. Returns its StringFileInfo strings plus
+    "FixedProductVersion"/"FixedFileVersion" from VS_FIXEDFILEINFO.
+    """
+    limit = len(data) if size is None else min(len(data), offset + size)
+    key, value, _, children, end = _read_version_block(data, offset, limit)
+    if key != "VS_VERSION_INFO":
+        raise ValueError(f"unexpected version resource key {key!r}")
+    result: Dict[str, str] = {}
+    if len(value) >= 52:
+        fields = struct.unpack_from("<13I", value)
+        if fields[0] == VS_FIXEDFILEINFO_SIGNATURE:
+            file_ms, file_ls, product_ms, product_ls = fields[2:6]
+            result["FixedFileVersion"] = f"{file_ms >> 16}.{file_ms & 0xFFFF}.{file_ls >> 16}.{file_ls & 0xFFFF}"
+            result["FixedProductVersion"] = f"{product_ms >> 16}.{product_ms & 0xFFFF}.{product_ls >> 16}.{product_ls & 0xFFFF}"
+
+    def walk(start: int, stop: int, depth: int, in_strings: bool):
+        position = start
+        while position + 6 <= stop:
+            key, value, value_type, children, block_end = _read_version_block(data, position, stop)
+            if depth == 2 and in_strings:
+                result.setdefault(key, value.decode("utf-16-le", errors="replace").rstrip("\0"))
+            elif depth < 2:
+                walk(children, block_end, depth + 1, in_strings or key == "StringFileInfo")
+            position = _align4(block_end)
+
+    walk(children, end, 0, False)
+    return result
+
+
+def _probe_pe(data, regex: Optional[Pattern]) -> Optional[StaticVersion]:
+    pe_offset, = struct.unpack_from("<I", data, 0x3C)
+    if data[pe_offset : pe_offset + 4] != b"PE\0\0":
+        return None
+    resource_rva, sections = _pe_sections(data, pe_offset)
+    if resource_rva:
+        location = _find_version_resource(data, resource_rva, sections)
+        if location is not None:
+            info = parse_version_info(data, *location)
+            for key in ("ProductVersion", "FileVersion", "FixedProductVersion"):
+                version = _normalize_version_string(info.get(key, ""))
+                if version:
+                    return StaticVersion(version, "pe-versioninfo")
+    if regex is not None:
+        for name, _, _, raw_offset, raw_size in sections:
+            if name == ".rdata":
+                version = _search_regex(data, regex, raw_offset, raw_offset + raw_size)
+                if version:
+                    return StaticVersion(version, "section-scan")
+    return None
+
+
+# --- ELF ---
+
+
+def _elf_sections(data) -> Dict[str, Tuple[int, int, int]]:
+    """Returns {section name: (type, file offset, size)}."""
+    elf_class, byte_order = data[4], data[5]
+    endian = "<" if byte_order == 1 else ">"
+    if elf_class == 2:
+        shoff, = struct.unpack_from(endian + "Q", data, 0x28)
+        shentsize, shnum, shstrndx = struct.unpack_from(endian + "HHH", data, 0x3A)
+        header = endian + "IIQQQQ"
+    elif elf_class == 1:
+        shoff, = struct.unpack_from(endian + "I", data, 0x20)
+        shentsize, shnum, shstrndx = struct.unpack_from(endian + "HHH", data, 0x2E)
+        header = endian + "IIIIII"
+    else:
+        raise ValueError(f"unknown ELF class {elf_class}")
+    raw = []
+    for i in range(shnum):
+        name, sh_type, _, _, offset, size = struct.unpack_from(header, data, shoff + i * shentsize)
+        raw.append((name, sh_type, offset, size))
+    if not raw or shstrndx >= len(raw):
+        return {}
+    strtab_offset = raw[shstrndx][2]
+    sections = {}
+    for name, sh_type, offset, size in raw:
+        start = strtab_offset + name
+        end = data.find(b"\0", start)
+        if end == -1:
+            continue
+        sections[bytes(data[start:end]).decode("ascii", "replace")] = (sh_type, offset, size)
+    return sections
+
+
+def _elf_notes(data, offset: int, size: int, endian: str) -> Iterator[Tuple[bytes, int, bytes]]:
+    position, end = offset, min(offset + size, len(data))
+    while position + 12 <= end:
+        namesz, descsz, note_type = struct.unpack_from(endian + "III", data, position)
+        name_start = position + 12
+        desc_start = name_start + _align4(namesz)
+        desc_end = desc_start + descsz
+        if desc_end > end:
+            return
+        yield bytes(data[name_start : name_start + namesz]).rstrip(b"\0"), note_type, bytes(data[desc_start:desc_end])
+        position = desc_start + _align4(descsz)
+
+
+def _package_note_version(note: Dict) -> Optional[str]:
+    """The upstream version of a `.note.package` ('2.43.0-1.fc39' -> '2.43.0'), None if it isn't one."""
+    version = note.get("version")
+    if not isinstance(version, str) or not version:
+        return None
+    upstream = upstream_version(version, "rpm" if note.get("type") == "rpm" else "debian")
+    return upstream if _VERSION_STRING_RE.fullmatch(upstream) else None
+
+
+def _probe_elf(data, regex: Optional[Pattern]) -> Optional[StaticVersion]:
+    endian = "<" if data[5] == 1 else ">"
+    sections = _elf_sections(data)
+    for sh_type, offset, size in sections.values():
+        if sh_type != SHT_NOTE:
+            continue
+        for name, note_type, desc in _elf_notes(data, offset, size, endian):
+            if name == b"FDO" and note_type == FDO_PACKAGING_NOTE_TYPE:
+                try:
+                    version = _package_note_version(json.loads(desc.rstrip(b"\0").decode("utf-8")))
+                except (ValueError, AttributeError):
+                    continue
+                if version:
+                    return StaticVersion(str(version), "elf-package-note")
+    if regex is not None and ".rodata" in sections:
+        _, offset, size = sections[".rodata"]
+        version = _search_regex(data, regex, offset, offset + size)
+        if version:
+            return StaticVersion(version, "section-scan")
+    return None
+
+
+def static_version(
+    exe_path: str, version_regex: Union[str, Pattern, None] = None
+) -> Optional[StaticVersion]:
+    """Reads the version of a PE or ELF executable without running it; None if not found."""
+    regex = _as_bytes_regex(version_regex)
+    try:
+        with open(exe_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < 64:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                magic = data[:4]
+                if magic[:2] == b"MZ":
+                    return _probe_pe(data, regex)
+                if magic == b"\x7fELF":
+                    return _probe_elf(data, regex)
+    except (OSError, ValueError, struct.error, IndexError, UnicodeDecodeError) as e:
+        logger.debug(f"Static version probe of {exe_path} failed: {e}")
+    return None
@@ -0,0 +1,261 @@
+"""
+Compiled representation of DevEnvAudit's 'tools_database.json'.
+
+The JSON list of tool definitions is turned into a `CompiledToolsDB` holding,
+per operating system, the executable names and install paths of each tool,
+an inverted index from executable name to the tools that ship it, and the
+tools' version regexes compiled once. The parsed definitions and the per-OS
+indexes are cached with `marshal` in 'tools_database.json.cache' next to the
+JSON file; the cache is only used while its header matches the cache format,
+the running Python's marshal format and the size and mtime of the JSON
+source, and is rebuilt otherwise.
+"""
+
+import json
+import logging
+import marshal
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOOLS_DB_PATH = os.path.join(os.path.dirname(__file__), "tools_database.json")
+TOOLS_DB_CACHE_SUFFIX = ".cache"
+CACHE_MAGIC = "systemsage-tools-db"
+CACHE_FORMAT_VERSION = 1
+
+SUPPORTED_SYSTEMS = ("Windows", "Linux", "Darwin")
+DEFAULT_VERSION_ARGS = ["--version"]
+DEFAULT_VERSION_REGEX = r"([0-9]+\.[0-9]+(?:\.[0-9]+)?)"
+
+
+@dataclass
+class CompiledTool:
+    """A tool definition with its OS-specific fields resolved and regex compiled."""
+
+    index: int
+    config: Dict[str, Any]
+    executables: Tuple[str, ...] = ()
+    install_paths: Tuple[str, ...] = ()
+    version_args: Tuple[str, ...] = tuple(DEFAULT_VERSION_ARGS)
+    version_regex: Optional[Pattern] = None
+
+    @property
+    def id(self) -> str:
+        return self.config.get("id", "")
+
+    @property
+    def name(self) -> str:
+        return self.config.get("name", "UnknownTool")
+
+
+@dataclass
+class ToolsDBView:
+    """The tools DB as seen from one operating system."""
+
+    system: str
+    tools: List[CompiledTool] = field(default_factory=list)
+    by_executable: Dict[str, List[CompiledTool]] = field(default_factory=dict)
+
+    def _key(self, exe_name: str) -> str:
+        return exe_name.lower() if self.system == "Windows" else exe_name
+
+    def tools_for_executable(self, exe_name: str) -> List[CompiledTool]:
+        """Returns the tools that list `exe_name` as one of their executables."""
+        return self.by_executable.get(self._key(exe_name), [])
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+
+def _system_executables(config: Dict[str, Any], system: str) -> List[str]:
+    executables = config.get("executables", {}).get(system, [])
+    # Non-Windows systems without their own list fall back to the Linux names.
+    if not executables and system != "Windows":
+        executables = config.get("executables", {}).get("Linux", [])
+    return list(executables)
+
+
+def _build_view_index(configs: List[Dict[str, Any]], system: str) -> Dict[str, Any]:
+    """Builds the marshal-able per-OS index: executables, install paths, name -> tool indices."""
+    executables = []
+    install_paths = []
+    by_executable: Dict[str, List[int]] = {}
+    for i, config in enumerate(configs):
+        names = _system_executables(config, system)
+        executables.append(names)
+        install_paths.append(list(config.get("install_paths", {}).get(system, [])))
+        for name in names:
+            key = name.lower() if system == "Windows" else name
+            indices = by_executable.setdefault(key, [])
+            if i not in indices:
+                indices.append(i)
+    return {
+        "executables": executables,
+        "install_paths": install_paths,
+        "by_executable": by_executable,
+    }
+
+
+def _compile_regex(config: Dict[str, Any]) -> Optional[Pattern]:
+    regex_str = config.get("version_regex", DEFAULT_VERSION_REGEX)
+    try:
+        # Same flags _parse_version_output applies to uncompiled regexes.
+        return re.compile(regex_str, re.MULTILINE | re.IGNORECASE)
+    except (re.error, TypeError) as e:
+        logger.error(
+            f"Invalid version_regex for tool '{config.get('id', '?')}': {regex_str!r} ({e})"
+        )
+        return None
+
+
+class CompiledToolsDB:
+    """Tool definitions plus per-OS views with an executable-name index."""
+
+    def __init__(
+        self,
+        configs: List[Dict[str, Any]],
+        view_indexes: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.configs = configs
+        self.view_indexes = view_indexes or {
+            system: _build_view_index(configs, system) for system in SUPPORTED_SYSTEMS
+        }
+        self._regexes = [_compile_regex(config) for config in configs]
+        self._views: Dict[str, ToolsDBView] = {}
+
+    def view(self, system: str) -> ToolsDBView:
+        """Returns the (memoized) view of the tools DB for `system`."""
+        view = self._views.get(system)
+        if view is not None:
+            return view
+        index = self.view_indexes.get(system)
+        if index is None:
+            index = _build_view_index(self.configs, system)
+            self.view_indexes[system] = index
+
+        view = ToolsDBView(system=system)
+        for i, config in enumerate(self.configs):
+            view.tools.append(
+                CompiledTool(
+                    index=i,
+                    config=config,
+                    executables=tuple(index["executables"][i]),
+                    install_paths=tuple(index["install_paths"][i]),
+                    version_args=tuple(config.get("version_args", DEFAULT_VERSION_ARGS)),
+                    version_regex=self._regexes[i],
+                )
+            )
+        view.by_executable = {
+            name: [view.tools[i] for i in indices]
+            for name, indices in index["by_executable"].items()
+        }
+        self._views[system] = view
+        return view
+
+    def __len__(self) -> int:
+        return len(self.configs)
+
+    def __bool__(self) -> bool:
+        return bool(self.configs)
+
+
+def compile_tools_db(configs: List[Dict[str, Any]]) -> CompiledToolsDB:
+    """Compiles an in-memory list of tool definitions (no cache involved)."""
+    return CompiledToolsDB(list(configs))
+
+
+def _cache_header(source_path: str) -> Optional[Tuple[Any, ...]]:
+    try:
+        st = os.stat(source_path)
+    except OSError:
+        return None
+    return (
+        CACHE_MAGIC,
+        CACHE_FORMAT_VERSION,
+        marshal.version,
+        sys.implementation.cache_tag,
+        st.st_size,
+        st.st_mtime_ns,
+    )
+
+
+def _read_cache(cache_path: str, header: Tuple[Any, ...]) -> Optional[CompiledToolsDB]:
+    try:
+        with open(cache_path, "rb") as f:
+            data = marshal.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        logger.info(f"Ignoring unreadable tools DB cache {cache_path}: {e}")
+        return None
+    if not isinstance(data, dict) or data.get("header") != header:
+        logger.debug(f"Tools DB cache {cache_path} is stale; rebuilding.")
+        return None
+    try:
+        return CompiledToolsDB(data["tools"], data["views"])
+    except (KeyError, TypeError, AttributeError) as e:
+        # A matching header over a different layout, e.g. a hand-edited cache
+        logger.info(f"Ignoring malformed tools DB cache {cache_path}: {e!r}")
+        return None
+
+
+def _write_cache(cache_path: str, header: Tuple[Any, ...], db: CompiledToolsDB):
+    data = {"header": header, "tools": db.configs, "views": db.view_indexes}
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            marshal.dump(data, f)
+        os.replace(tmp_path, cache_path)
+        logger.debug(f"Wrote tools DB cache to {cache_path}")
+    except (OSError, ValueError) as e:
+        # Read-only installs simply run without the cache.
+        logger.info(f"Could not write tools DB cache {cache_path}: {e}")
+
+
+def load_tools_db(
+    source_path: str = TOOLS_DB_PATH, use_cache: bool = True
+) -> CompiledToolsDB:
+    """
+    Loads and compiles the tools DB, preferring a valid marshal cache.
+    Errors reading the JSON yield an empty DB, as before.
+    """
+    cache_path = source_path + TOOLS_DB_CACHE_SUFFIX
+    header = _cache_header(source_path) if use_cache else None
+    if header is not None:
+        cached = _read_cache(cache_path, header)
+        if cached is not None:
+            logger.debug(f"Loaded {len(cached)} tools from cache {cache_path}")
+            return cached
+
+    try:
+        with open(source_path, "r", encoding="utf-8") as f:
+            configs = json.load(f)
+        if not isinstance(configs, list):
+            logger.error(
+                f"TOOLS_DB loaded from {source_path} is not a list. Defaulting to empty list."
+            )
+            configs = []
+    except FileNotFoundError:
+        logger.error(
+            f"Tools database file not found at {source_path}. TOOLS_DB will be empty."
+        )
+        configs = []
+    except json.JSONDecodeError as e:
+        logger.error(
+            f"Error decoding JSON from {source_path}: {e}. TOOLS_DB will be empty."
+        )
+        configs = []
+    except Exception as e:
+        logger.error(
+            f"Unexpected error loading {source_path}: {e}. TOOLS_DB will be empty."
+        )
+        configs = []
+
+    db = CompiledToolsDB(configs)
+    if header is not None and configs:
+        _write_cache(cache_path, header, db)
+    return db
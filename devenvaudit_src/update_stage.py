@@ -0,0 +1,225 @@
+"""
+Pipelined update checks for a running scan.
+
+EnvironmentScanner submits every component as soon as it is detected. The
+first component a package manager knows about starts a worker thread that
+detects the package managers and lists their installed packages while tool
+identification carries on; it then queries the latest versions of the
+submitted tools in small batches (see
+package_manager_integrator.get_latest_versions_and_update_commands), so the
+package managers run alongside the version probes instead of after them.
+Each result is handed to `on_result(component, update_info)` from the
+worker thread. The scan calls finish() once identification is done, which
+waits for the batches still in flight; the worker then lists the tools the
+package managers report as installed that the scan didn't detect
+(`package_only_tools`).
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config_manager import DEFAULT_CONFIG
+from .latest_version_cache import LatestVersionCache
+from .package_manager_integrator import (
+    DEFAULT_STAGE_TIMEOUT_SECONDS,
+    TOOL_TO_PM_PACKAGE_MAP,
+    PackageManagerExecutor,
+    _is_update_available,
+    build_installed_package_index,
+    detect_package_managers,
+    find_tools_installed_via_package_managers,
+    get_latest_versions_and_update_commands,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WINDOW_SECONDS = 0.25  # Submissions collected into one package-manager round
+DEFAULT_MAX_BATCH_SIZE = 64
+FINISH_POLL_INTERVAL = 0.1
+
+# Tool ids of the tools database / version managers -> TOOL_TO_PM_PACKAGE_MAP ids
+TOOL_ID_ALIASES = {"nodejs": "node"}
+
+_FINISHED = object()
+
+
+def preferred_package_managers(scan_options: Dict[str, Any], system: str) -> List[str]:
+    """The preferred_package_managers_<os> scan option for `system` ("Linux", "Windows", ...)."""
+    key = f"preferred_package_managers_{system.lower()}"
+    return list(scan_options.get(key, DEFAULT_CONFIG["scan_options"].get(key, [])))
+
+
+class UpdateCheckStage:
+    """Queues detected components and checks them for updates on a worker thread."""
+
+    def __init__(
+        self,
+        scan_options: Dict[str, Any],
+        system: str,
+        on_result: Callable[[Any, Dict[str, Any]], None],
+        batch_window: float = DEFAULT_BATCH_WINDOW_SECONDS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        self.scan_options = scan_options
+        self.preferred_pms = preferred_package_managers(scan_options, system)
+        self.on_result = on_result
+        self.batch_window = float(batch_window)
+        self.max_batch_size = max(1, int(max_batch_size))
+        # tool id -> update info of the first version queried, None if no manager knows the tool
+        self.by_tool: Dict[str, Optional[Dict[str, Any]]] = {}
+        # (tool id, installed version) -> update info
+        self.results: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        self.checked = 0
+        # Tools installed through a package manager that no submitted component matched
+        self.package_only_tools: List[Dict[str, Any]] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def package_tool_id(tool_id: Optional[str]) -> Optional[str]:
+        """The TOOL_TO_PM_PACKAGE_MAP id of `tool_id`, or None if no manager packages it."""
+        tool_id = TOOL_ID_ALIASES.get(tool_id, tool_id)
+        return tool_id if tool_id in TOOL_TO_PM_PACKAGE_MAP else None
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def submit(self, component, tool_id: Optional[str]) -> bool:
+        """
+        Queues `component` for an update check. Returns False (and does
+        nothing) if no package manager packages the tool, no manager is
+        preferred on this OS or the stage was cancelled.
+        """
+        tool_id = self.package_tool_id(tool_id)
+        if tool_id is None or not self.preferred_pms or self._cancelled.is_set():
+            return False
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="update-checks", daemon=True
+                )
+                self._thread.start()
+        self._queue.put((component, tool_id))
+        return True
+
+    def cancel(self):
+        """Drops the queued checks; results still in flight are discarded."""
+        self._cancelled.set()
+        self._queue.put(_FINISHED)
+
+    def finish(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits up to `timeout` seconds (the package-manager stage timeout if
+        omitted) for the queued checks. Returns False if they didn't complete;
+        the stage is then cancelled.
+        """
+        if self._thread is None:
+            return True
+        if timeout is None:
+            timeout = float(
+                self.scan_options.get(
+                    "package_manager_stage_timeout_seconds", DEFAULT_STAGE_TIMEOUT_SECONDS
+                )
+            )
+        self._queue.put(_FINISHED)
+        deadline = time.monotonic() + timeout
+        # Polled, so cancel() from another thread stops the wait too
+        while self._thread.is_alive() and not self._cancelled.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Update checks did not finish within {timeout:.0f}s; skipping the rest.")
+                self._cancelled.set()
+                return False
+            self._thread.join(min(remaining, FINISH_POLL_INTERVAL))
+        return not self._cancelled.is_set()
+
+    def _next_batch(self) -> Tuple[List[Tuple[Any, str]], bool]:
+        """Blocks for one submission, then gathers more for batch_window seconds."""
+        batch: List[Tuple[Any, str]] = []
+        item = self._queue.get()
+        if item is _FINISHED:
+            return batch, True
+        batch.append(item)
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _FINISHED:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        try:
+            detected_pms = detect_package_managers()
+            pm_ids = [pm_id for pm_id in self.preferred_pms if pm_id in detected_pms]
+            if not pm_ids:
+                logger.info("Update checks: none of the preferred package managers is installed.")
+                return
+            cache = LatestVersionCache.from_config(self.scan_options)
+            installed_index = build_installed_package_index(
+                detected_pms, pm_ids=pm_ids, executor=PackageManagerExecutor.from_config(self.scan_options)
+            )
+            finished = False
+            while not finished and not self._cancelled.is_set():
+                batch, finished = self._next_batch()
+                if batch and not self._cancelled.is_set():
+                    self._check(batch, pm_ids, detected_pms, cache, installed_index)
+            if finished and not self._cancelled.is_set():
+                self.package_only_tools = find_tools_installed_via_package_managers(
+                    installed_index, exclude_tool_ids=list(self.by_tool)
+                )
+        except Exception as e:
+            logger.error(f"Update checks failed: {e}", exc_info=True)
+
+    def _check(self, batch, pm_ids, detected_pms, cache, installed_index):
+        pending: Dict[str, Optional[str]] = {}  # tool id -> installed version to query with
+        for component, tool_id in batch:
+            if tool_id not in self.by_tool and tool_id not in pending:
+                pending[tool_id] = component.version
+        if pending:
+            infos = get_latest_versions_and_update_commands(
+                [(tool_id, tool_id, version) for tool_id, version in pending.items()],
+                pm_ids,
+                detected_pms,
+                cache=cache,
+                installed_index=installed_index,
+                executor=PackageManagerExecutor.from_config(self.scan_options),
+            )
+            for tool_id, version in pending.items():
+                self.by_tool[tool_id] = infos.get(tool_id)
+                self.results[(tool_id, version)] = infos.get(tool_id)
+        for component, tool_id in batch:
+            if self._cancelled.is_set():
+                return
+            info = self._info_for(tool_id, component.version)
+            self.checked += 1
+            if info is not None:
+                self.on_result(component, info)
+
+    def _info_for(self, tool_id: str, version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        The update info of one installed version. Other versions of a tool
+        that was already queried share its latest version; only
+        is_update_available is worked out again.
+        """
+        if (tool_id, version) not in self.results:
+            info = self.by_tool.get(tool_id)
+            if info is not None:
+                info = dict(info)
+                installed = (
+                    version if version and version != "Unknown" else info.get("installed_version_in_pm")
+                )
+                info["is_update_available"] = _is_update_available(
+                    installed, info.get("latest_version"), info.get("package_manager_id")
+                )
+            self.results[(tool_id, version)] = info
+        return self.results[(tool_id, version)]
@@ -0,0 +1,315 @@
+"""
+Discovery of toolchains installed through version managers, without running them.
+
+pyenv, nvm, SDKMAN!, asdf, rustup and conda keep every installed version in a
+well-known directory layout, and only one of them is reachable through PATH at
+a time. Each plugin below lists its layout and reports every installed version
+with its install directory and main executable. Versions come from the
+metadata files the installs ship with, falling back to the version directory
+name:
+
+    python  pyvenv.cfg ("version"/"version_info"), conda-meta/python-*.json
+    java    the JDK's `release` file (JAVA_VERSION)
+    nodejs  include/node/node_version.h (NODE_*_VERSION)
+    rust    lib/rustlib/multirust-channel-manifest.toml ([pkg.rustc] version)
+
+Everything goes through the scan's FileSystemCache (directory listings, stat
+and small metadata reads), so finding dozens of toolchains costs a handful of
+stat calls and never starts a process.
+"""
+
+import logging
+import os
+import platform
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .fs_cache import FileSystemCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ManagedInstall:
+    """One toolchain version installed by a version manager."""
+
+    manager: str
+    tool_id: str
+    tool_name: str
+    category: str
+    version: Optional[str]
+    install_path: str
+    executable_path: str
+
+
+# tool id -> (display name, category, executable names without extension)
+MANAGED_TOOLS: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "python": ("Python", "Language", ("python3", "python")),
+    "nodejs": ("Node.js", "Runtime", ("node",)),
+    "java": ("Java", "Runtime", ("java",)),
+    "ruby": ("Ruby", "Language", ("ruby",)),
+    "go": ("Go", "Language", ("go",)),
+    "rust": ("Rust", "Language", ("rustc",)),
+    "gradle": ("Gradle", "Build Tool", ("gradle",)),
+    "maven": ("Maven", "Build Tool", ("mvn",)),
+    "kotlin": ("Kotlin", "Language", ("kotlin",)),
+}
+
+# asdf plugin / SDKMAN! candidate names that differ from our tool ids
+_TOOL_ALIASES = {"golang": "go", "node": "nodejs"}
+
+_NODE_VERSION_RE = re.compile(r"#define\s+NODE_(MAJOR|MINOR|PATCH)_VERSION\s+(\d+)")
+_RUSTC_MANIFEST_RE = re.compile(
+    r'^\[pkg\.rustc\][^\[]*?^version\s*=\s*"([0-9][^ "]*)', re.MULTILINE | re.DOTALL
+)
+_JAVA_RELEASE_RE = re.compile(r'^JAVA_VERSION\s*=\s*"?([^"\s]+)"?', re.MULTILINE)
+_CONDA_PYTHON_RE = re.compile(r"^python-(\d+\.\d+(?:\.\d+)?)-.*\.json$")
+
+
+# --- Version metadata readers (stat and small reads only) ---
+
+
+def _python_version(fs: FileSystemCache, install_dir: str) -> Optional[str]:
+    cfg = fs.read_text(os.path.join(install_dir, "pyvenv.cfg"))
+    if cfg:
+        values = {}
+        for line in cfg.splitlines():
+            key, sep, value = line.partition("=")
+            if sep:
+                values[key.strip().lower()] = value.strip()
+        version = values.get("version") or values.get("version_info")
+        if version:
+            return version
+    for name in fs.list_files(os.path.join(install_dir, "conda-meta")) or []:
+        match = _CONDA_PYTHON_RE.match(name)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _java_version(fs: FileSystemCache, install_dir: str) -> Optional[str]:
+    release = fs.read_text(os.path.join(install_dir, "release"))
+    match = _JAVA_RELEASE_RE.search(release or "")
+    return match.group(1) if match else None
+
+
+def _node_version(fs: FileSystemCache, install_dir: str) -> Optional[str]:
+    header = fs.read_text(os.path.join(install_dir, "include", "node", "node_version.h"))
+    parts = dict(_NODE_VERSION_RE.findall(header or ""))
+    if all(k in parts for k in ("MAJOR", "MINOR", "PATCH")):
+        return f"{parts['MAJOR']}.{parts['MINOR']}.{parts['PATCH']}"
+    return None
+
+
+def _rust_version(fs: FileSystemCache, install_dir: str) -> Optional[str]:
+    manifest = fs.read_text(
+        os.path.join(install_dir, "lib", "rustlib", "multirust-channel-manifest.toml")
+    )
+    match = _RUSTC_MANIFEST_RE.search(manifest or "")
+    return match.group(1) if match else None
+
+
+VERSION_READERS: Dict[str, Callable[[FileSystemCache, str], Optional[str]]] = {
+    "python": _python_version,
+    "java": _java_version,
+    "nodejs": _node_version,
+    "rust": _rust_version,
+}
+
+
+def _version_from_dir_name(name: str) -> str:
+    # "v18.17.0" (nvm) -> "18.17.0"; "17.0.8-tem" (SDKMAN!) is kept as is.
+    return name[1:] if len(name) > 1 and name[0] in "vV" and name[1].isdigit() else name
+
+
+# --- Plugins ---
+
+
+class VersionManagerPlugin:
+    """Enumerates (tool id, install dir, version dir name) for one version manager."""
+
+    name = ""
+
+    def __init__(
+        self,
+        fs: FileSystemCache,
+        system: str,
+        environ: Mapping[str, str],
+        home: str,
+    ):
+        self.fs = fs
+        self.system = system
+        self.environ = environ
+        self.home = home
+
+    def _root(self, env_var: Optional[str], *default: str) -> str:
+        if env_var and self.environ.get(env_var):
+            return self.environ[env_var]
+        return os.path.join(self.home, *default)
+
+    def _subdirs(self, directory: str) -> List[str]:
+        return [d for d in self.fs.list_dirs(directory) or [] if d != "current"]
+
+    def candidates(self) -> Iterator[Tuple[str, str, str]]:
+        """Yields (tool id or alias, install dir, version dir name or "")."""
+        raise NotImplementedError
+
+    def _find_executable(self, tool_id: str, install_dir: str) -> Optional[str]:
+        names = MANAGED_TOOLS[tool_id][2]
+        suffixes = (".exe", ".cmd") if self.system == "Windows" else ("",)
+        for subdir in ("bin", ""):
+            for exe_name in names:
+                for suffix in suffixes:
+                    path = os.path.join(install_dir, subdir, exe_name + suffix)
+                    if self.fs.isfile(path):
+                        return path
+        return None
+
+    def discover(self) -> List[ManagedInstall]:
+        installs = []
+        for tool_id, install_dir, dir_name in self.candidates():
+            tool_id = _TOOL_ALIASES.get(tool_id, tool_id)
+            if tool_id not in MANAGED_TOOLS:
+                continue
+            exe_path = self._find_executable(tool_id, install_dir)
+            if exe_path is None:
+                continue  # Half-installed or removed version
+            reader = VERSION_READERS.get(tool_id)
+            version = (reader(self.fs, install_dir) if reader else None) or (
+                _version_from_dir_name(dir_name) if dir_name else None
+            )
+            tool_name, category, _ = MANAGED_TOOLS[tool_id]
+            installs.append(
+                ManagedInstall(
+                    manager=self.name,
+                    tool_id=tool_id,
+                    tool_name=tool_name,
+                    category=category,
+                    version=version,
+                    install_path=install_dir,
+                    executable_path=exe_path,
+                )
+            )
+        return installs
+
+
+class PyenvPlugin(VersionManagerPlugin):
+    name = "pyenv"
+
+    def candidates(self):
+        root = self._root("PYENV_ROOT", ".pyenv")
+        if self.system == "Windows" and not self.environ.get("PYENV_ROOT"):
+            root = os.path.join(root, "pyenv-win")
+        versions_dir = os.path.join(root, "versions")
+        for name in self._subdirs(versions_dir):
+            yield "python", os.path.join(versions_dir, name), name
+
+
+class NvmPlugin(VersionManagerPlugin):
+    name = "nvm"
+
+    def candidates(self):
+        if self.system == "Windows":
+            # nvm-windows keeps versions directly below NVM_HOME
+            versions_dir = self.environ.get("NVM_HOME")
+        else:
+            versions_dir = os.path.join(self._root("NVM_DIR", ".nvm"), "versions", "node")
+        if not versions_dir:
+            return
+        for name in self._subdirs(versions_dir):
+            if name[:1] in "vV":
+                yield "nodejs", os.path.join(versions_dir, name), name
+
+
+class SdkmanPlugin(VersionManagerPlugin):
+    name = "sdkman"
+
+    def candidates(self):
+        candidates_dir = os.path.join(self._root("SDKMAN_DIR", ".sdkman"), "candidates")
+        for candidate in self._subdirs(candidates_dir):
+            candidate_dir = os.path.join(candidates_dir, candidate)
+            for name in self._subdirs(candidate_dir):
+                yield candidate, os.path.join(candidate_dir, name), name
+
+
+class AsdfPlugin(VersionManagerPlugin):
+    name = "asdf"
+
+    def candidates(self):
+        installs_dir = os.path.join(self._root("ASDF_DATA_DIR", ".asdf"), "installs")
+        for plugin in self._subdirs(installs_dir):
+            plugin_dir = os.path.join(installs_dir, plugin)
+            for name in self._subdirs(plugin_dir):
+                yield plugin, os.path.join(plugin_dir, name), name
+
+
+class RustupPlugin(VersionManagerPlugin):
+    name = "rustup"
+
+    def candidates(self):
+        toolchains_dir = os.path.join(self._root("RUSTUP_HOME", ".rustup"), "toolchains")
+        for name in self._subdirs(toolchains_dir):
+            # Channel names ("stable-x86_64-...") say nothing about the version,
+            # so only pinned toolchains ("1.72.0-x86_64-...") fall back to the name.
+            fallback = name.split("-")[0] if name[:1].isdigit() else ""
+            yield "rust", os.path.join(toolchains_dir, name), fallback
+
+
+class CondaPlugin(VersionManagerPlugin):
+    name = "conda"
+    BASE_DIR_NAMES = ("miniconda3", "anaconda3", "miniforge3", "mambaforge", "micromamba")
+
+    def _bases(self) -> List[str]:
+        bases = []
+        for env_var in ("CONDA_ROOT", "MAMBA_ROOT_PREFIX"):
+            if self.environ.get(env_var):
+                bases.append(self.environ[env_var])
+        bases.extend(os.path.join(self.home, d) for d in self.BASE_DIR_NAMES)
+        seen = set()
+        return [b for b in bases if not (b in seen or seen.add(b))]
+
+    def candidates(self):
+        for base in self._bases():
+            if not self.fs.isdir(os.path.join(base, "conda-meta")):
+                continue
+            yield "python", base, ""
+            envs_dir = os.path.join(base, "envs")
+            for name in self._subdirs(envs_dir):
+                yield "python", os.path.join(envs_dir, name), ""
+
+
+VERSION_MANAGER_PLUGINS = (
+    PyenvPlugin,
+    NvmPlugin,
+    SdkmanPlugin,
+    AsdfPlugin,
+    RustupPlugin,
+    CondaPlugin,
+)
+
+
+def discover_managed_installs(
+    fs: Optional[FileSystemCache] = None,
+    system: Optional[str] = None,
+    environ: Optional[Mapping[str, str]] = None,
+    home: Optional[str] = None,
+    plugins: Iterable[type] = VERSION_MANAGER_PLUGINS,
+) -> List[ManagedInstall]:
+    """Runs every plugin; a failing plugin is logged and skipped."""
+    fs = fs if fs is not None else FileSystemCache()
+    system = system or platform.system()
+    environ = os.environ if environ is None else environ
+    home = home or os.path.expanduser("~")
+    installs: List[ManagedInstall] = []
+    for plugin_cls in plugins:
+        plugin = plugin_cls(fs, system, environ, home)
+        try:
+            found = plugin.discover()
+        except Exception as e:
+            logger.error(f"Version manager plugin '{plugin.name}' failed: {e}", exc_info=True)
+            continue
+        if found:
+            logger.info(f"{plugin.name}: found {len(found)} installed toolchain version(s).")
+        installs.extend(found)
+    return installs
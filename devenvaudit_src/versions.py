@@ -0,0 +1,305 @@
+"""
+Scheme-aware version parsing and comparison.
+
+Every version string is turned into a sort key once; comparing two versions
+is then a plain tuple comparison. Keys are memoized per (version, scheme), so
+the same installed or candidate version seen by many tools is parsed once per
+process. Supported schemes:
+
+    debian   dpkg ordering: epoch, upstream and revision; "~" sorts before
+             everything, even the end of the string ("1.0~rc1" < "1.0")
+    rpm      rpmvercmp: epoch, version and release; "~" sorts before the
+             end of the string, "^" after it but before anything else
+    homebrew generic upstream version and a numeric "_N" revision
+             ("3.12.1_1" > "3.12.1")
+    pep440   Python packages, through `packaging.version` when installed
+    semver   MAJOR.MINOR.PATCH[-prerelease][+build]; a pre-release sorts
+             before its release and build metadata is ignored
+    generic  anything else (winget's four-part versions, "2.43.0.windows.1"):
+             numbers compare as numbers ("10.0" > "9.0"), and letters after a
+             number mark a pre-release ("2.0rc1" < "2.0" < "2.0.1")
+
+Keys of different schemes must not be compared with each other.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ("debian", "rpm", "homebrew", "pep440", "semver", "generic")
+KEY_CACHE_SIZE = 65536
+
+# Version scheme of each package manager's candidate versions
+PACKAGE_MANAGER_SCHEMES = {
+    "apt": "debian",
+    "dnf": "rpm",
+    "yum": "rpm",
+    "pacman": "rpm",  # vercmp follows rpmvercmp; versions are [epoch:]pkgver-pkgrel
+    "brew": "homebrew",
+    "pip": "pep440",
+    "npm": "semver",
+    "cargo": "semver",
+}
+
+_DIGITS_RE = re.compile(r"\d+|\D+")
+_RPM_SEGMENT_RE = re.compile(r"~|\^|[0-9]+|[a-zA-Z]+")
+_GENERIC_SEGMENT_RE = re.compile(r"[0-9]+|[a-zA-Z]+")
+_SEMVER_RE = re.compile(
+    r"^[vV]?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$"
+)
+
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:  # Optional: PEP 440 versions are then compared as generic ones
+    Version = None
+    InvalidVersion = ValueError
+
+
+# --- Debian (dpkg) ---
+
+_DPKG_END = (0,)  # An exhausted version compares like an empty string
+
+
+def _dpkg_char(c: str) -> int:
+    # '~' sorts before everything (even the end of the string), letters before non-letters
+    if c == "~":
+        return -1
+    if c.isalpha():
+        return ord(c)
+    return ord(c) + 256
+
+
+def _dpkg_part_key(part: str) -> Tuple:
+    """
+    Alternating (non-digit run, number) pairs, starting with a possibly empty
+    run; each run ends in 0, the end-of-string weight, and the key ends in an
+    empty run, so a shorter version compares like dpkg's empty remainder.
+    """
+    key: List[Any] = []
+    text = ""
+    for token in _DIGITS_RE.findall(part):
+        if token[0].isdigit():
+            key.append(tuple(_dpkg_char(c) for c in text) + (0,))
+            key.append(int(token))
+            text = ""
+        else:
+            text = token
+    if text or not key:
+        key.append(tuple(_dpkg_char(c) for c in text) + (0,))
+        key.append(0)
+    key.append(_DPKG_END)
+    return tuple(key)
+
+
+def split_debian_version(version: str) -> Tuple[int, str, str]:
+    """'1:2.39.2-1.1' -> (1, '2.39.2', '1.1')."""
+    epoch, _, rest = version.partition(":") if ":" in version else ("0", "", version)
+    upstream, _, revision = rest.rpartition("-") if "-" in rest else (rest, "", "")
+    return int(epoch) if epoch.isdigit() else 0, upstream, revision
+
+
+def debian_key(version: str) -> Tuple:
+    epoch, upstream, revision = split_debian_version(version.strip())
+    return (epoch, _dpkg_part_key(upstream), _dpkg_part_key(revision))
+
+
+# --- RPM ---
+
+# Segment ranks: '~' < end of version < '^' < letters < numbers
+_RPM_END = (1,)
+
+
+def _rpm_part_key(part: str) -> Tuple:
+    key = []
+    for segment in _RPM_SEGMENT_RE.findall(part):
+        if segment == "~":
+            key.append((0,))
+        elif segment == "^":
+            key.append((2,))
+        elif segment.isdigit():
+            key.append((4, int(segment)))
+        else:
+            key.append((3, segment))
+    key.append(_RPM_END)
+    return tuple(key)
+
+
+def rpm_evr_key(evr: Tuple[int, str, str]) -> Tuple:
+    """Key of an (epoch, version, release) tuple, as read from repository metadata."""
+    return (evr[0], _rpm_part_key(evr[1]), _rpm_part_key(evr[2]))
+
+
+def split_rpm_version(version: str) -> Tuple[int, str, str]:
+    """'1:3.8.6-3.fc39' -> (1, '3.8.6', '3.fc39')."""
+    epoch, _, rest = version.partition(":") if ":" in version else ("0", "", version)
+    ver, _, release = rest.rpartition("-") if "-" in rest else (rest, "", "")
+    return int(epoch) if epoch.isdigit() else 0, ver, release
+
+
+def rpm_key(version: str) -> Tuple:
+    return rpm_evr_key(split_rpm_version(version.strip()))
+
+
+# --- Generic, Homebrew, semver, PEP 440 ---
+
+# Segment ranks after the numeric release: letters (pre-release) < end of version < numbers
+_GENERIC_END = (1,)
+
+
+def generic_key(version: str) -> Tuple:
+    """(numeric release without trailing zeros, ranked remaining segments)."""
+    segments = _GENERIC_SEGMENT_RE.findall(version.strip())
+    numeric = 0
+    while numeric < len(segments) and segments[numeric].isdigit():
+        numeric += 1
+    release = [int(segment) for segment in segments[:numeric]]
+    while release and release[-1] == 0:
+        release.pop()  # "1.0.0" == "1.0" == "1"
+    rest = [
+        (2, int(segment)) if segment.isdigit() else (0, segment.lower())
+        for segment in segments[numeric:]
+    ]
+    rest.append(_GENERIC_END)
+    return (tuple(release), tuple(rest))
+
+
+def split_homebrew_version(version: str) -> Tuple[str, int]:
+    """'3.12.1_1' -> ('3.12.1', 1)."""
+    upstream, _, revision = version.rpartition("_")
+    if upstream and revision.isdigit():
+        return upstream, int(revision)
+    return version, 0
+
+
+def homebrew_key(version: str) -> Tuple:
+    upstream, revision = split_homebrew_version(version.strip())
+    return (generic_key(upstream), revision)
+
+
+def semver_key(version: str) -> Tuple:
+    match = _SEMVER_RE.match(version.strip())
+    if not match:
+        return (1, generic_key(version))
+    major, minor, patch, prerelease = match.groups()
+    if prerelease is None:
+        pre_key: Tuple = (1,)  # A release sorts after all of its pre-releases
+    else:
+        pre_key = (0,) + tuple(
+            (0, int(part), "") if part.isdigit() else (1, 0, part)
+            for part in prerelease.split(".")
+        )
+    return (2, (int(major), int(minor or 0), int(patch or 0)), pre_key)
+
+
+def pep440_key(version: str) -> Tuple:
+    if Version is not None:
+        try:
+            return (2, Version(version.strip()))
+        except InvalidVersion:
+            pass
+    return (1, generic_key(version))
+
+
+_KEY_FUNCTIONS = {
+    "debian": debian_key,
+    "rpm": rpm_key,
+    "homebrew": homebrew_key,
+    "pep440": pep440_key,
+    "semver": semver_key,
+    "generic": generic_key,
+}
+
+
+# --- Public API ---
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def version_key(version: str, scheme: str = "generic") -> Tuple:
+    """Memoized sort key of `version` under `scheme`."""
+    try:
+        key_function = _KEY_FUNCTIONS[scheme]
+    except KeyError:
+        raise ValueError(f"Unknown version scheme '{scheme}'") from None
+    return key_function(version)
+
+
+def scheme_for_package_manager(pm_id: Optional[str]) -> str:
+    return PACKAGE_MANAGER_SCHEMES.get(pm_id or "", "generic")
+
+
+def compare_versions(a: str, b: str, scheme: str = "generic") -> int:
+    """-1, 0 or 1 as `a` is older than, equal to or newer than `b`."""
+    key_a, key_b = version_key(a, scheme), version_key(b, scheme)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def compare_many(pairs: Iterable[Tuple[str, str]], scheme: str = "generic") -> List[int]:
+    """compare_versions for every (a, b) pair."""
+    key = version_key
+    results = []
+    for a, b in pairs:
+        key_a, key_b = key(a, scheme), key(b, scheme)
+        results.append((key_a > key_b) - (key_a < key_b))
+    return results
+
+
+def newest(versions: Iterable[str], scheme: str = "generic") -> Optional[str]:
+    """The newest of `versions`, or None if there are none."""
+    return max(versions, key=lambda v: version_key(v, scheme), default=None)
+
+
+def sort_versions(versions: Iterable[str], scheme: str = "generic", reverse: bool = False) -> List[str]:
+    return sorted(versions, key=lambda v: version_key(v, scheme), reverse=reverse)
+
+
+def upstream_version(version: str, scheme: str) -> str:
+    """The upstream part of a distribution package version ('1:2.39.2-1.1' -> '2.39.2')."""
+    if scheme == "debian":
+        return split_debian_version(version)[1]
+    if scheme == "rpm":
+        return split_rpm_version(version)[1]
+    if scheme == "homebrew":
+        return split_homebrew_version(version)[0]
+    return version
+
+
+def is_newer(candidate: str, installed: str, scheme: str = "generic") -> bool:
+    """
+    True if `candidate` is newer than `installed`. A bare upstream version
+    (e.g. '3.11.2' from `python3 --version`) is compared with the upstream
+    part of a packaged candidate ('3.11.2-1+b1', '3.12.1_1'), so a packaging
+    revision alone doesn't count as an update.
+    """
+    if upstream_version(installed, scheme) == installed:
+        candidate = upstream_version(candidate, scheme)
+    return version_key(candidate, scheme) > version_key(installed, scheme)
+
+
+def newer_than(
+    candidates: Dict[str, Optional[str]],
+    installed: Dict[str, Optional[str]],
+    scheme: str = "generic",
+) -> Dict[str, bool]:
+    """Bulk is_newer: name -> whether candidates[name] is newer than installed[name]."""
+    return {
+        name: bool(candidate and installed.get(name)) and is_newer(candidate, installed[name], scheme)
+        for name, candidate in candidates.items()
+    }
+
+
+def compare_debian_versions(a: str, b: str) -> int:
+    """dpkg --compare-versions: -1, 0 or 1."""
+    return compare_versions(a, b, "debian")
+
+
+def compare_rpm_versions(a: Tuple[int, str, str], b: Tuple[int, str, str]) -> int:
+    """Compares (epoch, version, release) tuples like rpm: -1, 0 or 1."""
+    key_a, key_b = rpm_evr_key(a), rpm_evr_key(b)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def clear_cache():
+    version_key.cache_clear()
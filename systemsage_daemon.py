@@ -0,0 +1,480 @@
+"""
+System Sage background daemon.
+
+Runs the System Inventory scan (`get_installed_software`) and the DevEnvAudit
+scan (`EnvironmentScanner.run_scan`) on a jittered interval at low process
+priority. Before each scan a cheap fingerprint of the scan's inputs is taken;
+if it matches the fingerprint of the last successful scan, the scan is skipped.
+
+Results are written as timestamped JSON files into `output_data/` using the
+same layout the GUI produces:
+
+    output_data/system_inventory/system_inventory_<timestamp>.json
+    output_data/devenv_audit/devenv_audit_<timestamp>.json
+
+With --ndjson, each scan instead writes '<job>_<timestamp>.ndjson' (or
+'.ndjson.gz' with --gzip) while it runs: one JSON Lines record per inventory
+row, component, environment variable and issue, tagged with the scan's ID
+(see devenvaudit_src/json_stream.JsonLinesWriter), for log pipelines.
+
+The status of the last scan of each kind is exposed through
+`output_data/daemon_status.json`, which is rewritten atomically after every
+run so other tools can poll it safely.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from devenvaudit_src.config_manager import CONFIG_FILE_PATH
+from devenvaudit_src.json_stream import EVENT_RECORD_KINDS, JsonLinesWriter
+from devenvaudit_src.report_generator import ReportGenerator
+from devenvaudit_src.scan_logic import TOOLS_DB_PATH, EnvironmentScanner
+
+logger = logging.getLogger(__name__)
+
+IS_WINDOWS = platform.system() == "Windows"
+
+DEFAULT_OUTPUT_DATA_DIR = os.path.join(
+    os.path.abspath(os.path.dirname(__file__)), "output_data"
+)
+STATUS_FILE_NAME = "daemon_status.json"
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+DEFAULT_INTERVAL_SECONDS = 3600
+DEFAULT_JITTER_FRACTION = 0.1  # +/- 10% of the interval
+
+# Registry locations read by get_installed_software(); their last-write times
+# are used to decide whether the inventory changed.
+UNINSTALL_REGISTRY_PATHS = [
+    ("HKEY_LOCAL_MACHINE", r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (
+        "HKEY_LOCAL_MACHINE",
+        r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall",
+    ),
+    ("HKEY_CURRENT_USER", r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+]
+
+
+def lower_process_priority():
+    """Drops the current process to background priority. Failures are only logged."""
+    try:
+        if IS_WINDOWS:
+            import ctypes
+
+            BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
+            kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+            kernel32.SetPriorityClass(
+                kernel32.GetCurrentProcess(), BELOW_NORMAL_PRIORITY_CLASS
+            )
+        elif hasattr(os, "nice"):
+            os.nice(10)
+        logger.info("Daemon process priority lowered.")
+    except Exception as e:
+        logger.warning(f"Could not lower daemon process priority: {e}")
+
+
+def _hash_parts(parts: List[str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8", errors="replace"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _mtime_ns(path: str) -> str:
+    try:
+        return str(os.stat(path).st_mtime_ns)
+    except OSError:
+        return "missing"
+
+
+def inventory_fingerprint() -> str:
+    """
+    Fingerprints the inputs of the System Inventory scan.
+    On Windows this is the subkey count and last-write time of each Uninstall
+    registry key, which change whenever software is installed or removed.
+    """
+    if not IS_WINDOWS:
+        return _hash_parts([platform.system(), "no-registry"])
+    try:
+        import winreg
+    except ImportError:
+        return _hash_parts(["winreg-unavailable"])
+
+    parts = []
+    for hive_name, key_path in UNINSTALL_REGISTRY_PATHS:
+        hive = getattr(winreg, hive_name)
+        try:
+            with winreg.OpenKey(hive, key_path) as key:
+                subkey_count, value_count, last_modified = winreg.QueryInfoKey(key)
+                parts.append(f"{hive_name}\\{key_path}:{subkey_count}:{last_modified}")
+        except OSError:
+            parts.append(f"{hive_name}\\{key_path}:missing")
+    return _hash_parts(parts)
+
+
+def devenv_fingerprint(environ: Optional[Dict[str, str]] = None) -> str:
+    """
+    Fingerprints the inputs of the DevEnvAudit scan: the environment, the
+    modification time of every PATH directory (installing or removing an
+    executable touches its directory), and the tools DB and config files.
+    """
+    environ = dict(os.environ) if environ is None else environ
+    parts = [f"{name}={environ[name]}" for name in sorted(environ)]
+    for path_dir in environ.get("PATH", "").split(os.pathsep):
+        if path_dir:
+            parts.append(f"dir:{path_dir}:{_mtime_ns(path_dir)}")
+    parts.append(f"tools_db:{_mtime_ns(TOOLS_DB_PATH)}")
+    parts.append(f"config:{_mtime_ns(CONFIG_FILE_PATH)}")
+    return _hash_parts(parts)
+
+
+def _write_json_atomic(path: str, data: Any):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _default_inventory_scan() -> List[Dict[str, Any]]:
+    # Imported lazily: systemsage_main pulls in the GUI toolkit, which the
+    # daemon only needs for this one function.
+    from systemsage_main import get_installed_software
+
+    return get_installed_software(calculate_disk_usage_flag=True)
+
+
+def _default_devenv_scan():
+    return EnvironmentScanner().run_scan()
+
+
+def _stream_inventory_scan(writer: JsonLinesWriter) -> List[Dict[str, Any]]:
+    from systemsage_main import get_installed_software
+
+    return get_installed_software(
+        calculate_disk_usage_flag=True,
+        on_row=lambda row: writer.write("inventory", row),
+    )
+
+
+def _stream_devenv_scan(writer: JsonLinesWriter):
+    scanner = EnvironmentScanner()
+    # Delivered on the bus's own thread while the scan runs
+    scanner.events.subscribe(writer.event_consumer(), kinds=EVENT_RECORD_KINDS, threaded=True)
+    try:
+        return scanner.run_scan()
+    finally:
+        scanner.events.close()
+
+
+def _inventory_rows_writer(scan_func: Callable[[], List[Dict[str, Any]]]):
+    """Streams a replacement inventory scan's rows once it has finished."""
+
+    def stream(writer: JsonLinesWriter):
+        results = scan_func()
+        writer.write_rows("inventory", results)
+        return results
+
+    return stream
+
+
+def _devenv_rows_writer(scan_func: Callable[[], Any]):
+    """Streams a replacement DevEnvAudit scan's results once it has finished."""
+
+    def stream(writer: JsonLinesWriter):
+        results = scan_func()
+        components, env_vars, issues = results
+        writer.write_rows("component", components)
+        writer.write_rows("environment_variable", env_vars)
+        writer.write_rows("issue", issues)
+        return results
+
+    return stream
+
+
+class ScanJob:
+    """One periodically scheduled scan with its change-detection fingerprint."""
+
+    def __init__(
+        self,
+        name: str,
+        fingerprint_func: Callable[[], str],
+        scan_func: Callable[[], Any],
+        write_func: Callable[[Any, str], str],
+        stream_func: Optional[Callable[[JsonLinesWriter], Any]] = None,
+    ):
+        self.name = name
+        self.fingerprint_func = fingerprint_func
+        self.scan_func = scan_func
+        self.write_func = write_func
+        # Runs the scan writing JSON Lines records as they are found (--ndjson)
+        self.stream_func = stream_func
+        self.last_fingerprint: Optional[str] = None
+        self.status: Dict[str, Any] = {"state": "pending"}
+
+
+class SystemSageDaemon:
+    """
+    Schedules the System Inventory and DevEnvAudit scans in the background.
+
+    Args:
+        output_dir (str): Root directory for results and the status file.
+        interval (float): Base number of seconds between scan rounds.
+        jitter (float): Fraction of the interval added or subtracted at random,
+                        so many workstations don't scan in lockstep.
+        inventory_scan / devenv_scan: Optional replacements for the scan
+                        functions (used by tests and embedding code).
+        ndjson (bool): Stream results as JSON Lines while scanning instead of
+                        writing JSON files afterwards.
+        compress (bool): gzip the JSON Lines output.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = DEFAULT_OUTPUT_DATA_DIR,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        jitter: float = DEFAULT_JITTER_FRACTION,
+        inventory_scan: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        devenv_scan: Optional[Callable[[], Any]] = None,
+        inventory_fingerprint_func: Callable[[], str] = inventory_fingerprint,
+        devenv_fingerprint_func: Callable[[], str] = devenv_fingerprint,
+        ndjson: bool = False,
+        compress: bool = False,
+    ):
+        self.output_dir = output_dir
+        self.ndjson = ndjson
+        self.compress = compress
+        self.interval = max(1.0, float(interval))
+        self.jitter = min(max(float(jitter), 0.0), 0.9)
+        self.status_file_path = os.path.join(output_dir, STATUS_FILE_NAME)
+        self.started_at = datetime.datetime.now().isoformat()
+        self._stop_event = threading.Event()
+        self.jobs = [
+            ScanJob(
+                "system_inventory",
+                inventory_fingerprint_func,
+                inventory_scan or _default_inventory_scan,
+                self._write_inventory,
+                _inventory_rows_writer(inventory_scan) if inventory_scan else _stream_inventory_scan,
+            ),
+            ScanJob(
+                "devenv_audit",
+                devenv_fingerprint_func,
+                devenv_scan or _default_devenv_scan,
+                self._write_devenv_audit,
+                _devenv_rows_writer(devenv_scan) if devenv_scan else _stream_devenv_scan,
+            ),
+        ]
+
+    # --- Result writers ---
+
+    def _result_path(
+        self, job_name: str, timestamp: datetime.datetime, extension: str = ".json"
+    ) -> str:
+        job_dir = os.path.join(self.output_dir, job_name)
+        os.makedirs(job_dir, exist_ok=True)
+        return os.path.join(
+            job_dir, f"{job_name}_{timestamp.strftime(TIMESTAMP_FORMAT)}{extension}"
+        )
+
+    def _stream_job(self, job: ScanJob, timestamp: datetime.datetime) -> str:
+        extension = ".ndjson.gz" if self.compress else ".ndjson"
+        path = self._result_path(job.name, timestamp, extension)
+        with JsonLinesWriter(path, compress=self.compress) as writer:
+            job.stream_func(writer)
+        logger.info(f"Daemon: {job.name} records written to {path}: {writer.counts}")
+        return path
+
+    def _write_inventory(self, results, path: str) -> str:
+        _write_json_atomic(
+            path,
+            {
+                "reportTime": datetime.datetime.now().isoformat(),
+                "systemInventory": results,
+            },
+        )
+        return path
+
+    def _write_devenv_audit(self, results, path: str) -> str:
+        components, env_vars, issues = results
+        if not ReportGenerator(components, env_vars, issues).export_to_json(path):
+            raise IOError(f"Could not write DevEnvAudit results to {path}")
+        return path
+
+    # --- Scheduling ---
+
+    def next_delay(self) -> float:
+        """Returns the number of seconds to wait before the next round."""
+        spread = self.interval * self.jitter
+        return self.interval + random.uniform(-spread, spread)
+
+    def run_job(self, job: ScanJob, force: bool = False) -> Dict[str, Any]:
+        """Runs a single job unless its fingerprint is unchanged."""
+        started = datetime.datetime.now()
+        status: Dict[str, Any] = {"last_checked": started.isoformat()}
+        try:
+            fingerprint = job.fingerprint_func()
+        except Exception as e:
+            logger.warning(f"Fingerprint for {job.name} failed, scanning anyway: {e}")
+            fingerprint = None
+
+        if not force and fingerprint is not None and fingerprint == job.last_fingerprint:
+            logger.info(f"Daemon: {job.name} inputs unchanged, skipping scan.")
+            status.update(
+                {
+                    "state": "skipped",
+                    "last_success": job.status.get("last_success"),
+                    "last_output": job.status.get("last_output"),
+                }
+            )
+            job.status = status
+            return status
+
+        logger.info(f"Daemon: running {job.name} scan.")
+        t0 = time.monotonic()
+        try:
+            if self.ndjson and job.stream_func is not None:
+                output_path = self._stream_job(job, started)
+            else:
+                results = job.scan_func()
+                output_path = job.write_func(results, self._result_path(job.name, started))
+        except Exception as e:
+            logger.error(f"Daemon: {job.name} scan failed: {e}", exc_info=True)
+            status.update(
+                {
+                    "state": "error",
+                    "error": str(e),
+                    "last_success": job.status.get("last_success"),
+                    "last_output": job.status.get("last_output"),
+                }
+            )
+            job.status = status
+            return status
+
+        job.last_fingerprint = fingerprint
+        status.update(
+            {
+                "state": "ok",
+                "last_success": datetime.datetime.now().isoformat(),
+                "last_output": output_path,
+                "duration_seconds": round(time.monotonic() - t0, 3),
+            }
+        )
+        job.status = status
+        return status
+
+    def run_once(self, force: bool = False):
+        """Runs one round of all jobs and refreshes the status file."""
+        for job in self.jobs:
+            if self._stop_event.is_set():
+                break
+            self.run_job(job, force=force)
+        self.write_status()
+
+    def write_status(self, next_run: Optional[float] = None):
+        status = {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "updated_at": datetime.datetime.now().isoformat(),
+            "interval_seconds": self.interval,
+            "next_run": (
+                datetime.datetime.fromtimestamp(next_run).isoformat()
+                if next_run
+                else None
+            ),
+            "jobs": {job.name: job.status for job in self.jobs},
+        }
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            _write_json_atomic(self.status_file_path, status)
+        except OSError as e:
+            logger.error(f"Could not write daemon status to {self.status_file_path}: {e}")
+
+    def run_forever(self):
+        """Runs scan rounds until stop() is called."""
+        logger.info(
+            f"System Sage daemon started (interval {self.interval}s, jitter {self.jitter:.0%})."
+        )
+        while not self._stop_event.is_set():
+            self.run_once()
+            delay = self.next_delay()
+            self.write_status(next_run=time.time() + delay)
+            self._stop_event.wait(delay)
+        self.write_status()
+        logger.info("System Sage daemon stopped.")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run System Sage scans periodically in the background."
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL_SECONDS,
+        help="Seconds between scan rounds (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=DEFAULT_JITTER_FRACTION,
+        help="Random fraction of the interval to add or subtract (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--output-data-dir",
+        default=DEFAULT_OUTPUT_DATA_DIR,
+        help="Directory for timestamped results and daemon_status.json.",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Run a single forced round and exit."
+    )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Write results as JSON Lines while scanning, one record per row.",
+    )
+    parser.add_argument(
+        "--gzip", action="store_true", help="gzip-compress the --ndjson output."
+    )
+    args = parser.parse_args(argv)
+
+    lower_process_priority()
+    daemon = SystemSageDaemon(
+        output_dir=args.output_data_dir,
+        interval=args.interval,
+        jitter=args.jitter,
+        ndjson=args.ndjson,
+        compress=args.gzip,
+    )
+    if args.once:
+        daemon.run_once(force=True)
+        return 0
+
+    def _handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, stopping daemon.")
+        daemon.stop()
+
+    signal.signal(signal.SIGINT, _handle_signal)
+    signal.signal(signal.SIGTERM, _handle_signal)
+    daemon.run_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    raise SystemExit(main())
@@ -12,6 +12,7 @@ import platform
 import json
 import datetime
 import argparse
+import itertools
 import tkinter as tk
 from threading import Thread
 import traceback
@@ -25,8 +26,21 @@ from tkinter import messagebox # Import messagebox explicitly
 from typing import Optional
 
 # --- DevEnvAudit Imports ---
-from devenvaudit_src.scan_logic import EnvironmentScanner
-from devenvaudit_src.report_generator import ReportGenerator
+from devenvaudit_src.scan_logic import (
+    RESULT_EVENT_KINDS,
+    DetectedComponent,
+    EnvironmentScanner,
+    EnvironmentVariableInfo,
+    ScanIssue,
+    SoftwareCategorizer,
+    load_software_categorization_db,
+)
+from devenvaudit_src.report_generator import (
+    ReportGenerator,
+    write_combined_json_report,
+    write_combined_ndjson_report,
+)
+from devenvaudit_src.fs_cache import FileSystemCache
 
 # --- OCL Module Imports ---
 from ocl_module_src import olb_api as ocl_api
@@ -340,21 +354,29 @@ def format_size(size_bytes, calculate_disk_usage_flag):
     return f"{size_bytes:.2f} {size_name[i]}"
 
 
-def get_installed_software(calculate_disk_usage_flag):
+def get_installed_software(calculate_disk_usage_flag, filesystem=None, on_row=None, categorizer=None):
+    # Many Uninstall entries share an InstallLocation; path checks are memoized per scan.
+    # Every row gets a SoftwareCategory from one categorize_many pass over the
+    # DisplayNames (`categorizer`, or one built from the categorization database).
+    # on_row, if given, is then called with every row in registry order (e.g. a
+    # JsonLinesWriter streaming the inventory); the sorted list is returned as usual.
+    fs = filesystem if filesystem is not None else FileSystemCache()
     if not IS_WINDOWS:
         logging.info(
             "System Inventory (registry scan) is skipped as it's only available on Windows."
         )
-        return [
-            {
-                "DisplayName": "System Inventory",
-                "Remarks": "System Inventory (via registry scan) is only available on Windows.",
-                "Category": "Informational",
-            }
-        ]
+        placeholder = {
+            "DisplayName": "System Inventory",
+            "Remarks": "System Inventory (via registry scan) is only available on Windows.",
+            "Category": "Informational",
+        }
+        if on_row is not None:
+            on_row(placeholder)
+        return [placeholder]
 
     software_list = []
     processed_entries = set()
+    dir_sizes = {}  # realpath -> size; components often share an install directory
     registry_paths = [
         (
             winreg.HKEY_LOCAL_MACHINE, # type: ignore
@@ -445,16 +467,19 @@ def get_installed_software(calculate_disk_usage_flag):
                                 app_details["InstallLocation"] = (
                                     install_location_cleaned
                                 )
-                                if install_location_cleaned and os.path.isdir(
+                                if install_location_cleaned and fs.isdir(
                                     install_location_cleaned
                                 ):
                                     app_details["PathStatus"] = "OK"
                                     if calculate_disk_usage_flag:
                                         try:
-                                            dir_size = get_directory_size(
-                                                install_location_cleaned,
-                                                calculate_disk_usage_flag,
-                                            )
+                                            size_key = fs.realpath(install_location_cleaned)
+                                            if size_key not in dir_sizes:
+                                                dir_sizes[size_key] = get_directory_size(
+                                                    install_location_cleaned,
+                                                    calculate_disk_usage_flag,
+                                                )
+                                            dir_size = dir_sizes[size_key]
                                             app_details["InstallLocationSize"] = (
                                                 format_size(
                                                     dir_size, calculate_disk_usage_flag
@@ -467,7 +492,7 @@ def get_installed_software(calculate_disk_usage_flag):
                                             app_details["Remarks"] += (
                                                 f"Size calc error: {e_size};"
                                             )
-                                elif install_location_cleaned and os.path.isfile(
+                                elif install_location_cleaned and fs.isfile(
                                     install_location_cleaned
                                 ):
                                     app_details["PathStatus"] = "OK (File)"
@@ -476,7 +501,7 @@ def get_installed_software(calculate_disk_usage_flag):
                                     )
                                     if calculate_disk_usage_flag:
                                         try:
-                                            file_size = os.path.getsize(
+                                            file_size = fs.getsize(
                                                 install_location_cleaned
                                             )
                                             app_details["InstallLocationSize"] = (
@@ -522,50 +547,69 @@ def get_installed_software(calculate_disk_usage_flag):
                 f"An error occurred accessing registry path {hive_display_name} - {path_suffix}: {e_outer}",
                 exc_info=True,
             )
+    logging.debug(f"System Inventory filesystem cache: {fs.summary()}")
+    categorize_inventory(software_list, categorizer)
+    if on_row is not None:
+        for app_details in software_list:
+            on_row(app_details)
     return sorted(software_list, key=lambda x: str(x.get("DisplayName", "")).lower())
 
 
+def categorize_inventory(software_list, categorizer=None):
+    """Sets each inventory row's SoftwareCategory from the software categorization database."""
+    if not software_list:
+        return
+    if categorizer is None:
+        categorizer = SoftwareCategorizer(load_software_categorization_db())
+    categories = categorizer.categorize_many(row.get("DisplayName") for row in software_list)
+    for row, (category, _) in zip(software_list, categories):
+        row["SoftwareCategory"] = category or "Unknown"
+
+
 def output_to_json_combined(
     system_inventory_data,
     devenv_components_data,
     devenv_env_vars_data,
     devenv_issues_data,
     output_dir,
-    filename="system_sage_combined_report.json",
+    filename=None,
+    compact=False,
+    ndjson=False,
+    compress=False,
+    scan_id=None,
 ):
-    combined_data = {}
-    is_sys_inv_placeholder = (
-        system_inventory_data
-        and len(system_inventory_data) == 1
-        and system_inventory_data[0].get("Category") == "Informational"
-    )
-    if system_inventory_data and not is_sys_inv_placeholder:
-        combined_data["systemInventory"] = system_inventory_data
-    devenv_audit_data = {}
-    if devenv_components_data:
-        devenv_audit_data["detectedComponents"] = [
-            comp.to_dict() for comp in devenv_components_data
-        ]
-    if devenv_env_vars_data:
-        devenv_audit_data["environmentVariables"] = [
-            ev.to_dict() for ev in devenv_env_vars_data
-        ]
-    if devenv_issues_data:
-        devenv_audit_data["identifiedIssues"] = [
-            issue.to_dict() for issue in devenv_issues_data
-        ]
-    if devenv_audit_data:
-        combined_data["devEnvAudit"] = devenv_audit_data
-    if not combined_data and is_sys_inv_placeholder:
-        combined_data["systemInventory"] = system_inventory_data
-    if not combined_data:
-        logging.info("No data to save to JSON report.")
-        return
+    # Rows are streamed to disk one at a time (see devenvaudit_src/json_stream.py)
+    # instead of building the whole report in memory first. ndjson=True writes
+    # JSON Lines records instead, gzip-compressed if compress=True.
+    if filename is None:
+        filename = "system_sage_combined_report." + ("ndjson" if ndjson else "json")
+        if ndjson and compress:
+            filename += ".gz"
     try:
         os.makedirs(output_dir, exist_ok=True)
         full_path = os.path.join(output_dir, filename)
-        with open(full_path, "w", encoding="utf-8") as f:
-            json.dump(combined_data, f, ensure_ascii=False, indent=4)
+        if ndjson:
+            written = write_combined_ndjson_report(
+                full_path,
+                system_inventory_data,
+                devenv_components_data,
+                devenv_env_vars_data,
+                devenv_issues_data,
+                scan_id=scan_id,
+                compress=compress,
+            )
+        else:
+            written = write_combined_json_report(
+                full_path,
+                system_inventory_data,
+                devenv_components_data,
+                devenv_env_vars_data,
+                devenv_issues_data,
+                compact=compact,
+            )
+        if not written:
+            logging.info("No data to save to JSON report.")
+            return
         logging.info(f"Combined JSON report successfully saved to {full_path}")
     except Exception as e:
         logging.error(
@@ -792,7 +836,7 @@ class SystemSageApp(customtkinter.CTk):
         filter_entry.bind("<KeyRelease>", lambda e: self.update_inventory_display())
 
         # Treeview setup
-        inv_cols = ["Name", "Version", "Publisher", "Path", "Size", "Status", "Remarks", "SourceHive", "RegKey"]
+        inv_cols = ["Name", "Version", "Publisher", "Category", "Path", "Size", "Status", "Remarks", "SourceHive", "RegKey"]
         self.inventory_tree = ttk.Treeview(inventory_outer_frame, columns=inv_cols, show="headings", selectmode="browse")
         for col in inv_cols:
             self.inventory_tree.heading(col, text=col, command=lambda c=col: self._sort_inventory_by_column(c, False))
@@ -844,7 +888,7 @@ class SystemSageApp(customtkinter.CTk):
         devenv_components_tab = devenv_notebook.tab("Detected Components")
         devenv_components_tab.grid_rowconfigure(0, weight=1)
         devenv_components_tab.grid_columnconfigure(0, weight=1)
-        comp_cols = ["ID", "Name", "Category", "Version", "Path", "Executable Path", "Source", "DB Name"]
+        comp_cols = ["ID", "Name", "Category", "Version", "Update", "Path", "Executable Path", "Source", "DB Name"]
         self.devenv_components_tree = ttk.Treeview(devenv_components_tab, columns=comp_cols, show="headings", selectmode="browse")
         for col in comp_cols:
             self.devenv_components_tree.heading(col, text=col, command=lambda c=col: self._sort_treeview_by_column(self.devenv_components_tree, c, False))
@@ -1050,12 +1094,24 @@ class SystemSageApp(customtkinter.CTk):
     def run_devenv_audit_scan_thread(self, on_finish_callback=None):
         try:
             scanner = EnvironmentScanner()
-            (
-                self.devenv_components_results,
-                self.devenv_env_vars_results,
-                self.devenv_issues_results,
-            ) = scanner.run_scan() # Corrected method call
-            self.after(0, self.update_devenv_audit_display)
+            # Progress and results reach the UI through the scanner's event bus, which
+            # coalesces progress updates; the UI thread polls it instead of receiving
+            # one after() call per scanned item, and fills the DevEnv trees as
+            # components, variables and issues are found.
+            scan_events = scanner.events.subscribe(
+                self._on_devenv_scan_event, kinds=("status", "progress", "update_info") + RESULT_EVENT_KINDS
+            )
+            self.after(0, self._clear_devenv_audit_display)
+            self.after(0, self._poll_scan_events, scan_events)
+            try:
+                (
+                    self.devenv_components_results,
+                    self.devenv_env_vars_results,
+                    self.devenv_issues_results,
+                ) = scanner.run_scan() # Corrected method call
+            finally:
+                scanner.events.close()
+            self.after(0, self._show_final_devenv_results, scan_events)
         except Exception as e:
             logging.error(f"Error during DevEnv Audit scan: {e}", exc_info=True)
             self.after(0, lambda: self.update_status_bar(f"DevEnv Audit scan failed: {e}", is_error=True))
@@ -1064,6 +1120,39 @@ class SystemSageApp(customtkinter.CTk):
             return
         self.after(0, self.finalize_scan, on_finish_callback)
 
+    def _poll_scan_events(self, subscription):
+        """Delivers pending scan events on the UI thread until the subscription is closed."""
+        closed = subscription.closed  # Read first: events published before close() are drained below
+        subscription.drain()
+        if closed:
+            return  # Scan finished; finalize_scan sets the final status text
+        self.after(max(1, int(subscription.interval * 1000)), self._poll_scan_events, subscription)
+
+    def _show_final_devenv_results(self, subscription):
+        """
+        Redraws the DevEnv trees from the finished scan's results. Events the
+        poller has not delivered yet are dropped first: the redraw already
+        contains them, and delivering them afterwards would add their rows twice.
+        """
+        subscription.discard()
+        self.update_devenv_audit_display()
+
+    def _on_devenv_scan_event(self, event):
+        if event.kind in RESULT_EVENT_KINDS:
+            self._append_devenv_result(event.data[event.kind])
+        elif event.kind == "update_info":
+            # Update checks finish after their component's row was added
+            tree = self.devenv_components_tree
+            component = event.data["component"]
+            if tree and tree.exists(component.id):
+                tree.set(component.id, "Update", self._format_update_info(component.update_info))
+        elif event.kind == "status":
+            self._devenv_scan_status = event.data.get("message", "")
+            self.update_status_bar(self._devenv_scan_status)
+        elif event.kind == "progress" and event.data.get("total"):
+            status = getattr(self, "_devenv_scan_status", "") or event.data.get("message", "")
+            self.update_status_bar(f"{status} ({event.data['current']}/{event.data['total']})")
+
     def finalize_scan(self, on_finish_callback=None):
         """
         Finalizes a scan step. If a callback is provided, it executes it (to chain scans).
@@ -1099,7 +1188,7 @@ class SystemSageApp(customtkinter.CTk):
     def update_inventory_display(self):
         if not hasattr(self, 'inventory_tree') or not self.inventory_tree:
             return
-        inv_cols = ["Name", "Version", "Publisher", "Path", "Size", "Status", "Remarks", "SourceHive", "RegKey"]
+        inv_cols = ["Name", "Version", "Publisher", "Category", "Path", "Size", "Status", "Remarks", "SourceHive", "RegKey"]
         # Clear current rows
         inv_children = self.inventory_tree.get_children()
         if inv_children:
@@ -1113,6 +1202,7 @@ class SystemSageApp(customtkinter.CTk):
                 item.get("DisplayName", "N/A"),
                 item.get("DisplayVersion", "N/A"),
                 item.get("Publisher", "N/A"),
+                item.get("SoftwareCategory", "N/A"),
                 item.get("InstallLocation", "N/A"),
                 item.get("InstallLocationSize", "N/A"),
                 item.get("PathStatus", "N/A"),
@@ -1168,47 +1258,67 @@ class SystemSageApp(customtkinter.CTk):
             self._inventory_sort_reverse = False
 
 
-    def update_devenv_audit_display(self):
-        # Components
-        if hasattr(self, 'devenv_components_tree') and self.devenv_components_tree:
-            comp_cols = ["ID", "Name", "Category", "Version", "Path", "Executable Path", "Source", "DB Name"]
-            comp_children = self.devenv_components_tree.get_children()
-            if comp_children:
-                self.devenv_components_tree.delete(*comp_children)
-            if self.devenv_components_results:
-                for comp in self.devenv_components_results:
-                    row = [
-                        getattr(comp, 'id', 'N/A'), getattr(comp, 'name', 'N/A'), getattr(comp, 'category', 'N/A'),
-                        getattr(comp, 'version', 'N/A') or "N/A", getattr(comp, 'path', 'N/A') or "N/A",
-                        getattr(comp, 'executable_path', 'N/A') or "N/A", getattr(comp, 'source_detection', 'N/A') or "N/A", getattr(comp, 'matched_db_name', 'N/A') or "N/A"
-                    ]
-                    self.devenv_components_tree.insert("", "end", values=row)
-
-        # Env Vars
-        if hasattr(self, 'devenv_env_vars_tree') and self.devenv_env_vars_tree:
-            env_cols = ["Name", "Value", "Scope"]
-            env_children = self.devenv_env_vars_tree.get_children()
-            if env_children:
-                self.devenv_env_vars_tree.delete(*env_children)
-            if self.devenv_env_vars_results:
-                for var in self.devenv_env_vars_results:
-                    row = [var.name, var.value, var.scope]
-                    self.devenv_env_vars_tree.insert("", "end", values=row)
-
-        # Issues
-        if hasattr(self, 'devenv_issues_tree') and self.devenv_issues_tree:
-            issue_cols = ["Severity", "Description", "Category", "Component ID", "Related Path"]
-            issue_children = self.devenv_issues_tree.get_children()
-            if issue_children:
-                self.devenv_issues_tree.delete(*issue_children)
-            if self.devenv_issues_results:
-                for issue in self.devenv_issues_results:
-                    row = [
-                        issue.severity, issue.description, issue.category,
-                        issue.component_id or "N/A", issue.related_path or "N/A"
-                    ]
-                    self.devenv_issues_tree.insert("", "end", values=row)
-        self.update_status_bar(f"DevEnv Audit updated with {len(self.devenv_components_results)} components and {len(self.devenv_issues_results)} issues.", clear_after_ms=4000)
+    def _clear_devenv_audit_display(self):
+        for tree in (self.devenv_components_tree, self.devenv_env_vars_tree, self.devenv_issues_tree):
+            if tree:
+                children = tree.get_children()
+                if children:
+                    tree.delete(*children)
+
+    def _append_devenv_result(self, item):
+        """Adds one DetectedComponent, EnvironmentVariableInfo or ScanIssue row to its tree."""
+        if isinstance(item, DetectedComponent):
+            if self.devenv_components_tree:
+                row = [
+                    getattr(item, 'id', 'N/A'), getattr(item, 'name', 'N/A'), getattr(item, 'category', 'N/A'),
+                    getattr(item, 'version', 'N/A') or "N/A", self._format_update_info(getattr(item, 'update_info', None)),
+                    getattr(item, 'path', 'N/A') or "N/A",
+                    getattr(item, 'executable_path', 'N/A') or "N/A", getattr(item, 'source_detection', 'N/A') or "N/A", getattr(item, 'matched_db_name', 'N/A') or "N/A"
+                ]
+                if not self.devenv_components_tree.exists(item.id):
+                    self.devenv_components_tree.insert("", "end", iid=item.id, values=row)
+        elif isinstance(item, EnvironmentVariableInfo):
+            if self.devenv_env_vars_tree:
+                self.devenv_env_vars_tree.insert("", "end", values=[item.name, item.value, item.scope])
+        elif isinstance(item, ScanIssue):
+            if self.devenv_issues_tree:
+                row = [
+                    item.severity, item.description, item.category,
+                    item.component_id or "N/A", item.related_path or "N/A"
+                ]
+                self.devenv_issues_tree.insert("", "end", values=row)
+
+    @staticmethod
+    def _format_update_info(update_info):
+        """Text of the DevEnv "Update" column for a component's update_info."""
+        if not update_info or not update_info.get("latest_version"):
+            return ""
+        if update_info.get("is_update_available"):
+            return f"{update_info['latest_version']} via {update_info.get('package_manager_name', '?')}"
+        return "Up to date"
+
+    def update_devenv_audit_display(self, results=None):
+        """
+        Redraws the DevEnv trees from `results` (an iterable of scan results
+        that is already available, e.g. a finished scan's lists), defaulting to
+        the stored results of the last scan. Runs on the Tk thread: results of
+        a running scan are streamed through _poll_scan_events instead.
+        """
+        self._clear_devenv_audit_display()
+        if results is None:
+            results = itertools.chain(
+                self.devenv_components_results or [],
+                self.devenv_env_vars_results or [],
+                self.devenv_issues_results or [],
+            )
+        components = issues = 0
+        for item in results:
+            self._append_devenv_result(item)
+            if isinstance(item, DetectedComponent):
+                components += 1
+            elif isinstance(item, ScanIssue):
+                issues += 1
+        self.update_status_bar(f"DevEnv Audit updated with {components} components and {issues} issues.", clear_after_ms=4000)
 
     def _sort_treeview_by_column(self, tree, col, reverse):
         if not tree:
@@ -1532,7 +1642,17 @@ class SystemSageApp(customtkinter.CTk):
 if __name__ == "__main__":
     # --- Logging Configuration ---
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    
+
+    # --- Background Daemon Mode ---
+    # "--daemon" runs scheduled scans without the GUI; remaining arguments
+    # (e.g. --interval, --once) are handled by systemsage_daemon.
+    cli_parser = argparse.ArgumentParser(description="System Sage", add_help=False)
+    cli_parser.add_argument("--daemon", action="store_true", help="Run scheduled scans in the background without the GUI.")
+    cli_args, remaining_args = cli_parser.parse_known_args()
+    if cli_args.daemon:
+        from systemsage_daemon import main as daemon_main
+        sys.exit(daemon_main(remaining_args))
+
     # --- Main Application Entry Point ---
     app = SystemSageApp()
     app.mainloop()
\ No newline at end of file
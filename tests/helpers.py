@@ -0,0 +1,58 @@
+"""Shared builders for the DevEnvAudit scanner tests."""
+
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src import scan_logic as devenv_scan_logic
+from devenvaudit_src.scan_logic import DetectedComponent
+from devenvaudit_src.tools_db import compile_tools_db
+
+# Scan stages that are on by default but reach past a test's own tools,
+# filesystem and probes (disk caches, real package managers, the home
+# directory). make_scanner turns them off; a test enables the one it covers,
+# e.g. make_scanner(cross_reference_tools=True).
+OPTIONAL_STAGES_OFF = {
+    "version_probe_cache_enabled": False,
+    "static_version_probe_enabled": False,
+    "incremental_scan_enabled": False,
+    "discovery_enabled": False,
+    "version_manager_discovery_enabled": False,
+    "ecosystem_inventory_enabled": False,
+    "cross_reference_tools": False,
+    "perform_update_checks": False,
+}
+
+
+def make_scanner(tools=None, filesystem=None, system="Linux", **scan_options):
+    """
+    An EnvironmentScanner with an empty config, no categorization and the
+    optional stages off; `scan_options` are applied on top. `tools` (tool
+    definitions) replace the bundled tools database.
+    """
+    config = {"scan_options": {**OPTIONAL_STAGES_OFF, **scan_options}}
+    with (
+        patch("devenvaudit_src.scan_logic.load_config", return_value=config),
+        patch("devenvaudit_src.scan_logic.SoftwareCategorizer"),
+    ):
+        scanner = devenv_scan_logic.EnvironmentScanner(filesystem=filesystem)
+    scanner.categorizer.categorize_component.return_value = (None, None)
+    scanner.system = system
+    if tools is not None:
+        scanner.tools_db = compile_tools_db(tools)
+    return scanner
+
+
+def component(name, version, exe_path, category="Tool", **details):
+    """A detected component at `exe_path`; its id is unique per name, version and executable name."""
+    return DetectedComponent(
+        id=f"{name.lower()}_{version}_{os.path.basename(exe_path)}",
+        name=name,
+        category=category,
+        version=version,
+        path=os.path.dirname(exe_path),
+        executable_path=exe_path,
+        details=details,
+    )
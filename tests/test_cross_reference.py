@@ -0,0 +1,124 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.cross_reference import CrossReferenceAnalyzer
+from devenvaudit_src.fs_cache import FakeFileSystem
+from devenvaudit_src.path_index import PathIndex
+from tests.helpers import component, make_scanner
+
+LINK = {"type": "file", "executable": True}
+
+TREE = {
+    "/usr/local/bin/python3": "exe",
+    "/usr/bin/python3": {**LINK, "target": "/usr/bin/python3.11"},
+    "/usr/bin/python3.11": "exe",
+    "/opt/bin/python3": {**LINK, "target": "/usr/bin/python3.11"},  # Same target again
+    "/usr/bin/java": {**LINK, "target": "/usr/lib/jvm/java-11/bin/java"},
+    "/usr/lib/jvm/java-11/bin/java": "exe",
+    "/usr/lib/jvm/java-17/bin/java": "exe",
+    "/usr/bin/git": "exe",
+}
+PATH = os.pathsep.join(["/usr/local/bin", "/usr/bin", "/opt/bin"])
+
+
+class TestCrossReferenceAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.fs = FakeFileSystem(TREE)
+        self.path_index = PathIndex(PATH, system="Linux", filesystem=self.fs).build()
+
+    def _run(self, components, environment=None):
+        analyzer = CrossReferenceAnalyzer(
+            components, environment or {}, self.path_index, filesystem=self.fs,
+            tool_executables={"Python": ["python3", "python"]},
+        )
+        return analyzer, analyzer.run()
+
+    def test_shadowing_chain_is_ordered_and_collapses_links(self):
+        local = component("Python", "3.12.0", "/usr/local/bin/python3")
+        system = component("Python", "3.11.2", "/usr/bin/python3.11")
+        analyzer, findings = self._run([local, system])
+
+        chain = analyzer.shadowing["python3"]
+        self.assertEqual(chain.paths, ["/usr/local/bin/python3", "/usr/bin/python3"])
+        self.assertEqual([e.component_id for e in chain.entries], [local.id, system.id])
+        self.assertNotIn("python", analyzer.shadowing)  # Not on PATH at all
+
+        shadowing = [f for f in findings if f.category == "Pathing"]
+        self.assertEqual(len(shadowing), 1)
+        self.assertEqual(shadowing[0].severity, "Warning")  # Different versions
+        self.assertEqual(shadowing[0].component_id, local.id)
+        self.assertIn("1. /usr/local/bin/python3 (3.12.0); 2. /usr/bin/python3 (3.11.2)", shadowing[0].description)
+
+    def test_java_home_compared_with_the_java_on_path(self):
+        jdk11 = component("Java", "11.0.20", "/usr/lib/jvm/java-11/bin/java")
+        jdk17 = component("Java", "17.0.8", "/usr/lib/jvm/java-17/bin/java", version_manager="sdkman")
+
+        _, findings = self._run([jdk11, jdk17], {"JAVA_HOME": "/usr/lib/jvm/java-17"})
+        home = [f for f in findings if f.category == "Configuration"]
+        self.assertEqual(len(home), 1)
+        self.assertEqual(home[0].component_id, jdk17.id)
+        self.assertIn("PATH runs /usr/bin/java (11.0.20)", home[0].description)
+
+        _, findings = self._run([jdk11, jdk17], {"JAVA_HOME": "/usr/lib/jvm/java-11"})
+        self.assertFalse([f for f in findings if f.category == "Configuration"])
+
+        _, findings = self._run([jdk11], {"JAVA_HOME": "/usr/lib/jvm/java-17"})
+        self.assertIn("not one of the detected installations", findings[-1].description)
+
+    def test_duplicates_and_conflicts_ignore_version_managers(self):
+        components = [
+            component("Git", "2.39.2", "/usr/bin/git"),
+            component("Git", "2.39.2", "/usr/local/git/bin/git"),
+            component("Java", "11.0.20", "/usr/lib/jvm/java-11/bin/java"),
+            component("Java", "17.0.8", "/usr/lib/jvm/java-17/bin/java", version_manager="sdkman"),
+            component("Python", "3.12.0", "/usr/local/bin/python3"),
+            component("Python", "3.11.2", "/usr/bin/python3.11"),
+        ]
+        _, findings = self._run(components)
+        version_findings = sorted(f.description for f in findings if f.category == "Version")
+        self.assertEqual(
+            version_findings,
+            [
+                "Conflicting Python installations: versions 3.11.2, 3.12.0.",
+                "Git 2.39.2 is installed 2 times: /usr/bin/git, /usr/local/git/bin/git",
+            ],
+        )
+
+
+class TestScannerCrossReferencePhase(unittest.TestCase):
+    def setUp(self):
+        self.scanner = make_scanner(
+            [{"id": "python", "name": "Python", "executables": {"Linux": ["python3"]}}],
+            filesystem=FakeFileSystem(TREE),
+            cross_reference_tools=True,
+        )
+        self.scanner.path_index = PathIndex(PATH, system="Linux", filesystem=self.scanner.fs).build()
+
+    def test_issues_carry_component_ids_and_chain_is_recorded(self):
+        tool_cfg = {"id": "python", "name": "Python"}
+        self.scanner._add_detected_component(tool_cfg, "/usr/local/bin/python3", "3.12.0")
+        self.scanner._add_detected_component(tool_cfg, "/usr/bin/python3.11", "3.11.2")
+
+        self.scanner.cross_reference_and_analyze()
+
+        winner = self.scanner.detected_components[0]
+        self.assertEqual(
+            self.scanner.path_shadowing["python3"], ["/usr/local/bin/python3", "/usr/bin/python3"]
+        )
+        self.assertEqual(winner.details["path_shadowing"]["python3"][0], "/usr/local/bin/python3")
+        self.assertTrue(self.scanner.issues)
+        self.assertTrue(all(issue.component_id for issue in self.scanner.issues))
+
+    def test_phase_can_be_disabled(self):
+        self.scanner.scan_options["cross_reference_tools"] = False
+        self.scanner._add_detected_component({"id": "python", "name": "Python"}, "/usr/local/bin/python3", "3.12.0")
+        self.scanner.cross_reference_and_analyze()
+        self.assertEqual(self.scanner.path_shadowing, {})
+        self.assertEqual(self.scanner.issues, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -177,6 +177,7 @@ class TestDevEnvAuditGUIIntegration(unittest.TestCase):  # Removed class decorat
         # Adding missing attributes based on SystemSageApp's usage
         mock_comp1.source_detection = "TestDB"
         mock_comp1.matched_db_name = "TestToolX"
+        mock_comp1.update_info = None
 
         mock_env1 = MagicMock()
         mock_env1.name = "PATH"
@@ -195,7 +196,7 @@ class TestDevEnvAuditGUIIntegration(unittest.TestCase):  # Removed class decorat
             [mock_env1],
             [mock_issue1],
         )
-
+        self.app.devenv_components_tree.exists.return_value = False
 
         # Call the thread's target method directly to avoid thread complexities in test
         self.app.run_devenv_audit_thread()
@@ -206,12 +207,13 @@ class TestDevEnvAuditGUIIntegration(unittest.TestCase):  # Removed class decorat
             "ToolX",
             "IDE",
             "1.0",
+            "",
             "/opt/toolx",
             "/opt/toolx/bin/toolx",
             "TestDB",
             "TestToolX",
         ]
-        self.app.devenv_components_tree.insert.assert_any_call("", "end", values=expected_component_row)
+        self.app.devenv_components_tree.insert.assert_any_call("", "end", iid="c1", values=expected_component_row)
 
         # Verify env vars tree population
         expected_env_row = ["PATH", "/usr/bin", "System"]
@@ -224,6 +226,52 @@ class TestDevEnvAuditGUIIntegration(unittest.TestCase):  # Removed class decorat
         self.app.status_bar.configure.assert_called()
         self.app.devenv_audit_button.configure.assert_called()
 
+    def test_final_redraw_does_not_repeat_streamed_rows(self):
+        """Rows still queued when the scan ends are only drawn once, by the final redraw."""
+        from devenvaudit_src.events import ScanEventBus
+        from devenvaudit_src.scan_logic import EnvironmentVariableInfo, ScanIssue
+
+        env_var = EnvironmentVariableInfo(name="PATH", value="/usr/bin", scope="Process")
+        issues = [
+            ScanIssue(severity="Warning", description="PATH entry missing", category="Pathing"),
+            ScanIssue(severity="Info", description="Conflicting Python installations", category="Version"),
+        ]
+        bus = ScanEventBus()
+        subscription = bus.subscribe(self.app._on_devenv_scan_event)
+        bus.publish("environment_variable", environment_variable=env_var)
+        bus.publish("issue", issue=issues[0])
+        self.app._poll_scan_events(subscription)
+        bus.publish("issue", issue=issues[1])  # Cross-reference issue, found after the last poll
+        bus.close()
+
+        self.app.devenv_components_results, self.app.devenv_env_vars_results = [], [env_var]
+        self.app.devenv_issues_results = issues
+        self.app.devenv_env_vars_tree.insert.reset_mock()
+        self.app.devenv_issues_tree.insert.reset_mock()
+        self.app._show_final_devenv_results(subscription)
+        self.app._poll_scan_events(subscription)
+
+        self.assertEqual(self.app.devenv_env_vars_tree.insert.call_count, 1)
+        self.assertEqual(self.app.devenv_issues_tree.insert.call_count, 2)
+
+    def test_redraw_from_given_results_counts_what_it_drew(self):
+        from devenvaudit_src.scan_logic import DetectedComponent, ScanIssue
+
+        self.app.devenv_components_results = [MagicMock(), MagicMock(), MagicMock()]  # Previous scan
+        self.app.devenv_issues_results = []
+        self.app.devenv_components_tree.exists.return_value = False
+        self.app.update_status_bar = MagicMock()
+        results = [
+            DetectedComponent(id="git", name="Git", version="2.43.0"),
+            ScanIssue(severity="Warning", description="PATH entry missing", category="Pathing"),
+        ]
+
+        self.app.update_devenv_audit_display(results=iter(results))
+
+        self.app.update_status_bar.assert_called_once_with(
+            "DevEnv Audit updated with 1 components and 1 issues.", clear_after_ms=4000
+        )
+
     @patch.object(SystemSageApp, "after")
     @patch("systemsage_main.logging.error")
     @patch("systemsage_main.show_custom_messagebox")
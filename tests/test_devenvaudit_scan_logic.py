@@ -9,6 +9,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 # For DevEnvAudit modules:
 from devenvaudit_src import config_manager as devenv_config_manager
 from devenvaudit_src import scan_logic as devenv_scan_logic
+from devenvaudit_src.fs_cache import FakeFileSystem, FileSystemCache
+from devenvaudit_src.tools_db import compile_tools_db
+from tests.helpers import make_scanner
 
 
 class TestDevEnvAuditConfigLoading(unittest.TestCase):
@@ -79,53 +82,86 @@ class TestDevEnvAuditConfigLoading(unittest.TestCase):
 
 
 class TestDevEnvAuditScanLogicAssetLoading(unittest.TestCase):
-    # Patch 'open' at the module level where scan_logic is defined.
-    # This needs careful handling due to module-level loading in scan_logic.
-    @patch("devenvaudit_src.scan_logic.open", new_callable=mock_open)
-    def test_tools_db_loading_success(self, mock_file):
-        # Set up the mock for the open call that loads TOOLS_DB_PATH
-        tools_db_content = '[{"id": "test_tool", "name": "Test Tool"}]'
-
-        # We need to ensure this mock is active when scan_logic is reloaded/imported.
-        # The patch should apply to 'devenvaudit_src.scan_logic.open'
-
-        # Mock json.load within scan_logic's scope
-        with patch("devenvaudit_src.scan_logic.json.load") as mock_json_load:
-            mock_json_load.return_value = json.loads(
-                tools_db_content
-            )  # Simulate successful JSON parsing
-
-            # Configure the specific open call for TOOLS_DB_PATH
-            # This is tricky because the path is constructed inside scan_logic.
-            # A direct patch on scan_logic.open is better.
-            # We'll assume the mock_file (patched scan_logic.open) is called correctly.
-            # To ensure the mock is configured for the right file, we check the path later.
-            # For now, just make sure it returns the content.
-            mock_file.return_value.read.return_value = tools_db_content
-
-            # Reload scan_logic to trigger module-level code execution with patches
-            import importlib
-
-            importlib.reload(devenv_scan_logic)
-
-        # Verify TOOLS_DB content
-        self.assertIsNotNone(devenv_scan_logic.TOOLS_DB, "TOOLS_DB should not be None")
+    def test_tools_db_loading_success(self):
+        # scan_logic compiles the tools DB at import time via tools_db.load_tools_db.
+        compiled = compile_tools_db([{"id": "test_tool", "name": "Test Tool"}])
+        # Executes a private copy of the module, so other tests keep the shared
+        # module's classes (a reload would replace them for every later test).
+        import importlib.util
+
+        spec = importlib.util.find_spec("devenvaudit_src.scan_logic")
+        fresh_scan_logic = importlib.util.module_from_spec(spec)
+        with patch(
+            "devenvaudit_src.tools_db.load_tools_db", return_value=compiled
+        ) as mock_load:
+            spec.loader.exec_module(fresh_scan_logic)
+
+        self.assertIs(fresh_scan_logic.COMPILED_TOOLS_DB, compiled)
         self.assertEqual(
-            devenv_scan_logic.TOOLS_DB, [{"id": "test_tool", "name": "Test Tool"}]
+            fresh_scan_logic.TOOLS_DB, [{"id": "test_tool", "name": "Test Tool"}]
         )
-
-        # Verify open was called with the correct path (constructed in scan_logic)
-        # This requires knowing the exact path string.
         expected_tools_db_path = os.path.join(
-            os.path.dirname(devenv_scan_logic.__file__), "tools_database.json"
+            os.path.dirname(fresh_scan_logic.__file__), "tools_database.json"
         )
-        mock_file.assert_called_with(expected_tools_db_path, "r", encoding="utf-8")
+        mock_load.assert_called_once_with(expected_tools_db_path)
 
     def test_software_categorizer_init_handles_db_load_failure(self):
         categorizer = devenv_scan_logic.SoftwareCategorizer(categorization_data={})
         self.assertEqual(categorizer.categorization_data, {})
 
 
+class TestSoftwareCategorizer(unittest.TestCase):
+    DB = {
+        "IDEs": [
+            {"name": "Visual Studio Code", "executables": ["Code.exe"], "keywords": ["vscode"]},
+            {"name": "PyCharm", "executables": ["pycharm64.exe"], "keywords": ["jetbrains"]},
+        ],
+        "Languages": [
+            {"name": "Python", "executables": ["python.exe"], "keywords": ["cpython", "py"]},
+            {"name": None, "keywords": None},
+        ],
+    }
+
+    def setUp(self):
+        self.categorizer = devenv_scan_logic.SoftwareCategorizer(self.DB)
+
+    def test_executable_match_takes_precedence(self):
+        self.assertEqual(
+            self.categorizer.categorize_component("Some Python Tool", "/opt/apps/CODE.EXE"),
+            ("IDEs", "Visual Studio Code"),
+        )
+
+    def test_first_matching_entry_in_database_order_wins(self):
+        # "jetbrains" (PyCharm) and "py" (Python) both occur; PyCharm comes first.
+        self.assertEqual(
+            self.categorizer.categorize_component("JetBrains Python Plugin"),
+            ("IDEs", "PyCharm"),
+        )
+        self.assertEqual(
+            self.categorizer.categorize_component("cpython 3.12"), ("Languages", "Python")
+        )
+        self.assertEqual(self.categorizer.categorize_component("Notepad"), (None, None))
+
+    def test_categorize_many_matches_single_calls(self):
+        items = ["VSCode Insiders", ("Runner", "/usr/bin/python.exe"), "Notepad", "VSCode Insiders"]
+        expected = [
+            ("IDEs", "Visual Studio Code"),
+            ("Languages", "Python"),
+            (None, None),
+            ("IDEs", "Visual Studio Code"),
+        ]
+        self.assertEqual(self.categorizer.categorize_many(items), expected)
+        self.assertEqual(len(self.categorizer._memo), 3)
+
+    def test_keyword_automaton_overlapping_patterns(self):
+        from devenvaudit_src.keyword_automaton import KeywordAutomaton
+
+        automaton = KeywordAutomaton([("she", 3), ("he", 2), ("hers", 1), ("his", 0)])
+        self.assertEqual(automaton.best_match("ushers"), 1)
+        self.assertEqual(automaton.best_match("ushe"), 2)
+        self.assertIsNone(automaton.best_match("xyz"))
+
+
 class TestEnvironmentScannerHelpers(unittest.TestCase):
     def setUp(self):
         # Create a dummy scanner instance, mocking config loading if it happens in __init__
@@ -146,15 +182,13 @@ class TestEnvironmentScannerHelpers(unittest.TestCase):
         mock_process.communicate.return_value = ("Python 3.9.1", "")
 
         mock_process.returncode = 0
-        # Patch os.path.exists, isfile and access for the executable path check
-        with (
-            patch("os.path.exists", return_value=True),
-            patch("os.path.isfile", return_value=True),
-            patch("os.access", return_value=True),
-        ):
-            version = self.scanner._get_version_from_command(
-                "python", ["--version"], r"Python\s+([0-9\.]+)"
-            )
+        # The executable path check goes through the scanner's filesystem facade
+        self.scanner.fs = FakeFileSystem({"/usr/bin/python": "exe"})
+        self.scanner.probe_cache = None
+        self.scanner.static_version_probe = False  # Would read the real /usr/bin/python
+        version = self.scanner._get_version_from_command(
+            "/usr/bin/python", ["--version"], r"Python\s+([0-9\.]+)"
+        )
         self.assertEqual(version, "3.9.1")
 
     @patch("subprocess.Popen")
@@ -175,37 +209,204 @@ class TestEnvironmentScannerHelpers(unittest.TestCase):
             version = self.scanner._get_version_from_command("cmd", ["arg"], r"(.+)")
         self.assertIsNone(version)  # Or check for specific error logging/handling
 
-    @patch.dict(
-        os.environ, {"PATH": "/test/bin:/usr/bin"}, clear=True
-    )  # clear=True ensures a clean PATH
-    @patch("devenvaudit_src.scan_logic.Path")  # Patch Path in the module
-    @patch("os.access")  # os.access is still used
-    def test_find_executable_in_path(self, mock_os_access, mock_path_class):
-        # Scenario: exe exists and is executable
-
-        def path_side_effect(path_str):
-            mock_path = unittest.mock.MagicMock()
-            mock_path.__str__.return_value = path_str
-            mock_path.__truediv__.side_effect = lambda other: path_side_effect(
-                os.path.join(path_str, other)
-            )
-            mock_path.is_file.return_value = path_str == "/test/bin/myexe"
-            mock_path.resolve.return_value = path_str
-            return mock_path
-
-        mock_path_class.side_effect = path_side_effect
-
-        mock_os_access.return_value = True  # os.access(exe_path, os.X_OK)
-
-        # Clear cached found_executables for consistent test runs
-        self.scanner.found_executables = {}
-        found_path = self.scanner._find_executable_in_path("myexe")
-        self.assertEqual(found_path, "/test/bin/myexe")
-
-        # Scenario: exe not found
-        self.scanner.found_executables = {}  # Clear cache
-        found_path_not = self.scanner._find_executable_in_path("another_exe")
-        self.assertIsNone(found_path_not)
+    def test_find_executable_in_path(self):
+        import shutil
+        import tempfile
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        bin_dir = os.path.join(tmp_dir, "bin")
+        os.mkdir(bin_dir)
+        exe_path = os.path.join(bin_dir, "myexe")
+        with open(exe_path, "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\n")
+        os.chmod(exe_path, 0o755)
+        missing_dir = os.path.join(tmp_dir, "missing")
+
+        with patch.dict(
+            os.environ, {"PATH": os.pathsep.join([missing_dir, bin_dir])}, clear=True
+        ):
+            # Scenario: exe exists and is executable
+            self.scanner.found_executables = {}
+            self.scanner.path_index = None
+            found_path = self.scanner._find_executable_in_path("myexe")
+            self.assertEqual(found_path, os.path.realpath(exe_path))
+
+            # Scenario: exe not found
+            self.scanner.found_executables = {}
+            found_path_not = self.scanner._find_executable_in_path("another_exe")
+            self.assertIsNone(found_path_not)
+
+
+class TestConcurrentVersionProbing(unittest.TestCase):
+    TOOLS = [
+        {"id": "alpha", "name": "Alpha", "version_args": ["--version"]},
+        {"id": "beta", "name": "Beta", "version_args": ["--version"]},
+    ]
+
+    def setUp(self):
+        self.scanner = make_scanner(self.TOOLS)
+        executables = {
+            "Alpha": ["/opt/alpha/z/alpha", "/opt/alpha/a/alpha"],
+            "Beta": ["/opt/beta/beta"],
+        }
+        self.scanner._find_executables_for_tool = lambda tool: executables[tool.name]
+
+    def test_components_are_ordered_deterministically(self):
+        import time
+
+        delays = {"/opt/alpha/a/alpha": 0.1, "/opt/alpha/z/alpha": 0.0, "/opt/beta/beta": 0.0}
+
+        def fake_probe(exe_path, args, regex):
+            time.sleep(delays[exe_path])
+            return "2.0" if "/z/" in exe_path else "1.0"
+
+        self.scanner._get_version_from_command = fake_probe
+        self.scanner.identify_tools()
+
+        self.assertEqual(
+            [c.executable_path for c in self.scanner.detected_components],
+            ["/opt/alpha/a/alpha", "/opt/alpha/z/alpha", "/opt/beta/beta"],
+        )
+
+    def test_scan_deadline_abandons_slow_probes(self):
+        import threading
+
+        release = threading.Event()
+
+        def fake_probe(exe_path, args, regex):
+            if exe_path == "/opt/beta/beta":
+                release.wait(5)
+                return "9.9"
+            return "1.0"
+
+        self.scanner._get_version_from_command = fake_probe
+        self.scanner.scan_options["version_probe_deadline_seconds"] = 0.2
+        with patch.object(
+            self.scanner, "_kill_active_processes", side_effect=release.set
+        ) as mock_kill:
+            self.scanner.identify_tools()
+
+        mock_kill.assert_called_once()
+        versions = {c.executable_path: c.version for c in self.scanner.detected_components}
+        self.assertEqual(versions["/opt/beta/beta"], "Unknown")
+        self.assertEqual(versions["/opt/alpha/a/alpha"], "1.0")
+        self.assertTrue(any(i.category == "Performance" for i in self.scanner.issues))
+
+    @unittest.skipIf(os.name == "nt", "process groups are POSIX-specific")
+    @patch("devenvaudit_src.scan_logic.os.killpg")
+    @patch("subprocess.Popen")
+    def test_timeout_kills_process_group(self, mock_popen, mock_killpg):
+        mock_process = mock_popen.return_value
+        mock_process.pid = 4242
+        mock_process.communicate.side_effect = [
+            subprocess.TimeoutExpired(cmd="slow", timeout=1),
+            ("", ""),
+        ]
+        stdout, stderr, code = self.scanner._run_command(["slow"], timeout=1)
+
+        self.assertEqual(code, -1)
+        self.assertTrue(mock_popen.call_args.kwargs["start_new_session"])
+        mock_killpg.assert_called_once_with(4242, devenv_scan_logic.signal.SIGKILL)
+
+
+class TestFileSystemCache(unittest.TestCase):
+    def test_repeated_lookups_hit_the_cache(self):
+        fs = FileSystemCache()
+        with patch("os.stat", wraps=os.stat) as mock_stat:
+            for _ in range(3):
+                self.assertTrue(fs.isdir(os.path.dirname(__file__)))
+                self.assertTrue(fs.exists(__file__))
+                self.assertFalse(fs.exists("/nonexistent/systemsage/path"))
+        self.assertEqual(mock_stat.call_count, 3)
+        self.assertEqual(fs.stats()["stat"], {"hits": 6, "misses": 3, "hit_rate": 0.667})
+
+    def test_fake_filesystem_drives_env_var_checks(self):
+        fs = FakeFileSystem(
+            {
+                "/opt/jdk/bin/java": "exe",
+                "/usr/local/bin": "dir",
+                "/etc/hosts": "file",
+                "/usr/bin/java": {"target": "/opt/jdk/bin/java"},
+            }
+        )
+        scanner = make_scanner(filesystem=fs)
+
+        issues = scanner._analyze_env_var_for_issues(
+            "PATH", os.pathsep.join(["/usr/local/bin", "/missing/bin"]), "User"
+        )
+        self.assertEqual([i.related_path for i in issues], ["/missing/bin"])
+        self.assertEqual(
+            scanner._analyze_env_var_for_issues("JAVA_HOME", "/opt/jdk", "User"), []
+        )
+        self.assertEqual(fs.realpath("/usr/bin/java"), "/opt/jdk/bin/java")
+        self.assertTrue(fs.access("/usr/bin/java", os.X_OK))
+        self.assertFalse(fs.isdir("/etc/hosts"))
+        self.assertEqual(fs.list_files("/usr/bin"), ["java"])
+
+
+class TestVersionProbeCache(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.exe_path = os.path.join(self.tmp_dir, "tool")
+        with open(self.exe_path, "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\necho Tool 1.2.3\n")
+        os.chmod(self.exe_path, 0o755)
+        self.cache_path = os.path.join(self.tmp_dir, "cache.json")
+        self.scanner = make_scanner()
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _probe(self):
+        return self.scanner._get_version_from_command(
+            self.exe_path, ["--version"], r"Tool\s+([0-9\.]+)"
+        )
+
+    @patch("subprocess.Popen")
+    def test_warm_cache_spawns_no_process(self, mock_popen):
+        mock_popen.return_value.communicate.return_value = ("Tool 1.2.3", "")
+        mock_popen.return_value.returncode = 0
+
+        self.scanner.probe_cache = devenv_scan_logic.VersionProbeCache(self.cache_path)
+        self.assertEqual(self._probe(), "1.2.3")
+        self.scanner.probe_cache.save()
+        self.assertEqual(mock_popen.call_count, 1)
+
+        # A fresh cache instance reads the persisted entry from disk.
+        self.scanner.probe_cache = devenv_scan_logic.VersionProbeCache(self.cache_path)
+        self.assertEqual(self._probe(), "1.2.3")
+        self.assertEqual(mock_popen.call_count, 1)
+        self.assertEqual(self.scanner.probe_cache.hits, 1)
+
+    @patch("subprocess.Popen")
+    def test_changed_binary_is_probed_again(self, mock_popen):
+        mock_popen.return_value.communicate.return_value = ("Tool 1.2.3", "")
+        mock_popen.return_value.returncode = 0
+        self.scanner.probe_cache = devenv_scan_logic.VersionProbeCache(self.cache_path)
+        self._probe()
+
+        with open(self.exe_path, "a", encoding="utf-8") as f:
+            f.write("# upgraded\n")
+        self.scanner.fs.clear()  # as at the start of the next scan
+        mock_popen.return_value.communicate.return_value = ("Tool 1.3.0", "")
+        self.assertEqual(self._probe(), "1.3.0")
+        self.assertEqual(mock_popen.call_count, 2)
+
+    def test_eviction_caps_entries(self):
+        cache = devenv_scan_logic.VersionProbeCache(self.cache_path, max_entries=2)
+        for i in range(4):
+            cache.put(f"key{i}", f"/bin/tool{i}", "1.0")
+            cache.entries[f"key{i}"]["last_used"] += i  # key3 is the most recent
+        cache.save()
+
+        reloaded = devenv_scan_logic.VersionProbeCache(self.cache_path)
+        reloaded.load()
+        self.assertEqual(sorted(reloaded.entries), ["key2", "key3"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.discovery import DiscoveryWalker, ExclusionTrie
+from devenvaudit_src.tools_db import compile_tools_db
+from tests.helpers import make_scanner
+
+TOOLS = [
+    {"id": "java", "name": "Java", "executables": {"Linux": ["java"]}},
+    {"id": "node", "name": "Node.js", "executables": {"Linux": ["node"]}},
+    {"id": "python", "name": "Python", "executables": {"Linux": ["python3"]}},
+]
+
+
+class TestExclusionTrie(unittest.TestCase):
+    def test_prefix_matches_whole_components_only(self):
+        trie = ExclusionTrie(["/opt/excluded", "~/Library"])
+
+        self.assertTrue(trie.excludes("/opt/excluded"))
+        self.assertTrue(trie.excludes("/opt/excluded/sub/dir"))
+        self.assertFalse(trie.excludes("/opt/excluded-not"))
+        self.assertFalse(trie.excludes("/opt"))
+        self.assertTrue(trie.excludes(os.path.expanduser("~/Library/Caches")))
+        self.assertEqual(len(trie), 2)
+
+
+class TestDiscoveryWalker(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.view = compile_tools_db(TOOLS).view("Linux")
+
+    def _make_file(self, relative_path, executable=True):
+        path = os.path.join(self.root, *relative_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\n")
+        os.chmod(path, 0o755 if executable else 0o644)
+        return path
+
+    def _walker(self, **kwargs):
+        kwargs.setdefault("system", "Linux")
+        return DiscoveryWalker(self.view, [self.root], **kwargs)
+
+    @unittest.skipIf(os.name == "nt", "relies on POSIX execute permissions")
+    def test_finds_tools_and_prunes_excluded_and_heavy_directories(self):
+        java = self._make_file("tools/jdk-21/bin/java")
+        self._make_file("project/node_modules/.bin/node")
+        self._make_file("project/.git/hooks/python3")
+        self._make_file("excluded/bin/python3")
+        self._make_file("notes/java", executable=False)
+        os.symlink(self.root, os.path.join(self.root, "tools", "loop"))
+
+        result = self._walker(excluded_paths=[os.path.join(self.root, "excluded")]).walk()
+
+        self.assertEqual(result.matches, {"java": [java]})
+        self.assertGreaterEqual(result.directories_pruned, 3)
+        self.assertFalse(result.truncated)
+        self.assertFalse(result.timed_out)
+
+    @unittest.skipIf(os.name == "nt", "relies on POSIX execute permissions")
+    def test_depth_and_time_limits_are_reported(self):
+        self._make_file("a/b/c/d/python3")
+
+        shallow = self._walker(max_depth=2).walk()
+        self.assertEqual(shallow.matches, {})
+        self.assertTrue(shallow.truncated)
+
+        out_of_time = self._walker(time_budget_seconds=0).walk()
+        self.assertTrue(out_of_time.timed_out)
+
+    def test_nested_and_excluded_roots_are_dropped(self):
+        nested = os.path.join(self.root, "tools")
+        walker = DiscoveryWalker(
+            self.view, [nested, self.root, "/opt/excluded/root"],
+            excluded_paths=["/opt/excluded"], system="Linux",
+        )
+        self.assertEqual(walker.roots, [os.path.abspath(self.root)])
+
+
+class TestScannerDiscovery(unittest.TestCase):
+    @unittest.skipIf(os.name == "nt", "relies on POSIX execute permissions")
+    def test_discovered_executables_join_path_results(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, True)
+        java = os.path.join(root, "jdk", "bin", "java")
+        os.makedirs(os.path.dirname(java))
+        with open(java, "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\n")
+        os.chmod(java, 0o755)
+
+        scanner = make_scanner(TOOLS, discovery_enabled=True, scan_paths=[root])
+        scanner._find_executable_in_path = lambda name: None
+        java_tool = scanner.tools_db.view("Linux").tools[0]
+
+        self.assertEqual(scanner._find_executables_for_tool(java_tool), [os.path.realpath(java)])
+        self.assertEqual(scanner.discovery.directories_scanned, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
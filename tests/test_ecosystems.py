@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.ecosystems import (
+    collect_ecosystem_packages,
+    parse_gem_list,
+    parse_go_version_m,
+)
+from devenvaudit_src.fs_cache import FakeFileSystem
+from tests.helpers import component, make_scanner
+
+HOME = "/home/dev"
+PY = f"{HOME}/.pyenv/versions/3.11.4"
+NODE = f"{HOME}/.nvm/versions/node/v20.5.0"
+
+TREE = {
+    f"{PY}/bin/python3": "exe",
+    f"{PY}/lib/python3.11/site-packages/requests-2.31.0.dist-info/METADATA": "file",
+    f"{PY}/lib/python3.11/site-packages/Flask_SQLAlchemy-3.1.1.dist-info/METADATA": "file",
+    f"{PY}/lib/python3.11/site-packages/legacy.egg-info/PKG-INFO": {
+        "content": "Metadata-Version: 1.0\nName: legacy-pkg\nVersion: 0.9\n\nVersion: 99 in the description\n"
+    },
+    f"{PY}/lib/python3.11/site-packages/requests": "dir",
+    # Another minor version's packages are not this interpreter's
+    f"{PY}/lib/python3.10/site-packages/old-1.0.dist-info/METADATA": "file",
+    # The user site shadows the interpreter's own packages
+    f"{HOME}/.local/lib/python3.11/site-packages/requests-2.32.3.dist-info/METADATA": "file",
+    # Two Pythons under one prefix, each with its own site-packages
+    "/usr/bin/python2.7": "exe",
+    "/usr/bin/python3.11": "exe",
+    "/usr/lib/python2.7/site-packages/six-1.16.0.dist-info/METADATA": "file",
+    "/usr/lib/python3.11/site-packages/attrs-23.1.0.dist-info/METADATA": "file",
+    f"{NODE}/bin/node": "exe",
+    f"{NODE}/bin/npm": "exe",
+    f"{HOME}/.cargo/.crates.toml": {
+        "content": '[v1]\n"ripgrep 14.1.0 (registry+https://github.com/rust-lang/crates.io-index)" = ["rg"]\n'
+        '"cargo-edit 0.12.2 (registry+https://github.com/rust-lang/crates.io-index)" = ["cargo-add"]\n'
+    },
+    f"{HOME}/.rustup/toolchains/stable/bin/rustc": "exe",
+    f"{HOME}/.rustup/toolchains/nightly/bin/rustc": "exe",
+}
+
+NPM_LS = json.dumps(
+    {
+        "name": "lib",
+        "dependencies": {"typescript": {"version": "5.3.3"}, "npm": {"version": "10.2.4"}},
+    }
+)
+
+
+class TestEcosystemCollectors(unittest.TestCase):
+    def setUp(self):
+        self.fs = FakeFileSystem(TREE)
+        self.commands = []
+
+    def _run(self, command_parts, timeout=None):
+        self.commands.append(command_parts)
+        if command_parts[1:4] == ["ls", "-g", "--json"]:
+            return NPM_LS, "", 1  # Peer-dependency warnings, JSON still complete
+        return "", "not found", 127
+
+    def _collect(self, components):
+        inventories = collect_ecosystem_packages(
+            components, fs=self.fs, system="Linux", environ={}, home=HOME, run_command=self._run
+        )
+        return {(i.ecosystem, i.component_id): i for i in inventories}
+
+    def test_pip_reads_dist_info_without_running_python(self):
+        python = component("Python", "3.11.4", f"{PY}/bin/python3")
+        link = component("Python", "3.11", f"{PY}/bin/python3.11")  # Same interpreter: listed once
+        inventories = self._collect([python, link])
+        self.assertEqual(list(inventories), [("pip", python.id), ("pip", link.id)])
+        self.assertEqual(
+            inventories[("pip", python.id)].packages,
+            {"requests": "2.32.3", "Flask_SQLAlchemy": "3.1.1", "legacy-pkg": "0.9"},
+        )
+        self.assertEqual(inventories[("pip", link.id)].packages, inventories[("pip", python.id)].packages)
+        self.assertEqual(self.commands, [])
+
+    def test_pythons_sharing_a_prefix_are_listed_separately(self):
+        python2 = component("Python", "2.7.18", "/usr/bin/python2.7")
+        python3 = component("Python", "3.11.2", "/usr/bin/python3.11")
+        inventories = self._collect([python2, python3])
+        self.assertEqual(inventories[("pip", python2.id)].packages, {"six": "1.16.0"})
+        self.assertEqual(inventories[("pip", python3.id)].packages, {"attrs": "23.1.0", "requests": "2.32.3"})
+
+    def test_bulk_commands_and_user_wide_registries(self):
+        node = component("Node.js", "20.5.0", f"{NODE}/bin/node")
+        stable = component("Rust", "1.75.0", f"{HOME}/.rustup/toolchains/stable/bin/rustc")
+        nightly = component("Rust", "1.77.0", f"{HOME}/.rustup/toolchains/nightly/bin/rustc")
+        inventories = self._collect([node, stable, nightly])
+        self.assertEqual(
+            self.commands,
+            [[f"{NODE}/bin/npm", "ls", "-g", "--json", "--depth=0", "--prefix", NODE]],
+        )
+        self.assertEqual(inventories[("npm", node.id)].packages["typescript"], "5.3.3")
+        # cargo installs are per user: reported once, on the first Rust found
+        self.assertEqual(
+            inventories[("cargo", stable.id)].packages, {"ripgrep": "14.1.0", "cargo-edit": "0.12.2"}
+        )
+        self.assertNotIn(("cargo", nightly.id), inventories)
+
+    def test_output_parsers(self):
+        go_output = (
+            "/home/dev/go/bin/gopls: go1.21.5\n"
+            "\tpath\tgolang.org/x/tools/gopls\n"
+            "\tmod\tgolang.org/x/tools/gopls\tv0.14.2\th1:abc=\n"
+            "\tdep\tgolang.org/x/mod\tv0.14.0\th1:def=\n"
+        )
+        self.assertEqual(parse_go_version_m(go_output), {"golang.org/x/tools/gopls": "v0.14.2"})
+        self.assertEqual(
+            parse_gem_list("rake (13.1.0, 13.0.6)\nbundler (default: 2.4.10)\n"),
+            {"rake": "13.1.0", "bundler": "2.4.10"},
+        )
+
+
+class TestScannerEcosystemInventory(unittest.TestCase):
+    def test_packages_become_component_details(self):
+        scanner = make_scanner(filesystem=FakeFileSystem(TREE), ecosystem_inventory_enabled=True)
+        python = component("Python", "3.11.4", f"{PY}/bin/python3")
+        scanner.detected_components.append(python)
+        with patch.dict(os.environ, {"HOME": HOME}, clear=True):
+            scanner.collect_ecosystem_packages()
+
+        pip = python.details["packages"]["pip"]
+        self.assertEqual(pip["count"], 3)
+        self.assertEqual(list(pip["packages"]), ["Flask_SQLAlchemy", "legacy-pkg", "requests"])
+
+
+if __name__ == "__main__":
+    unittest.main()
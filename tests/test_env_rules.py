@@ -0,0 +1,128 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.env_rules import DEFAULT_ENV_RULES, OPTIONAL_ENV_RULES, EnvRuleEngine
+from devenvaudit_src.fs_cache import FakeFileSystem
+
+
+class TestEnvRuleEngine(unittest.TestCase):
+    def setUp(self):
+        self.fs = FakeFileSystem(
+            {
+                "/usr/bin": "dir",
+                "/opt/tool/bin": "dir",
+                "/etc/profile": "file",
+                "/opt/jdk/bin/java": "exe",
+            }
+        )
+        self.engine = EnvRuleEngine()
+
+    def _by_rule(self, findings):
+        result = {}
+        for finding in findings:
+            result.setdefault(finding.rule_id, []).append(finding)
+        return result
+
+    def test_missing_paths_are_reported_once_and_counted(self):
+        path_value = os.pathsep.join(
+            ["/usr/bin", "/missing/a", "/missing/a", "/etc/profile", "/opt/tool/bin"]
+        )
+        variables = {
+            "PATH": path_value,
+            "LD_LIBRARY_PATH": os.pathsep.join(["/missing/a", "/missing/b"]),
+        }
+        findings = self._by_rule(self.engine.evaluate(variables, self.fs))
+
+        missing = {f.related_path: f for f in findings["missing_path_entry"]}
+        self.assertEqual(sorted(missing), ["/missing/a", "/missing/b"])
+        self.assertEqual(missing["/missing/a"].occurrences, 3)
+        self.assertEqual(missing["/missing/a"].variables, ["PATH", "LD_LIBRARY_PATH"])
+        self.assertEqual(
+            missing["/missing/a"].description,
+            "Path '/missing/a' in environment variable 'PATH', 'LD_LIBRARY_PATH' does not exist.",
+        )
+        self.assertNotIn("path_entry_not_directory", findings)  # Opt-in
+        # Each distinct path was stat'ed once.
+        self.assertEqual(self.fs.misses["stat"], 5)
+
+    def test_default_rules_report_what_the_original_checks_did(self):
+        path_value = os.pathsep.join(["/usr/bin", "/missing/a", "/etc/profile"])
+        variables = {"PATH": path_value, "java_home": "/opt/missing-jdk", "JAVA_HOME": "/opt/jdk"}
+        findings = sorted(
+            (f.rule_id, f.variables, f.related_path)
+            for f in self.engine.evaluate(variables, self.fs)
+        )
+        self.assertEqual(
+            findings,
+            [
+                ("missing_path_entry", ["PATH"], "/missing/a"),
+                ("name_format", ["java_home"], None),
+            ],
+        )
+
+    def test_optional_rules_can_be_enabled(self):
+        engine = EnvRuleEngine.from_config({"env_rules": DEFAULT_ENV_RULES + OPTIONAL_ENV_RULES})
+        path_value = os.pathsep.join(["/usr/bin", "/etc/profile"])
+        findings = self._by_rule(engine.evaluate({"PATH": path_value}, self.fs))
+        self.assertEqual(
+            [f.related_path for f in findings["path_entry_not_directory"]],
+            ["/etc/profile"],
+        )
+
+    def test_single_variable_rules(self):
+        variables = {
+            "EMPTY_VAR": "  ",
+            "lower_case": "x",
+            "GITHUB_TOKEN": "ghp_" + "x" * 36,
+            "SHORT_SECRET": "abc",
+            "JAVA_HOME": "/opt/missing-jdk",
+            "OK_JAVA_HOME": "/opt/jdk",
+        }
+        findings = self._by_rule(self.engine.evaluate(variables, self.fs))
+
+        self.assertEqual([f.variables for f in findings["empty_value"]], [["EMPTY_VAR"]])
+        self.assertEqual([f.variables for f in findings["name_format"]], [["lower_case"]])
+        self.assertEqual(
+            [f.variables for f in findings["sensitive_value"]], [["GITHUB_TOKEN"]]
+        )
+        self.assertEqual(
+            [f.variables for f in findings["java_home_invalid"]], [["JAVA_HOME"]]
+        )
+        self.assertNotIn("long_value", findings)
+
+    def test_rules_from_config_replace_defaults(self):
+        config = {
+            "env_rules": [
+                {
+                    "id": "proxy_set",
+                    "name_regex": "^https?_proxy$",
+                    "check": "min_length",
+                    "params": {"min_length": 0},
+                    "severity": "Info",
+                    "category": "Network",
+                    "description": "Proxy configured via {name}.",
+                },
+                {"id": "broken", "check": "no_such_check"},
+            ]
+        }
+        engine = EnvRuleEngine.from_config(config)
+        self.assertEqual([r.id for r in engine.rules], ["proxy_set"])
+
+        findings = engine.evaluate({"HTTPS_PROXY": "http://proxy:3128", "HOME": "/root"})
+        self.assertEqual(len(findings), 1)
+        self.assertEqual(findings[0].description, "Proxy configured via 'HTTPS_PROXY'.")
+
+    def test_name_matching_is_memoized(self):
+        engine = EnvRuleEngine(DEFAULT_ENV_RULES)
+        first = engine.rules_for("MY_API_KEY")
+        self.assertIs(engine.rules_for("MY_API_KEY"), first)
+        rule_ids = {engine.rules[i].id for i in first}
+        self.assertIn("sensitive_value", rule_ids)
+        self.assertNotIn("missing_path_entry", rule_ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.events import ScanEventBus
+from devenvaudit_src.json_stream import EVENT_RECORD_KINDS, JsonLinesWriter, StreamingJsonWriter
+from devenvaudit_src.report_generator import ReportGenerator, write_combined_json_report
+from devenvaudit_src.scan_logic import DetectedComponent, EnvironmentVariableInfo, ScanIssue
+
+INVENTORY = [
+    {"DisplayName": "Café Tool", "DisplayVersion": "1.0", "Remarks": "line\nbreak", "Nested": {"a": [1, {}]}},
+    {"DisplayName": "Empty", "Tags": [], "Extra": {}},
+]
+COMPONENTS = [
+    DetectedComponent(id="git-2.43", name="Git", version="2.43.0", details={"packages": {}}),
+]
+ISSUES = [ScanIssue(description="PATH entry missing", severity="Warning", category="PATH")]
+
+
+class TestStreamingJsonWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        self.path = os.path.join(self.tmp_dir, "report.json")
+
+    def _read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def _write(self, indent):
+        with StreamingJsonWriter(self.path, indent=indent) as writer:
+            with writer.object():
+                writer.write_array("systemInventory", INVENTORY)
+                writer.write_array("empty", [])
+                with writer.object("devEnvAudit"):
+                    writer.write_array("detectedComponents", COMPONENTS)
+                writer.write_value("done", "status")
+        return writer
+
+    def test_indented_output_matches_json_dump(self):
+        writer = self._write(indent=4)
+        expected = {
+            "systemInventory": INVENTORY,
+            "empty": [],
+            "devEnvAudit": {"detectedComponents": [c.to_dict() for c in COMPONENTS]},
+            "status": "done",
+        }
+        self.assertEqual(self._read(), json.dumps(expected, ensure_ascii=False, indent=4))
+        self.assertEqual(writer.rows_written, 3)
+        self.assertFalse(os.path.exists(writer.tmp_path))
+
+    def test_compact_output_has_no_whitespace_between_tokens(self):
+        self._write(indent=None)
+        text = self._read()
+        self.assertNotIn("\n", text.replace("\\n", ""))
+        self.assertTrue(text.startswith('{"systemInventory":[{"DisplayName":"Café Tool"'))
+        self.assertEqual(json.loads(text)["devEnvAudit"]["detectedComponents"][0]["name"], "Git")
+
+    def test_failed_export_keeps_the_previous_file(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"previous": true}')
+        with self.assertRaises(TypeError):
+            with StreamingJsonWriter(self.path) as writer:
+                with writer.array():
+                    writer.write_rows([{"ok": 1}, object()])
+        self.assertEqual(json.loads(self._read()), {"previous": True})
+        self.assertEqual(os.listdir(self.tmp_dir), ["report.json"])
+
+
+class TestCombinedReport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        self.path = os.path.join(self.tmp_dir, "combined.json")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_sections_and_inventory_placeholder(self):
+        placeholder = [{"Category": "Informational", "Remarks": "Windows only"}]
+        self.assertTrue(write_combined_json_report(self.path, placeholder, COMPONENTS, [], ISSUES))
+        data = self._load()
+        self.assertEqual(list(data), ["devEnvAudit"])
+        self.assertEqual(list(data["devEnvAudit"]), ["detectedComponents", "identifiedIssues"])
+
+        self.assertTrue(write_combined_json_report(self.path, placeholder, None, None, None))
+        self.assertEqual(self._load(), {"systemInventory": placeholder})
+        self.assertFalse(write_combined_json_report(self.path, [], [], [], []))
+
+    def test_report_generator_json_export(self):
+        env_vars = [EnvironmentVariableInfo(name="PATH", value="/usr/bin", scope="Process")]
+        self.assertTrue(ReportGenerator(COMPONENTS, env_vars, ISSUES).export_to_json(self.path))
+        data = self._load()
+        self.assertEqual(data["detected_components"][0]["id"], "git-2.43")
+        self.assertEqual(data["environment_variables"][0]["name"], "PATH")
+        self.assertEqual(data["issues"][0]["severity"], "Warning")
+
+
+class TestJsonLinesWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+
+    def test_records_are_flushed_in_batches(self):
+        path = os.path.join(self.tmp_dir, "scan.ndjson")
+        now = [0.0]
+        writer = JsonLinesWriter(path, scan_id="s1", flush_rows=2, flush_interval=10, clock=lambda: now[0])
+        writer.open()
+        writer.write("inventory", INVENTORY[0])
+        self.assertEqual(os.path.getsize(path), 0)
+        writer.write("inventory", {"DisplayName": "Second", "type": "row's own field"})
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([(r["type"], r["scan_id"]) for r in lines], [("inventory", "s1")] * 2)
+        self.assertEqual(lines[0]["DisplayName"], "Café Tool")
+
+        writer.write("issue", ISSUES[0])
+        now[0] = 11.0  # The oldest pending record is now too old to keep waiting
+        writer.write("issue", ISSUES[0])
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 4)
+        writer.close()
+        self.assertEqual(writer.counts, {"inventory": 2, "issue": 2})
+
+    def test_scan_events_are_written_compressed(self):
+        path = os.path.join(self.tmp_dir, "scan.ndjson.gz")
+        bus = ScanEventBus(interval=0.01)
+        with JsonLinesWriter(path) as writer:
+            bus.subscribe(writer.event_consumer(), kinds=EVENT_RECORD_KINDS, threaded=True)
+            bus.publish("component", component=COMPONENTS[0])
+            bus.publish("progress", current=1, total=2)
+            bus.publish("update_info", component=COMPONENTS[0], update_info={"latest_version": "2.45.0"})
+            bus.publish("issue", issue=ISSUES[0])
+            bus.close()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["type"] for r in records], ["component", "update_info", "issue"])
+        self.assertEqual(records[1]["component_id"], "git-2.43")
+        self.assertEqual({r["scan_id"] for r in records}, {writer.scan_id})
+
+    def test_report_generator_ndjson_export(self):
+        path = os.path.join(self.tmp_dir, "report.ndjson")
+        self.assertTrue(ReportGenerator(COMPONENTS, [], ISSUES).export_to_ndjson(path, scan_id="s2"))
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["type"] for r in records], ["component", "issue"])
+        self.assertEqual(records[0]["name"], "Git")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src import package_manager_integrator as pmi
+from devenvaudit_src.latest_version_cache import LatestVersionCache
+
+DETECTED = {"apt": {"name": "APT", "path": "/usr/bin/apt-get"}}
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestLatestVersionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        self.clock = FakeClock()
+        self.cache = self._cache()
+
+    def _cache(self, **kwargs):
+        return LatestVersionCache(
+            cache_path=os.path.join(self.tmp_dir, "latest.json"),
+            ttl_seconds=3600,
+            max_stale_seconds=86400,
+            clock=self.clock,
+            **kwargs,
+        )
+
+    def test_entries_age_into_stale_then_expire(self):
+        self.cache.put("apt", "git", "1:2.43.0-1")
+        self.clock.now += 60
+        entry = self.cache.get("apt", "git")
+        self.assertEqual((entry.version, entry.age_seconds, entry.stale), ("1:2.43.0-1", 60, False))
+
+        self.clock.now += 3600
+        self.assertTrue(self.cache.get("apt", "git").stale)
+        self.clock.now += 86400
+        self.assertIsNone(self.cache.get("apt", "git"))
+
+    def test_save_evicts_expired_and_oldest_entries(self):
+        cache = self._cache(max_entries=2)
+        cache.put("apt", "old", "1.0")
+        self.clock.now += 90000  # Past max_stale_seconds
+        for name in ("a", "b", "c"):
+            cache.put("apt", name, "1.0")
+            self.clock.now += 1
+        self.assertTrue(cache.save())
+
+        reloaded = self._cache()
+        self.assertEqual(
+            sorted(k for k in ("old", "a", "b", "c") if reloaded.get("apt", k)), ["b", "c"]
+        )
+
+    def test_background_refresh_is_deduplicated(self):
+        release = threading.Event()
+        calls = []
+
+        def fetch(names):
+            calls.append(list(names))
+            release.wait(5)
+            return {"git": "2.44.0", "curl": None}
+
+        self.cache.refresh_in_background("apt", ["git", "curl"], fetch)
+        self.cache.refresh_in_background("apt", ["git"], fetch)  # Already in flight
+        release.set()
+        self.assertTrue(self.cache.wait_for_refreshes(5))
+
+        self.assertEqual(calls, [["git", "curl"]])
+        self.assertEqual(self.cache.get("apt", "git").version, "2.44.0")
+        self.assertIsNone(self.cache.get("apt", "curl").version)  # Cached as unknown
+
+
+class TestCachedUpdateChecks(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        self.clock = FakeClock()
+        self.cache = LatestVersionCache(
+            cache_path=os.path.join(self.tmp_dir, "latest.json"), ttl_seconds=3600, clock=self.clock
+        )
+        self.queries = []
+        self.failing = False
+
+    def _query(self, pm_id, names, detected_pms, executor=None, answered=None):
+        self.queries.append(list(names))
+        if self.failing:
+            return {}  # e.g. the command timed out: nothing answered
+        answered.update(names)
+        return {name: "2.44.0" for name in names}
+
+    def _check(self, block_on_miss=True):
+        with patch.object(pmi, "query_latest_versions", side_effect=self._query):
+            results = pmi.get_latest_versions_and_update_commands(
+                [("git", "Git", "2.43.0")], ["apt"], DETECTED, cache=self.cache, block_on_miss=block_on_miss
+            )
+            self.cache.wait_for_refreshes(5)
+        return results["git"]
+
+    def test_stale_while_revalidate(self):
+        self.assertEqual(self._check()["latest_version_age_seconds"], 0.0)  # Miss: queried now
+        self.assertEqual(len(self.queries), 1)
+
+        self.clock.now += 600
+        info = self._check()  # Fresh: no query
+        self.assertEqual((info["latest_version_age_seconds"], info["latest_version_is_stale"]), (600, False))
+        self.assertEqual(len(self.queries), 1)
+
+        self.clock.now += 7200
+        info = self._check()  # Stale: served, then refreshed in the background
+        self.assertTrue(info["latest_version_is_stale"])
+        self.assertTrue(info["is_update_available"])
+        self.assertEqual(len(self.queries), 2)
+        self.assertFalse(self.cache.get("apt", "git").stale)
+
+    def test_failed_lookups_are_not_cached(self):
+        self.failing = True
+        self.assertIsNone(self._check())
+        self.assertIsNone(self.cache.get("apt", "git"))
+
+        self.failing = False
+        self.assertEqual(self._check()["latest_version"], "2.44.0")  # Queried again at once
+        self.assertEqual(len(self.queries), 2)
+
+    def test_misses_can_be_left_to_the_background(self):
+        self.assertIsNone(self._check(block_on_miss=False))
+        self.assertEqual(self.queries, [["git"]])
+        self.assertEqual(self._check(block_on_miss=False)["latest_version"], "2.44.0")
+
+
+if __name__ == "__main__":
+    unittest.main()
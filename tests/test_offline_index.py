@@ -0,0 +1,156 @@
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src import offline_index
+from devenvaudit_src import package_manager_integrator as pmi
+from devenvaudit_src.offline_index import build_apt_index, build_dnf_index, dnf_primary_files
+
+MAIN = "deb.debian.org_debian_dists_bookworm"
+UPDATES = "deb.debian.org_debian_dists_bookworm-updates"
+BACKPORTS = "deb.debian.org_debian_dists_bookworm-backports"
+
+MAIN_PACKAGES = """Package: git
+Version: 1:2.39.2-1.1
+Architecture: amd64
+Description: fast, scalable, distributed revision control system
+
+Package: python3
+Version: 3.11.2-1+b1
+Architecture: amd64
+
+Package: maven
+Version: 3.8.7-1
+"""
+UPDATES_PACKAGES = """Package: git
+Version: 1:2.39.5-0+deb12u1
+Architecture: amd64
+"""
+BACKPORTS_PACKAGES = """Package: git
+Version: 1:2.45.2-1~bpo12+1
+"""
+
+REPOMD = """<?xml version="1.0" encoding="UTF-8"?>
+<repomd xmlns="http://linux.duke.edu/metadata/repo">
+  <data type="primary"><location href="repodata/abc-primary.xml.gz"/></data>
+</repomd>
+"""
+PRIMARY = """<?xml version="1.0" encoding="UTF-8"?>
+<metadata xmlns="http://linux.duke.edu/metadata/common" packages="3">
+<package type="rpm"><name>git</name><arch>x86_64</arch>
+  <version epoch="0" ver="2.41.0" rel="1.fc39"/></package>
+<package type="rpm"><name>git</name><arch>x86_64</arch>
+  <version epoch="0" ver="2.43.0" rel="1.fc39"/></package>
+<package type="rpm"><name>maven</name><arch>noarch</arch>
+  <version epoch="1" ver="3.8.6" rel="3.fc39"/></package>
+</metadata>
+"""
+TESTING_PRIMARY = PRIMARY.replace('ver="2.43.0"', 'ver="2.44.0"')
+REPOS = """[fedora]
+name=Fedora
+enabled=1
+
+[updates]
+name=Fedora updates
+
+[updates-testing]
+name=Fedora test updates
+enabled=0
+"""
+DNF_INFO = """Available Packages
+Name         : docker-ce
+Version      : 24.0.7
+Release      : 1.fc39
+"""
+
+
+class TestOfflineIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        self.addCleanup(offline_index.clear_offline_indexes)
+        offline_index.clear_offline_indexes()
+
+    def _write(self, relative_path, text, compress=False):
+        path = os.path.join(self.tmp_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with (gzip.open if compress else open)(path, "wt", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def _apt_lists(self):
+        lists_dir = os.path.join(self.tmp_dir, "lists")
+        self._write(f"lists/{MAIN}_main_binary-amd64_Packages", MAIN_PACKAGES)
+        self._write(f"lists/{UPDATES}_main_binary-amd64_Packages.gz", UPDATES_PACKAGES, compress=True)
+        self._write(f"lists/{BACKPORTS}_main_binary-amd64_Packages", BACKPORTS_PACKAGES)
+        self._write(f"lists/{BACKPORTS}_InRelease", "Origin: Debian Backports\nNotAutomatic: yes\n")
+        return lists_dir
+
+    def test_apt_lists_give_the_highest_automatic_version(self):
+        index = build_apt_index(self._apt_lists())
+        self.assertEqual(len(index.files), 2)  # Backports are never candidates by default
+        self.assertEqual(index.get("git"), "1:2.39.5-0+deb12u1")
+        self.assertEqual(index.lookup(["python3", "missing"]), {"python3": "3.11.2-1+b1"})
+
+    def _dnf_cache(self):
+        repos_dir = os.path.dirname(self._write("yum.repos.d/fedora.repo", REPOS))
+        self._write("dnf/fedora-0123456789abcdef/repodata/repomd.xml", REPOMD)
+        self._write("dnf/fedora-0123456789abcdef/repodata/abc-primary.xml.gz", PRIMARY, compress=True)
+        # Only enabled for one command (--enablerepo): dnf doesn't offer its versions
+        self._write("dnf/updates-testing-fedcba9876543210/repodata/repomd.xml", REPOMD)
+        self._write(
+            "dnf/updates-testing-fedcba9876543210/repodata/abc-primary.xml.gz", TESTING_PRIMARY, compress=True
+        )
+        # Enabled, but its metadata is in a format that can't be read
+        self._write(
+            "dnf/updates-00112233aabbccdd/repodata/repomd.xml", REPOMD.replace(".xml.gz", ".xml.lz4")
+        )
+        self._write("dnf/updates-00112233aabbccdd/repodata/abc-primary.xml.lz4", "")
+        return [os.path.join(self.tmp_dir, "dnf")], repos_dir
+
+    def test_dnf_primary_metadata_of_enabled_repositories(self):
+        cache_dirs, repos_dir = self._dnf_cache()
+        self.assertEqual(len(dnf_primary_files(cache_dirs, repos_dir)), 1)
+        index = build_dnf_index(cache_dirs, repos_dir=repos_dir)
+        self.assertEqual(index.candidates, {"git": "2.43.0", "maven": "3.8.6"})
+        self.assertFalse(index.complete)  # "updates" was not read
+
+    def test_packages_missing_from_an_incomplete_index_are_queried(self):
+        cache_dirs, repos_dir = self._dnf_cache()
+        detected = {"dnf": {"name": "DNF", "path": "/usr/bin/dnf"}}
+        with (
+            patch.object(offline_index, "DNF_CACHE_DIRS", cache_dirs),
+            patch.object(offline_index, "YUM_REPOS_DIR", repos_dir),
+            patch.object(pmi, "_run_pm_command", return_value=(DNF_INFO, "")) as mock_run,
+        ):
+            versions = pmi.query_latest_versions("dnf", ["git", "docker-ce"], detected)
+
+        self.assertEqual(versions, {"git": "2.43.0", "docker-ce": "24.0.7"})
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[0][0][-1], "docker-ce")
+
+    def test_update_checks_use_the_index_without_processes(self):
+        lists_dir = self._apt_lists()
+        detected = {"apt": {"name": "APT", "path": "/usr/bin/apt-get"}}
+        with (
+            patch.object(offline_index, "APT_LISTS_DIR", lists_dir),
+            patch.object(pmi, "_run_pm_command") as mock_run,
+        ):
+            info = pmi.get_latest_version_and_update_command("git", "Git", "2.39.2", ["apt"], detected)
+            missing = pmi.get_latest_version_and_update_command("docker", "Docker", "24.0", ["apt"], detected)
+            first_index = offline_index.get_offline_index("apt")
+            self.assertIs(offline_index.get_offline_index("apt"), first_index)  # Built once
+
+        mock_run.assert_not_called()
+        self.assertEqual(info["latest_version"], "1:2.39.5-0+deb12u1")
+        self.assertIsNone(missing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src import package_manager_integrator as pmi
+
+APT_POLICY = """git:
+  Installed: 1:2.39.2-1.1
+  Candidate: 1:2.43.0-1
+  Version table:
+     1:2.43.0-1 500
+        500 http://deb.debian.org/debian trixie/main amd64 Packages
+ *** 1:2.39.2-1.1 100
+        100 /var/lib/dpkg/status
+python3:
+  Installed: 3.11.2-1+b1
+  Candidate: 3.11.2-1+b1
+  Version table:
+ *** 3.11.2-1+b1 500
+maven:
+  Installed: (none)
+  Candidate: 3.8.7-2
+"""
+
+DNF_INFO = """Installed Packages
+Name         : git
+Version      : 2.41.0
+Release      : 1.fc38
+Description  : Git is a fast, scalable, distributed revision control system
+             : with an unusually rich command set: version: 1.0
+
+Available Packages
+Name         : git
+Version      : 2.43.0
+Release      : 1.fc38
+
+Name         : maven
+Version      : 3.8.6
+"""
+
+BREW_JSON = json.dumps(
+    {
+        "formulae": [
+            {"name": "python@3.12", "full_name": "python@3.12", "aliases": ["python3", "python"],
+             "oldnames": [], "versions": {"stable": "3.12.1"}},
+            {"name": "git", "full_name": "git", "aliases": [], "oldnames": [], "versions": {"stable": "2.43.0"}},
+        ],
+        "casks": [{"token": "visual-studio-code", "full_token": "visual-studio-code", "version": "1.85.1"}],
+    }
+)
+
+WINGET_LIST = (
+    "Name                Id                         Version   Available Source\n"
+    "--------------------------------------------------------------------------\n"
+    "Git                 Git.Git                    2.42.0    2.43.0    winget\n"
+    "Node.js             OpenJS.NodeJS              20.10.0             winget\n"
+)
+
+
+class TestBatchOutputParsers(unittest.TestCase):
+    def test_apt_policy_is_split_per_package(self):
+        versions = pmi.BATCH_OUTPUT_PARSERS["apt"]([APT_POLICY], ["git", "python3", "maven", "missing"])
+        self.assertEqual(versions, {"git": "1:2.43.0-1", "python3": "3.11.2-1+b1", "maven": "3.8.7-2"})
+
+    def test_dnf_info_prefers_available_over_installed(self):
+        versions = pmi.BATCH_OUTPUT_PARSERS["dnf"]([DNF_INFO], ["git", "maven"])
+        self.assertEqual(versions, {"git": "2.43.0", "maven": "3.8.6"})
+
+    def test_brew_json_matches_aliases_and_casks(self):
+        versions = pmi.BATCH_OUTPUT_PARSERS["brew"]([BREW_JSON], ["python3", "git", "visual-studio-code"])
+        self.assertEqual(versions, {"python3": "3.12.1", "git": "2.43.0", "visual-studio-code": "1.85.1"})
+
+    def test_winget_list_uses_available_column_when_present(self):
+        versions = pmi.BATCH_OUTPUT_PARSERS["winget"]([WINGET_LIST], ["Git.Git", "OpenJS.NodeJS"])
+        self.assertEqual(versions, {"Git.Git": "2.43.0", "OpenJS.NodeJS": "20.10.0"})
+
+    def test_choco_outdated_overrides_installed_version(self):
+        outputs = ["git|2.42.0\nnodejs|21.4.0\n", "git|2.42.0|2.43.0|false\n"]
+        self.assertEqual(
+            pmi.BATCH_OUTPUT_PARSERS["choco"](outputs, ["git", "nodejs"]),
+            {"git": "2.43.0", "nodejs": "21.4.0"},
+        )
+
+
+class TestBatchQueries(unittest.TestCase):
+    DETECTED = {"apt": {"name": "APT", "path": "/usr/bin/apt-get"}, "snap": {"name": "Snap", "path": "/usr/bin/snap"}}
+
+    def setUp(self):
+        self.commands = []
+        # Package-manager processes only: no offline metadata from this machine
+        offline = patch.object(pmi, "get_offline_index", return_value=None)
+        offline.start()
+        self.addCleanup(offline.stop)
+
+    def _fake_run(self, command_parts, timeout=15):
+        self.commands.append(command_parts)
+        if command_parts[:2] == ["apt-cache", "policy"]:
+            return APT_POLICY, ""
+        if command_parts[:2] == ["/usr/bin/snap", "info"]:
+            return "name: code\nchannels:\n  latest/stable: 1.85.1 2023-12-13\n", ""
+        return None, "not found"
+
+    def test_one_command_per_package_manager(self):
+        tools = [
+            ("git", "Git", "2.39.2"),
+            ("python", "Python", "3.11.2-1+b1"),
+            ("maven", "Maven", "Unknown"),
+            ("vscode", "VS Code", "1.80.0"),
+            ("nonexistent_tool", "Nothing", "1.0"),
+        ]
+        with (
+            patch.object(pmi, "_run_pm_command", side_effect=self._fake_run),
+            patch.object(pmi, "detect_package_managers") as mock_detect,
+        ):
+            results = pmi.get_latest_versions_and_update_commands(tools, ["apt", "snap"], self.DETECTED)
+
+        mock_detect.assert_not_called()
+        self.assertCountEqual(  # The two managers run in parallel
+            self.commands,
+            [["apt-cache", "policy", "git", "python3", "maven"], ["/usr/bin/snap", "info", "code"]],
+        )
+        self.assertEqual(results["git"]["latest_version"], "1:2.43.0-1")
+        self.assertEqual(results["git"]["update_command"], "sudo apt install --only-upgrade git")
+        self.assertFalse(results["python"]["is_update_available"])
+        self.assertTrue(results["maven"]["is_update_available"])
+        self.assertEqual(results["vscode"]["package_manager_id"], "snap")
+        self.assertIsNone(results["nonexistent_tool"])
+
+    def test_failed_batch_falls_back_to_single_searches(self):
+        detected = {"brew": {"name": "Homebrew", "path": "/opt/homebrew/bin/brew"}}
+
+        def fake_run(command_parts, timeout=15):
+            self.commands.append(command_parts)
+            if "--json=v2" in command_parts:
+                return None, "Error: No available formula with the name"
+            return f"{command_parts[-1]}: stable 2.43.0 (bottled), HEAD\n", ""
+
+        with patch.object(pmi, "_run_pm_command", side_effect=fake_run):
+            results = pmi.get_latest_versions_and_update_commands(
+                [("git", "Git", "2.40.0"), ("node", "Node.js", "20.0.0")], ["brew"], detected
+            )
+        self.assertEqual(len(self.commands), 3)
+        self.assertEqual(self.commands[1], ["/opt/homebrew/bin/brew", "info", "git"])
+        self.assertEqual(results["node"]["latest_version"], "2.43.0")
+
+    def test_failed_lookups_are_not_reported_as_answered(self):
+        detected = {"brew": {"name": "Homebrew", "path": "/opt/homebrew/bin/brew"}}
+
+        def fake_run(command_parts, timeout=15):
+            if "--json=v2" in command_parts:
+                return None, "Error: No available formula with the name"
+            if command_parts[-1] == "node":
+                return None, "TimeoutExpired"
+            if command_parts[-1] == "git":
+                return "git: stable 2.43.0 (bottled), HEAD\n", ""
+            return "", ""  # Answered, but no version for it
+
+        answered = set()
+        with patch.object(pmi, "_run_pm_command", side_effect=fake_run):
+            versions = pmi.query_latest_versions("brew", ["git", "node", "nothing"], detected, answered=answered)
+        self.assertEqual(versions, {"git": "2.43.0"})
+        self.assertEqual(answered, {"git", "nothing"})
+
+    def test_single_tool_api_delegates_to_the_batch(self):
+        with patch.object(pmi, "_run_pm_command", side_effect=self._fake_run):
+            info = pmi.get_latest_version_and_update_command("git", "Git", "2.39.2", ["apt"], self.DETECTED)
+        self.assertEqual(info["package_name_in_pm"], "git")
+        self.assertEqual(self.commands, [["apt-cache", "policy", "git"]])
+
+
+class TestInstalledPackageIndex(unittest.TestCase):
+    DETECTED = {
+        "apt": {"name": "APT", "path": "/usr/bin/apt-get"},
+        "snap": {"name": "Snap", "path": "/usr/bin/snap"},
+        "flatpak": {"name": "Flatpak", "path": "/usr/bin/flatpak"},
+    }
+    OUTPUTS = {
+        "dpkg-query": "ii \tgit\t1:2.39.2-1.1\nhi \tpython3\t3.11.2-1+b1\nun \told-pkg\t\n",
+        "/usr/bin/snap": (
+            "Name    Version    Rev    Tracking       Publisher   Notes\n"
+            "code    1.85.1     150    latest/stable  vscode**    classic\n"
+        ),
+    }
+
+    def _fake_run(self, command_parts, timeout=15):
+        output = self.OUTPUTS.get(command_parts[0])
+        return (output, "") if output is not None else (None, "error")
+
+    def test_one_list_command_per_manager(self):
+        with patch.object(pmi, "_run_pm_command", side_effect=self._fake_run) as mock_run:
+            index = pmi.build_installed_package_index(self.DETECTED)
+
+        self.assertEqual(mock_run.call_count, 3)
+        self.assertEqual(index.version_of("apt", "git"), "1:2.39.2-1.1")
+        self.assertIsNone(index.version_of("apt", "old-pkg"))  # Removed, config files only
+        self.assertEqual(index.version_of("snap", "code"), "1.85.1")
+        self.assertNotIn("flatpak", index)  # Its list command failed
+
+        found = pmi.find_tools_installed_via_package_managers(index, exclude_tool_ids=["python"])
+        self.assertEqual(
+            sorted((f["tool_id"], f["package_manager_id"]) for f in found),
+            [("git", "apt"), ("vscode", "snap")],
+        )
+
+    def test_list_output_parsers(self):
+        self.assertEqual(
+            pmi.INSTALLED_LIST_PARSERS["apt"](
+                "ii \tgit\t1:2.39.2-1.1\nrc \tmaven\t3.6.3-5\niF \tbroken\t1.0-1\n"
+            ),
+            {"git": "1:2.39.2-1.1"},  # maven was removed, only its config files are left
+        )
+        self.assertEqual(
+            pmi.INSTALLED_LIST_PARSERS["dnf"](
+                "Installed Packages\ngit.x86_64    2.43.0-1.fc39   @updates\nmaven.noarch  1:3.8.6-3.fc39  @fedora\n"
+            ),
+            {"git": "2.43.0", "maven": "3.8.6"},
+        )
+        self.assertEqual(
+            pmi.INSTALLED_LIST_PARSERS["brew"]("git 2.43.0\npython@3.12 3.12.0 3.12.1\n"),
+            {"git": "2.43.0", "python@3.12": "3.12.1"},
+        )
+        index = pmi.InstalledPackageIndex({"winget": pmi.INSTALLED_LIST_PARSERS["winget"](WINGET_LIST)})
+        self.assertEqual(index.version_of("winget", "git.git"), "2.42.0")
+
+    def test_installed_index_fills_in_unknown_versions(self):
+        index = pmi.InstalledPackageIndex({"apt": {"maven": "3.8.7-2"}})
+        with (
+            patch.object(pmi, "get_offline_index", return_value=None),
+            patch.object(pmi, "_run_pm_command", return_value=(APT_POLICY, "")),
+        ):
+            results = pmi.get_latest_versions_and_update_commands(
+                [("maven", "Maven", "Unknown")], ["apt"], self.DETECTED, installed_index=index
+            )
+        self.assertEqual(results["maven"]["installed_version_in_pm"], "3.8.7-2")
+        self.assertFalse(results["maven"]["is_update_available"])
+
+
+class TestPackageManagerExecutor(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+
+    def _slow_run(self, command_parts, timeout=15):
+        pm_id = command_parts[0]
+        with self.lock:
+            self.running[pm_id] = self.running.get(pm_id, 0) + 1
+            self.peak[pm_id] = max(self.peak.get(pm_id, 0), self.running[pm_id])
+        time.sleep(0.2)
+        with self.lock:
+            self.running[pm_id] -= 1
+        return "ok", ""
+
+    def test_managers_run_in_parallel_within_their_limits(self):
+        executor = pmi.PackageManagerExecutor()
+        started = time.monotonic()
+        with patch.object(pmi, "_run_pm_command", side_effect=self._slow_run):
+            results = executor.map(
+                {
+                    "apt": lambda: executor.run_many("apt", [["apt"], ["apt"]]),
+                    "snap": lambda: executor.run_many("snap", [["snap"], ["snap"]]),
+                }
+            )
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(results["apt"], [("ok", ""), ("ok", "")])
+        self.assertEqual(self.peak, {"apt": 1, "snap": 2})  # apt holds the dpkg lock
+        self.assertLess(elapsed, 0.55)  # apt's two calls, with snap alongside
+        self.assertEqual(executor.timings["apt"].calls, 2)
+        self.assertGreaterEqual(executor.timings["apt"].seconds, 0.4)
+
+    def test_calls_are_cut_off_at_the_stage_deadline(self):
+        executor = pmi.PackageManagerExecutor(call_timeout=30, stage_timeout=5)
+        with patch.object(pmi, "_run_pm_command", return_value=("ok", "")) as mock_run:
+            executor.run("brew", ["brew", "info", "git"])
+            self.assertLessEqual(mock_run.call_args.kwargs["timeout"], 5)
+            executor.deadline = executor.clock() - 1
+            self.assertEqual(executor.run("brew", ["brew", "info", "git"]), (None, "DeadlineExceeded"))
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertEqual(executor.timings["brew"].skipped, 1)
+
+    def test_timed_out_commands_are_killed(self):
+        started = time.monotonic()
+        stdout, stderr = pmi._run_pm_command(
+            [sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.2
+        )
+        self.assertEqual((stdout, stderr), (None, "TimeoutExpired"))
+        self.assertLess(time.monotonic() - started, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.path_index import PathIndex
+
+
+class TestPathIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.first = os.path.join(self.tmp_dir, "first")
+        self.second = os.path.join(self.tmp_dir, "second")
+        os.mkdir(self.first)
+        os.mkdir(self.second)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _make_file(self, directory, name, executable=True):
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\n")
+        os.chmod(path, 0o755 if executable else 0o644)
+        return path
+
+    def _path_value(self, *dirs):
+        return os.pathsep.join(dirs)
+
+    def test_first_match_follows_path_order(self):
+        self._make_file(self.second, "tool")
+        first_tool = self._make_file(self.first, "tool")
+        index = PathIndex(self._path_value(self.first, self.second), system="Linux")
+
+        self.assertEqual(index.find("tool"), first_tool)
+        self.assertEqual(len(index.find_all("tool")), 2)
+        self.assertIsNone(index.find("Tool"))
+
+    def test_directories_are_listed_once(self):
+        self._make_file(self.first, "tool")
+        path_value = self._path_value(self.first, self.first, "", self.second)
+        with patch("os.scandir", wraps=os.scandir) as mock_scandir:
+            index = PathIndex(path_value, system="Linux").build()
+            for _ in range(5):
+                index.find("tool")
+                index.find("missing")
+        self.assertEqual(mock_scandir.call_count, 2)
+
+    def test_non_executable_files_are_skipped(self):
+        self._make_file(self.first, "tool", executable=False)
+        second_tool = self._make_file(self.second, "tool")
+        index = PathIndex(self._path_value(self.first, self.second), system="Linux")
+
+        self.assertEqual(index.find("tool"), second_tool)
+
+    def test_windows_lookup_uses_pathext_and_ignores_case(self):
+        python_exe = self._make_file(self.first, "Python.EXE")
+        self._make_file(self.first, "notes.txt")
+        index = PathIndex(
+            self._path_value(self.first), system="Windows", pathext=".COM;.EXE"
+        )
+
+        self.assertEqual(index.find("python.exe"), python_exe)
+        self.assertEqual(index.find("python"), python_exe)
+        self.assertIsNone(index.find("notes"))
+
+    def test_windows_stems_follow_pathext_order(self):
+        tool_bat = self._make_file(self.first, "tool.bat")
+        tool_exe = self._make_file(self.first, "tool.exe")
+        index = PathIndex(self._path_value(self.first), system="Windows", pathext=".COM;.EXE;.BAT;.CMD")
+        # Listed with the .bat first, as scandir may return them
+        with patch.object(index.fs, "list_files", return_value=["tool.bat", "tool.exe"]):
+            index.build()
+
+        self.assertEqual(index.find("tool"), tool_exe)
+        self.assertEqual(index.find_all("tool"), [tool_exe, tool_bat])
+
+
+if __name__ == "__main__":
+    unittest.main()
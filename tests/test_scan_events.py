@@ -0,0 +1,126 @@
+import io
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.events import (
+    CliProgressConsumer,
+    JsonLinesEventExporter,
+    ScanEventBus,
+)
+from tests.helpers import make_scanner
+
+
+class TestScanEventBus(unittest.TestCase):
+    def test_progress_is_coalesced_and_discrete_events_kept(self):
+        bus = ScanEventBus()
+        received = []
+        subscription = bus.subscribe(received.append)
+
+        for i in range(1000):
+            bus.progress(i + 1, 1000, f"item {i}")
+            if i % 250 == 0:
+                bus.publish("component", name=f"tool{i}")
+        bus.status("done")
+
+        self.assertEqual(subscription.drain(), 6)
+        self.assertEqual(
+            [e.kind for e in received],
+            ["component"] * 4 + ["status", "progress"],
+        )
+        self.assertEqual(received[-1].data["current"], 1000)
+        self.assertEqual(subscription.coalesced, 999)
+
+    def test_slow_subscriber_does_not_block_publisher(self):
+        bus = ScanEventBus(interval=0.01)
+        release = threading.Event()
+        fast_events = []
+
+        def slow_consumer(event):
+            release.wait(5)
+
+        bus.subscribe(slow_consumer, threaded=True)
+        fast = bus.subscribe(fast_events.append, kinds=("component",))
+
+        start = time.monotonic()
+        for i in range(10000):
+            bus.progress(i, 10000)
+            bus.publish("component", index=i)
+        elapsed = time.monotonic() - start
+
+        fast.drain()
+        release.set()
+        bus.close()
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(len(fast_events), 10000)
+
+    def test_threaded_subscriber_gets_final_events_on_close(self):
+        bus = ScanEventBus(interval=0.01)
+        received = []
+        bus.subscribe(received.append, threaded=True)
+        bus.publish("component", index=1)
+        bus.progress(5, 5, "finished")
+        bus.close()
+
+        self.assertEqual([e.kind for e in received][-2:], ["component", "progress"])
+
+    def test_final_redraw_drops_undelivered_rows(self):
+        # The GUI's sequence: rows streamed by the poller, scan closes the bus,
+        # the trees are redrawn from the results, then the last poll drains.
+        bus = ScanEventBus()
+        rows = []
+        subscription = bus.subscribe(lambda event: rows.append(event.data["issue"]), kinds=("issue",))
+        bus.publish("issue", issue="PATH entry missing")
+        subscription.drain()
+        bus.publish("issue", issue="Conflicting Python installations")  # Found after the last poll
+        bus.close()
+
+        results = ["PATH entry missing", "Conflicting Python installations"]
+        self.assertEqual(subscription.discard(), 1)
+        rows[:] = results  # Redraw
+        self.assertEqual(subscription.drain(), 0)
+        self.assertEqual(rows, results)
+
+    def test_cli_and_exporter_consumers(self):
+        bus = ScanEventBus()
+        cli_stream, export_stream = io.StringIO(), io.StringIO()
+        cli = bus.subscribe(CliProgressConsumer(cli_stream, width=10))
+        exporter = bus.subscribe(JsonLinesEventExporter(export_stream))
+
+        bus.status("Scanning")
+        bus.progress(5, 10)
+        bus.publish("scan_finished", issues=0)
+        cli.drain()
+        exporter.drain()
+
+        self.assertIn("[#####-----] 5/10 Scanning", cli_stream.getvalue())
+        kinds = [json.loads(line)["kind"] for line in export_stream.getvalue().splitlines()]
+        self.assertEqual(kinds, ["scan_finished", "status", "progress"])
+
+
+class TestScannerPublishesEvents(unittest.TestCase):
+    def test_environment_scan_progress_is_throttled(self):
+        scanner = make_scanner()
+        received = []
+        subscription = scanner.events.subscribe(received.append)
+
+        env = {f"VAR_{i}": "value" for i in range(500)}
+        with patch.dict(os.environ, env, clear=True):
+            scanner.collect_environment_variables()
+        subscription.drain()
+
+        kinds = [e.kind for e in received]
+        # Every variable is streamed, but status and progress arrive once each.
+        self.assertEqual(kinds.count("environment_variable"), 500)
+        self.assertEqual(kinds[500:], ["status", "progress"])
+        self.assertEqual(received[-1].data["current"], 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
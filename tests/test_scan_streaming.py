@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.report_generator import ReportGenerator
+from devenvaudit_src.scan_logic import (
+    DetectedComponent,
+    EnvironmentVariableInfo,
+    ScanIssue,
+    partition_scan_results,
+)
+from tests.helpers import make_scanner
+
+
+class TestStreamingScan(unittest.TestCase):
+    TOOLS = [
+        {"id": "alpha", "name": "Alpha", "version_args": ["--version"]},
+        {"id": "beta", "name": "Beta", "version_args": ["--version"]},
+    ]
+
+    def setUp(self):
+        self.scanner = make_scanner(self.TOOLS)
+        executables = {"Alpha": ["/opt/alpha/alpha"], "Beta": ["/opt/beta/beta"]}
+        self.scanner._find_executables_for_tool = lambda tool: executables[tool.name]
+        self.release_beta = threading.Event()
+
+        def fake_probe(exe_path, args, regex):
+            if exe_path == "/opt/beta/beta":
+                self.release_beta.wait(5)
+                return "2.0"
+            return "1.0"
+
+        self.scanner._get_version_from_command = fake_probe
+        env_patch = patch.dict(os.environ, {"EMPTY_VAR": ""}, clear=True)
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+
+    def test_results_are_yielded_while_the_scan_runs(self):
+        received = []
+        for item in self.scanner.iter_scan():
+            received.append(item)
+            # Beta's probe only finishes once Alpha has reached the consumer.
+            if isinstance(item, DetectedComponent) and item.name == "Alpha":
+                self.release_beta.set()
+
+        components, env_vars, issues = partition_scan_results(received)
+        self.assertEqual([(c.name, c.version) for c in components], [("Alpha", "1.0"), ("Beta", "2.0")])
+        self.assertEqual([v.name for v in env_vars], ["EMPTY_VAR"])
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(components, self.scanner.detected_components)
+
+    def test_cancel_event_stops_the_scan(self):
+        cancel = threading.Event()
+        received = []
+        start = time.monotonic()
+        with patch.object(
+            self.scanner, "_kill_active_processes", side_effect=self.release_beta.set
+        ):
+            for item in self.scanner.iter_scan(cancel_event=cancel):
+                received.append(item)
+                cancel.set()
+
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual([c.name for c in received], ["Alpha"])
+        self.assertTrue(self.scanner.cancelled)
+        self.assertEqual(self.scanner.environment_variables, [])
+
+    def test_leaving_the_loop_early_cancels_the_scan(self):
+        with patch.object(
+            self.scanner, "_kill_active_processes", side_effect=self.release_beta.set
+        ):
+            for item in self.scanner.iter_scan():
+                break
+
+        self.assertTrue(self.scanner.cancelled)
+        self.assertEqual(self.scanner.detected_components[0].name, "Alpha")
+
+    def test_scan_errors_are_raised_by_the_iterator(self):
+        self.scanner.identify_tools = lambda: (_ for _ in ()).throw(RuntimeError("boom"))
+
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            list(self.scanner.iter_scan())
+
+    def test_async_iterator_and_report_from_stream(self):
+        self.release_beta.set()
+
+        async def collect():
+            return [item async for item in self.scanner.aiter_scan()]
+
+        received = asyncio.run(collect())
+        report = ReportGenerator.from_scan_stream(received)
+
+        self.assertEqual([c.name for c in report.detected_components], ["Alpha", "Beta"])
+        self.assertTrue(all(isinstance(v, EnvironmentVariableInfo) for v in report.environment_variables))
+        self.assertTrue(all(isinstance(i, ScanIssue) for i in report.issues))
+        self.assertFalse(self.scanner.cancelled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.fs_cache import FakeFileSystem
+from devenvaudit_src.scan_logic import ScanIssue
+from devenvaudit_src.snapshot import ScanSnapshot, probe_environment_hash
+from tests.helpers import component, make_scanner
+
+
+class TestScanSnapshot(unittest.TestCase):
+    def test_diff_reports_tool_and_issue_changes(self):
+        stale = ScanIssue("Warning", "JAVA_HOME is not set", "Configuration")
+        kept = ScanIssue("Info", "Duplicate PATH entry", "Pathing")
+        previous = ScanSnapshot.capture(
+            [component("Git", "2.39.2", "/usr/bin/git"), component("Node", "20.5.0", "/usr/bin/node"),
+             component("Ruby", "3.2.0", "/usr/bin/ruby")],
+            [stale, kept], {}, {"PATH": "/usr/bin"},
+        )
+        current = ScanSnapshot.capture(
+            [component("Git", "2.43.0", "/usr/bin/git"), component("Node", "18.17.1", "/usr/bin/node"),
+             component("Go", "1.21.0", "/usr/bin/go")],
+            [kept, ScanIssue("Error", "Broken PATH entry", "Pathing")], {}, {"PATH": "/usr/bin"},
+        )
+        changes = current.diff(previous)
+
+        self.assertEqual([(c.name, c.old_version, c.new_version) for c in changes.upgraded], [("Git", "2.39.2", "2.43.0")])
+        self.assertEqual([(c.name, c.new_version) for c in changes.downgraded], [("Node", "18.17.1")])
+        self.assertEqual([c.name for c in changes.added], ["Go"])
+        self.assertEqual([c.name for c in changes.removed], ["Ruby"])
+        self.assertEqual([i["description"] for i in changes.new_issues], ["Broken PATH entry"])
+        self.assertEqual([i["description"] for i in changes.resolved_issues], ["JAVA_HOME is not set"])
+        self.assertTrue(current.diff(current).is_empty)
+
+    def test_probe_environment_hash_ignores_unrelated_variables(self):
+        base = {"PATH": "/usr/bin", "TERM": "xterm"}
+        self.assertEqual(probe_environment_hash(base), probe_environment_hash({**base, "TERM": "dumb"}))
+        self.assertNotEqual(probe_environment_hash(base), probe_environment_hash({**base, "PYENV_VERSION": "3.12"}))
+        self.assertNotEqual(probe_environment_hash(base), probe_environment_hash({**base, "ASDF_NODEJS_VERSION": "20"}))
+
+    def test_save_and_load_round_trip(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        path = os.path.join(tmp_dir, "snapshot.json")
+        snapshot = ScanSnapshot.capture([component("Git", "2.43.0", "/usr/bin/git")], [], {}, {})
+        self.assertTrue(snapshot.save(path))
+        loaded = ScanSnapshot.load(path)
+        self.assertEqual(loaded.tools, snapshot.tools)
+        self.assertTrue(loaded.diff(snapshot).is_empty)
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertIsNone(ScanSnapshot.load(path))
+
+
+class TestIncrementalScan(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        self.fs = FakeFileSystem({"/opt/tool/tool": "exe"})
+        self.scanner = make_scanner(
+            [{"id": "tool", "name": "Tool"}], filesystem=self.fs, incremental_scan_enabled=True
+        )
+        self.scanner.snapshot_path = os.path.join(self.tmp_dir, "snapshot.json")
+        self.scanner._find_executables_for_tool = lambda tool: ["/opt/tool/tool"]
+        self.probe_version = "1.0"
+        self.probe_calls = 0
+
+    def _probe(self, exe_path, version_args, version_regex, signature=None):
+        self.probe_calls += 1
+        self.scanner.version_sources[exe_path] = "process"
+        return self.probe_version
+
+    def _scan(self, environ):
+        with (
+            patch.dict(os.environ, environ, clear=True),
+            patch.object(self.scanner, "_probe_version", side_effect=self._probe),
+        ):
+            return self.scanner.run_incremental_scan()
+
+    def test_only_changed_binaries_or_environments_are_probed_again(self):
+        environ = {"PATH": "/opt/tool"}
+        components, _, _, changes = self._scan(environ)
+        self.assertEqual((self.probe_calls, [c.name for c in changes.added]), (1, ["Tool"]))
+
+        components, _, _, changes = self._scan(environ)
+        self.assertEqual(self.probe_calls, 1)
+        self.assertTrue(changes.is_empty)
+        self.assertEqual((changes.reused, changes.reprobed), (1, 0))
+        self.assertEqual(components[0].details["version_source"], "process, unchanged")
+
+        self.fs.add("/opt/tool/tool", {"executable": True, "size": 2048})  # Binary replaced
+        self.probe_version = "1.1"
+        _, _, _, changes = self._scan(environ)
+        self.assertEqual(self.probe_calls, 2)
+        self.assertEqual([(c.old_version, c.new_version) for c in changes.upgraded], [("1.0", "1.1")])
+
+        _, _, _, changes = self._scan({**environ, "PYENV_VERSION": "3.12.0"})
+        self.assertEqual(self.probe_calls, 3)
+        self.assertEqual(changes.reprobed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
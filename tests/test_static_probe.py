@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.static_probe import parse_version_info, static_version
+from tests.helpers import make_scanner
+
+
+def _pad4(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+
+def _version_block(key, value=b"", value_type=0, children=()):
+    """Encodes one VS_VERSIONINFO node (header, key, value, children)."""
+    body = _pad4(struct.pack("<HHH", 0, 0, 0) + key.encode("utf-16-le") + b"\0\0")
+    body = _pad4(body + value) + b"".join(_pad4(child) for child in children)
+    value_length = len(value) // 2 if value_type == 1 else len(value)
+    return struct.pack("<HHH", len(body), value_length, value_type) + body[6:]
+
+
+def _string(key, text):
+    return _version_block(key, text.encode("utf-16-le") + b"\0\0", value_type=1)
+
+
+def make_version_info(strings=None, product=(3, 11, 4150, 1013)):
+    fixed = struct.pack(
+        "<13I", 0xFEEF04BD, 0x10000,
+        (product[0] << 16) | product[1], (product[2] << 16) | product[3],
+        (product[0] << 16) | product[1], (product[2] << 16) | product[3],
+        0x3F, 0, 4, 1, 0, 0, 0,
+    )
+    children = []
+    if strings:
+        table = _version_block("040904b0", children=[_string(k, v) for k, v in strings.items()])
+        children.append(_version_block("StringFileInfo", children=[table]))
+    children.append(_version_block("VarFileInfo", children=[
+        _version_block("Translation", struct.pack("<HH", 0x409, 1200))
+    ]))
+    return _version_block("VS_VERSION_INFO", fixed, children=children)
+
+
+def make_pe(version_info: bytes) -> bytes:
+    """A minimal PE32+ image whose only section is a .rsrc holding RT_VERSION."""
+    rsrc_rva, rsrc_offset = 0x1000, 0x200
+    resources = bytearray()
+    resources += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 16, 0x80000000 | 0x18)
+    resources += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 1, 0x80000000 | 0x30)
+    resources += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 0x409, 0x48)
+    resources += struct.pack("<IIII", rsrc_rva + 0x58, len(version_info), 0, 0)
+    resources += version_info
+
+    optional = bytearray(240)
+    struct.pack_into("<H", optional, 0, 0x20B)
+    struct.pack_into("<I", optional, 108, 16)
+    struct.pack_into("<II", optional, 112 + 2 * 8, rsrc_rva, len(resources))
+    coff = struct.pack("<HHIIIHH", 0x8664, 1, 0, 0, 0, len(optional), 0x22)
+    section = struct.pack(
+        "<8sIIIIIIHHI", b".rsrc", len(resources), rsrc_rva, len(resources), rsrc_offset, 0, 0, 0, 0, 0x40000040
+    )
+    dos = bytearray(64)
+    dos[0:2] = b"MZ"
+    struct.pack_into("<I", dos, 0x3C, 64)
+    image = bytes(dos) + b"PE\0\0" + coff + bytes(optional) + section
+    return image.ljust(rsrc_offset, b"\0") + bytes(resources)
+
+
+def make_elf(note_json=None, rodata=b"") -> bytes:
+    """A minimal little-endian ELF64 file with optional .note.package and .rodata."""
+    sections = []  # (name, type, data)
+    if note_json is not None:
+        desc = json.dumps(note_json).encode() + b"\0"
+        note = struct.pack("<III", 4, len(desc), 0xCAFE1A7E) + b"FDO\0" + _pad4(desc)
+        sections.append((".note.package", 7, note))
+    sections.append((".rodata", 1, rodata))
+    names = b"\0" + b"".join(name.encode() + b"\0" for name, _, _ in sections) + b".shstrtab\0"
+    sections.append((".shstrtab", 3, names))
+
+    body = bytearray(64)
+    headers = [bytes(64)]  # SHN_UNDEF
+    name_offset = 1
+    for name, sh_type, data in sections:
+        offset = len(body)
+        body += _pad4(data)
+        headers.append(struct.pack("<IIQQQQIIQQ", name_offset, sh_type, 0, 0, offset, len(data), 0, 0, 1, 0))
+        name_offset += len(name) + 1
+    shoff = len(body)
+    body[0:16] = b"\x7fELF" + bytes([2, 1, 1]) + bytes(9)
+    struct.pack_into("<Q", body, 0x28, shoff)
+    struct.pack_into("<HHH", body, 0x3A, 64, len(headers), len(headers) - 1)
+    return bytes(body) + b"".join(headers)
+
+
+class TestStaticProbe(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        os.chmod(path, 0o755)
+        return path
+
+    def test_pe_version_resource_strings_win_over_fixed_info(self):
+        info = make_version_info({"FileVersion": "3.11.4150.1013", "ProductVersion": "3.11.4"})
+        self.assertEqual(parse_version_info(info)["ProductVersion"], "3.11.4")
+
+        result = static_version(self._write("python.exe", make_pe(info)))
+        self.assertEqual((result.version, result.method), ("3.11.4", "pe-versioninfo"))
+
+    def test_pe_without_strings_uses_fixed_product_version(self):
+        path = self._write("tool.exe", make_pe(make_version_info(product=(2, 41, 0, 1))))
+        self.assertEqual(static_version(path).version, "2.41.0.1")
+
+    def test_elf_package_note(self):
+        note = {"type": "deb", "name": "git", "version": "1:2.39.2-1"}
+        path = self._write("git", make_elf(note_json=note, rodata=b"git version %s\0"))
+        result = static_version(path, r"git version ([0-9.]+)")
+        self.assertEqual((result.version, result.method), ("2.39.2", "elf-package-note"))
+
+        note = {"type": "rpm", "name": "git", "version": "2.43.0-1.fc39"}
+        self.assertEqual(static_version(self._write("git2", make_elf(note_json=note))).version, "2.43.0")
+
+        # Not a version once epoch and release are dropped: the .rodata scan decides
+        note = {"type": "deb", "name": "git", "version": "snapshot"}
+        path = self._write("git3", make_elf(note_json=note, rodata=b"git version 2.40.1\0"))
+        result = static_version(path, r"git version ([0-9.]+)")
+        self.assertEqual((result.version, result.method), ("2.40.1", "section-scan"))
+
+    def test_elf_rodata_scan_requires_an_unambiguous_match(self):
+        regex = r"Tool\s+([0-9]+\.[0-9]+(?:\.[0-9]+)?)"
+        unique = self._write("tool", make_elf(rodata=b"usage\0Tool 1.2.3\0Tool 1.2.3 (build)\0"))
+        result = static_version(unique, regex)
+        self.assertEqual((result.version, result.method), ("1.2.3", "section-scan"))
+
+        ambiguous = self._write("tool2", make_elf(rodata=b"Tool 1.2.3\0needs Tool 1.0 or later\0"))
+        self.assertIsNone(static_version(ambiguous, regex))
+
+    def test_scripts_and_damaged_files_fall_back(self):
+        script = self._write("script.sh", b"#!/bin/sh\necho Tool 1.2.3\n" * 4)
+        truncated = self._write("broken.exe", make_pe(make_version_info({"ProductVersion": "1.0"}))[:400])
+        self.assertIsNone(static_version(script, r"Tool ([0-9.]+)"))
+        self.assertIsNone(static_version(truncated))
+        self.assertIsNone(static_version(os.path.join(self.tmp_dir, "missing")))
+
+
+class TestScannerStaticTier(unittest.TestCase):
+    @unittest.skipIf(os.name == "nt", "relies on POSIX execute permissions")
+    @patch("subprocess.Popen")
+    def test_static_version_skips_the_process_and_is_recorded(self, mock_popen):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        exe_path = os.path.join(tmp_dir, "tool")
+        with open(exe_path, "wb") as f:
+            f.write(make_elf(note_json={"version": "4.5.6"}))
+        os.chmod(exe_path, 0o755)
+        scanner = make_scanner(static_version_probe_enabled=True)
+
+        version = scanner._get_version_from_command(exe_path, ["--version"], r"Tool ([0-9.]+)")
+        scanner._add_detected_component({"id": "tool", "name": "Tool"}, exe_path, version)
+
+        mock_popen.assert_not_called()
+        details = scanner.detected_components[0].details
+        self.assertEqual(version, "4.5.6")
+        self.assertEqual(details["version_source"], "static (elf-package-note)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,7 +11,9 @@ from unittest.mock import MagicMock
 sys.modules["tkinterweb"] = MagicMock()
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from devenvaudit_src.scan_logic import SoftwareCategorizer
 from systemsage_main import (
+    categorize_inventory,
     format_size,
     is_likely_component,
     load_json_config,
@@ -52,6 +54,16 @@ class TestIsLikelyComponent(unittest.TestCase):
         self.assertTrue(is_likely_component("KB123456", "Microsoft"))  # type: ignore
 
 
+class TestCategorizeInventory(unittest.TestCase):
+    def test_rows_get_a_software_category(self):
+        categorizer = SoftwareCategorizer(
+            {"IDEs": [{"name": "Visual Studio Code", "keywords": ["vscode"]}]}
+        )
+        rows = [{"DisplayName": "Microsoft Visual Studio Code (User)"}, {"DisplayName": "Notepad++"}]
+        categorize_inventory(rows, categorizer)
+        self.assertEqual([row["SoftwareCategory"] for row in rows], ["IDEs", "Unknown"])
+
+
 class TestLoadJsonConfig(unittest.TestCase):
     @patch("os.path.exists")
     @patch("builtins.open", new_callable=mock_open)
@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import MagicMock
+import gzip
+import json
+import os
+import sys
+import tempfile
+import shutil
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import systemsage_daemon
+from devenvaudit_src.scan_logic import DetectedComponent
+
+
+class TestSystemSageDaemon(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.inventory_scan = MagicMock(return_value=[{"DisplayName": "App1"}])
+        self.devenv_scan = MagicMock(
+            return_value=(
+                [DetectedComponent(id="tool_1_0_tool", name="Tool", version="1.0")],
+                [],
+                [],
+            )
+        )
+        self.fingerprints = {"inventory": "a", "devenv": "b"}
+        self.daemon = systemsage_daemon.SystemSageDaemon(
+            output_dir=self.output_dir,
+            interval=60,
+            inventory_scan=self.inventory_scan,
+            devenv_scan=self.devenv_scan,
+            inventory_fingerprint_func=lambda: self.fingerprints["inventory"],
+            devenv_fingerprint_func=lambda: self.fingerprints["devenv"],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _read_status(self):
+        with open(self.daemon.status_file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_run_once_writes_results_and_status(self):
+        self.daemon.run_once()
+
+        status = self._read_status()
+        self.assertEqual(status["jobs"]["system_inventory"]["state"], "ok")
+        self.assertEqual(status["jobs"]["devenv_audit"]["state"], "ok")
+
+        inventory_file = status["jobs"]["system_inventory"]["last_output"]
+        with open(inventory_file, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["systemInventory"], [{"DisplayName": "App1"}])
+        devenv_file = status["jobs"]["devenv_audit"]["last_output"]
+        with open(devenv_file, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["detected_components"][0]["name"], "Tool")
+
+    def test_unchanged_inputs_skip_scan(self):
+        self.daemon.run_once()
+        self.daemon.run_once()
+        self.assertEqual(self.inventory_scan.call_count, 1)
+        self.assertEqual(self.devenv_scan.call_count, 1)
+        self.assertEqual(self._read_status()["jobs"]["devenv_audit"]["state"], "skipped")
+
+        self.fingerprints["devenv"] = "changed"
+        self.daemon.run_once()
+        self.assertEqual(self.inventory_scan.call_count, 1)
+        self.assertEqual(self.devenv_scan.call_count, 2)
+
+    def test_failed_scan_is_retried(self):
+        self.devenv_scan.side_effect = RuntimeError("boom")
+        self.daemon.run_once()
+        status = self._read_status()["jobs"]["devenv_audit"]
+        self.assertEqual(status["state"], "error")
+        self.assertEqual(status["error"], "boom")
+
+        self.devenv_scan.side_effect = None
+        self.daemon.run_once()
+        self.assertEqual(self._read_status()["jobs"]["devenv_audit"]["state"], "ok")
+
+    def test_ndjson_mode_writes_one_record_per_row(self):
+        self.daemon.ndjson = True
+        self.daemon.compress = True
+        self.daemon.run_once()
+
+        status = self._read_status()["jobs"]
+        inventory_file = status["system_inventory"]["last_output"]
+        self.assertTrue(inventory_file.endswith(".ndjson.gz"))
+        with gzip.open(inventory_file, "rt", encoding="utf-8") as f:
+            record = json.loads(f.readline())
+        self.assertEqual((record["type"], record["DisplayName"]), ("inventory", "App1"))
+        with gzip.open(status["devenv_audit"]["last_output"], "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([(r["type"], r["name"]) for r in records], [("component", "Tool")])
+
+    def test_next_delay_stays_within_jitter(self):
+        for _ in range(50):
+            delay = self.daemon.next_delay()
+            self.assertGreaterEqual(delay, 54)
+            self.assertLessEqual(delay, 66)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src import tools_db
+
+
+TOOLS = [
+    {
+        "id": "python",
+        "name": "Python",
+        "executables": {
+            "Windows": ["python.exe", "python3.exe"],
+            "Linux": ["python", "python3"],
+        },
+        "version_args": ["--version"],
+        "version_regex": "Python\\s+([0-9]+\\.[0-9]+(?:\\.[0-9]+)?)",
+    },
+    {
+        "id": "pypy",
+        "name": "PyPy",
+        "executables": {"Linux": ["pypy3", "python3"]},
+        "version_regex": "PyPy ([0-9.]+",  # deliberately invalid
+    },
+]
+
+
+class TestCompiledToolsDB(unittest.TestCase):
+    def test_inverted_index_per_os(self):
+        db = tools_db.compile_tools_db(TOOLS)
+
+        linux = db.view("Linux")
+        self.assertEqual(
+            [t.id for t in linux.tools_for_executable("python3")], ["python", "pypy"]
+        )
+        self.assertEqual(linux.tools_for_executable("Python3"), [])
+
+        # Darwin has no list of its own and falls back to the Linux names.
+        self.assertEqual(db.view("Darwin").tools[0].executables, ("python", "python3"))
+
+        windows = db.view("Windows")
+        self.assertEqual(
+            [t.id for t in windows.tools_for_executable("PYTHON.EXE")], ["python"]
+        )
+        self.assertEqual(windows.tools[1].executables, ())
+
+    def test_version_regexes_are_precompiled(self):
+        view = tools_db.compile_tools_db(TOOLS).view("Linux")
+
+        match = view.tools[0].version_regex.search("python 3.12.1")
+        self.assertEqual(match.group(1), "3.12.1")
+        self.assertIsNone(view.tools[1].version_regex)
+
+
+class TestToolsDBCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmp_dir, "tools_database.json")
+        with open(self.source, "w", encoding="utf-8") as f:
+            json.dump(TOOLS, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_second_load_uses_cache(self):
+        first = tools_db.load_tools_db(self.source)
+        self.assertTrue(os.path.exists(self.source + tools_db.TOOLS_DB_CACHE_SUFFIX))
+
+        with patch("devenvaudit_src.tools_db.json.load") as mock_json_load:
+            second = tools_db.load_tools_db(self.source)
+        mock_json_load.assert_not_called()
+        self.assertEqual(second.configs, first.configs)
+        self.assertEqual(
+            [t.id for t in second.view("Linux").tools_for_executable("python3")],
+            ["python", "pypy"],
+        )
+
+    def test_modified_source_invalidates_cache(self):
+        tools_db.load_tools_db(self.source)
+        with open(self.source, "w", encoding="utf-8") as f:
+            json.dump(TOOLS[:1], f)
+
+        reloaded = tools_db.load_tools_db(self.source)
+        self.assertEqual([c["id"] for c in reloaded.configs], ["python"])
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(self.source + tools_db.TOOLS_DB_CACHE_SUFFIX, "wb") as f:
+            f.write(b"not a marshal stream")
+
+        db = tools_db.load_tools_db(self.source)
+        self.assertEqual(len(db), 2)
+
+    def test_cache_with_a_different_layout_is_rebuilt(self):
+        cache_path = self.source + tools_db.TOOLS_DB_CACHE_SUFFIX
+        header = tools_db._cache_header(self.source)
+        for data in ({"header": header, "entries": []}, {"header": header, "tools": None, "views": None}):
+            with open(cache_path, "wb") as f:
+                marshal.dump(data, f)
+
+            db = tools_db.load_tools_db(self.source)
+            self.assertEqual(len(db), 2)
+
+    def test_missing_source_yields_empty_db(self):
+        db = tools_db.load_tools_db(os.path.join(self.tmp_dir, "missing.json"))
+        self.assertFalse(db)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src import package_manager_integrator as pmi
+from devenvaudit_src.scan_logic import DetectedComponent
+from devenvaudit_src.update_stage import UpdateCheckStage
+from tests.helpers import make_scanner
+
+LATEST = {"git": "2.45.0", "python": "3.12.4"}
+
+
+class FakeIntegrator:
+    """Stands in for the package_manager_integrator functions the stage calls."""
+
+    def __init__(self):
+        self.queries = []
+        self.queried = threading.Event()
+
+    def latest(self, tools, preferred_pms, detected_pms, **kwargs):
+        tools = list(tools)
+        self.queries.append([tool_id for tool_id, _, _ in tools])
+        self.queried.set()
+        return {
+            tool_id: pmi._update_info("apt", tool_id, LATEST[tool_id], version) if tool_id in LATEST else None
+            for tool_id, _, version in tools
+        }
+
+    def patches(self):
+        return [
+            patch("devenvaudit_src.update_stage.detect_package_managers", return_value={"apt": {"name": "APT"}}),
+            patch(
+                "devenvaudit_src.update_stage.build_installed_package_index",
+                return_value=pmi.InstalledPackageIndex(),
+            ),
+            patch("devenvaudit_src.update_stage.LatestVersionCache"),
+            patch("devenvaudit_src.update_stage.get_latest_versions_and_update_commands", side_effect=self.latest),
+        ]
+
+
+class IntegratorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.integrator = FakeIntegrator()
+        for p in self.integrator.patches():
+            p.start()
+            self.addCleanup(p.stop)
+
+
+class TestUpdateCheckStage(IntegratorTestCase):
+    def test_each_tool_is_queried_once_per_scan(self):
+        results = {}
+        stage = UpdateCheckStage(
+            {"preferred_package_managers_linux": ["apt"]},
+            "Linux",
+            lambda component, info: results.__setitem__(component.id, info),
+            batch_window=0.05,
+        )
+        python311 = DetectedComponent(id="py311", name="Python", version="3.11.2")
+        python312 = DetectedComponent(id="py312", name="Python", version="3.12.4")
+        git = DetectedComponent(id="git", name="Git", version="2.45.0")
+
+        self.assertFalse(stage.submit(DetectedComponent(id="x", name="Alpha"), "alpha"))
+        self.assertFalse(stage.started)  # Nothing a package manager knows: no worker
+        for component, tool_id in ((python311, "python"), (git, "git"), (python312, "python")):
+            self.assertTrue(stage.submit(component, tool_id))
+        self.assertTrue(stage.finish(timeout=5))
+
+        self.assertEqual(sorted(tool for query in self.integrator.queries for tool in query), ["git", "python"])
+        self.assertTrue(results["py311"]["is_update_available"])
+        self.assertFalse(results["py312"]["is_update_available"])
+        self.assertEqual(results["py312"]["latest_version"], "3.12.4")
+        self.assertFalse(results["git"]["is_update_available"])
+
+    def test_cancel_stops_waiting(self):
+        stage = UpdateCheckStage({"preferred_package_managers_linux": ["apt"]}, "Linux", MagicMock())
+        stage.cancel()
+        self.assertFalse(stage.submit(DetectedComponent(id="git", name="Git"), "git"))
+        self.assertTrue(stage.finish(timeout=1))  # Never started
+
+
+class TestScannerUpdateChecks(IntegratorTestCase):
+    def test_package_managers_are_queried_while_tools_are_identified(self):
+        scanner = make_scanner(
+            [
+                {"id": "git", "name": "Git", "version_args": ["--version"]},
+                {"id": "python", "name": "Python", "version_args": ["--version"]},
+            ],
+            perform_update_checks=True,
+            preferred_package_managers_linux=["apt"],
+        )
+        executables = {"Git": ["/usr/bin/git"], "Python": ["/usr/bin/python3"]}
+        scanner._find_executables_for_tool = lambda tool: executables[tool.name]
+
+        def fake_probe(exe_path, args, regex):
+            if exe_path == "/usr/bin/python3":
+                # Git's update check has to start before identification ends
+                self.assertTrue(self.integrator.queried.wait(5))
+                return "3.11.2"
+            return "2.39.2"
+
+        scanner._get_version_from_command = fake_probe
+        updates = []
+        subscription = scanner.events.subscribe(updates.append, kinds=("update_info",))
+
+        with patch.dict(os.environ, {}, clear=True):
+            components, _, _ = scanner.run_scan()
+        subscription.drain()
+
+        self.assertEqual(
+            {c.name: c.update_info["latest_version"] for c in components},
+            {"Git": "2.45.0", "Python": "3.12.4"},
+        )
+        self.assertEqual(self.integrator.queries[0], ["git"])
+        self.assertEqual(sorted(e.data["component"].name for e in updates), ["Git", "Python"])
+        self.assertEqual(components[0].to_dict()["update_info"]["package_manager_id"], "apt")
+
+    def test_tools_installed_only_through_a_package_manager_are_reported(self):
+        scanner = make_scanner(
+            [{"id": "git", "name": "Git", "version_args": ["--version"]}],
+            perform_update_checks=True,
+            preferred_package_managers_linux=["apt"],
+        )
+        scanner._find_executables_for_tool = lambda tool: ["/usr/bin/git"]
+        scanner._get_version_from_command = lambda exe_path, args, regex: "2.39.2"
+        index = pmi.InstalledPackageIndex({"apt": {"git": "1:2.39.2-1.1", "maven": "3.8.7-1"}})
+        reported = []
+        subscription = scanner.events.subscribe(reported.append, kinds=("package_only_tools",))
+
+        with (
+            patch("devenvaudit_src.update_stage.build_installed_package_index", return_value=index),
+            patch.dict(os.environ, {}, clear=True),
+        ):
+            scanner.run_scan()
+        subscription.drain()
+
+        expected = [
+            {
+                "tool_id": "maven",
+                "package_manager_id": "apt",
+                "package_name_in_pm": "maven",
+                "installed_version": "3.8.7-1",
+            }
+        ]
+        self.assertEqual(scanner.package_only_tools, expected)
+        self.assertEqual([e.data["tools"] for e in reported], [expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
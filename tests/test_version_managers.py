@@ -0,0 +1,119 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src.fs_cache import FakeFileSystem
+from devenvaudit_src.version_managers import discover_managed_installs
+from tests.helpers import make_scanner
+
+HOME = "/home/dev"
+
+NODE_HEADER = """
+#define NODE_MAJOR_VERSION 18
+#define NODE_MINOR_VERSION 17
+#define NODE_PATCH_VERSION 1
+"""
+
+RUST_MANIFEST = """
+[pkg.cargo]
+version = "1.72.0 (103a7ff2e 2023-08-15)"
+[pkg.rustc]
+version = "1.72.1 (d5c2e9c34 2023-09-13)"
+"""
+
+TREE = {
+    # pyenv: a CPython build and a pyenv-virtualenv environment
+    f"{HOME}/.pyenv/versions/3.11.4/bin/python3": "exe",
+    f"{HOME}/.pyenv/versions/tools-env/bin/python3": "exe",
+    f"{HOME}/.pyenv/versions/tools-env/pyvenv.cfg": {"content": "home = /x\nversion = 3.10.12\n"},
+    f"{HOME}/.pyenv/versions/broken": "dir",
+    # nvm: version from node_version.h, falling back to the directory name
+    f"{HOME}/.nvm/versions/node/v18.17.1/bin/node": "exe",
+    f"{HOME}/.nvm/versions/node/v18.17.1/include/node/node_version.h": {"content": NODE_HEADER},
+    f"{HOME}/.nvm/versions/node/v20.5.0/bin/node": "exe",
+    # SDKMAN!: JDK release file; "current" is a link to one of the versions
+    f"{HOME}/.sdkman/candidates/java/17.0.8-tem/bin/java": "exe",
+    f"{HOME}/.sdkman/candidates/java/17.0.8-tem/release": {"content": 'IMPLEMENTOR="Eclipse"\nJAVA_VERSION="17.0.8"\n'},
+    f"{HOME}/.sdkman/candidates/java/current": {"type": "dir", "target": f"{HOME}/.sdkman/candidates/java/17.0.8-tem"},
+    f"{HOME}/.sdkman/candidates/maven/3.9.4/bin/mvn": "exe",
+    # asdf: plugin names are mapped to tool ids; unknown plugins are ignored
+    f"{HOME}/.asdf/installs/golang/1.21.0/bin/go": "exe",
+    f"{HOME}/.asdf/installs/terraform/1.5.0/bin/terraform": "exe",
+    # rustup: version from the channel manifest, not the channel name
+    f"{HOME}/.rustup/toolchains/stable-x86_64-unknown-linux-gnu/bin/rustc": "exe",
+    f"{HOME}/.rustup/toolchains/stable-x86_64-unknown-linux-gnu/lib/rustlib/multirust-channel-manifest.toml": {"content": RUST_MANIFEST},
+    # conda: base and envs, versions from conda-meta
+    f"{HOME}/miniconda3/bin/python3": "exe",
+    f"{HOME}/miniconda3/conda-meta/python-3.11.5-h955ad1f_0.json": "file",
+    f"{HOME}/miniconda3/envs/ml/bin/python3": "exe",
+    f"{HOME}/miniconda3/envs/ml/conda-meta/python-3.9.18-h955ad1f_0.json": "file",
+}
+
+
+class TestVersionManagerPlugins(unittest.TestCase):
+    def setUp(self):
+        self.fs = FakeFileSystem(TREE)
+
+    def test_all_installed_versions_are_reported(self):
+        installs = discover_managed_installs(self.fs, "Linux", environ={}, home=HOME)
+
+        found = sorted((i.manager, i.tool_id, i.version) for i in installs)
+        self.assertEqual(
+            found,
+            [
+                ("asdf", "go", "1.21.0"),
+                ("conda", "python", "3.11.5"),
+                ("conda", "python", "3.9.18"),
+                ("nvm", "nodejs", "18.17.1"),
+                ("nvm", "nodejs", "20.5.0"),
+                ("pyenv", "python", "3.10.12"),
+                ("pyenv", "python", "3.11.4"),
+                ("rustup", "rust", "1.72.1"),
+                ("sdkman", "java", "17.0.8"),
+                ("sdkman", "maven", "3.9.4"),
+            ],
+        )
+
+    def test_environment_variables_override_default_roots(self):
+        fs = FakeFileSystem({"/opt/pyenv/versions/3.12.0/bin/python3": "exe"})
+        installs = discover_managed_installs(
+            fs, "Linux", environ={"PYENV_ROOT": "/opt/pyenv"}, home=HOME
+        )
+        self.assertEqual([i.executable_path for i in installs], ["/opt/pyenv/versions/3.12.0/bin/python3"])
+
+    def test_discovery_never_reads_beyond_metadata(self):
+        discover_managed_installs(self.fs, "Linux", environ={}, home=HOME)
+        stats = self.fs.stats()
+        # Only the metadata files of the installs above are read.
+        self.assertLessEqual(stats["read_text"]["misses"], 8)
+
+
+class TestScannerManagedInstalls(unittest.TestCase):
+    def test_managed_installs_become_components(self):
+        fs = FakeFileSystem(TREE)
+        scanner = make_scanner(
+            [{"id": "python", "name": "Python", "category": "Language"}],
+            filesystem=fs,
+            version_manager_discovery_enabled=True,
+        )
+        with (
+            patch.dict(os.environ, {"HOME": HOME}, clear=True),
+            patch.object(scanner, "_get_version_from_command") as mock_probe,
+        ):
+            scanner.identify_managed_installs()
+
+        mock_probe.assert_not_called()
+        by_exe = {c.executable_path: c for c in scanner.detected_components}
+        pyenv_python = by_exe[f"{HOME}/.pyenv/versions/3.11.4/bin/python3"]
+        self.assertEqual(pyenv_python.version, "3.11.4")
+        self.assertEqual(pyenv_python.details["version_manager"], "pyenv")
+        self.assertTrue(pyenv_python.source_detection.startswith("pyenv ("))
+        self.assertEqual(by_exe[f"{HOME}/.sdkman/candidates/java/17.0.8-tem/bin/java"].name, "Java")
+        self.assertEqual(len(scanner.detected_components), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
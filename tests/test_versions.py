@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from devenvaudit_src import package_manager_integrator as pmi
+from devenvaudit_src import versions
+from devenvaudit_src.versions import (
+    compare_debian_versions,
+    compare_many,
+    compare_rpm_versions,
+    compare_versions,
+    is_newer,
+    newest,
+)
+
+
+class TestVersionOrdering(unittest.TestCase):
+    def test_debian_ordering(self):
+        self.assertEqual(compare_debian_versions("1:2.39.5-0+deb12u1", "1:2.39.2-1.1"), 1)
+        self.assertEqual(compare_debian_versions("1.0~rc1-1", "1.0-1"), -1)
+        self.assertEqual(compare_debian_versions("1:1.0", "2.0"), 1)
+        self.assertEqual(compare_debian_versions("3.11.2-1+b1", "3.11.2-1+b1"), 0)
+        self.assertEqual(compare_debian_versions("1.0", "1.0-0"), 0)
+        self.assertEqual(compare_debian_versions("0~", ""), -1)
+
+    def test_rpm_ordering(self):
+        self.assertEqual(compare_rpm_versions((0, "2.43.0", "1.fc39"), (0, "2.41.0", "1.fc39")), 1)
+        self.assertEqual(compare_rpm_versions((0, "1.0~rc1", "1"), (0, "1.0", "1")), -1)
+        self.assertEqual(compare_rpm_versions((0, "1.0a", "1"), (0, "1.0.1", "1")), -1)
+        self.assertEqual(compare_versions("1.0^git1-1", "1.0-1", "rpm"), 1)
+        self.assertEqual(compare_versions("1.0^git1-1", "1.0.1-1", "rpm"), -1)
+
+    def test_generic_ordering_is_numeric(self):
+        self.assertEqual(compare_versions("10.0", "9.0"), 1)
+        self.assertEqual(compare_versions("1.2.3.4", "1.2.3"), 1)  # winget four-part versions
+        self.assertEqual(compare_versions("2.0rc1", "2.0"), -1)
+        self.assertEqual(compare_versions("1.0.0", "1"), 0)
+        self.assertEqual(compare_versions("2.43.0.windows.2", "2.43.0.windows.1"), 1)
+
+    def test_semver_and_pep440(self):
+        self.assertEqual(compare_versions("1.0.0-alpha.1", "1.0.0-alpha", "semver"), 1)
+        self.assertEqual(compare_versions("1.0.0-rc.1", "1.0.0", "semver"), -1)
+        self.assertEqual(compare_versions("v1.2.3+build.5", "1.2.3", "semver"), 0)
+        self.assertEqual(compare_versions("2.0.0.dev1", "2.0.0a1", "pep440"), -1)
+        self.assertEqual(newest(["1.10.0", "1.9.2", "1.10.0rc1"], "pep440"), "1.10.0")
+
+
+class TestBulkComparison(unittest.TestCase):
+    def test_compare_many_reuses_parsed_keys(self):
+        versions.clear_cache()
+        pairs = [("10.0", "9.0"), ("9.0", "10.0"), ("10.0", "10.0")] * 100
+        self.assertEqual(compare_many(pairs), [1, -1, 0] * 100)
+        self.assertEqual(versions.version_key.cache_info().misses, 2)
+
+    def test_packaging_revision_alone_is_not_an_update(self):
+        self.assertFalse(is_newer("3.11.2-1+b1", "3.11.2", "debian"))
+        self.assertTrue(is_newer("3.11.4-1", "3.11.2", "debian"))
+        self.assertTrue(is_newer("3.11.2-2", "3.11.2-1+b1", "debian"))
+        self.assertFalse(pmi._is_update_available("2.43.0", "2.43.0-1.fc39", "dnf"))
+        self.assertTrue(pmi._is_update_available("9.0.1", "10.0.0", "winget"))
+
+    def test_pacman_pkgrel_and_brew_revision_alone_are_not_updates(self):
+        self.assertFalse(pmi._is_update_available("2.43.0", "2.43.0-1", "pacman"))
+        self.assertFalse(pmi._is_update_available("3.12.1", "3.12.1_1", "brew"))
+        self.assertTrue(pmi._is_update_available("2.43.0", "2.44.0-1", "pacman"))
+        self.assertTrue(pmi._is_update_available("3.12.1", "3.12.2", "brew"))
+        self.assertTrue(pmi._is_update_available("3.12.1_1", "3.12.1_2", "brew"))
+        self.assertEqual(compare_versions("3.12.10_1", "3.12.9_3", "homebrew"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()